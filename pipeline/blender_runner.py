@@ -8,15 +8,30 @@ blender --background --python pipeline/blender_runner.py -- \
   --format glb \
   --voxel-size 0.004 \
   --solidify-thickness 0.002
+
+Modo por lotes (una sola sesión de Blender para muchas mallas):
+blender --background --python pipeline/blender_runner.py -- --jobs jobs.json
+
+``jobs.json`` es una lista de trabajos o ``{"defaults": {...}, "jobs": [...]}``.
+Cada trabajo admite las mismas claves que los argumentos (``input``,
+``output``, ``format``, ``voxel_size``, ``remesh_mode``, ``adaptivity``,
+``solidify_thickness``, ``solidify_offset``, ``smooth_shading``); lo que falte
+se toma de ``defaults`` y, después, de la línea de comandos.
 """
 
 from __future__ import annotations
 
 import argparse
 import sys
+import time
 from pathlib import Path
 from typing import Iterable
 
+if not __package__:
+    # Dentro de Blender el script se ejecuta suelto: la raíz del repo da acceso a ``tools``.
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+from tools.blender_jobs import load_jobs  # noqa: E402
+
 try:
     import bpy  # type: ignore
 except ImportError as exc:  # pragma: no cover - solo disponible en Blender
@@ -32,6 +47,16 @@ def _clear_scene() -> None:
         bpy.data.meshes.remove(block)
 
 
+def _free_scene_data() -> None:
+    """Borra objetos y datablocks sin usuarios entre trabajos para que la memoria no crezca."""
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for collection in (bpy.data.meshes, bpy.data.materials, bpy.data.textures, bpy.data.images):
+        for block in list(collection):
+            if block.users == 0:
+                collection.remove(block)
+
+
 def _import_mesh(path: Path):
     ext = path.suffix.lower()
     if ext == ".obj":
@@ -92,8 +117,9 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
     if "--" in argv:
         argv = argv[argv.index("--") + 1 :]
     parser = argparse.ArgumentParser(description="Postproceso headless de malla en Blender.")
-    parser.add_argument("--input", required=True, type=Path, help="Ruta de la malla de entrada.")
-    parser.add_argument("--output", required=True, type=Path, help="Ruta de salida (la extensión define el formato).")
+    parser.add_argument("--input", type=Path, help="Ruta de la malla de entrada.")
+    parser.add_argument("--output", type=Path, help="Ruta de salida (la extensión define el formato).")
+    parser.add_argument("--jobs", type=Path, help="JSON con una lista de trabajos (sustituye a --input/--output).")
     parser.add_argument("--format", default=None, help="Formato de exportación (obj, glb, gltf, ply, stl).")
     parser.add_argument("--voxel-size", default=0.005, type=float, help="Tamaño de voxel para el Remesh.")
     parser.add_argument("--remesh-mode", default="VOXEL", choices={"VOXEL", "SMOOTH", "SHARP"}, help="Modo de Remesh.")
@@ -101,12 +127,14 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--solidify-thickness", default=0.0, type=float, help="Espesor para Solidify (0 desactiva).")
     parser.add_argument("--solidify-offset", default=0.0, type=float, help="Offset de Solidify.")
     parser.add_argument("--smooth-shading", action="store_true", help="Activa suavizado de normales.")
-    return parser.parse_args(list(argv))
+    args = parser.parse_args(list(argv))
+    if args.jobs is None and (args.input is None or args.output is None):
+        parser.error("Se requiere --input y --output, o bien --jobs.")
+    return args
 
 
-def main(argv: Iterable[str] | None = None) -> None:
-    args = parse_args(argv)
-    _clear_scene()
+def process_job(args: argparse.Namespace) -> None:
+    """Importa, remesh, solidify y exporta una malla en la escena actual."""
     obj = _import_mesh(args.input)
     if args.voxel_size > 0:
         _apply_remesh(obj, voxel_size=args.voxel_size, adaptivity=args.adaptivity, mode=args.remesh_mode)
@@ -118,6 +146,29 @@ def main(argv: Iterable[str] | None = None) -> None:
     _export_mesh(obj, args.output, fmt)
 
 
+def main(argv: Iterable[str] | None = None) -> None:
+    args = parse_args(argv)
+    _clear_scene()
+    if args.jobs is None:
+        process_job(args)
+        return
+
+    jobs = load_jobs(args.jobs, args)
+    failures = 0
+    for i, job in enumerate(jobs, start=1):
+        start = time.perf_counter()
+        try:
+            process_job(job)
+            print(f"[blender_runner] Trabajo {i}/{len(jobs)} listo en {time.perf_counter() - start:.1f}s")
+        except Exception as exc:  # un trabajo roto no detiene el lote
+            failures += 1
+            print(f"[blender_runner] Trabajo {i}/{len(jobs)} falló ({job.input}): {exc}", file=sys.stderr)
+        finally:
+            _free_scene_data()
+    if failures:
+        sys.exit(f"[blender_runner] {failures} de {len(jobs)} trabajos fallaron.")
+
+
 if __name__ == "__main__":  # pragma: no cover - ejecutable desde Blender
     main()
 
@@ -3,24 +3,62 @@ CLI para capturar densidad (Marching Cubes) y postprocesar con Blender headless.
 
 Ejemplos:
   python -m pipeline.cli capture --input density.npy --output mesh.obj --iso-level 0.6 --spacing 0.8,0.8,1.2
+  python -m pipeline.cli capture --input "frames/density_*.npy" --output anim.glb --animation --fps 24
+  python -m pipeline.cli capture --input "frames/density_*.npz" --output frames/mesh.glb --prefetch 3 --prefetch-memory 2G
+  python -m pipeline.cli capture --input mask.npy --output mask.glb --mirror-axis x
+  python -m pipeline.cli capture --input big.vbv --output exports/big.glb --tiles 64 --tile-lods 3
+  python -m pipeline.cli capture --preset veil --resolution 512 --output veil.glb
+  python -m pipeline.cli capture --preset halo --particles 2000000 --steps 240 --resolution 256 --output halo.glb
   python -m pipeline.cli postprocess --input mesh.obj --output final.glb --voxel-size 0.003 --solidify-thickness 0.001
+  python -m pipeline.cli postprocess --jobs jobs.json --voxel-size 0.003
   python -m pipeline.cli full --density density.npy --output final.glb --iso-level 0.55 --voxel-size 0.004 --format glb
+  python -m pipeline.cli sweep --input density.npy --output-dir exports/sweep --iso-levels 0.4,0.5,0.6 --step-sizes 1,2 --voxel-sizes 0,0.004 --solidify-thicknesses 0,0.001
+  python -m pipeline.cli convert --input density.npz --output density.vbv --chunk 64 --codec zlib
+  python -m pipeline.cli convert --input mask.npy --output mask.vbv --chunk 32 --sparse-fill 0
+  python -m pipeline.cli convert --input mask.npy --output mask_bits.npz --pack-threshold 0.5
+  python -m pipeline.cli serve --port 8765 --workers 2
+  python -m pipeline.cli submit -- capture --input density.npy --output exports/mesh.obj
+  python -m pipeline.cli worker --spool exports/spool
+  python -m pipeline.cli --metrics-dir exports/metrics worker --spool exports/spool
 """
 
 from __future__ import annotations
 
 import argparse
-import subprocess
+import asyncio
 import sys
+import tempfile
+import time
 from pathlib import Path
 from typing import Iterable, List, Tuple
 
+import trimesh
+
 from pipeline.density_capture import (
+    DEFAULT_MIRROR_TOLERANCE,
+    ENGINES,
+    MIRROR_AXES,
     DensityCaptureConfig,
     capture_density_to_mesh,
+    capture_progressive,
+    capture_with_budget,
+    export_mesh,
     load_config,
     save_config,
 )
+from pipeline.density_frames import capture_frames, is_frame_input
+from pipeline.particle_sim import SPLAT_KERNELS, capture_particles
+from pipeline.preset_sdf import capture_preset
+from pipeline.sweep import SweepPost, parse_values, run_sweep
+from pipeline.tiled_export import capture_tiled
+from tools.blender_process import BlenderJob, run_blender
+from tools.chunked_volume import CODECS, convert_volume, parse_region
+from tools.memory_budget import parse_memory_size
+from tools.mesh_optimize import OPTIMIZE_METHODS
+from tools.metrics import inc, observe, start_exporter
+from tools.prefetch import DEFAULT_DEPTH as DEFAULT_PREFETCH_DEPTH
+from tools.prefetch import DEFAULT_MAX_BYTES as DEFAULT_PREFETCH_BYTES
+from tools.voxel_remesh import REMESH_ENGINES, voxel_remesh
 
 
 def _parse_spacing(value: str) -> Tuple[float, float, float]:
@@ -37,21 +75,49 @@ def _parse_step_size(value: str) -> int:
     return step
 
 
-def _run_blender(input_mesh: Path, output_mesh: Path, args: argparse.Namespace) -> None:
+def _value_list(cast):
+    def _parse(value: str) -> list:
+        try:
+            return parse_values(value, cast)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(f"Lista no válida: {value!r} (usa p. ej. 0.4,0.5,0.6).") from exc
+
+    return _parse
+
+
+def _parse_memory(value: str) -> int:
+    try:
+        return parse_memory_size(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _run_blender(input_mesh: Path | None, output_mesh: Path | None, args: argparse.Namespace) -> None:
+    """
+    Lanza ``blender_runner.py`` para una malla o, con ``args.jobs``, para toda
+    una lista de trabajos en una sola sesión de Blender.
+    """
     blender_executable = args.blender or "blender"
     script_path = Path(__file__).with_name("blender_runner.py")
-    cmd: List[str] = [
-        blender_executable,
-        "--background",
-        "--python",
-        str(script_path),
-        "--",
-        "--input",
-        str(input_mesh),
-        "--output",
-        str(output_mesh),
-        "--format",
-        args.format or output_mesh.suffix.replace(".", ""),
+    cmd: List[str] = [blender_executable, "--background", "--python", str(script_path), "--"]
+    if getattr(args, "jobs", None):
+        cmd.extend(["--jobs", str(args.jobs)])
+        if args.format:
+            cmd.extend(["--format", args.format])
+        name = args.jobs.stem
+    else:
+        cmd.extend(
+            [
+                "--input",
+                str(input_mesh),
+                "--output",
+                str(output_mesh),
+                "--format",
+                args.format or output_mesh.suffix.replace(".", ""),
+            ]
+        )
+        name = output_mesh.stem
+    cmd += [
         "--voxel-size",
         str(args.voxel_size),
         "--remesh-mode",
@@ -67,11 +133,54 @@ def _run_blender(input_mesh: Path, output_mesh: Path, args: argparse.Namespace)
         cmd.append("--smooth-shading")
 
     print(f"[cli] Ejecutando Blender headless: {' '.join(cmd)}")
-    subprocess.run(cmd, check=True)
+    result = run_blender(
+        BlenderJob(
+            cmd=cmd,
+            name=name,
+            log_path=args.blender_log,
+            timeout=args.blender_timeout,
+            max_memory_mb=args.blender_max_memory_mb,
+            echo=True,
+        )
+    )
+    print(f"[cli] Blender terminó en {result.seconds:.1f}s (pico RSS {result.peak_rss_mb:.0f} MiB)")
+
+
+def add_blender_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--blender", default=None, help="Ruta al ejecutable de Blender.")
+    parser.add_argument("--blender-timeout", default=None, type=float, help="Límite de tiempo por trabajo (s).")
+    parser.add_argument("--blender-max-memory-mb", default=None, type=float, help="Límite de memoria RSS (MiB).")
+    parser.add_argument("--blender-log", default=None, type=Path, help="Log con la salida completa de Blender.")
+
+
+def add_remesh_backend_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--remesh-backend",
+        choices=("blender", "python"),
+        default="blender",
+        help="Dónde se hace el remesh VOXEL: Blender o en proceso (tools.voxel_remesh).",
+    )
+    parser.add_argument(
+        "--remesh-engine",
+        choices=REMESH_ENGINES,
+        default="surface_nets",
+        help="Motor de extracción del remesh nativo.",
+    )
+
+
+def add_component_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--min-island-voxels", default=0, type=int, help="Borra islas de voxeles más pequeñas.")
+    parser.add_argument("--min-component-faces", default=0, type=int, help="Borra componentes con menos caras.")
+    parser.add_argument("--min-component-volume", default=0.0, type=float, help="Borra componentes de menor volumen.")
+    parser.add_argument("--keep-largest", default=None, type=int, help="Conserva solo las N componentes mayores.")
 
 
 def add_capture_arguments(parser: argparse.ArgumentParser) -> None:
-    parser.add_argument("--input", required=True, type=Path, help="Grid de densidad (.npy o .npz).")
+    parser.add_argument(
+        "--input",
+        type=Path,
+        help="Grid de densidad (.npy, .npz o .vbv), array 4D (T, X, Y, Z) o patrón glob de fotogramas.",
+    )
     parser.add_argument("--output", required=True, type=Path, help="Malla de salida (usa extensión o --format).")
     parser.add_argument("--iso-level", default=0.5, type=float, help="Iso-superficie para Marching Cubes.")
     parser.add_argument(
@@ -81,9 +190,103 @@ def add_capture_arguments(parser: argparse.ArgumentParser) -> None:
         help="Espaciado XYZ (mm o unidades del grid), formato x,y,z.",
     )
     parser.add_argument("--step-size", default=1, type=_parse_step_size, help="Salto de Marching Cubes (resolución).")
+    parser.add_argument(
+        "--target-triangles",
+        default=None,
+        type=int,
+        help="Presupuesto de triángulos: elige el step_size mínimo que lo cumple (--step-size actúa como mínimo).",
+    )
     parser.add_argument("--format", default=None, help="Formato de exportación: obj, ply, glb, gltf, stl.")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="marching_cubes",
+        help="Motor de extracción: marching_cubes, surface_nets o dual_contouring.",
+    )
+    parser.add_argument(
+        "--optimize-cache",
+        choices=OPTIMIZE_METHODS,
+        default=None,
+        help="Reordena triángulos/vértices para la caché de GPU (auto, forsyth, morton).",
+    )
+    add_component_arguments(parser)
+    parser.add_argument(
+        "--mirror-axis",
+        choices=sorted(MIRROR_AXES),
+        default=None,
+        help="El grid es simétrico respecto al plano medio de este eje: malla la mitad, refleja y suelda.",
+    )
+    parser.add_argument(
+        "--mirror-tolerance",
+        default=DEFAULT_MIRROR_TOLERANCE,
+        type=float,
+        help="Diferencia máxima entre muestras espejo; si se supera, la captura falla.",
+    )
+    parser.add_argument(
+        "--region",
+        type=parse_region,
+        default=None,
+        help="Sub-bloque a mallar, formato x0:x1,y0:y1,z0:z1 (extremos opcionales).",
+    )
+    parser.add_argument(
+        "--progressive",
+        default=None,
+        type=int,
+        metavar="NIVELES",
+        help="Escribe primero mallas gruesas (<salida>.lod0, .lod1...) y al final la resolución completa.",
+    )
+    parser.add_argument(
+        "--max-memory",
+        default=None,
+        type=_parse_memory,
+        metavar="TAMAÑO",
+        help="Presupuesto de RAM (p. ej. 2G, 1500M): estima el pico y, si no cabe, captura por losas.",
+    )
+    parser.add_argument(
+        "--tiles",
+        default=None,
+        type=int,
+        metavar="CELDAS",
+        help="Exporta por teselas de CELDAS³ (GLB por tesela y nivel + index.json en la carpeta <salida sin extensión>).",
+    )
+    parser.add_argument("--tile-lods", default=3, type=int, help="Niveles de detalle por tesela (step ×2 cada uno).")
     parser.add_argument("--config-out", type=Path, help="Guarda un JSON con la configuración usada.")
     parser.add_argument("--config-in", type=Path, help="Carga un JSON con configuración.")
+    frames = parser.add_argument_group("fotogramas (entrada 4D o glob)")
+    frames.add_argument("--frame-workers", default=None, type=int, help="Fotogramas mallados en paralelo.")
+    frames.add_argument("--animation", action="store_true", help="Un único glTF/GLB con los fotogramas animados.")
+    frames.add_argument("--fps", default=24.0, type=float, help="Fotogramas por segundo de la animación.")
+    frames.add_argument("--timings", default=None, type=Path, help="JSON con los tiempos por fotograma.")
+    frames.add_argument(
+        "--prefetch",
+        default=DEFAULT_PREFETCH_DEPTH,
+        type=int,
+        metavar="K",
+        help="Fotogramas leídos y descomprimidos por adelantado mientras se malla el actual (0 = desactivado).",
+    )
+    frames.add_argument(
+        "--prefetch-memory",
+        default=DEFAULT_PREFETCH_BYTES,
+        type=_parse_memory,
+        metavar="TAMAÑO",
+        help="Tope de los fotogramas cargados en cola (p. ej. 512M, 2G; por defecto 1G).",
+    )
+    preset = parser.add_argument_group("preset SDF (en lugar de --input)")
+    preset.add_argument("--preset", default=None, help="Id de assets/presets.json a evaluar y mallar directamente.")
+    preset.add_argument("--resolution", default=128, type=int, help="Resolución del grid evaluado (por eje).")
+    preset.add_argument("--extent", default=1.0, type=float, help="Semilado del dominio [-extent, extent]³.")
+    preset.add_argument("--seed", default=0, type=int, help="Semilla del ruido del preset.")
+    preset.add_argument("--preset-workers", default=None, type=int, help="Hilos de evaluación (por defecto, CPUs).")
+    preset.add_argument(
+        "--particles",
+        default=None,
+        type=int,
+        metavar="N",
+        help="Simula N partículas con las fuerzas del preset y malla su densidad (en lugar del SDF).",
+    )
+    preset.add_argument("--steps", default=240, type=int, help="Pasos de simulación (dt = 1/60 s).")
+    preset.add_argument("--splat-kernel", choices=SPLAT_KERNELS, default="gaussian", help="Kernel del splatting.")
+    preset.add_argument("--save-grid", default=None, type=Path, help="Guarda el grid splateado (.npy).")
 
 
 def _build_capture_config(args: argparse.Namespace) -> DensityCaptureConfig:
@@ -95,31 +298,153 @@ def _build_capture_config(args: argparse.Namespace) -> DensityCaptureConfig:
             spacing=args.spacing,
             step_size=args.step_size,
             export_format=args.format or args.output.suffix.replace(".", "") or "obj",
+            optimize_cache=args.optimize_cache,
+            engine=args.engine,
+            min_island_voxels=args.min_island_voxels,
+            min_component_faces=args.min_component_faces,
+            min_component_volume=args.min_component_volume,
+            keep_largest=args.keep_largest,
+            target_triangles=args.target_triangles,
+            mirror_axis=getattr(args, "mirror_axis", None),
+            mirror_tolerance=getattr(args, "mirror_tolerance", DEFAULT_MIRROR_TOLERANCE),
         )
-    if args.config_out:
-        save_config(config, args.config_out)
     return config
 
 
 def handle_capture(args: argparse.Namespace) -> Path:
+    preset = getattr(args, "preset", None)
+    if (args.input is None) == (preset is None):
+        raise SystemExit("[cli] capture requiere --input o --preset (solo uno de los dos).")
+    if getattr(args, "max_memory", None) is not None and (preset is not None or is_frame_input(args.input)):
+        raise SystemExit("[cli] --max-memory solo aplica a un grid único con --input.")
+    if getattr(args, "tiles", None) and (preset is not None or is_frame_input(args.input)):
+        raise SystemExit("[cli] --tiles solo aplica a un grid único con --input.")
     config = _build_capture_config(args)
-    output = capture_density_to_mesh(args.input, args.output, config)
-    print(f"[cli] Malla generada con Marching Cubes: {output}")
+    if preset is not None:
+        if args.region or getattr(args, "progressive", None):
+            raise SystemExit("[cli] --region y --progressive no aplican a --preset.")
+        if args.particles:
+            output, config = capture_particles(
+                preset,
+                args.output,
+                config,
+                count=args.particles,
+                steps=args.steps,
+                resolution=args.resolution,
+                extent=args.extent,
+                seed=args.seed,
+                kernel=args.splat_kernel,
+                grid_out=args.save_grid,
+            )
+        else:
+            output, config = capture_preset(
+                preset,
+                args.output,
+                config,
+                resolution=args.resolution,
+                extent=args.extent,
+                seed=args.seed,
+                workers=args.preset_workers,
+            )
+        if args.config_out:
+            save_config(config, args.config_out)
+        print(f"[cli] Malla generada desde el preset '{preset}': {output}")
+        return output
+    if is_frame_input(args.input):
+        outputs, config = capture_frames(
+            args.input,
+            args.output,
+            config,
+            region=args.region,
+            workers=args.frame_workers,
+            animation=args.animation,
+            fps=args.fps,
+            timings_path=args.timings,
+            prefetch=args.prefetch,
+            prefetch_bytes=args.prefetch_memory,
+        )
+        if args.config_out:
+            save_config(config, args.config_out)
+        print(f"[cli] {len(outputs)} archivo(s) generados con {config.engine}.")
+        return outputs[0] if len(outputs) == 1 else args.output.parent
+    max_memory = getattr(args, "max_memory", None)
+    if max_memory is not None and getattr(args, "progressive", None):
+        raise SystemExit("[cli] --max-memory no se combina con --progressive.")
+    if getattr(args, "tiles", None):
+        if max_memory is not None or getattr(args, "progressive", None):
+            raise SystemExit("[cli] --tiles no se combina con --max-memory ni con --progressive.")
+        output = capture_tiled(args.input, args.output, config, brick=args.tiles, lods=args.tile_lods, region=args.region)
+    elif max_memory is not None:
+        output, config = capture_with_budget(args.input, args.output, config, max_memory, region=args.region)
+    elif getattr(args, "progressive", None):
+        outputs, config = capture_progressive(
+            args.input, args.output, config, region=args.region, levels=args.progressive
+        )
+        output = outputs[-1]
+    else:
+        output, config = capture_density_to_mesh(args.input, args.output, config, region=args.region)
+    # Se guarda la configuración efectiva: lleva el step_size elegido por --target-triangles.
+    if args.config_out:
+        save_config(config, args.config_out)
+    print(f"[cli] Malla generada con {config.engine}: {output}")
     return output
 
 
+def _run_native_remesh(input_mesh: Path, output_mesh: Path, args: argparse.Namespace) -> None:
+    """
+    Remesh VOXEL en proceso (``tools.voxel_remesh``). Blender solo se lanza
+    después si hace falta Solidify, ya sin remesh.
+    """
+    if args.remesh_mode != "VOXEL":
+        raise SystemExit("[cli] --remesh-backend python solo admite --remesh-mode VOXEL.")
+    if args.adaptivity:
+        print("[cli] Aviso: --adaptivity no se aplica en el remesh nativo.")
+    mesh = trimesh.load(input_mesh, force="mesh", process=False)
+    result, report = voxel_remesh(mesh.vertices, mesh.faces, args.voxel_size, engine=args.remesh_engine)
+    print(
+        f"[cli] Remesh nativo ({args.remesh_engine}): {report.faces_before} -> {report.faces_after} caras, "
+        f"grid {report.grid_shape} en {report.seconds:.1f}s"
+    )
+    remeshed = trimesh.Trimesh(vertices=result.vertices, faces=result.faces, process=False)
+    if not args.solidify_thickness:
+        output = export_mesh(remeshed, output_mesh, args.format or output_mesh.suffix.replace(".", ""))
+        print(f"[cli] Malla final: {output}")
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        remeshed_path = Path(tmpdir) / f"{output_mesh.stem}_remesh.obj"
+        remeshed.export(remeshed_path, file_type="obj")
+        _run_blender(remeshed_path, output_mesh, argparse.Namespace(**{**vars(args), "voxel_size": 0.0}))
+
+
 def handle_postprocess(args: argparse.Namespace) -> None:
+    if not getattr(args, "jobs", None) and (args.input is None or args.output is None):
+        raise SystemExit("[cli] postprocess requiere --input y --output, o bien --jobs.")
+    if getattr(args, "remesh_backend", "blender") == "python" and args.voxel_size > 0:
+        if getattr(args, "jobs", None):
+            raise SystemExit("[cli] --jobs se ejecuta en Blender; usa --remesh-backend blender.")
+        _run_native_remesh(args.input, args.output, args)
+        return
     _run_blender(args.input, args.output, args)
 
 
 def handle_full(args: argparse.Namespace) -> None:
+    if is_frame_input(args.density):
+        raise SystemExit("[cli] 'full' procesa un único grid; usa 'capture' para series 4D.")
     capture_args = argparse.Namespace(
         input=args.density,
         output=args.intermediate,
         iso_level=args.iso_level,
         spacing=args.spacing,
         step_size=args.step_size,
+        target_triangles=args.target_triangles,
         format=args.capture_format,
+        optimize_cache=args.optimize_cache,
+        engine=args.engine,
+        min_island_voxels=args.min_island_voxels,
+        min_component_faces=args.min_component_faces,
+        min_component_volume=args.min_component_volume,
+        keep_largest=args.keep_largest,
+        region=None,
         config_out=None,
         config_in=args.config_in,
     )
@@ -132,16 +457,174 @@ def handle_full(args: argparse.Namespace) -> None:
         voxel_size=args.voxel_size,
         remesh_mode=args.remesh_mode,
         adaptivity=args.adaptivity,
+        remesh_backend=args.remesh_backend,
+        remesh_engine=args.remesh_engine,
         solidify_thickness=args.solidify_thickness,
         solidify_offset=args.solidify_offset,
         smooth_shading=args.smooth_shading,
         blender=args.blender,
+        blender_timeout=args.blender_timeout,
+        blender_max_memory_mb=args.blender_max_memory_mb,
+        blender_log=args.blender_log,
     )
     handle_postprocess(post_args)
 
 
+def handle_sweep(args: argparse.Namespace) -> Path:
+    if is_frame_input(args.input):
+        raise SystemExit("[cli] sweep procesa un único grid 3D.")
+    if any(step < 1 for step in args.step_sizes):
+        raise SystemExit("[cli] Los step_size deben ser >= 1.")
+    if args.remesh_backend == "python" and args.remesh_mode != "VOXEL":
+        raise SystemExit("[cli] --remesh-backend python solo admite --remesh-mode VOXEL.")
+    config = DensityCaptureConfig(
+        spacing=args.spacing,
+        export_format=args.capture_format,
+        optimize_cache=args.optimize_cache,
+        engine=args.engine,
+        min_island_voxels=args.min_island_voxels,
+        min_component_faces=args.min_component_faces,
+        min_component_volume=args.min_component_volume,
+        keep_largest=args.keep_largest,
+    )
+    post = SweepPost(
+        export_format=args.format,
+        remesh_backend=args.remesh_backend,
+        remesh_engine=args.remesh_engine,
+        remesh_mode=args.remesh_mode,
+        adaptivity=args.adaptivity,
+        solidify_offset=args.solidify_offset,
+        smooth_shading=args.smooth_shading,
+        blender=args.blender,
+        blender_timeout=args.blender_timeout,
+        blender_max_memory_mb=args.blender_max_memory_mb,
+        blender_log=args.blender_log,
+    )
+    results = run_sweep(
+        args.input,
+        args.output_dir,
+        config,
+        iso_levels=args.iso_levels,
+        step_sizes=args.step_sizes,
+        voxel_sizes=args.voxel_sizes,
+        thicknesses=args.solidify_thicknesses,
+        post=post,
+        region=args.region,
+        workers=args.workers,
+        table_path=args.table,
+    )
+    if any(row.error for row in results):
+        raise SystemExit("[cli] Algunas variantes del barrido fallaron; revisa la columna 'error' de la tabla.")
+    return (args.table or args.output_dir / "sweep.csv").with_suffix(".csv")
+
+
+def _parse_chunk_shape(value: str) -> Tuple[int, ...]:
+    try:
+        shape = tuple(int(v) for v in value.split(","))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError("El tamaño de bloque debe ser N o x,y,z.") from exc
+    if any(n < 1 for n in shape):
+        raise argparse.ArgumentTypeError("El tamaño de bloque debe ser >= 1.")
+    return shape * 3 if len(shape) == 1 else shape
+
+
+def handle_convert(args: argparse.Namespace) -> Path:
+    output = convert_volume(
+        args.input,
+        args.output,
+        chunk_shape=args.chunk,
+        codec=args.codec,
+        level=args.level,
+        sparse_fill=args.sparse_fill,
+        pack_threshold=args.pack_threshold,
+    )
+    print(f"[cli] Volumen convertido: {args.input} -> {output}")
+    return output
+
+
+def handle_serve(args: argparse.Namespace) -> None:
+    from pipeline.mesh_server import DEFAULT_CORS_ORIGINS, serve
+
+    try:
+        asyncio.run(
+            serve(
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                max_queue=args.max_queue,
+                cache_bytes=int(args.cache_mb * 1024 * 1024),
+                cors_origins=args.cors_origin or DEFAULT_CORS_ORIGINS,
+            )
+        )
+    except KeyboardInterrupt:
+        print("[cli] Servidor detenido.")
+
+
+def _spool_root(args: argparse.Namespace) -> Path:
+    if args.spool is not None:
+        return args.spool
+    from tools.mesh_exporter import EXPORT_ROOT
+
+    return EXPORT_ROOT / "spool"
+
+
+def handle_submit(args: argparse.Namespace) -> None:
+    from tools.spool import Spool
+
+    job_args = list(args.job_args)
+    if job_args and job_args[0] == "--":
+        job_args = job_args[1:]
+    if not job_args:
+        raise SystemExit("[cli] Indica el comando del trabajo tras '--' (p. ej. -- capture --input ...).")
+    spool = Spool(_spool_root(args))
+    job = spool.submit(job_args, module=args.module, timeout=args.timeout, max_attempts=args.max_attempts)
+    print(f"[cli] Trabajo encolado: {job.job_id} ({spool.root})")
+
+
+def handle_worker(args: argparse.Namespace) -> None:
+    from tools.spool import Spool, SpoolWorker
+
+    spool = Spool(_spool_root(args))
+    if args.status:
+        print(spool.status())
+        return
+    worker = SpoolWorker(
+        spool,
+        worker_id=args.worker_id,
+        lease_seconds=args.lease,
+        heartbeat_seconds=args.heartbeat,
+        poll_seconds=args.poll,
+        metrics_dir=args.metrics_dir,
+    )
+    print(f"[cli] Worker {worker.worker_id} escuchando {spool.root}")
+    try:
+        processed = worker.run(max_jobs=args.max_jobs, exit_when_empty=args.exit_when_empty)
+    except KeyboardInterrupt:
+        print("[cli] Worker detenido.")
+        return
+    print(f"[cli] Worker {worker.worker_id}: {processed} trabajo(s) procesados.")
+
+
+def add_spool_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--spool", default=None, type=Path, help="Directorio compartido de la cola (por defecto exports/spool)."
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Pipeline de Marching Cubes + Blender headless.")
+    parser.add_argument(
+        "--metrics-dir",
+        default=None,
+        type=Path,
+        help="Vuelca métricas (<comando>-<instancia>.prom y .json) en este directorio.",
+    )
+    parser.add_argument(
+        "--metrics-instance",
+        default=None,
+        help="Instancia en el nombre de los archivos de métricas (por defecto host-pid).",
+    )
+    parser.add_argument("--metrics-interval", default=15.0, type=float, help="Segundos entre volcados de métricas.")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     capture_parser = subparsers.add_parser("capture", help="Convierte densidad a malla.")
@@ -149,16 +632,22 @@ def build_parser() -> argparse.ArgumentParser:
     capture_parser.set_defaults(func=handle_capture)
 
     post_parser = subparsers.add_parser("postprocess", help="Ejecuta remesh/solidify/export en Blender headless.")
-    post_parser.add_argument("--input", required=True, type=Path, help="Malla de entrada para Blender.")
-    post_parser.add_argument("--output", required=True, type=Path, help="Malla de salida.")
+    post_parser.add_argument("--input", type=Path, help="Malla de entrada para Blender.")
+    post_parser.add_argument("--output", type=Path, help="Malla de salida.")
+    post_parser.add_argument(
+        "--jobs",
+        type=Path,
+        help="JSON con varios trabajos para una sola sesión de Blender (los argumentos actúan como valores por defecto).",
+    )
     post_parser.add_argument("--format", default=None, help="Formato de exportación final.")
     post_parser.add_argument("--voxel-size", default=0.005, type=float, help="Tamaño de voxel para Remesh.")
     post_parser.add_argument("--remesh-mode", choices={"VOXEL", "SMOOTH", "SHARP"}, default="VOXEL")
     post_parser.add_argument("--adaptivity", default=0.0, type=float)
+    add_remesh_backend_arguments(post_parser)
     post_parser.add_argument("--solidify-thickness", default=0.0, type=float)
     post_parser.add_argument("--solidify-offset", default=0.0, type=float)
     post_parser.add_argument("--smooth-shading", action="store_true")
-    post_parser.add_argument("--blender", default=None, help="Ruta al ejecutable de Blender.")
+    add_blender_arguments(post_parser)
     post_parser.set_defaults(func=handle_postprocess)
 
     full_parser = subparsers.add_parser("full", help="Captura densidad y lanza postproceso en Blender.")
@@ -173,25 +662,130 @@ def build_parser() -> argparse.ArgumentParser:
     full_parser.add_argument("--iso-level", default=0.5, type=float)
     full_parser.add_argument("--spacing", default="1,1,1", type=_parse_spacing)
     full_parser.add_argument("--step-size", default=1, type=_parse_step_size)
+    full_parser.add_argument("--target-triangles", default=None, type=int)
     full_parser.add_argument("--capture-format", default="obj")
+    full_parser.add_argument("--optimize-cache", choices=OPTIMIZE_METHODS, default=None)
+    full_parser.add_argument("--engine", choices=ENGINES, default="marching_cubes")
+    add_component_arguments(full_parser)
     full_parser.add_argument("--format", default="glb")
     full_parser.add_argument("--config-in", type=Path, help="Config JSON para reproducir parámetros de captura.")
     full_parser.add_argument("--voxel-size", default=0.005, type=float)
     full_parser.add_argument("--remesh-mode", choices={"VOXEL", "SMOOTH", "SHARP"}, default="VOXEL")
     full_parser.add_argument("--adaptivity", default=0.0, type=float)
+    add_remesh_backend_arguments(full_parser)
     full_parser.add_argument("--solidify-thickness", default=0.0, type=float)
     full_parser.add_argument("--solidify-offset", default=0.0, type=float)
     full_parser.add_argument("--smooth-shading", action="store_true")
-    full_parser.add_argument("--blender", default=None, help="Ruta al ejecutable de Blender.")
+    add_blender_arguments(full_parser)
     full_parser.set_defaults(func=handle_full)
 
+    sweep_parser = subparsers.add_parser(
+        "sweep", help="Barrido de parámetros sobre un grid cargado una vez en memoria compartida."
+    )
+    sweep_parser.add_argument("--input", required=True, type=Path, help="Grid de densidad (.npy, .npz o .vbv).")
+    sweep_parser.add_argument("--output-dir", required=True, type=Path, help="Carpeta de mallas y tabla de resultados.")
+    sweep_parser.add_argument("--iso-levels", default=[0.5], type=_value_list(float), help="Lista: 0.4,0.5,0.6.")
+    sweep_parser.add_argument("--step-sizes", default=[1], type=_value_list(int), help="Lista: 1,2,4.")
+    sweep_parser.add_argument(
+        "--voxel-sizes", default=[0.0], type=_value_list(float), help="Lista de voxel_size de Remesh (0 = sin remesh)."
+    )
+    sweep_parser.add_argument(
+        "--solidify-thicknesses", default=[0.0], type=_value_list(float), help="Lista de espesores (0 = sin Solidify)."
+    )
+    sweep_parser.add_argument("--workers", default=None, type=int, help="Procesos del pool (por defecto, hasta 4).")
+    sweep_parser.add_argument("--table", default=None, type=Path, help="Tabla de resultados (CSV y JSON al lado).")
+    sweep_parser.add_argument("--spacing", default="1,1,1", type=_parse_spacing)
+    sweep_parser.add_argument("--capture-format", default="obj", help="Formato de las capturas intermedias.")
+    sweep_parser.add_argument("--optimize-cache", choices=OPTIMIZE_METHODS, default=None)
+    sweep_parser.add_argument("--engine", choices=ENGINES, default="marching_cubes")
+    add_component_arguments(sweep_parser)
+    sweep_parser.add_argument("--region", type=parse_region, default=None, help="Sub-bloque x0:x1,y0:y1,z0:z1.")
+    sweep_parser.add_argument("--format", default="glb", help="Formato de las variantes postprocesadas.")
+    sweep_parser.add_argument("--remesh-mode", choices={"VOXEL", "SMOOTH", "SHARP"}, default="VOXEL")
+    sweep_parser.add_argument("--adaptivity", default=0.0, type=float)
+    add_remesh_backend_arguments(sweep_parser)
+    sweep_parser.add_argument("--solidify-offset", default=0.0, type=float)
+    sweep_parser.add_argument("--smooth-shading", action="store_true")
+    add_blender_arguments(sweep_parser)
+    sweep_parser.set_defaults(func=handle_sweep)
+
+    convert_parser = subparsers.add_parser("convert", help="Convierte volúmenes entre .npy/.npz y .vbv por bloques.")
+    convert_parser.add_argument("--input", required=True, type=Path, help="Volumen de entrada (.npy, .npz o .vbv).")
+    convert_parser.add_argument("--output", required=True, type=Path, help="Volumen de salida (.npy, .npz o .vbv).")
+    convert_parser.add_argument("--chunk", default="64", type=_parse_chunk_shape, help="Tamaño de bloque: N o x,y,z.")
+    convert_parser.add_argument("--codec", default="zlib", choices=sorted(CODECS), help="Códec por bloque.")
+    convert_parser.add_argument("--level", default=6, type=int, help="Nivel de compresión.")
+    convert_parser.add_argument(
+        "--sparse-fill",
+        default=None,
+        type=float,
+        help="Salida dispersa con este fondo: .vbv sin bloques vacíos o .npz COO (coords/values/shape).",
+    )
+    convert_parser.add_argument(
+        "--pack-threshold",
+        default=None,
+        type=float,
+        help="Máscara .npz a un bit por voxel (packed/shape) con valor >= este umbral.",
+    )
+    convert_parser.set_defaults(func=handle_convert)
+
+    serve_parser = subparsers.add_parser("serve", help="Servicio HTTP local de mallado para el front-end.")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Interfaz de escucha (por defecto solo localhost).")
+    serve_parser.add_argument("--port", default=8765, type=int)
+    serve_parser.add_argument("--workers", default=2, type=int, help="Trabajos de mallado simultáneos.")
+    serve_parser.add_argument("--max-queue", default=32, type=int, help="Máximo de trabajos pendientes.")
+    serve_parser.add_argument("--cache-mb", default=256.0, type=float, help="Tamaño de la caché de mallas en MiB.")
+    serve_parser.add_argument(
+        "--cors-origin",
+        action="append",
+        default=None,
+        help="Origen permitido por CORS (repetible; 'http://host:*' admite cualquier puerto, '*' cualquier origen). "
+        "Por defecto http://localhost:* y http://127.0.0.1:*.",
+    )
+    serve_parser.set_defaults(func=handle_serve)
+
+    submit_parser = subparsers.add_parser("submit", help="Encola un trabajo en el spool compartido.")
+    add_spool_arguments(submit_parser)
+    submit_parser.add_argument(
+        "--module", default="pipeline.cli", choices=("pipeline.cli", "tools.mesh_exporter"), help="CLI a ejecutar."
+    )
+    submit_parser.add_argument("--timeout", default=None, type=float, help="Límite de tiempo del trabajo (s).")
+    submit_parser.add_argument("--max-attempts", default=3, type=int, help="Intentos antes de marcarlo como fallido.")
+    submit_parser.add_argument("job_args", nargs=argparse.REMAINDER, help="Argumentos de la CLI tras '--'.")
+    submit_parser.set_defaults(func=handle_submit)
+
+    worker_parser = subparsers.add_parser("worker", help="Procesa trabajos del spool compartido.")
+    add_spool_arguments(worker_parser)
+    worker_parser.add_argument("--worker-id", default=None, help="Identificador (por defecto host-pid-aleatorio).")
+    worker_parser.add_argument("--lease", default=60.0, type=float, help="Segundos sin latido antes de requeue.")
+    worker_parser.add_argument("--heartbeat", default=10.0, type=float, help="Intervalo de latido (s).")
+    worker_parser.add_argument("--poll", default=2.0, type=float, help="Espera entre sondeos con la cola vacía (s).")
+    worker_parser.add_argument("--max-jobs", default=None, type=int, help="Termina tras N trabajos.")
+    worker_parser.add_argument("--exit-when-empty", action="store_true", help="Termina cuando la cola esté vacía.")
+    worker_parser.add_argument("--status", action="store_true", help="Muestra el estado de la cola y sale.")
+    worker_parser.set_defaults(func=handle_worker)
+
     return parser
 
 
 def main(argv: Iterable[str] | None = None) -> None:
     parser = build_parser()
     args = parser.parse_args(list(argv) if argv is not None else None)
-    result = args.func(args)
+    exporter = None
+    if args.metrics_dir is not None:
+        exporter = start_exporter(
+            args.metrics_dir, name=args.command, interval=args.metrics_interval, instance=args.metrics_instance
+        )
+    start = time.perf_counter()
+    status = "error"
+    try:
+        result = args.func(args)
+        status = "ok"
+    finally:
+        inc("vibra_jobs_total", runner="cli", command=args.command, status=status)
+        observe("vibra_job_seconds", time.perf_counter() - start, runner="cli", command=args.command)
+        if exporter is not None:
+            exporter.stop()
     if result:
         print(result)
 
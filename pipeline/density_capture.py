@@ -2,24 +2,51 @@
 Generador de mallas a partir de campos de densidad usando Marching Cubes.
 
 El módulo está pensado para alimentar la tubería de Blender headless:
-1. Se lee un grid de densidad (``.npy`` o ``.npz``).
+1. Se lee un grid de densidad (``.npy``, ``.npz`` o ``.vbv`` por bloques; COO
+   ``.npz`` y ``.vbv`` disperso se mallan por bloques activos sin densificar).
 2. Se ejecuta Marching Cubes para obtener la malla.
 3. Se exporta a un formato estándar (OBJ/PLY/GLB, etc.).
+
+``iter_progressive_meshes`` / ``capture_progressive`` entregan además niveles
+de grueso a fino para que los visores muestren una vista previa al instante.
 """
 
 from __future__ import annotations
 
+import dataclasses
 import json
+import math
+import os
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Callable, Iterable, Iterator, List, Sequence, Tuple
 
 import numpy as np
 import trimesh
 from skimage import measure
 
+from tools.components import filter_mesh, remove_small_islands
+from tools.metrics import inc, timer
+from tools.memory_budget import (
+    CapturePlan,
+    estimate_surface_triangles,
+    format_mib,
+    peak_rss_bytes,
+    plan_capture,
+)
+from tools.mesh_budget import choose_step_size
+from tools.chunked_volume import SUFFIX as CHUNKED_SUFFIX
+from tools.chunked_volume import ChunkedVolume, Region, array_shape, load_array
+from tools.mesh_optimize import optimize_mesh
+from tools.sparse_volume import open_sparse, sparse_marching_cubes
+from tools.surface_nets import ENGINES, dual_contouring, surface_nets
+
 
 SUPPORTED_EXPORT_FORMATS = {"obj", "ply", "glb", "gltf", "stl"}
+MIRROR_AXES = {"x": 0, "y": 1, "z": 2}
+# Diferencia máxima admitida entre muestras espejo (en unidades del grid).
+DEFAULT_MIRROR_TOLERANCE = 1e-4
 
 
 @dataclass
@@ -30,6 +57,15 @@ class DensityCaptureConfig:
     spacing: Tuple[float, float, float] = (1.0, 1.0, 1.0)
     step_size: int = 1
     export_format: str = "obj"
+    optimize_cache: str | None = None
+    engine: str = "marching_cubes"
+    min_island_voxels: int = 0
+    min_component_faces: int = 0
+    min_component_volume: float = 0.0
+    keep_largest: int | None = None
+    target_triangles: int | None = None
+    mirror_axis: str | None = None
+    mirror_tolerance: float = DEFAULT_MIRROR_TOLERANCE
 
     @classmethod
     def from_mapping(cls, payload: dict) -> "DensityCaptureConfig":
@@ -41,6 +77,15 @@ class DensityCaptureConfig:
             spacing=tuple(spacing),  # type: ignore[arg-type]
             step_size=int(payload.get("step_size", 1)),
             export_format=str(payload.get("export_format", "obj")).lower(),
+            optimize_cache=payload.get("optimize_cache"),
+            engine=str(payload.get("engine", "marching_cubes")),
+            min_island_voxels=int(payload.get("min_island_voxels", 0)),
+            min_component_faces=int(payload.get("min_component_faces", 0)),
+            min_component_volume=float(payload.get("min_component_volume", 0.0)),
+            keep_largest=payload.get("keep_largest"),
+            target_triangles=payload.get("target_triangles"),
+            mirror_axis=payload.get("mirror_axis"),
+            mirror_tolerance=float(payload.get("mirror_tolerance", DEFAULT_MIRROR_TOLERANCE)),
         )
 
 
@@ -53,23 +98,22 @@ def _ensure_supported_format(path: Path, export_format: str | None) -> str:
     return fmt
 
 
-def load_density_grid(input_path: Path) -> np.ndarray:
+def load_density_grid(input_path: Path, region: Region | None = None) -> np.ndarray:
     """
-    Carga un grid de densidad desde un archivo ``.npy`` o ``.npz``.
+    Carga un grid de densidad desde un archivo ``.npy``, ``.npz`` o ``.vbv``.
     El resultado es un ``numpy.ndarray`` 3D.
+
+    Con ``region`` solo se lee ese sub-bloque (en ``.vbv`` solo se decodifican
+    los bloques que lo cortan; ``.npy`` se abre con mmap).
     """
     if not input_path.exists():
         raise FileNotFoundError(f"No existe el archivo de densidad: {input_path}")
 
-    if input_path.suffix == ".npy":
-        grid = np.load(input_path)
-    elif input_path.suffix == ".npz":
-        with np.load(input_path) as data:
-            # Usamos la primera clave encontrada
-            first_key = next(iter(data.files))
-            grid = data[first_key]
-    else:
-        raise ValueError("Solo se aceptan archivos .npy o .npz para el grid de densidad.")
+    if input_path.suffix not in {".npy", ".npz", CHUNKED_SUFFIX}:
+        raise ValueError("Solo se aceptan archivos .npy, .npz o .vbv para el grid de densidad.")
+    # Para .npz se usa la primera clave encontrada.
+    with timer("vibra_stage_seconds", stage="load"):
+        grid = load_array(input_path, region)
 
     if grid.ndim != 3:
         raise ValueError(f"Se esperaba un grid 3D, pero se obtuvo una forma {grid.shape}.")
@@ -88,33 +132,645 @@ def run_marching_cubes(
     return trimesh.Trimesh(vertices=vertices, faces=faces, vertex_normals=normals, process=False)
 
 
+def run_surface_extraction(
+    grid: np.ndarray, iso_level: float, spacing: Iterable[float], step_size: int, engine: str = "marching_cubes"
+) -> trimesh.Trimesh:
+    """
+    Extrae la iso-superficie con el motor indicado (``ENGINES``).
+
+    ``surface_nets`` y ``dual_contouring`` generan un vértice por celda activa,
+    con triángulos mejor formados que Marching Cubes (y el mismo número en
+    superficies suaves).
+    """
+    if engine == "marching_cubes":
+        return run_marching_cubes(grid=grid, iso_level=iso_level, spacing=spacing, step_size=step_size)
+    if engine == "surface_nets":
+        result = surface_nets(grid, iso_level=iso_level, spacing=tuple(spacing), step_size=step_size)
+    elif engine == "dual_contouring":
+        result = dual_contouring(grid, iso_level=iso_level, spacing=tuple(spacing), step_size=step_size)
+    else:
+        raise ValueError(f"Motor '{engine}' no soportado. Usa uno de: {', '.join(ENGINES)}")
+    return trimesh.Trimesh(vertices=result.vertices, faces=result.faces, process=False)
+
+
+def check_mirror_symmetry(grid: np.ndarray, axis: str, tolerance: float, planes: int = 16) -> float:
+    """
+    Compara cada plano con su espejo respecto al plano medio de ``axis``.
+
+    Se recorre por grupos de ``planes`` planos (sin copiar el grid volteado) y
+    se lanza ``ValueError`` con el primer plano que supera ``tolerance``.
+
+    Returns:
+        La diferencia máxima encontrada.
+    """
+    volume = np.moveaxis(grid, MIRROR_AXES[axis], 0)
+    n = volume.shape[0]
+    worst = 0.0
+    for start in range(0, n // 2, planes):
+        stop = min(start + planes, n // 2)
+        front = volume[start:stop]
+        back = volume[n - stop : n - start][::-1]
+        diff = np.abs(front.astype(np.float32, copy=False) - back.astype(np.float32, copy=False))
+        diff = diff.reshape(len(diff), -1).max(axis=1)
+        worst = max(worst, float(diff.max()))
+        if worst > tolerance:
+            plane = start + int(np.argmax(diff > tolerance))
+            raise ValueError(
+                f"El grid no es simétrico respecto a {axis}: el plano {plane} difiere de su espejo {n - 1 - plane} "
+                f"en {float(diff.max()):.3g} (> tolerancia {tolerance:g}). Quita --mirror-axis o sube --mirror-tolerance."
+            )
+    return worst
+
+
+def _weld_planes(
+    vertices: np.ndarray, faces: np.ndarray, normals: np.ndarray, planes: Sequence[float]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Suelda los vértices repetidos (posición exacta) sobre los planos ``x = planes``."""
+    on_seam = np.flatnonzero(np.isin(vertices[:, 0], np.asarray(planes, dtype=vertices.dtype)))
+    if not on_seam.size:
+        return vertices, faces, normals
+    _, first, inverse = np.unique(vertices[on_seam], axis=0, return_index=True, return_inverse=True)
+    remap = np.arange(len(vertices))
+    remap[on_seam] = on_seam[first[inverse.ravel()]]
+    faces = remap[faces]
+    used = np.zeros(len(vertices), dtype=bool)
+    used[faces] = True
+    index = np.cumsum(used) - 1
+    return vertices[used], index[faces], normals[used]
+
+
+def run_mirrored_marching_cubes(
+    grid: np.ndarray, iso_level: float, spacing: Iterable[float], step_size: int, axis: str
+) -> trimesh.Trimesh:
+    """
+    Marching Cubes sobre la mitad del grid y reflejo respecto al plano medio.
+
+    Con ``n`` impar el plano medio es la muestra ``m = (n - 1) / 2``: se malla
+    ``[0, m]`` y la copia reflejada comparte los vértices del plano. Con ``n``
+    par el plano cae entre ``m - 1`` y ``m = n / 2``: se malla ``[0, m - 1]``,
+    la celda central se malla una sola vez (con ``m`` igual a ``m - 1``) y
+    ambas mitades se sueldan a ella. Los vértices de las costuras salen
+    idénticos y se sueldan por posición exacta.
+    """
+    a = MIRROR_AXES[axis]
+    volume = np.moveaxis(grid, a, 0)
+    n = volume.shape[0]
+    step = max(1, step_size)
+    m = (n - 1) // 2 if n % 2 else n // 2
+    last = m if n % 2 else m - 1
+    if n < 3 or last % step or (n % 2 == 0 and step > 1):
+        raise ValueError(
+            f"--mirror-axis {axis} con {n} muestras necesita step_size que divida {last} "
+            "(y step_size 1 si el número de muestras es par)."
+        )
+    verts, faces, normals, _ = measure.marching_cubes(
+        volume=volume[: last + 1], level=iso_level, step_size=step, allow_degenerate=False
+    )
+    parts = [(verts, faces, normals)]
+    # Reflejo x' = 2·c - x respecto al plano medio c; el orden de las caras se invierte.
+    centre2 = float(n - 1)
+    mirrored = verts.copy()
+    mirrored[:, 0] = centre2 - mirrored[:, 0]
+    mirrored_normals = normals.copy()
+    mirrored_normals[:, 0] *= -1.0
+    mirrored_faces = faces[:, ::-1]
+    if n % 2:
+        # Triángulos contenidos en el plano medio ya están en la primera mitad.
+        flat = (verts[faces, 0] == float(m)).all(axis=1)
+        mirrored_faces = mirrored_faces[~flat]
+    parts.append((mirrored, mirrored_faces, mirrored_normals))
+    planes = [float(m)]
+    if n % 2 == 0:
+        centre = np.stack([volume[m - 1], volume[m - 1]])
+        try:
+            c_verts, c_faces, c_normals, _ = measure.marching_cubes(
+                volume=centre, level=iso_level, allow_degenerate=False
+            )
+            c_verts[:, 0] += m - 1
+            parts.append((c_verts, c_faces, c_normals))
+        except (ValueError, RuntimeError):
+            pass  # el iso-nivel no corta el plano central
+        planes = [float(m - 1), float(m)]
+
+    offsets = np.cumsum([0] + [len(v) for v, _, _ in parts[:-1]])
+    vertices = np.concatenate([v for v, _, _ in parts])
+    all_faces = np.concatenate([f.astype(np.int64) + o for (_, f, _), o in zip(parts, offsets)])
+    all_normals = np.concatenate([nrm for _, _, nrm in parts])
+    vertices, all_faces, all_normals = _weld_planes(vertices, all_faces, all_normals, planes)
+
+    # Volver al orden de ejes original; una permutación impar (y) invierte la orientación.
+    order = [a] + [i for i in range(3) if i != a]
+    restored = np.empty_like(vertices)
+    restored[:, order] = vertices
+    restored_normals = np.empty_like(all_normals)
+    restored_normals[:, order] = all_normals
+    if a == 1:
+        all_faces = all_faces[:, ::-1]
+    return trimesh.Trimesh(
+        vertices=restored.astype(np.float64) * np.asarray(tuple(spacing), dtype=np.float64),
+        faces=all_faces,
+        vertex_normals=restored_normals,
+        process=False,
+    )
+
+
+def mesh_from_grid(
+    grid: np.ndarray, config: DensityCaptureConfig
+) -> Tuple[trimesh.Trimesh, DensityCaptureConfig]:
+    """
+    Convierte un grid ya cargado en malla aplicando las etapas de ``config``.
+
+    Returns:
+        La malla y la configuración efectiva: con ``target_triangles`` lleva el
+        ``step_size`` elegido aquí (``config`` no se modifica), que es lo que
+        ``save_config`` debe registrar.
+    """
+    if config.mirror_axis:
+        if config.engine != "marching_cubes":
+            raise ValueError("--mirror-axis solo está disponible con el motor marching_cubes.")
+        with timer("vibra_stage_seconds", stage="symmetry"):
+            deviation = check_mirror_symmetry(grid, config.mirror_axis, config.mirror_tolerance)
+        print(f"[density_capture] Simetría en {config.mirror_axis}: diferencia máxima {deviation:.3g}")
+    if config.min_island_voxels > 0:
+        with timer("vibra_stage_seconds", stage="islands"):
+            grid, report = remove_small_islands(grid, config.iso_level, config.min_island_voxels)
+        print(
+            f"[density_capture] Islas de voxeles: {report.components_before} -> {report.components_after}"
+        )
+    if config.target_triangles:
+        estimate = choose_step_size(
+            grid, config.iso_level, config.target_triangles, engine=config.engine, min_step=config.step_size
+        )
+        config = dataclasses.replace(config, step_size=estimate.step_size)
+        print(
+            f"[density_capture] step_size={estimate.step_size} para <= {estimate.target_triangles} triángulos "
+            f"(~{estimate.estimated_triangles} estimados, {estimate.seconds:.2f}s)"
+        )
+    with timer("vibra_stage_seconds", stage="extract"):
+        if config.mirror_axis:
+            mesh = run_mirrored_marching_cubes(
+                grid, config.iso_level, config.spacing, config.step_size, config.mirror_axis
+            )
+        else:
+            mesh = run_surface_extraction(
+                grid=grid,
+                iso_level=config.iso_level,
+                spacing=config.spacing,
+                step_size=config.step_size,
+                engine=config.engine,
+            )
+    inc("vibra_triangles_total", len(mesh.faces), engine=config.engine)
+    return _postprocess_mesh(mesh, config), config
+
+
+def _postprocess_mesh(mesh: trimesh.Trimesh, config: DensityCaptureConfig) -> trimesh.Trimesh:
+    """Etapas sobre la malla ya extraída: filtro de componentes y caché de vértices."""
+    if config.min_component_faces > 0 or config.min_component_volume > 0 or config.keep_largest is not None:
+        with timer("vibra_stage_seconds", stage="components"):
+            mesh, report = filter_mesh(
+                mesh,
+                min_faces=config.min_component_faces,
+                min_volume=config.min_component_volume,
+                keep_largest=config.keep_largest,
+            )
+        print(
+            f"[density_capture] Componentes: {report.components_before} -> {report.components_after} "
+            f"({report.elements_before} -> {report.elements_after} caras)"
+        )
+    if config.optimize_cache:
+        with timer("vibra_stage_seconds", stage="optimize"):
+            mesh, report = optimize_mesh(mesh, method=config.optimize_cache)
+        print(
+            f"[density_capture] ACMR {report.acmr_before:.3f} -> {report.acmr_after:.3f} "
+            f"({report.method}, {report.faces} caras, {report.seconds:.2f}s)"
+        )
+    return mesh
+
+
+def export_mesh_bytes(mesh: trimesh.Trimesh, export_format: str) -> bytes:
+    """
+    Serializa la malla en memoria (para respuestas HTTP o cachés).
+    """
+    fmt = export_format.lower()
+    if fmt not in SUPPORTED_EXPORT_FORMATS:
+        raise ValueError(
+            f"Formato '{fmt}' no soportado. Usa uno de: {', '.join(sorted(SUPPORTED_EXPORT_FORMATS))}"
+        )
+    if fmt == "gltf":
+        raise ValueError("glTF separado genera varios archivos; usa 'glb' para exportar en memoria.")
+    payload = mesh.export(file_type=fmt)
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return payload
+
+
 def export_mesh(mesh: trimesh.Trimesh, output_path: Path, export_format: str | None = None) -> Path:
     """
     Exporta la malla al formato indicado usando la extensión del archivo o ``export_format``.
     """
     fmt = _ensure_supported_format(output_path, export_format)
     output_path = output_path.with_suffix(f".{fmt}")
-    mesh.export(output_path, file_type=fmt)
+    with timer("vibra_stage_seconds", stage="export"):
+        mesh.export(output_path, file_type=fmt)
+    if output_path.exists():
+        inc("vibra_bytes_written_total", output_path.stat().st_size, format=fmt)
     return output_path
 
 
 def capture_density_to_mesh(
-    density_path: Path, output_path: Path, config: DensityCaptureConfig | None = None
-) -> Path:
+    density_path: Path | np.ndarray,
+    output_path: Path,
+    config: DensityCaptureConfig | None = None,
+    region: Region | None = None,
+) -> Tuple[Path, DensityCaptureConfig]:
     """
     Pipeline completo: carga densidad → Marching Cubes → exporta.
+
+    ``density_path`` también puede ser un grid 3D ya en memoria (p. ej. el
+    splatting de ``pipeline.particle_sim``).
+
+    Returns:
+        La ruta exportada y la configuración efectiva (ver ``mesh_from_grid``).
     """
     config = config or DensityCaptureConfig()
-    grid = load_density_grid(density_path)
-    mesh = run_marching_cubes(
-        grid=grid,
-        iso_level=config.iso_level,
-        spacing=config.spacing,
-        step_size=config.step_size,
+    if isinstance(density_path, np.ndarray):
+        if density_path.ndim != 3:
+            raise ValueError(f"Se esperaba un grid 3D, pero se obtuvo una forma {density_path.shape}.")
+        grid = density_path[region] if region is not None else density_path
+    else:
+        if region is None and density_path.exists():
+            output = capture_sparse(density_path, output_path, config)
+            if output is not None:
+                return output, config
+        grid = load_density_grid(density_path, region)
+    mesh, config = mesh_from_grid(grid, config)
+    return export_mesh(mesh, output_path, config.export_format), config
+
+
+def _region_bounds(region: Region | None, shape: Tuple[int, ...]) -> List[Tuple[int, int]]:
+    slices = list(region or ()) + [slice(None)] * (len(shape) - len(region or ()))
+    return [sl.indices(n)[:2] for sl, n in zip(slices, shape)]
+
+
+def capture_streaming(
+    density_path: Path,
+    output_path: Path,
+    config: DensityCaptureConfig | None = None,
+    region: Region | None = None,
+    slab: int = 64,
+) -> Path:
+    """
+    Marching Cubes por losas en X: solo una losa de ``slab + 1`` planos vive en
+    memoria (mmap en ``.npy``, bloques en ``.vbv``).
+
+    Losas contiguas comparten el plano del borde; sus vértices salen idénticos
+    en ambas (mismo par de valores por arista) y se sueldan al final, así que
+    la malla es la misma que la del grid completo.
+    """
+    config = config or DensityCaptureConfig()
+    if config.engine != "marching_cubes":
+        raise ValueError("La captura por losas solo está disponible con el motor marching_cubes.")
+    if config.mirror_axis:
+        raise ValueError("La captura por losas no admite --mirror-axis.")
+    if density_path.suffix not in {".npy", CHUNKED_SUFFIX}:
+        raise ValueError("La captura por losas necesita acceso por regiones (.npy o .vbv).")
+    step = max(1, config.step_size)
+    slab = max(step, slab // step * step)
+    (x_lo, x_hi), (y_lo, y_hi), (z_lo, z_hi) = _region_bounds(region, array_shape(density_path))
+    nx = x_hi - x_lo
+    vertices: List[np.ndarray] = []
+    faces: List[np.ndarray] = []
+    seams: List[float] = []
+    count = 0
+    for x0 in range(0, max(nx - 1, 1), slab):
+        x1 = min(x0 + slab, nx - 1)
+        if x0:
+            seams.append(float(x0))
+        with timer("vibra_stage_seconds", stage="load"):
+            block = load_array(density_path, (slice(x_lo + x0, x_lo + x1 + 1), slice(y_lo, y_hi), slice(z_lo, z_hi)))
+        if not float(block.min()) <= config.iso_level <= float(block.max()):
+            continue
+        with timer("vibra_stage_seconds", stage="extract"):
+            try:
+                verts, tris, _, _ = measure.marching_cubes(
+                    volume=block, level=config.iso_level, step_size=step, allow_degenerate=False
+                )
+            except (ValueError, RuntimeError):
+                # El iso-nivel solo toca un extremo de la losa (o no la corta tras el step): sin superficie.
+                continue
+        verts[:, 0] += x0
+        vertices.append(verts.astype(np.float32, copy=False))
+        faces.append(tris.astype(np.int64, copy=False) + count)
+        count += len(verts)
+        del block
+    if not faces:
+        raise ValueError(f"El iso-nivel {config.iso_level} no corta el volumen.")
+    verts = np.concatenate(vertices)
+    tris = np.concatenate(faces)
+    del vertices, faces
+
+    # Soldadura de las costuras: vértices repetidos en los planos compartidos.
+    on_seam = np.flatnonzero(np.isin(verts[:, 0], np.asarray(seams, dtype=np.float32)))
+    if on_seam.size:
+        _, first, inverse = np.unique(verts[on_seam], axis=0, return_index=True, return_inverse=True)
+        remap = np.arange(len(verts))
+        remap[on_seam] = on_seam[first[inverse.ravel()]]
+        tris = remap[tris]
+        # Muestras justo en el iso-nivel dejan vértices repetidos en la costura: como con
+        # ``allow_degenerate=False``, se descartan los triángulos que colapsan al soldar.
+        tris = tris[(tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 2] != tris[:, 0])]
+        used = np.zeros(len(verts), dtype=bool)
+        used[tris] = True
+        index = np.cumsum(used) - 1
+        verts, tris = verts[used], index[tris]
+
+    mesh = trimesh.Trimesh(
+        vertices=verts.astype(np.float64) * np.asarray(config.spacing, dtype=np.float64), faces=tris, process=False
+    )
+    inc("vibra_triangles_total", len(mesh.faces), engine=config.engine)
+    mesh = _postprocess_mesh(mesh, config)
+    return export_mesh(mesh, output_path, config.export_format)
+
+
+def capture_sparse(
+    density_path: Path, output_path: Path, config: DensityCaptureConfig | None = None
+) -> Path | None:
+    """
+    Captura sobre un volumen disperso (COO ``.npz`` o ``.vbv`` con ``fill``)
+    mallando solo los ladrillos activos (``tools.sparse_volume``).
+
+    Devuelve ``None`` si la entrada es densa; si la configuración necesita el
+    grid completo (otro motor, islas, ``target_triangles``, espejo) se avisa y
+    se densifica.
+    """
+    config = config or DensityCaptureConfig()
+    volume = open_sparse(density_path)
+    if volume is None:
+        return None
+    try:
+        reasons = []
+        if volume.ndim != 3:
+            reasons.append(f"forma {volume.shape}")
+        if config.engine != "marching_cubes":
+            reasons.append(f"motor {config.engine}")
+        if config.min_island_voxels > 0:
+            reasons.append("--min-island-voxels")
+        if config.target_triangles:
+            reasons.append("--target-triangles")
+        if config.mirror_axis:
+            reasons.append("--mirror-axis")
+        if reasons:
+            print(f"[density_capture] Aviso: entrada dispersa densificada por {', '.join(reasons)}.")
+            return None
+        with timer("vibra_stage_seconds", stage="extract"):
+            result = sparse_marching_cubes(volume, config.iso_level, config.step_size)
+    finally:
+        if hasattr(volume, "close"):
+            volume.close()
+    print(
+        f"[density_capture] Disperso: {result.bricks_active} de {result.bricks_total} bloques activos, "
+        f"{result.bricks_meshed} mallados"
     )
+    mesh = trimesh.Trimesh(
+        vertices=result.vertices * np.asarray(config.spacing, dtype=np.float64), faces=result.faces, process=False
+    )
+    inc("vibra_triangles_total", len(mesh.faces), engine=config.engine)
+    mesh = _postprocess_mesh(mesh, config)
     return export_mesh(mesh, output_path, config.export_format)
 
 
+def capture_with_budget(
+    density_path: Path,
+    output_path: Path,
+    config: DensityCaptureConfig,
+    max_memory: int,
+    region: Region | None = None,
+) -> Tuple[Path, DensityCaptureConfig]:
+    """
+    Estima el pico de memoria y captura en RAM o por losas para quedar bajo
+    ``max_memory`` bytes. Al final informa del pico de RSS observado.
+
+    Returns:
+        La ruta exportada y la configuración efectiva (ver ``mesh_from_grid``).
+    """
+    if not density_path.exists():
+        raise FileNotFoundError(f"No existe el archivo de densidad: {density_path}")
+    if region is None:
+        # Entrada dispersa: la memoria ya escala con los bloques activos.
+        output = capture_sparse(density_path, output_path, config)
+        if output is not None:
+            print(f"[density_capture] Pico RSS {format_mib(peak_rss_bytes())} (presupuesto {format_mib(max_memory)})")
+            return output, config
+    suffix = density_path.suffix
+    grid: np.ndarray | None = None
+    chunk_x = None
+    if suffix == CHUNKED_SUFFIX:
+        with ChunkedVolume(density_path) as volume:
+            shape, dtype, chunk_x = volume.shape, volume.dtype, volume.chunk_shape[0]
+        sample = None
+    elif suffix == ".npy":
+        mapped = np.load(density_path, mmap_mode="r")
+        shape, dtype = mapped.shape, mapped.dtype
+        sample = mapped[tuple(region)] if region is not None else mapped
+    else:
+        # .npz no admite lectura parcial: se carga una vez y se reutiliza.
+        grid = load_density_grid(density_path, region)
+        shape, dtype, sample = grid.shape, grid.dtype, grid
+    if len(shape) != 3:
+        raise ValueError(f"Se esperaba un grid 3D, pero se obtuvo una forma {shape}.")
+    bounds = _region_bounds(region, tuple(shape))
+    shape = tuple(hi - lo for lo, hi in bounds)
+
+    reasons = []
+    if config.engine != "marching_cubes":
+        reasons.append(f"motor {config.engine}")
+    if config.min_island_voxels > 0:
+        reasons.append("--min-island-voxels")
+    if config.target_triangles:
+        reasons.append("--target-triangles")
+    if config.mirror_axis:
+        reasons.append("--mirror-axis")
+    if suffix not in {".npy", CHUNKED_SUFFIX}:
+        reasons.append(f"entrada {suffix}")
+    triangles, source = estimate_surface_triangles(shape, config.iso_level, config.step_size, sample)
+    del sample
+    plan: CapturePlan = plan_capture(
+        shape,
+        dtype,
+        max_memory,
+        triangles,
+        export_format=config.export_format,
+        step_size=config.step_size,
+        streamable=not reasons,
+        chunk_x=chunk_x,
+        triangles_source=source,
+    )
+    print(f"[density_capture] Memoria: {plan.describe()}")
+    if not plan.fits:
+        hint = f" (sin losas por {', '.join(reasons)})" if reasons and plan.mode == "memory" else ""
+        print(
+            f"[density_capture] Aviso: el pico estimado supera el presupuesto{hint}; "
+            "considera --step-size mayor o más --max-memory."
+        )
+    if plan.mode == "streaming":
+        output = capture_streaming(density_path, output_path, config, region=region, slab=plan.slab)
+    elif grid is not None:
+        output, config = capture_density_to_mesh(grid, output_path, config)
+    else:
+        output, config = capture_density_to_mesh(density_path, output_path, config, region=region)
+    peak = peak_rss_bytes()
+    status = "dentro del" if peak <= max_memory else "EXCEDE el"
+    print(
+        f"[density_capture] Pico RSS {format_mib(peak)} ({status} presupuesto de {format_mib(max_memory)}; "
+        f"estimado {format_mib(plan.estimated_bytes)})"
+    )
+    return output, config
+
+
+# Lado aproximado (en celdas) del nivel más grueso de la captura progresiva.
+PROGRESSIVE_COARSE_CELLS = 48
+
+
+@dataclass
+class ProgressiveLevel:
+    """
+    Un nivel de la captura progresiva (``factor`` = reducción respecto al grid).
+
+    ``config`` es la configuración con la que se extrajo el nivel; en el final
+    lleva el ``step_size`` elegido por ``target_triangles``.
+    """
+
+    index: int
+    factor: int
+    mesh: trimesh.Trimesh
+    seconds: float
+    final: bool
+    config: DensityCaptureConfig
+
+
+def downsample_grid(grid: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Reduce el grid promediando bloques ``factor³`` (conserva mejor las piezas
+    finas que un simple salto). Los bordes se rellenan replicando el último valor.
+    """
+    if factor <= 1:
+        return grid
+    pad = [(0, -n % factor) for n in grid.shape]
+    padded = np.pad(np.asarray(grid, dtype=np.float32), pad, mode="edge")
+    nx, ny, nz = (n // factor for n in padded.shape)
+    return padded.reshape(nx, factor, ny, factor, nz, factor).mean(axis=(1, 3, 5))
+
+
+def progressive_factors(shape: Tuple[int, ...], final_step: int = 1, levels: int = 3) -> List[int]:
+    """
+    Factores de reducción de grueso a fino, terminando en ``final_step``.
+
+    El más grueso deja ~``PROGRESSIVE_COARSE_CELLS`` celdas en el eje mayor;
+    los intermedios se reparten en progresión geométrica.
+    """
+    coarse = max(final_step, 2 ** math.ceil(math.log2(max(max(shape) / PROGRESSIVE_COARSE_CELLS, 1.0))))
+    if levels <= 1 or coarse <= final_step:
+        return [final_step]
+    ratio = (coarse / final_step) ** (1.0 / (levels - 1))
+    factors = [max(final_step, int(round(final_step * ratio**k))) for k in range(levels - 1, -1, -1)]
+    return sorted(set(factors), reverse=True)
+
+
+def iter_progressive_meshes(
+    grid: np.ndarray, config: DensityCaptureConfig, levels: int = 3
+) -> Iterator[ProgressiveLevel]:
+    """
+    Genera mallas de grueso a fino sobre el mismo grid.
+
+    Los niveles previos se extraen del grid promediado por bloques (con
+    ``spacing`` escalado y sin optimización de caché) para aparecer en
+    milisegundos; el último es exactamente ``mesh_from_grid(grid, config)``.
+    """
+    if config.target_triangles:
+        final_step = choose_step_size(
+            grid, config.iso_level, config.target_triangles, engine=config.engine, min_step=config.step_size
+        ).step_size
+        config = dataclasses.replace(config, step_size=final_step)
+    factors = progressive_factors(grid.shape, config.step_size, levels)
+    for index, factor in enumerate(factors):
+        start = time.perf_counter()
+        final = index == len(factors) - 1
+        if final:
+            mesh, _ = mesh_from_grid(grid, dataclasses.replace(config, target_triangles=None))
+            level_config = config
+        else:
+            coarse_config = dataclasses.replace(
+                config,
+                spacing=tuple(s * factor for s in config.spacing),
+                step_size=1,
+                optimize_cache=None,
+                target_triangles=None,
+                # Voxeles y caras escalan con la resolución del nivel (las caras, respecto al paso
+                # final); el volumen ya está en unidades del mundo gracias al spacing escalado.
+                min_island_voxels=config.min_island_voxels // factor**3,
+                min_component_faces=config.min_component_faces * config.step_size**2 // factor**2,
+                # El promediado por bloques no respeta el plano medio.
+                mirror_axis=None,
+            )
+            mesh, level_config = mesh_from_grid(downsample_grid(grid, factor), coarse_config)
+            # Cada muestra promediada representa el centro de su bloque.
+            mesh.apply_translation([(factor - 1) / 2.0 * s for s in config.spacing])
+        yield ProgressiveLevel(
+            index=index,
+            factor=factor,
+            mesh=mesh,
+            seconds=time.perf_counter() - start,
+            final=final,
+            config=level_config,
+        )
+
+
+def progressive_output_path(output_path: Path, index: int, export_format: str) -> Path:
+    """``mesh.stl`` → ``mesh.lod0.stl``, ``mesh.lod1.stl``..."""
+    return output_path.with_name(f"{output_path.stem}.lod{index}.{export_format}")
+
+
+def capture_progressive(
+    density_path: Path,
+    output_path: Path,
+    config: DensityCaptureConfig | None = None,
+    region: Region | None = None,
+    levels: int = 3,
+    on_level: Callable[[ProgressiveLevel, Path], None] | None = None,
+) -> Tuple[List[Path], DensityCaptureConfig]:
+    """
+    Captura progresiva: escribe cada nivel en cuanto termina.
+
+    Los niveles previos van a ``<stem>.lod<i>.<ext>`` y el final a
+    ``output_path``. Cada archivo se escribe con un nombre temporal y se
+    publica con ``rename`` para que un visor nunca lea una malla a medias.
+
+    Returns:
+        Las rutas por nivel (la final al último) y la configuración efectiva
+        del nivel final.
+    """
+    config = config or DensityCaptureConfig()
+    fmt = _ensure_supported_format(output_path, config.export_format)
+    grid = load_density_grid(density_path, region)
+    written: List[Path] = []
+    for level in iter_progressive_meshes(grid, config, levels):
+        target = output_path.with_suffix(f".{fmt}") if level.final else progressive_output_path(
+            output_path, level.index, fmt
+        )
+        partial = export_mesh(level.mesh, target.with_name(f".{target.stem}.partial.{fmt}"), fmt)
+        os.replace(partial, target)
+        written.append(target)
+        print(
+            f"[density_capture] Nivel {level.index} (x{level.factor}): {len(level.mesh.faces)} caras "
+            f"en {level.seconds * 1000:.0f} ms -> {target}"
+        )
+        if on_level is not None:
+            on_level(level, target)
+        if level.final:
+            config = level.config
+    return written, config
+
+
 def save_config(config: DensityCaptureConfig, path: Path) -> None:
     """Guarda la configuración en JSON para reproducir parámetros."""
     payload = {
@@ -122,6 +778,15 @@ def save_config(config: DensityCaptureConfig, path: Path) -> None:
         "spacing": list(config.spacing),
         "step_size": config.step_size,
         "export_format": config.export_format,
+        "optimize_cache": config.optimize_cache,
+        "engine": config.engine,
+        "min_island_voxels": config.min_island_voxels,
+        "min_component_faces": config.min_component_faces,
+        "min_component_volume": config.min_component_volume,
+        "keep_largest": config.keep_largest,
+        "target_triangles": config.target_triangles,
+        "mirror_axis": config.mirror_axis,
+        "mirror_tolerance": config.mirror_tolerance,
     }
     path.write_text(json.dumps(payload, indent=2))
 
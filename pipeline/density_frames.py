@@ -0,0 +1,327 @@
+"""
+Series temporales de densidad (4D) como fotogramas de malla.
+
+Las secuencias de partículas y curl-noise producen un grid por fotograma. En
+lugar de lanzar una CLI por fotograma, aquí se aceptan:
+- un array 4D ``(T, X, Y, Z)`` en ``.npy`` (mmap), ``.npz`` o ``.vbv`` (cada
+  fotograma se decodifica por separado, bloque a bloque),
+- un patrón glob (``frames/density_*.npy``) ordenado por nombre.
+
+Los fotogramas se mallan en paralelo con un pool de hilos que comparte la
+configuración ya resuelta. Con ``prefetch`` (``--prefetch``, 2 por defecto) la
+carga pasa a ``tools.prefetch.ReadAhead``: los siguientes fotogramas se leen y
+descomprimen mientras se malla el actual, con un tope de memoria para los que
+esperan en cola, y el informe dice cuánta E/S quedó oculta (el ``step_size`` de ``--target-triangles`` se
+calcula una sola vez sobre el primer fotograma para que todos tengan la misma
+resolución). La salida es una malla por fotograma o un único glTF/GLB en el que
+cada fotograma es un nodo y una animación ``STEP`` de escala muestra solo el
+fotograma activo.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+from pipeline.density_capture import (
+    DensityCaptureConfig,
+    export_mesh,
+    load_density_grid,
+    mesh_from_grid,
+)
+from tools.chunked_volume import SUFFIX as CHUNKED_SUFFIX
+from tools.chunked_volume import ChunkedVolume, Region, array_shape, load_array
+from tools.mesh_budget import choose_step_size
+from tools.mesh_writers import GltfBuilder
+from tools.prefetch import DEFAULT_DEPTH, DEFAULT_MAX_BYTES, PrefetchStats, ReadAhead
+
+ANIMATION_FORMATS = {"glb", "gltf"}
+_GLOB_CHARS = set("*?[")
+
+
+@dataclass
+class FrameSource:
+    """Fotograma perezoso: ``load()`` devuelve el grid 3D cuando se necesita."""
+
+    index: int
+    label: str
+    load: Callable[[], np.ndarray]
+
+
+@dataclass
+class FrameTiming:
+    """Tiempos y tamaño de malla por fotograma."""
+
+    index: int
+    source: str
+    load_seconds: float
+    mesh_seconds: float
+    vertices: int
+    faces: int
+    output: str | None = None
+    wait_seconds: float = 0.0
+
+
+def is_frame_pattern(path: Path) -> bool:
+    return any(ch in str(path) for ch in _GLOB_CHARS)
+
+
+def is_frame_input(path: Path) -> bool:
+    """``True`` si ``path`` es un patrón glob o un array 4D."""
+    if is_frame_pattern(path):
+        return True
+    return Path(path).exists() and len(array_shape(path)) == 4
+
+
+def _crop(grid: np.ndarray, region: Region | None) -> np.ndarray:
+    return np.asarray(grid[tuple(region)]) if region is not None else np.asarray(grid)
+
+
+def frame_sources(path: Path, region: Region | None = None) -> List[FrameSource]:
+    """Enumera los fotogramas de un patrón glob o de un array 4D."""
+    if is_frame_pattern(path):
+        files = sorted(glob.glob(str(path)))
+        if not files:
+            raise FileNotFoundError(f"El patrón no coincide con ningún archivo: {path}")
+        return [
+            FrameSource(index=i, label=name, load=lambda name=name: load_density_grid(Path(name), region))
+            for i, name in enumerate(files)
+        ]
+
+    path = Path(path)
+    shape = array_shape(path)
+    if len(shape) != 4:
+        raise ValueError(f"Se esperaba un array 4D (T, X, Y, Z), pero la forma es {shape}.")
+    spatial = tuple(region) if region is not None else (slice(None),) * 3
+    suffix = path.suffix.lower()
+    if suffix == CHUNKED_SUFFIX:
+        # Cada hilo abre su propio lector: solo se decodifican los bloques del fotograma.
+        def _loader(t: int) -> Callable[[], np.ndarray]:
+            def _load() -> np.ndarray:
+                with ChunkedVolume(path, workers=1) as volume:
+                    return volume.read((slice(t, t + 1),) + spatial)[0]
+
+            return _load
+
+    elif suffix == ".npy":
+        frames = np.load(path, mmap_mode="r")
+
+        def _loader(t: int) -> Callable[[], np.ndarray]:
+            return lambda: np.array(frames[(t,) + spatial])
+
+    else:
+        frames = load_array(path)
+
+        def _loader(t: int) -> Callable[[], np.ndarray]:
+            return lambda: _crop(frames[t], region)
+
+    return [FrameSource(index=t, label=f"{path.name}[{t}]", load=_loader(t)) for t in range(shape[0])]
+
+
+def resolve_shared_config(sources: Sequence[FrameSource], config: DensityCaptureConfig) -> DensityCaptureConfig:
+    """
+    Fija una única configuración para todos los fotogramas.
+
+    ``target_triangles`` se resuelve sobre el primer fotograma y el resto usa el
+    mismo ``step_size`` (si no, la animación cambiaría de resolución). ``config``
+    no se modifica: el resultado lleva el ``step_size`` elegido.
+    """
+    if not config.target_triangles or not sources:
+        return config
+    estimate = choose_step_size(
+        sources[0].load(), config.iso_level, config.target_triangles, engine=config.engine, min_step=config.step_size
+    )
+    print(
+        f"[density_frames] step_size={estimate.step_size} para todos los fotogramas "
+        f"(~{estimate.estimated_triangles} triángulos en el primero)"
+    )
+    return dataclasses.replace(config, step_size=estimate.step_size, target_triangles=None)
+
+
+def frame_output_path(output_path: Path, index: int, export_format: str) -> Path:
+    """``mesh.obj`` → ``mesh_0000.obj``; admite ``{frame}`` en el nombre."""
+    name = output_path.name
+    if "{frame" in name:
+        return output_path.with_name(name.format(frame=index)).with_suffix(f".{export_format}")
+    return output_path.with_name(f"{output_path.stem}_{index:04d}.{export_format}")
+
+
+def mesh_frames(
+    sources: Sequence[FrameSource],
+    config: DensityCaptureConfig,
+    workers: int | None = None,
+    consume: Callable[[FrameSource, object], str | None] | None = None,
+    prefetch: int = 0,
+    prefetch_bytes: int = DEFAULT_MAX_BYTES,
+    prefetch_stats: PrefetchStats | None = None,
+) -> List[FrameTiming]:
+    """
+    Malla los fotogramas en paralelo y devuelve sus tiempos en orden.
+
+    ``consume(source, mesh)`` se llama desde el hilo de cada fotograma (p. ej.
+    para exportarlo) y puede devolver la ruta escrita. Con ``prefetch > 0`` se
+    leen por adelantado hasta ``prefetch`` fotogramas (``prefetch_bytes`` como
+    tope de la cola) y ``prefetch_stats`` recibe los tiempos de E/S.
+    """
+    shared = resolve_shared_config(sources, config)
+
+    def _mesh(source: FrameSource, grid: np.ndarray, load_seconds: float, wait_seconds: float) -> FrameTiming:
+        start = time.perf_counter()
+        mesh, _ = mesh_from_grid(grid, shared)
+        meshed = time.perf_counter()
+        output = consume(source, mesh) if consume else None
+        timing = FrameTiming(
+            index=source.index,
+            source=source.label,
+            load_seconds=load_seconds,
+            mesh_seconds=meshed - start,
+            vertices=int(len(mesh.vertices)),
+            faces=int(len(mesh.faces)),
+            output=output,
+            wait_seconds=wait_seconds,
+        )
+        print(
+            f"[density_frames] Fotograma {source.index}: {timing.faces} caras "
+            f"(carga {timing.load_seconds:.2f}s, espera {timing.wait_seconds:.2f}s, malla {timing.mesh_seconds:.2f}s)"
+        )
+        return timing
+
+    def _run(source: FrameSource) -> FrameTiming:
+        start = time.perf_counter()
+        grid = source.load()
+        seconds = time.perf_counter() - start
+        return _mesh(source, grid, seconds, seconds)
+
+    workers = workers or min(4, os.cpu_count() or 1)
+    if prefetch > 0 and len(sources) > 1:
+        reader = ReadAhead(
+            [source.load for source in sources], depth=prefetch, max_bytes=prefetch_bytes, stats=prefetch_stats
+        )
+        with reader:
+            if workers <= 1:
+                return [_mesh(source, *loaded) for source, loaded in zip(sources, reader)]
+            # Como mucho ``workers`` grids mallándose: la cola de lectura no crece sin tope.
+            slots = threading.Semaphore(workers)
+            futures: List[Future] = []
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="frame") as pool:
+                for source, loaded in zip(sources, reader):
+                    slots.acquire()
+                    future = pool.submit(_mesh, source, *loaded)
+                    future.add_done_callback(lambda _: slots.release())
+                    futures.append(future)
+            return [future.result() for future in futures]
+    if workers <= 1 or len(sources) <= 1:
+        return [_run(source) for source in sources]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="frame") as pool:
+        return list(pool.map(_run, sources))
+
+
+def write_frame_animation(path: Path, meshes: Sequence[object], fps: float = 24.0) -> Path:
+    """
+    Escribe un glTF/GLB con un nodo por fotograma bajo una raíz común.
+
+    La animación usa interpolación ``STEP`` sobre la escala: cada nodo vale 1
+    durante su fotograma y 0 fuera de él.
+    """
+    if fps <= 0:
+        raise ValueError("fps debe ser > 0.")
+    builder = GltfBuilder()
+    count = len(meshes)
+    nodes = []
+    for i, mesh in enumerate(meshes):
+        mesh_index = builder.add_mesh(np.asarray(mesh.vertices), np.asarray(mesh.faces), name=f"frame_{i:04d}")
+        hidden = [0.0, 0.0, 0.0] if i > 0 else [1.0, 1.0, 1.0]
+        nodes.append(builder.add_node(mesh_index, name=f"frame_{i:04d}", root=False, scale=hidden))
+    builder.add_node(None, name=Path(path).stem, children=nodes)
+
+    channels = []
+    for i, node in enumerate(nodes):
+        times, values = [], []
+        if i > 0:
+            times.append(0.0)
+            values.append([0.0, 0.0, 0.0])
+        times.append(i / fps)
+        values.append([1.0, 1.0, 1.0])
+        if i < count - 1:
+            times.append((i + 1) / fps)
+            values.append([0.0, 0.0, 0.0])
+        channels.append((node, "scale", np.asarray(times), np.asarray(values)))
+    if count > 1:
+        builder.add_animation(channels, name="frames", interpolation="STEP")
+    return builder.write(path)
+
+
+def capture_frames(
+    density_path: Path,
+    output_path: Path,
+    config: DensityCaptureConfig | None = None,
+    region: Region | None = None,
+    workers: int | None = None,
+    animation: bool = False,
+    fps: float = 24.0,
+    timings_path: Path | None = None,
+    prefetch: int = DEFAULT_DEPTH,
+    prefetch_bytes: int = DEFAULT_MAX_BYTES,
+) -> Tuple[List[Path], DensityCaptureConfig]:
+    """
+    Pipeline 4D: fotogramas → mallas por fotograma o un glTF animado.
+
+    ``prefetch`` fotogramas se leen por adelantado (0 desactiva la lectura
+    anticipada); la cola de fotogramas cargados no pasa de ``prefetch_bytes``.
+
+    Returns:
+        Las rutas escritas (una por fotograma o solo la animación) y la
+        configuración efectiva, con el ``step_size`` común a todos los fotogramas.
+    """
+    config = config or DensityCaptureConfig()
+    sources = frame_sources(density_path, region)
+    shared = resolve_shared_config(sources, config)
+    stats = PrefetchStats()
+    reading = {"prefetch": prefetch, "prefetch_bytes": prefetch_bytes, "prefetch_stats": stats}
+    start = time.perf_counter()
+
+    if animation:
+        fmt = config.export_format.lower()
+        if fmt not in ANIMATION_FORMATS:
+            raise ValueError("La animación requiere formato glb o gltf.")
+        meshes: dict = {}
+
+        def _keep(source: FrameSource, mesh: object) -> None:
+            meshes[source.index] = mesh
+            return None
+
+        timings = mesh_frames(sources, shared, workers, consume=_keep, **reading)
+        written = [write_frame_animation(output_path.with_suffix(f".{fmt}"), [meshes[t.index] for t in timings], fps)]
+    else:
+
+        def _export(source: FrameSource, mesh: object) -> str:
+            target = frame_output_path(output_path, source.index, config.export_format)
+            return str(export_mesh(mesh, target, config.export_format))  # type: ignore[arg-type]
+
+        timings = mesh_frames(sources, shared, workers, consume=_export, **reading)
+        written = [Path(t.output) for t in timings if t.output]
+
+    total = time.perf_counter() - start
+    print(f"[density_frames] {len(timings)} fotogramas en {total:.2f}s")
+    if stats.items:
+        print(f"[density_frames] Lectura anticipada: {stats.describe()}")
+    if timings_path:
+        payload = {
+            "frames": [dataclasses.asdict(t) for t in timings],
+            "total_seconds": total,
+            "prefetch": stats.as_dict() if stats.items else None,
+            "step_size": shared.step_size,
+            "outputs": [str(p) for p in written],
+        }
+        Path(timings_path).write_text(json.dumps(payload, indent=2))
+    return written, dataclasses.replace(config, step_size=shared.step_size)
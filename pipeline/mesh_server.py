@@ -0,0 +1,557 @@
+"""
+Servicio local de mallado (asyncio + HTTP/1.1 mínimo, sin dependencias extra).
+
+Pensado para que ``fabrication.html`` pida mallas con calidad de servidor sin
+pasar por la CLI. Endpoints:
+
+- ``POST /mesh``: genera y devuelve la malla en streaming (chunked). Si la
+  conexión se pierde antes de terminar, el trabajo se cancela; un cliente que
+  solo cierra su lado de escritura (half-close) sigue recibiendo la malla.
+- ``POST /jobs``: encola un trabajo y devuelve ``{"job_id": ...}``.
+- ``GET /jobs/{id}``: espera el trabajo y devuelve la malla.
+- ``DELETE /jobs/{id}``: cancela un trabajo pendiente.
+- ``GET /health``: estado de la cola y de la caché.
+
+El cuerpo puede ser un grid ``.npy``/``.npz`` (``application/octet-stream``,
+parámetros en la query: ``iso_level``, ``spacing``, ``step_size``, ``format``)
+o un JSON con parámetros SDF::
+
+    {"sdf": {"kind": "face_mask", "size": 1.0}, "resolution": 96,
+     "extent": 1.5, "iso_level": 0.0, "format": "stl"}
+
+``resolution`` no puede pasar de ``MAX_RESOLUTION`` (400 si no): el grid se
+reserva dentro del proceso del servicio.
+
+Peticiones idénticas (misma clave) mientras una está en curso comparten el
+mismo trabajo; solo se cancela cuando lo abandonan todas. CORS solo se
+concede a los orígenes de ``cors_origins`` (``http://localhost:*`` admite
+cualquier puerto; ``*`` abre el servicio a cualquier origen).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from pipeline.density_capture import DensityCaptureConfig, export_mesh_bytes, mesh_from_grid
+from pipeline.sdf_fields import sample_sdf_grid
+from tools.metrics import inc, observe
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 512 * 1024 * 1024
+# Tope de resolución de las peticiones SDF: 512³ float32 son 512 MiB, como el cuerpo.
+MAX_RESOLUTION = 512
+STREAM_CHUNK_BYTES = 64 * 1024
+DEFAULT_CORS_ORIGINS = ("http://localhost:*", "http://127.0.0.1:*")
+
+CONTENT_TYPES = {
+    "stl": "model/stl",
+    "glb": "model/gltf-binary",
+    "ply": "application/octet-stream",
+    "obj": "text/plain; charset=utf-8",
+}
+
+REASONS = {
+    200: "OK",
+    202: "Accepted",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    411: "Length Required",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HttpError(Exception):
+    """Error con código HTTP que se devuelve tal cual al cliente."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class MeshRequest:
+    """Trabajo de mallado ya validado."""
+
+    key: str
+    config: DensityCaptureConfig
+    grid_bytes: bytes | None = None
+    sdf: Dict[str, Any] | None = None
+    resolution: int = 96
+    extent: float = 1.5
+
+
+@dataclass
+class MeshJob:
+    job_id: str
+    request: MeshRequest
+    task: "asyncio.Task[bytes]"
+    cached: bool = False
+    # Trabajo en curso al que se unió esta petición (compartido entre peticiones idénticas).
+    source: "Optional[asyncio.Future[bytes]]" = None
+    shared: bool = False
+
+
+class MeshCache:
+    """Caché LRU en memoria acotada por bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> bytes | None:
+        payload = self._entries.get(key)
+        if payload is None:
+            self.misses += 1
+            inc("vibra_cache_requests_total", cache="mesh_server", result="miss")
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        inc("vibra_cache_requests_total", cache="mesh_server", result="hit")
+        return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        if len(payload) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = payload
+        self._size += len(payload)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+def _parse_config(params: Dict[str, Any]) -> DensityCaptureConfig:
+    config = DensityCaptureConfig.from_mapping(
+        {
+            "iso_level": params.get("iso_level", 0.5),
+            "spacing": params.get("spacing", (1.0, 1.0, 1.0)),
+            "step_size": params.get("step_size", 1),
+            "export_format": params.get("format", "stl"),
+            "optimize_cache": params.get("optimize_cache"),
+        }
+    )
+    if config.export_format not in CONTENT_TYPES:
+        raise HttpError(400, f"Formato '{config.export_format}' no soportado: {', '.join(sorted(CONTENT_TYPES))}")
+    if config.step_size < 1:
+        raise HttpError(400, "step_size debe ser >= 1.")
+    return config
+
+
+def parse_mesh_request(content_type: str, query: Dict[str, str], body: bytes) -> MeshRequest:
+    """Convierte cuerpo + query en un ``MeshRequest`` con clave de caché estable."""
+    digest = hashlib.sha256()
+    if content_type.startswith("application/json"):
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError as exc:
+            raise HttpError(400, f"JSON inválido: {exc}") from exc
+        if not isinstance(payload.get("sdf"), dict):
+            raise HttpError(400, "El JSON debe incluir un objeto 'sdf'.")
+        params = {"iso_level": 0.0, **query, **payload}
+        config = _parse_config(params)
+        resolution = int(params.get("resolution", 96))
+        if resolution > MAX_RESOLUTION:
+            raise HttpError(400, f"resolution debe ser <= {MAX_RESOLUTION}, se recibió {resolution}.")
+        request = MeshRequest(
+            key="",
+            config=config,
+            sdf=payload["sdf"],
+            resolution=resolution,
+            extent=float(params.get("extent", 1.5)),
+        )
+        digest.update(json.dumps(payload["sdf"], sort_keys=True).encode("utf-8"))
+        digest.update(f"{request.resolution}:{request.extent}".encode("utf-8"))
+    else:
+        if not body:
+            raise HttpError(400, "Se esperaba un grid .npy/.npz en el cuerpo.")
+        config = _parse_config(dict(query))
+        request = MeshRequest(key="", config=config, grid_bytes=body)
+        digest.update(body)
+    digest.update(
+        json.dumps(
+            [config.iso_level, list(config.spacing), config.step_size, config.export_format, config.optimize_cache]
+        ).encode("utf-8")
+    )
+    request.key = digest.hexdigest()
+    return request
+
+
+def build_mesh(request: MeshRequest) -> bytes:
+    """Trabajo bloqueante: grid/SDF → malla → bytes. Se ejecuta en el pool de hilos."""
+    config = request.config
+    offset: Tuple[float, float, float] | None = None
+    if request.sdf is not None:
+        sdf, spacing = sample_sdf_grid(request.sdf, request.resolution, request.extent)
+        # Densidad = -SDF para conservar la orientación "alto = dentro" del pipeline.
+        grid = -sdf
+        config = DensityCaptureConfig(
+            iso_level=-config.iso_level,
+            spacing=spacing,
+            step_size=config.step_size,
+            export_format=config.export_format,
+            optimize_cache=config.optimize_cache,
+        )
+        offset = (-request.extent, -request.extent, -request.extent)
+    else:
+        loaded = np.load(io.BytesIO(request.grid_bytes or b""), allow_pickle=False)
+        if isinstance(loaded, np.lib.npyio.NpzFile):
+            with loaded:
+                if not loaded.files:
+                    raise HttpError(400, "El NPZ no contiene arrays.")
+                grid = loaded[loaded.files[0]]
+        else:
+            grid = loaded
+        if grid.ndim != 3:
+            raise HttpError(400, f"Se esperaba un grid 3D, pero se obtuvo una forma {grid.shape}.")
+
+    mesh, _ = mesh_from_grid(grid, config)
+    if offset is not None:
+        mesh.apply_translation(offset)
+    return export_mesh_bytes(mesh, config.export_format)
+
+
+class MeshService:
+    """Cola de trabajos con concurrencia acotada, cancelación y caché de resultados."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 32,
+        cache_bytes: int = 256 * 1024 * 1024,
+        cors_origins: Sequence[str] = DEFAULT_CORS_ORIGINS,
+    ) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.cache = MeshCache(cache_bytes)
+        self.cors_origins = tuple(cors_origins)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mesh")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._jobs: Dict[str, MeshJob] = {}
+        self._inflight: "Dict[str, asyncio.Future[bytes]]" = {}
+        self._running = 0
+
+    def _pending(self) -> int:
+        return sum(1 for task in self._inflight.values() if not task.done())
+
+    async def _run(self, request: MeshRequest) -> bytes:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:
+            self._running += 1
+            start = time.perf_counter()
+            status = "error"
+            try:
+                loop = asyncio.get_running_loop()
+                payload = await loop.run_in_executor(self._executor, build_mesh, request)
+                status = "ok"
+            finally:
+                self._running -= 1
+                inc("vibra_jobs_total", runner="serve", command="mesh", status=status)
+                observe("vibra_job_seconds", time.perf_counter() - start, runner="serve", command="mesh")
+        self.cache.put(request.key, payload)
+        return payload
+
+    def _start(self, request: MeshRequest) -> "asyncio.Future[bytes]":
+        source = self._inflight.get(request.key)
+        if source is not None:
+            return source
+        if self._pending() >= self.max_queue:
+            raise HttpError(503, "Cola de mallado llena, reintenta más tarde.")
+        source = asyncio.ensure_future(self._run(request))
+        self._inflight[request.key] = source
+
+        def _release(_: "asyncio.Future[bytes]") -> None:
+            if self._inflight.get(request.key) is source:
+                del self._inflight[request.key]
+
+        source.add_done_callback(_release)
+        return source
+
+    def submit(self, request: MeshRequest) -> MeshJob:
+        job_id = uuid.uuid4().hex
+        cached = self.cache.get(request.key)
+        if cached is not None:
+            task: "asyncio.Task[bytes]" = asyncio.get_running_loop().create_future()  # type: ignore[assignment]
+            task.set_result(cached)
+            job = MeshJob(job_id=job_id, request=request, task=task, cached=True)
+        else:
+            shared = request.key in self._inflight
+            source = self._start(request)
+            # Cada petición espera a través de shield: cancelar una no cancela el trabajo de las demás.
+            job = MeshJob(
+                job_id=job_id,
+                request=request,
+                task=asyncio.ensure_future(asyncio.shield(source)),
+                source=source,
+                shared=shared,
+            )
+            if shared:
+                inc("vibra_cache_requests_total", cache="mesh_server", result="shared")
+        self._jobs[job_id] = job
+        job.task.add_done_callback(lambda _: self._forget_later(job_id))
+        return job
+
+    def _forget_later(self, job_id: str, delay: float = 300.0) -> None:
+        # Mantiene el resultado disponible un tiempo para GET /jobs/{id}.
+        asyncio.get_running_loop().call_later(delay, self._jobs.pop, job_id, None)
+
+    def get(self, job_id: str) -> MeshJob:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise HttpError(404, f"No existe el trabajo {job_id}.")
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancela la petición ``job_id``. El trabajo compartido solo se cancela si
+        ninguna otra petición lo espera; si ya corre en un hilo, su resultado se
+        descarta.
+        """
+        job = self.get(job_id)
+        if job.task.done():
+            return False
+        job.task.cancel()
+        waiting = any(
+            other.source is job.source and other is not job and not other.task.done() for other in self._jobs.values()
+        )
+        if job.source is not None and not waiting:
+            job.source.cancel()
+        return True
+
+    def cors_headers(self, origin: str | None) -> Dict[str, str]:
+        """Cabeceras CORS para ``origin``; vacías si no está permitido."""
+        if "*" in self.cors_origins:
+            return {"Access-Control-Allow-Origin": "*"}
+        if not origin:
+            return {}
+        scheme_host, _, port = origin.rpartition(":")
+        allowed = origin in self.cors_origins or (port.isdigit() and f"{scheme_host}:*" in self.cors_origins)
+        if not allowed:
+            return {}
+        return {"Access-Control-Allow-Origin": origin, "Vary": "Origin"}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "pending": self._pending(),
+            "max_queue": self.max_queue,
+            "cache": self.cache.stats(),
+        }
+
+    def shutdown(self) -> None:
+        for job in self._jobs.values():
+            job.task.cancel()
+        for task in self._inflight.values():
+            task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@dataclass
+class HttpRequest:
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+
+async def read_request(reader: asyncio.StreamReader, max_body: int = MAX_BODY_BYTES) -> HttpRequest | None:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError as exc:
+        raise HttpError(400, "Línea de petición inválida.") from exc
+
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = b""
+    if method in {"POST", "PUT"}:
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            raise HttpError(411, "Usa Content-Length; no se aceptan cuerpos chunked.")
+        length = int(headers.get("content-length", "0") or 0)
+        if length > max_body:
+            raise HttpError(413, f"Cuerpo demasiado grande ({length} bytes, máximo {max_body}).")
+        body = await reader.readexactly(length) if length else b""
+
+    url = urlsplit(target)
+    return HttpRequest(method=method, path=url.path, query=dict(parse_qsl(url.query)), headers=headers, body=body)
+
+
+def _head(status: int, headers: Dict[str, str], cors: Dict[str, str] | None = None) -> bytes:
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    base: Dict[str, str] = {}
+    if cors:
+        base.update(cors)
+        base.update(
+            {
+                "Access-Control-Allow-Methods": "GET, POST, DELETE, OPTIONS",
+                "Access-Control-Allow-Headers": "Content-Type",
+                "Access-Control-Expose-Headers": "X-Job-Id, X-Cache",
+            }
+        )
+    base["Connection"] = "close"
+    base.update(headers)
+    lines.extend(f"{name}: {value}" for name, value in base.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_json(
+    writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], cors: Dict[str, str] | None = None
+) -> None:
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(_head(status, {"Content-Type": "application/json", "Content-Length": str(len(body))}, cors))
+    writer.write(body)
+    await writer.drain()
+
+
+async def stream_mesh(
+    writer: asyncio.StreamWriter, job: MeshJob, payload: bytes, cors: Dict[str, str] | None = None
+) -> None:
+    """Envía la malla con ``Transfer-Encoding: chunked`` en bloques de 64 KiB."""
+    fmt = job.request.config.export_format
+    writer.write(
+        _head(
+            200,
+            {
+                "Content-Type": CONTENT_TYPES[fmt],
+                "Transfer-Encoding": "chunked",
+                "X-Job-Id": job.job_id,
+                "X-Cache": "hit" if job.cached else "shared" if job.shared else "miss",
+            },
+            cors,
+        )
+    )
+    view = memoryview(payload)
+    for start in range(0, len(view), STREAM_CHUNK_BYTES):
+        chunk = view[start : start + STREAM_CHUNK_BYTES]
+        writer.write(f"{len(chunk):x}\r\n".encode("ascii"))
+        writer.write(chunk)
+        writer.write(b"\r\n")
+        await writer.drain()
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def _await_or_disconnect(job: MeshJob, writer: asyncio.StreamWriter, service: MeshService) -> bytes | None:
+    """
+    Espera el trabajo; si la conexión se pierde antes, lo cancela.
+
+    No se mira el EOF de lectura: un half-close (``shutdown(SHUT_WR)``) solo
+    indica que el cliente terminó de enviar. La conexión se da por perdida
+    cuando el transporte se cierra (RST o error de socket).
+    """
+    # shield: cancelar la espera no debe cancelar el futuro de cierre del protocolo.
+    closed = asyncio.ensure_future(asyncio.shield(writer.wait_closed()))
+    try:
+        done, _ = await asyncio.wait({job.task, closed}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        closed.cancel()
+    if job.task in done:
+        return job.task.result()
+    service.cancel(job.job_id)
+    return None
+
+
+async def handle_connection(service: MeshService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    cors: Dict[str, str] = {}
+    try:
+        request = await read_request(reader)
+        if request is None:
+            return
+        cors = service.cors_headers(request.headers.get("origin"))
+        if request.method == "OPTIONS":
+            writer.write(_head(204, {"Content-Length": "0"}, cors))
+            await writer.drain()
+            return
+
+        parts = [part for part in request.path.split("/") if part]
+        if parts == ["health"] and request.method == "GET":
+            await send_json(writer, 200, service.stats(), cors)
+        elif parts == ["mesh"] and request.method == "POST":
+            mesh_request = parse_mesh_request(request.headers.get("content-type", ""), request.query, request.body)
+            job = service.submit(mesh_request)
+            payload = await _await_or_disconnect(job, writer, service)
+            if payload is not None:
+                await stream_mesh(writer, job, payload, cors)
+        elif parts == ["jobs"] and request.method == "POST":
+            mesh_request = parse_mesh_request(request.headers.get("content-type", ""), request.query, request.body)
+            job = service.submit(mesh_request)
+            await send_json(writer, 202, {"job_id": job.job_id, "cached": job.cached}, cors)
+        elif len(parts) == 2 and parts[0] == "jobs" and request.method == "GET":
+            job = service.get(parts[1])
+            payload = await _await_or_disconnect(job, writer, service)
+            if payload is not None:
+                await stream_mesh(writer, job, payload, cors)
+        elif len(parts) == 2 and parts[0] == "jobs" and request.method == "DELETE":
+            cancelled = service.cancel(parts[1])
+            await send_json(writer, 200 if cancelled else 409, {"job_id": parts[1], "cancelled": cancelled}, cors)
+        else:
+            raise HttpError(404 if request.method in {"GET", "POST", "DELETE"} else 405, "Ruta no soportada.")
+    except HttpError as exc:
+        await send_json(writer, exc.status, {"error": str(exc)}, cors)
+    except asyncio.CancelledError:
+        await send_json(writer, 409, {"error": "Trabajo cancelado."}, cors)
+    except (ValueError, OSError) as exc:
+        await send_json(writer, 400, {"error": str(exc)}, cors)
+    except Exception as exc:  # noqa: BLE001
+        await send_json(writer, 500, {"error": str(exc)}, cors)
+    finally:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = 2,
+    max_queue: int = 32,
+    cache_bytes: int = 256 * 1024 * 1024,
+    cors_origins: Sequence[str] = DEFAULT_CORS_ORIGINS,
+) -> None:
+    """Arranca el servidor y atiende peticiones hasta que se cancele."""
+    service = MeshService(workers=workers, max_queue=max_queue, cache_bytes=cache_bytes, cors_origins=cors_origins)
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets or [])
+    print(f"[mesh_server] Escuchando en {addresses} (workers={workers}, cola={max_queue})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.shutdown()
@@ -0,0 +1,428 @@
+"""
+Simulación de partículas headless y splatting a densidad.
+
+El bloque ``forces`` de ``assets/presets.json`` (``flow``, ``curl``,
+``gravity``, ``attractors``) solo se animaba en el navegador
+(``agents/particles``). Aquí se integra en NumPy para hornear la escultura a
+resolución de impresión:
+
+- Estado struct-of-arrays: ``position`` y ``velocity`` son arrays ``(3, N)``
+  float32, una fila contigua por componente. Todas las fuerzas operan sobre
+  filas completas, sin bucles por partícula.
+- Integración semi-implícita como el shader ``integrationFrag``:
+  ``v += a·dt``, ``v *= exp(-drag·dt)``, ``p += v·dt``.
+- Un hash espacial (celdas ordenadas por clave, ``argsort`` + ``bincount``) se
+  reconstruye en cada paso. Los atractores solo visitan las partículas de las
+  celdas que tocan su radio; la separación entre vecinas usa los conteos y
+  centroides de las 27 celdas vecinas.
+- ``splat_density`` reparte cada partícula en el grid con un kernel (trilineal
+  o gaussiano) acumulado con ``np.bincount``. Las partículas se procesan
+  ordenadas por vóxel, así cada lote solo toca un tramo corto del grid.
+
+Semántica de las fuerzas (unidades del dominio ``[-extent, extent]³`` por s²):
+- ``curl``: rotacional de un potencial de ondas senoidales (campo sin
+  divergencia), con fase que avanza con el tiempo.
+- ``flow``: giro tangencial alrededor del eje Y.
+- ``gravity``: ``-gravity`` en Y.
+- ``attractors``: ``strength·(1 - r/radius)²`` hacia ``position`` dentro de
+  ``radius`` (por defecto ``extent``).
+Las partículas rebotan en las paredes del dominio.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from pipeline.density_capture import DensityCaptureConfig, capture_density_to_mesh
+from pipeline.preset_sdf import get_preset
+
+
+SPLAT_KERNELS = ("linear", "gaussian")
+CURL_WAVES = 8
+# Entradas (partícula × tap) por lote en el splatting: acota la memoria de índices y pesos.
+SPLAT_ENTRIES = 1 << 22
+
+
+@dataclass
+class Attractor:
+    position: Tuple[float, float, float]
+    strength: float
+    radius: float | None = None
+
+
+@dataclass
+class ParticleForces:
+    """Fuerzas de un preset (bloque ``forces``) más los parámetros de integración."""
+
+    flow: float = 0.0
+    curl: float = 0.0
+    gravity: float = 0.0
+    attractors: List[Attractor] = field(default_factory=list)
+    drag: float = 1.0
+    curl_frequency: float = 2.5
+    curl_speed: float = 0.25
+    separation: float = 0.0
+
+    @classmethod
+    def from_mapping(cls, payload: Mapping[str, Any]) -> "ParticleForces":
+        attractors = [
+            Attractor(
+                position=tuple(float(v) for v in item.get("position", (0.0, 0.0, 0.0))),  # type: ignore[arg-type]
+                strength=float(item.get("strength", 0.0)),
+                radius=item.get("radius"),
+            )
+            for item in payload.get("attractors") or []
+        ]
+        return cls(
+            flow=float(payload.get("flow", 0.0)),
+            curl=float(payload.get("curl", 0.0)),
+            gravity=float(payload.get("gravity", 0.0)),
+            attractors=attractors,
+            drag=float(payload.get("drag", 1.0)),
+            curl_frequency=float(payload.get("curl_frequency", 2.5)),
+            curl_speed=float(payload.get("curl_speed", 0.25)),
+            separation=float(payload.get("separation", 0.0)),
+        )
+
+
+@dataclass
+class ParticleState:
+    """Estado struct-of-arrays: ``position`` y ``velocity`` con forma ``(3, N)``."""
+
+    position: np.ndarray
+    velocity: np.ndarray
+    time: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return int(self.position.shape[1])
+
+    @classmethod
+    def seed(cls, count: int, spread: float = 1.0, seed: int = 0) -> "ParticleState":
+        """Posiciones uniformes en ``[-spread, spread]³`` y velocidad nula (como ``ParticleAgents.seed``)."""
+        rng = np.random.default_rng(seed)
+        position = rng.uniform(-spread, spread, size=(3, count)).astype(np.float32)
+        return cls(position=position, velocity=np.zeros_like(position))
+
+
+class SpatialHash:
+    """
+    Hash espacial denso sobre ``[-extent, extent]³``.
+
+    ``order`` lista las partículas ordenadas por celda y ``start[c]:start[c+1]``
+    es el tramo de la celda ``c`` dentro de ``order``.
+    """
+
+    def __init__(self, position: np.ndarray, extent: float, cell_size: float) -> None:
+        self.extent = float(extent)
+        self.dims = max(1, int(math.ceil(2.0 * extent / cell_size)))
+        self.cell_size = 2.0 * self.extent / self.dims
+        cell = np.floor((position + self.extent) / self.cell_size).astype(np.int64)
+        np.clip(cell, 0, self.dims - 1, out=cell)
+        key = (cell[0] * self.dims + cell[1]) * self.dims + cell[2]
+        # Con claves de 16 bits argsort estable usa radix sort (lineal).
+        self.key = key.astype(np.uint16) if self.dims**3 <= 1 << 16 else key
+        self.order = np.argsort(self.key, kind="stable")
+        counts = np.bincount(self.key, minlength=self.dims**3)
+        self.start = np.concatenate(([0], np.cumsum(counts)))
+        self.counts = counts.reshape((self.dims,) * 3)
+
+    def sort(self, *arrays: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Reordena arrays ``(..., N)`` por celda y deja el hash en ese orden: las
+        consultas devuelven tramos contiguos y los accesos son secuenciales.
+        """
+        order = self.order
+        self.key = np.repeat(np.arange(self.dims**3, dtype=self.key.dtype), self.counts.ravel())
+        self.order = np.arange(len(order))
+        return tuple(array[..., order] for array in arrays)
+
+    @property
+    def cell(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Índices ``(i, j, k)`` de la celda de cada partícula."""
+        key = self.key.astype(np.int64)
+        ij, k = np.divmod(key, self.dims)
+        i, j = np.divmod(ij, self.dims)
+        return i, j, k
+
+    def query_sphere(self, center: Sequence[float], radius: float) -> np.ndarray:
+        """Índices candidatos: partículas de las celdas que cortan la esfera."""
+        lo = np.floor((np.asarray(center) - radius + self.extent) / self.cell_size).astype(int)
+        hi = np.floor((np.asarray(center) + radius + self.extent) / self.cell_size).astype(int)
+        lo, hi = np.clip(lo, 0, self.dims - 1), np.clip(hi, 0, self.dims - 1)
+        cx, cy, cz = np.meshgrid(
+            np.arange(lo[0], hi[0] + 1), np.arange(lo[1], hi[1] + 1), np.arange(lo[2], hi[2] + 1), indexing="ij"
+        )
+        keys = ((cx * self.dims + cy) * self.dims + cz).ravel()
+        begin, end = self.start[keys], self.start[keys + 1]
+        lengths = end - begin
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # Concatena los tramos [begin, end) sin bucle por celda.
+        offsets = np.repeat(begin - np.cumsum(lengths) + lengths, lengths)
+        return self.order[np.arange(total) + offsets]
+
+    def neighbour_sums(self, values: np.ndarray) -> np.ndarray:
+        """Suma por celda de ``values`` (por partícula) sobre las 27 celdas vecinas."""
+        per_cell = np.bincount(self.key, weights=values, minlength=self.dims**3).reshape((self.dims,) * 3)
+        padded = np.pad(per_cell, 1)
+        out = np.zeros_like(per_cell)
+        n = self.dims
+        for dx in range(3):
+            for dy in range(3):
+                for dz in range(3):
+                    out += padded[dx : dx + n, dy : dy + n, dz : dz + n]
+        return out
+
+
+def _curl_waves(seed: int, count: int = CURL_WAVES) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Direcciones, vectores ``d × a`` y fases de las ondas del potencial."""
+    rng = np.random.default_rng(seed + 7919)
+    directions = rng.normal(size=(count, 3))
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    amplitudes = rng.normal(size=(count, 3))
+    rotors = np.cross(directions, amplitudes) / math.sqrt(count)
+    phases = rng.uniform(0.0, 2.0 * math.pi, count)
+    return directions.astype(np.float32), rotors.astype(np.float32), phases
+
+
+class ParticleSimulation:
+    """Integra un ``ParticleState`` con unas ``ParticleForces`` dentro de ``[-extent, extent]³``."""
+
+    def __init__(
+        self,
+        state: ParticleState,
+        forces: ParticleForces,
+        extent: float = 1.0,
+        seed: int = 0,
+        cell_size: float | None = None,
+        restitution: float = 0.5,
+    ) -> None:
+        self.state = state
+        self.forces = forces
+        self.extent = float(extent)
+        self.cell_size = cell_size or self.extent / 16.0
+        self.restitution = restitution
+        self.directions, self.rotors, self.phases = _curl_waves(seed)
+        self._accel = np.empty_like(state.position)
+        self._scratch = np.empty(state.count, dtype=np.float32)
+
+    def _add_curl(self, accel: np.ndarray, t: float) -> None:
+        f = self.forces
+        pos = self.state.position
+        phase = self._scratch
+        for direction, rotor, phi in zip(self.directions, self.rotors, self.phases):
+            np.dot(direction, pos, out=phase)
+            phase *= f.curl_frequency
+            phase += phi + f.curl_speed * t
+            np.cos(phase, out=phase)
+            for axis in range(3):
+                accel[axis] += (f.curl * rotor[axis]) * phase
+
+    def _add_flow(self, accel: np.ndarray) -> None:
+        x, z = self.state.position[0], self.state.position[2]
+        inv_r = self._scratch
+        np.hypot(x, z, out=inv_r)
+        np.maximum(inv_r, 1e-3, out=inv_r)
+        np.divide(self.forces.flow, inv_r, out=inv_r)
+        accel[0] -= z * inv_r
+        accel[2] += x * inv_r
+
+    def _add_attractors(self, accel: np.ndarray, grid: SpatialHash) -> None:
+        pos = self.state.position
+        for attractor in self.forces.attractors:
+            radius = float(attractor.radius or self.extent)
+            idx = grid.query_sphere(attractor.position, radius)
+            if idx.size == 0:
+                continue
+            if idx.size > pos.shape[1] // 2:
+                # La esfera cubre casi todo: recorrer todo es más barato que indexar.
+                idx = slice(None)
+            delta = np.asarray(attractor.position, dtype=np.float32)[:, None] - pos[:, idx]
+            dist = np.sqrt(np.einsum("ij,ij->j", delta, delta))
+            falloff = np.clip(1.0 - dist / radius, 0.0, 1.0) ** 2
+            scale = attractor.strength * falloff / np.maximum(dist, 1e-4)
+            accel[:, idx] += delta * scale
+
+    def _add_separation(self, accel: np.ndarray, grid: SpatialHash) -> None:
+        # Empuja cada partícula lejos del centroide de su vecindario (27 celdas),
+        # proporcional a la densidad local relativa a la media.
+        pos = self.state.position
+        cell = grid.cell
+        local = grid.neighbour_sums(np.ones(self.state.count))[cell]
+        crowd = local / max(1.0, self.state.count * 27.0 / grid.dims**3)
+        for axis in range(3):
+            centroid = grid.neighbour_sums(pos[axis])[cell] / local
+            accel[axis] += (self.forces.separation / grid.cell_size) * crowd * (pos[axis] - centroid)
+
+    def _bounce(self) -> None:
+        pos, vel, e = self.state.position, self.state.velocity, self.extent
+        for axis in range(3):
+            p, v = pos[axis], vel[axis]
+            out = np.abs(p) > e
+            if np.any(out):
+                np.clip(p, -e, e, out=p)
+                v[out] *= -self.restitution
+
+    def step(self, dt: float) -> None:
+        f = self.forces
+        accel = self._accel
+        accel.fill(0.0)
+        t = self.state.time
+        grid = None
+        if f.attractors or f.separation:
+            grid = SpatialHash(self.state.position, self.extent, self.cell_size)
+            self.state.position, self.state.velocity = grid.sort(self.state.position, self.state.velocity)
+        if f.curl:
+            self._add_curl(accel, t)
+        if f.flow:
+            self._add_flow(accel)
+        if f.gravity:
+            accel[1] -= f.gravity
+        if grid is not None:
+            if f.attractors:
+                self._add_attractors(accel, grid)
+            if f.separation:
+                self._add_separation(accel, grid)
+        vel = self.state.velocity
+        accel *= dt
+        vel += accel
+        vel *= math.exp(-f.drag * dt)
+        self.state.position += vel * dt
+        self._bounce()
+        self.state.time = t + dt
+
+    def run(self, steps: int, dt: float = 1.0 / 60.0) -> ParticleState:
+        for _ in range(steps):
+            self.step(dt)
+        return self.state
+
+
+def _kernel_taps(kernel: str, radius: int) -> np.ndarray:
+    """Desplazamientos por eje respecto al vóxel base de cada partícula."""
+    if kernel == "linear":
+        return np.arange(2)
+    if kernel == "gaussian":
+        return np.arange(-radius, radius + 2)
+    raise ValueError(f"Kernel '{kernel}' no soportado. Usa uno de: {', '.join(SPLAT_KERNELS)}")
+
+
+def splat_density(
+    position: np.ndarray,
+    resolution: int,
+    extent: float = 1.0,
+    kernel: str = "gaussian",
+    radius: int = 1,
+    normalize: float | None = 99.5,
+) -> Tuple[np.ndarray, Tuple[float, float, float], int]:
+    """
+    Acumula las partículas ``(3, N)`` en un grid ``resolution³`` float32.
+
+    ``linear`` reparte cada partícula entre los 8 vértices de su celda;
+    ``gaussian`` usa un kernel de ``radius`` vóxeles (sigma = radius/2 + 0.5),
+    normalizado para que cada partícula sume 1. Con ``normalize`` el grid se
+    divide por ese percentil de los vóxeles ocupados y se recorta a ``[0, 1]``,
+    de modo que ``iso_level=0.5`` corta a media densidad.
+
+    El dominio ``[-extent, extent]³`` se coloca dentro de un margen de
+    ``margin`` vóxeles vacíos: los taps nunca salen del grid (sin comprobar
+    bordes) y la superficie queda cerrada aunque haya partículas en las paredes.
+
+    Returns:
+        ``(grid, spacing, margin)``; ``-extent`` está en el vóxel ``margin``.
+    """
+    taps = _kernel_taps(kernel, radius)
+    margin = int(taps.max()) + 1
+    if resolution < 2 * margin + 2:
+        raise ValueError(f"La resolución debe ser >= {2 * margin + 2} con este kernel.")
+    spacing = 2.0 * extent / (resolution - 1 - 2 * margin)
+    sigma2 = 2.0 * (0.5 * radius + 0.5) ** 2
+    n = resolution
+    strides = np.array([n * n, n, 1], dtype=np.int64)
+    tap_offsets = (taps[:, None, None] * strides[0] + taps[None, :, None] * strides[1] + taps[None, None, :]).ravel()
+
+    g = (np.asarray(position, dtype=np.float32) + extent) / spacing + margin
+    np.clip(g, margin, n - 1 - margin, out=g)
+    base = np.floor(g).astype(np.int64)
+    frac = g - base
+    flat = strides @ base
+    # Orden por vóxel: cada lote toca un tramo contiguo y corto del grid.
+    order = np.argsort(flat, kind="stable")
+    flat, frac = flat[order], frac[:, order]
+
+    grid = np.zeros(n**3, dtype=np.float32)
+    batch = max(1, SPLAT_ENTRIES // len(tap_offsets))
+    for begin in range(0, flat.size, batch):
+        fb = flat[begin : begin + batch]
+        d = frac[:, None, begin : begin + batch] - taps[None, :, None]  # (3, taps, B)
+        if kernel == "linear":
+            w = 1.0 - np.abs(d)
+        else:
+            w = np.exp(-(d * d) / sigma2)
+            w /= w.sum(axis=1, keepdims=True)
+        # Pesos separables: producto de los tres ejes.
+        weight = (w[0][:, None, None] * w[1][None, :, None] * w[2][None, None, :]).reshape(-1, fb.size)
+        idx = fb[None, :] + tap_offsets[:, None]
+        start = int(fb[0] + tap_offsets.min())
+        stop = int(fb[-1] + tap_offsets.max()) + 1
+        grid[start:stop] += np.bincount((idx - start).ravel(), weights=weight.ravel(), minlength=stop - start)
+
+    grid = grid.reshape((n,) * 3)
+    if normalize is not None:
+        occupied = grid[grid > 0]
+        if occupied.size:
+            scale = float(np.percentile(occupied, normalize))
+            if scale > 0:
+                grid /= scale
+                np.clip(grid, 0.0, 1.0, out=grid)
+    return grid, (spacing, spacing, spacing), margin
+
+
+def capture_particles(
+    preset: Mapping[str, Any] | str,
+    output_path: Path,
+    config: DensityCaptureConfig | None = None,
+    count: int = 1_000_000,
+    steps: int = 240,
+    dt: float = 1.0 / 60.0,
+    resolution: int = 128,
+    extent: float = 1.0,
+    seed: int = 0,
+    kernel: str = "gaussian",
+    grid_out: Path | None = None,
+) -> Tuple[Path, DensityCaptureConfig]:
+    """
+    Simula las fuerzas de un preset, splatea las partículas y malla el grid con
+    ``capture_density_to_mesh`` (coordenadas del grid, como cualquier captura).
+
+    Returns:
+        La ruta exportada y la configuración efectiva (``spacing`` del splat y
+        ``step_size`` elegido por ``target_triangles``).
+    """
+    config = config or DensityCaptureConfig()
+    if isinstance(preset, str):
+        preset = get_preset(preset)
+    forces = ParticleForces.from_mapping(preset.get("forces") or {})
+    state = ParticleState.seed(count, spread=0.8 * extent, seed=seed)
+    start = time.perf_counter()
+    ParticleSimulation(state, forces, extent=extent, seed=seed).run(steps, dt)
+    sim_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    grid, spacing, _ = splat_density(state.position, resolution, extent=extent, kernel=kernel)
+    splat_seconds = time.perf_counter() - start
+    print(
+        f"[particle_sim] {preset.get('id', 'preset')}: {count} partículas × {steps} pasos en {sim_seconds:.2f}s, "
+        f"splat {resolution}³ en {splat_seconds:.2f}s."
+    )
+    if grid_out is not None:
+        np.save(grid_out, grid)
+    config = dataclasses.replace(config, spacing=spacing)
+    return capture_density_to_mesh(grid, output_path, config)
@@ -0,0 +1,535 @@
+"""
+Compilador de presets SDF (``assets/presets.json``) a un plan de evaluación fusionado.
+
+Cada preset describe un look como grafo SDF: ``fields`` (primitivas y
+modificadores), ``operators`` y ``falloff``. Aquí el grafo se compila a una
+lista de instrucciones sobre arrays:
+
+1. Cada campo se expande a nodos elementales (``add``, ``noise``, ``smin``...).
+   Los nodos se deduplican por ``(op, args, params)``, así que las
+   subexpresiones comunes (``|p|``, ``p·freq``, capas de ruido) se calculan una
+   vez.
+2. Se eliminan los nodos que no llegan a la salida y se calcula el último uso
+   de cada valor para liberarlo en cuanto deja de hacer falta.
+3. El grid se evalúa por bloques de tamaño de caché (``chunk³``) en un pool de
+   hilos. Las coordenadas entran como ejes ``(n, 1, 1)``, ``(1, n, 1)``,
+   ``(1, 1, n)``: las subexpresiones que dependen de un solo eje se quedan en 1D
+   por broadcasting. El único array del tamaño del grid es la densidad final.
+
+Semántica (referencia para el visor):
+- Coordenadas en ``[-extent, extent]³``; distancias negativas dentro.
+- Operadores alineados a la derecha con los campos: el último operador
+  combina el último campo con el acumulado. Un operador asociado al primer
+  campo se combina con el vacío (identidad).
+- ``shell``, ``glow_shell`` y ``pulse`` son modificadores: su operando se
+  calcula a partir del acumulado.
+- Los operadores suaves usan ``k = falloff / 2`` (o el ``feather`` del campo).
+- Densidad = ``clip(0.5 - d / (2·falloff), 0, 1)``: la superficie está en 0.5.
+- El resultado se recorta a un cubo de ``0.95·extent`` para que la malla cierre.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from pipeline.density_capture import DensityCaptureConfig, export_mesh, mesh_from_grid
+
+PRESETS_PATH = Path(__file__).resolve().parent.parent / "assets" / "presets.json"
+
+SHAPE_FIELDS = (
+    "signed_sphere",
+    "radial_gradient",
+    "slice",
+    "torus",
+    "capsule_array",
+    "fbm",
+    "ridge_noise",
+    "noise_carve",
+)
+MODIFIER_FIELDS = ("shell", "glow_shell", "pulse")
+OPERATORS = (
+    "union",
+    "intersect",
+    "difference",
+    "subtract",
+    "smooth_union",
+    "soft_intersect",
+    "smooth_intersect",
+    "smooth_subtract",
+    "chamfer",
+    "expand",
+)
+
+# Tabla de ruido de valor: P³ valores en [-1, 1], periódica.
+NOISE_PERIOD = 64
+DEFAULT_CHUNK = 32
+BOUND_FRACTION = 0.95
+
+
+def load_presets(path: Path = PRESETS_PATH) -> Dict[str, Dict[str, Any]]:
+    """Catálogo ``{id: preset}`` de ``presets.json``."""
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {str(p["id"]): p for p in payload.get("presets", [])}
+
+
+def get_preset(name: str, path: Path = PRESETS_PATH) -> Dict[str, Any]:
+    presets = load_presets(path)
+    if name not in presets:
+        raise ValueError(f"Preset no encontrado: {name}. Disponibles: {', '.join(sorted(presets))}")
+    return presets[name]
+
+
+# --- Núcleos elementales -------------------------------------------------------
+
+
+def _fade(t: np.ndarray) -> np.ndarray:
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+
+def _k_noise(qx: np.ndarray, qy: np.ndarray, qz: np.ndarray, table: np.ndarray) -> np.ndarray:
+    """Ruido de valor con interpolación quíntica sobre la tabla periódica."""
+    p = NOISE_PERIOD
+    mask = p - 1
+    parts = []
+    for q, stride in ((qx, p * p), (qy, p), (qz, 1)):
+        floor = np.floor(q)
+        i = floor.astype(np.int64)
+        parts.append(((i & mask) * stride, ((i + 1) & mask) * stride, _fade((q - floor).astype(np.float32))))
+    (x0, x1, ux), (y0, y1, uy), (z0, z1, uz) = parts
+
+    def lerp(a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+        return a + t * (b - a)
+
+    def plane(xi: np.ndarray) -> np.ndarray:
+        row0 = lerp(table[xi + y0 + z0], table[xi + y0 + z1], uz)
+        row1 = lerp(table[xi + y1 + z0], table[xi + y1 + z1], uz)
+        return lerp(row0, row1, uy)
+
+    return lerp(plane(x0), plane(x1), ux)
+
+
+def _k_smin(a: np.ndarray, b: np.ndarray, k: float) -> np.ndarray:
+    """Unión suave polinómica: ``min`` con un redondeo de ancho ``k``."""
+    h = np.clip(0.5 + 0.5 * (b - a) / k, 0.0, 1.0)
+    return (1.0 - h) * b + h * a - k * h * (1.0 - h)
+
+
+def _k_smax(a: np.ndarray, b: np.ndarray, k: float) -> np.ndarray:
+    return -_k_smin(-a, -b, k)
+
+
+_KERNELS: Dict[str, Callable[..., np.ndarray]] = {
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "mul": lambda a, b: a * b,
+    "min": np.minimum,
+    "max": np.maximum,
+    "addc": lambda a, c: a + np.float32(c),
+    "mulc": lambda a, c: a * np.float32(c),
+    "abs": np.abs,
+    "neg": np.negative,
+    "sin": np.sin,
+    "clamp": lambda a, lo, hi: np.clip(a, np.float32(lo), np.float32(hi)),
+    "length2": lambda a, b: np.sqrt(a * a + b * b),
+    "length3": lambda a, b, c: np.sqrt(a * a + b * b + c * c),
+    "smin": lambda a, b, k: _k_smin(a, b, np.float32(k)),
+    "smax": lambda a, b, k: _k_smax(a, b, np.float32(k)),
+    "chamfer": lambda a, b, k: np.minimum(np.minimum(a, b), (a + b - np.float32(k)) * np.float32(math.sqrt(0.5))),
+    "density": lambda d, falloff: np.clip(0.5 - d * np.float32(0.5 / falloff), 0.0, 1.0),
+}
+
+
+# --- Grafo -------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Instruction:
+    """``out = op(*args, *params)``; ``release`` son los valores que mueren aquí."""
+
+    op: str
+    args: Tuple[int, ...]
+    params: Tuple[Any, ...]
+    release: Tuple[int, ...] = ()
+
+
+class GraphBuilder:
+    """Construye el grafo deduplicando nodos idénticos (CSE por hash-consing)."""
+
+    def __init__(self) -> None:
+        self.nodes: List[Tuple[str, Tuple[int, ...], Tuple[Any, ...]]] = []
+        self._index: Dict[Tuple[str, Tuple[int, ...], Tuple[Any, ...]], int] = {}
+        self.requests = 0
+        self.x = self.node("x")
+        self.y = self.node("y")
+        self.z = self.node("z")
+
+    def node(self, op: str, *args: int, params: Tuple[Any, ...] = ()) -> int:
+        self.requests += 1
+        if op in ("add", "mul", "min", "max"):
+            args = tuple(sorted(args))
+        key = (op, tuple(args), tuple(params))
+        if key not in self._index:
+            self._index[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self._index[key]
+
+    # Atajos.
+    def add(self, a: int, b: int) -> int:
+        return self.node("add", a, b)
+
+    def sub(self, a: int, b: int) -> int:
+        return self.node("sub", a, b)
+
+    def addc(self, a: int, c: float) -> int:
+        return a if c == 0 else self.node("addc", a, params=(float(c),))
+
+    def mulc(self, a: int, c: float) -> int:
+        return a if c == 1 else self.node("mulc", a, params=(float(c),))
+
+    def length(self, *args: int) -> int:
+        return self.node(f"length{len(args)}", *args)
+
+
+def _noise_offset(seed: int, octave: int) -> Tuple[float, float, float]:
+    """Desfase determinista por campo/octava para decorrelacionar capas."""
+    rng = np.random.default_rng((seed * 1009 + octave) & 0xFFFFFFFF)
+    return tuple(float(v) for v in rng.uniform(0.0, NOISE_PERIOD, 3))  # type: ignore[return-value]
+
+
+def _noise(b: GraphBuilder, p: Tuple[int, int, int], freq: float, seed: int, octave: int) -> int:
+    off = _noise_offset(seed, octave)
+    q = [b.addc(b.mulc(c, freq), o) for c, o in zip(p, off)]
+    return b.node("noise", *q)
+
+
+def _fbm(b: GraphBuilder, p: Tuple[int, int, int], octaves: int, freq: float, seed: int, ridged: bool = False) -> int:
+    total = None
+    amp, norm = 1.0, 0.0
+    for octave in range(max(1, octaves)):
+        n = _noise(b, p, freq * 2.0**octave, seed, octave)
+        if ridged:
+            r = b.addc(b.node("neg", b.node("abs", n)), 1.0)
+            n = b.node("mul", r, r)
+        term = b.mulc(n, amp)
+        total = term if total is None else b.add(total, term)
+        norm += amp
+        amp *= 0.5
+    return b.mulc(total, 1.0 / norm)  # type: ignore[arg-type]
+
+
+def _base_freq(scale: float) -> float:
+    # ``scale`` 1 ≈ dos celdas de ruido por unidad.
+    return 2.0 * max(float(scale), 1e-3)
+
+
+def _capsule(b: GraphBuilder, p: Tuple[int, int, int], a: np.ndarray, c: np.ndarray, radius: float) -> int:
+    ba = c - a
+    pa = [b.addc(axis, -float(v)) for axis, v in zip(p, a)]
+    dot = b.add(b.add(b.mulc(pa[0], ba[0]), b.mulc(pa[1], ba[1])), b.mulc(pa[2], ba[2]))
+    h = b.node("clamp", b.mulc(dot, 1.0 / float(ba @ ba)), params=(0.0, 1.0))
+    diff = [b.sub(pa[i], b.mulc(h, ba[i])) for i in range(3)]
+    return b.addc(b.length(*diff), -radius)
+
+
+def _fibonacci_directions(count: int) -> np.ndarray:
+    i = np.arange(count) + 0.5
+    phi = np.arccos(1.0 - 2.0 * i / count)
+    theta = math.pi * (1.0 + 5.0**0.5) * i
+    return np.stack([np.cos(theta) * np.sin(phi), np.sin(theta) * np.sin(phi), np.cos(phi)], axis=1)
+
+
+_AXES = {"x": 0, "y": 1, "z": 2}
+
+
+def _shape(b: GraphBuilder, spec: Mapping[str, Any], seed: int) -> Tuple[int, float | None]:
+    """Nodo SDF de una primitiva y, si la define, su ``k`` de suavizado."""
+    kind = spec["type"]
+    p = (b.x, b.y, b.z)
+    if kind in ("signed_sphere", "radial_gradient"):
+        center = spec.get("center", (0.0, 0.0, 0.0))
+        shifted = tuple(b.addc(axis, -float(c)) for axis, c in zip(p, center))
+        d = b.addc(b.length(*shifted), -float(spec.get("radius", 0.5)))
+        return d, (float(spec["feather"]) if "feather" in spec else None)
+    if kind == "slice":
+        axis = p[_AXES[str(spec.get("axis", "z")).lower()]]
+        offset = b.addc(axis, -float(spec.get("offset", 0.0)))
+        return b.addc(b.node("abs", offset), -0.5 * float(spec.get("thickness", 0.2))), None
+    if kind == "torus":
+        axis = _AXES[str(spec.get("axis", "z")).lower()]
+        plane = [p[i] for i in range(3) if i != axis]
+        ring = b.addc(b.length(*plane), -float(spec.get("major_radius", 0.6)))
+        return b.addc(b.length(ring, p[axis]), -float(spec.get("minor_radius", 0.15))), None
+    if kind == "capsule_array":
+        count = int(spec.get("count", 8))
+        spread = float(spec.get("spread", 0.6))
+        radius = float(spec.get("radius", 0.08))
+        d = None
+        for direction in _fibonacci_directions(count):
+            capsule = _capsule(b, p, 0.3 * spread * direction, spread * direction, radius)
+            d = capsule if d is None else b.node("min", d, capsule)
+        return d, None  # type: ignore[return-value]
+    if kind in ("fbm", "ridge_noise", "noise_carve"):
+        freq = _base_freq(spec.get("scale", 1.0))
+        if kind == "noise_carve":
+            # Huecos donde el ruido supera 1 - 4·amplitude.
+            n = _noise(b, p, freq, seed, 0)
+            threshold = 1.0 - 4.0 * float(spec.get("amplitude", 0.2))
+            return b.mulc(b.addc(b.node("neg", n), threshold), 1.0 / freq), None
+        warp = float(spec.get("warp", 0.0))
+        if warp:
+            p = tuple(  # type: ignore[assignment]
+                b.add(axis, b.mulc(_noise(b, p, freq, seed + 101 + i, 0), warp)) for i, axis in enumerate(p)
+            )
+        if kind == "fbm":
+            value = _fbm(b, p, int(spec.get("octaves", 4)), freq, seed)
+            return b.mulc(value, -0.5 / freq), None
+        # Crestas donde el ruido ridged supera 1 - gain/2.
+        value = _fbm(b, p, int(spec.get("octaves", 4)), freq, seed, ridged=True)
+        threshold = 1.0 - 0.5 * float(spec.get("gain", 0.5))
+        return b.mulc(b.addc(b.node("neg", value), threshold), 1.0 / freq), None
+    raise ValueError(f"Campo SDF '{kind}' no soportado. Usa uno de: {', '.join(SHAPE_FIELDS + MODIFIER_FIELDS)}")
+
+
+def _modifier(b: GraphBuilder, spec: Mapping[str, Any], acc: int) -> int:
+    kind = spec["type"]
+    if kind == "shell":
+        return b.addc(b.node("abs", acc), -0.5 * float(spec.get("thickness", 0.1)))
+    if kind == "glow_shell":
+        return b.addc(b.node("abs", acc), -float(spec.get("thickness", 0.05)))
+    if kind == "pulse":
+        radius = b.length(b.x, b.y, b.z)
+        wave = b.node("sin", b.mulc(radius, 2.0 * math.pi * float(spec.get("frequency", 1.0))))
+        return b.sub(acc, b.mulc(wave, float(spec.get("amplitude", 0.1))))
+    raise ValueError(f"Modificador '{kind}' no soportado.")
+
+
+def _combine(b: GraphBuilder, op: str, a: int, c: int, k: float) -> int:
+    if op == "union":
+        return b.node("min", a, c)
+    if op == "intersect":
+        return b.node("max", a, c)
+    if op in ("difference", "subtract"):
+        return b.node("max", a, b.node("neg", c))
+    if op == "smooth_union":
+        return b.node("smin", a, c, params=(k,))
+    if op in ("soft_intersect", "smooth_intersect"):
+        return b.node("smax", a, c, params=(k,))
+    if op == "smooth_subtract":
+        return b.node("smax", a, b.node("neg", c), params=(k,))
+    if op == "chamfer":
+        return b.node("chamfer", a, c, params=(k,))
+    if op == "expand":
+        return b.addc(b.node("min", a, c), -k)
+    raise ValueError(f"Operador '{op}' no soportado. Usa uno de: {', '.join(OPERATORS)}")
+
+
+# --- Plan -------------------------------------------------------------------------
+
+
+@dataclass
+class PlanStats:
+    requested_nodes: int
+    unique_nodes: int
+    instructions: int
+    peak_live: int
+    noise_calls: int
+
+
+@dataclass
+class PresetPlan:
+    """Plan compilado: instrucciones en orden topológico y tabla de ruido."""
+
+    name: str
+    instructions: List[Instruction]
+    output: int
+    extent: float
+    falloff: float
+    table: np.ndarray
+    stats: PlanStats
+    seconds: float = 0.0
+
+    def evaluate_block(self, x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+        """Evalúa la densidad sobre ejes ``(n,1,1)``, ``(1,n,1)``, ``(1,1,n)``."""
+        values: List[Any] = [None] * len(self.instructions)
+        inputs = {"x": x, "y": y, "z": z}
+        for index, ins in enumerate(self.instructions):
+            if ins.op in inputs:
+                values[index] = inputs[ins.op]
+            elif ins.op == "noise":
+                values[index] = _k_noise(*(values[a] for a in ins.args), self.table)
+            else:
+                values[index] = _KERNELS[ins.op](*(values[a] for a in ins.args), *ins.params)
+            for dead in ins.release:
+                values[dead] = None
+        return values[self.output]
+
+    def evaluate(
+        self, resolution: int, chunk: int = DEFAULT_CHUNK, workers: int | None = None
+    ) -> Tuple[np.ndarray, Tuple[float, float, float]]:
+        """
+        Grid de densidad ``resolution³`` sobre ``[-extent, extent]³``.
+
+        Returns:
+            ``(grid, spacing)`` con el grid en float32.
+        """
+        if resolution < 2:
+            raise ValueError("La resolución debe ser >= 2.")
+        axis = np.linspace(-self.extent, self.extent, resolution, dtype=np.float32)
+        grid = np.empty((resolution,) * 3, dtype=np.float32)
+        starts = range(0, resolution, max(1, chunk))
+        blocks = [(i, j, k) for i in starts for j in starts for k in starts]
+
+        def _run(block: Tuple[int, int, int]) -> None:
+            i, j, k = block
+            sx, sy, sz = slice(i, i + chunk), slice(j, j + chunk), slice(k, k + chunk)
+            grid[sx, sy, sz] = self.evaluate_block(
+                axis[sx][:, None, None], axis[sy][None, :, None], axis[sz][None, None, :]
+            )
+
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1:
+            for block in blocks:
+                _run(block)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preset") as pool:
+                list(pool.map(_run, blocks))
+        step = float(axis[1] - axis[0])
+        return grid, (step, step, step)
+
+
+def _schedule(nodes: Sequence[Tuple[str, Tuple[int, ...], Tuple[Any, ...]]], output: int) -> Tuple[List[Instruction], int, int]:
+    """Elimina nodos muertos, renumera y calcula el último uso de cada valor."""
+    live = np.zeros(len(nodes), dtype=bool)
+    live[output] = True
+    for index in range(output, -1, -1):
+        if live[index]:
+            live[list(nodes[index][1])] = True
+    order = np.flatnonzero(live)
+    remap = {int(old): new for new, old in enumerate(order)}
+    program = [(nodes[old][0], tuple(remap[a] for a in nodes[old][1]), nodes[old][2]) for old in order]
+
+    last_use = list(range(len(program)))
+    for index, (_, args, _) in enumerate(program):
+        for a in args:
+            last_use[a] = index
+    releases: List[List[int]] = [[] for _ in program]
+    for value, index in enumerate(last_use):
+        if value != len(program) - 1:
+            releases[index].append(value)
+
+    instructions = []
+    alive = peak = 0
+    for index, (op, args, params) in enumerate(program):
+        alive += 1
+        peak = max(peak, alive)
+        alive -= len(releases[index])
+        instructions.append(Instruction(op, args, params, tuple(releases[index])))
+    return instructions, remap[output], peak
+
+
+def compile_preset(preset: Mapping[str, Any] | str, extent: float = 1.0, seed: int = 0) -> PresetPlan:
+    """
+    Compila un preset (dict o id de ``presets.json``) a un ``PresetPlan``.
+
+    ``seed`` cambia el ruido sin cambiar la estructura del grafo.
+    """
+    start = time.perf_counter()
+    if isinstance(preset, str):
+        preset = get_preset(preset)
+    sdf = preset.get("sdf") or {}
+    fields = list(sdf.get("fields") or [])
+    operators = list(sdf.get("operators") or [])
+    if not fields:
+        raise ValueError(f"El preset '{preset.get('id')}' no define campos SDF.")
+    falloff = float(sdf.get("falloff", 0.25))
+    if falloff <= 0:
+        raise ValueError("falloff debe ser > 0.")
+    default_k = falloff * 0.5
+
+    # Operadores alineados a la derecha con los campos.
+    attached: List[str | None] = [None] * max(0, len(fields) - len(operators)) + operators[-len(fields) :]
+
+    b = GraphBuilder()
+    acc: int | None = None
+    for index, (spec, op) in enumerate(zip(fields, attached)):
+        kind = spec.get("type")
+        if kind in MODIFIER_FIELDS:
+            if acc is None:
+                raise ValueError(f"El modificador '{kind}' no puede ser el primer campo.")
+            operand, k = _modifier(b, spec, acc), None
+        else:
+            operand, k = _shape(b, spec, seed + index)
+        if acc is None:
+            acc = operand
+        else:
+            acc = _combine(b, op or "union", acc, operand, k if k is not None else default_k)
+
+    bound = BOUND_FRACTION * extent
+    box = b.node("max", b.node("max", b.node("abs", b.x), b.node("abs", b.y)), b.node("abs", b.z))
+    acc = b.node("max", acc, b.addc(box, -bound))  # type: ignore[arg-type]
+    output = b.node("density", acc, params=(falloff,))
+
+    instructions, out_index, peak = _schedule(b.nodes, output)
+    stats = PlanStats(
+        requested_nodes=b.requests,
+        unique_nodes=len(b.nodes),
+        instructions=len(instructions),
+        peak_live=peak,
+        noise_calls=sum(1 for ins in instructions if ins.op == "noise"),
+    )
+    rng = np.random.default_rng(seed)
+    table = rng.uniform(-1.0, 1.0, NOISE_PERIOD**3).astype(np.float32)
+    return PresetPlan(
+        name=str(preset.get("id", "preset")),
+        instructions=instructions,
+        output=out_index,
+        extent=float(extent),
+        falloff=falloff,
+        table=table,
+        stats=stats,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def capture_preset(
+    preset: Mapping[str, Any] | str,
+    output_path: Path,
+    config: DensityCaptureConfig | None = None,
+    resolution: int = 128,
+    extent: float = 1.0,
+    seed: int = 0,
+    workers: int | None = None,
+) -> Tuple[Path, DensityCaptureConfig]:
+    """
+    Preset → grid de densidad → malla, sin pasar por disco.
+
+    La malla se centra en el origen (mismas coordenadas que ``mesh_server``).
+
+    Returns:
+        La ruta exportada y la configuración efectiva: ``spacing`` del grid
+        evaluado y ``step_size`` elegido por ``target_triangles``.
+    """
+    config = config or DensityCaptureConfig()
+    plan = compile_preset(preset, extent=extent, seed=seed)
+    start = time.perf_counter()
+    grid, spacing = plan.evaluate(resolution, workers=workers)
+    seconds = time.perf_counter() - start
+    config = dataclasses.replace(config, spacing=spacing)
+    mesh, config = mesh_from_grid(grid, config)
+    mesh.apply_translation((-extent, -extent, -extent))
+    stats = plan.stats
+    print(
+        f"[preset_sdf] {plan.name}: {stats.unique_nodes}/{stats.requested_nodes} nodos únicos, "
+        f"pico {stats.peak_live} arrays vivos, grid {resolution}³ en {seconds:.2f}s, {len(mesh.faces)} caras."
+    )
+    return export_mesh(mesh, output_path, config.export_format), config
@@ -0,0 +1,80 @@
+"""
+Campos SDF vectorizados (port de ``fields/sdf.ts``) para generar grids en Python.
+
+Las funciones reciben puntos con forma ``(..., 3)`` y devuelven distancias con
+signo (negativas dentro). ``sample_sdf_grid`` evalúa una especificación JSON
+sobre un grid cúbico centrado en el origen, por rebanadas para acotar memoria.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence, Tuple
+
+import numpy as np
+
+SDF_KINDS = {"sphere", "capsule", "face_mask"}
+
+
+def sphere(points: np.ndarray, radius: float, center: Sequence[float] = (0.0, 0.0, 0.0)) -> np.ndarray:
+    """Distancia con signo a una esfera."""
+    return np.linalg.norm(points - np.asarray(center, dtype=points.dtype), axis=-1) - radius
+
+
+def capsule(points: np.ndarray, a: Sequence[float], b: Sequence[float], radius: float) -> np.ndarray:
+    """Distancia con signo a una cápsula definida por el segmento AB y radio."""
+    a_arr = np.asarray(a, dtype=points.dtype)
+    ba = np.asarray(b, dtype=points.dtype) - a_arr
+    pa = points - a_arr
+    h = np.clip((pa @ ba) / float(ba @ ba), 0.0, 1.0)
+    return np.linalg.norm(pa - h[..., None] * ba, axis=-1) - radius
+
+
+def face_mask_simple(points: np.ndarray, size: float) -> np.ndarray:
+    """Máscara facial simple: cráneo + mandíbula + mentón con recortes (ver ``faceMaskSimple``)."""
+    skull = sphere(points, size, center=(0.0, -size * 0.15, 0.0))
+    jaw = capsule(points, (0.0, size * 0.1, 0.0), (0.0, -size * 0.95, 0.0), size * 0.55)
+    chin = sphere(points, size * 0.35, center=(0.0, -size, 0.0))
+
+    mask = np.minimum(skull, np.minimum(jaw, chin))
+    cheek_taper = np.maximum(np.abs(points[..., 0]) - size * 0.75, np.abs(points[..., 2]) - size * 0.55)
+    brow_cut = points[..., 1] - size * 1.05
+    mask = np.maximum(mask, cheek_taper)
+    return np.maximum(mask, brow_cut)
+
+
+def evaluate_sdf(spec: Mapping[str, Any], points: np.ndarray) -> np.ndarray:
+    """Evalúa una especificación ``{"kind": ..., ...}`` sobre ``points``."""
+    kind = str(spec.get("kind", "")).lower()
+    if kind == "sphere":
+        return sphere(points, float(spec.get("radius", 1.0)), spec.get("center", (0.0, 0.0, 0.0)))
+    if kind == "capsule":
+        return capsule(points, spec["a"], spec["b"], float(spec.get("radius", 0.25)))
+    if kind == "face_mask":
+        return face_mask_simple(points, float(spec.get("size", 1.0)))
+    raise ValueError(f"SDF '{kind}' no soportado. Usa uno de: {', '.join(sorted(SDF_KINDS))}")
+
+
+def sample_sdf_grid(
+    spec: Mapping[str, Any], resolution: int, extent: float, slab: int = 16
+) -> Tuple[np.ndarray, Tuple[float, float, float]]:
+    """
+    Muestrea el SDF en un grid ``resolution³`` que cubre ``[-extent, extent]³``.
+
+    Returns:
+        Tupla ``(grid, spacing)``; el grid es float32.
+    """
+    if resolution < 2:
+        raise ValueError("La resolución del SDF debe ser >= 2.")
+    axis = np.linspace(-extent, extent, resolution, dtype=np.float32)
+    grid = np.empty((resolution, resolution, resolution), dtype=np.float32)
+    yy, zz = np.meshgrid(axis, axis, indexing="ij")
+    for start in range(0, resolution, slab):
+        xs = axis[start : start + slab]
+        points = np.empty((len(xs), resolution, resolution, 3), dtype=np.float32)
+        points[..., 0] = xs[:, None, None]
+        points[..., 1] = yy
+        points[..., 2] = zz
+        grid[start : start + len(xs)] = evaluate_sdf(spec, points)
+    step = float(axis[1] - axis[0])
+    return grid, (step, step, step)
+
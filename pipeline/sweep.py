@@ -0,0 +1,404 @@
+"""
+Barridos de parámetros sobre un único grid de densidad.
+
+Explorar ``iso_level × step_size × voxel_size × solidify_thickness`` lanzando
+una CLI por combinación recarga el grid y repite todo cada vez. Aquí:
+
+- el grid se carga una sola vez en ``multiprocessing.shared_memory`` y cada
+  proceso del pool lo ve como un ``ndarray`` sobre el mismo segmento (sin copia
+  ni pickling del volumen);
+- cada tarea captura una combinación ``(iso_level, step_size)`` y alimenta esa
+  malla a todas sus variantes de postproceso ``(voxel_size,
+  solidify_thickness)``: con Blender, una sola sesión ``--jobs`` por captura;
+  con ``--remesh-backend python``, un remesh nativo por ``voxel_size`` que
+  comparten sus variantes (Blender solo para Solidify);
+- el resultado es una tabla (CSV y JSON) con tamaño, tiempo y estadísticas de
+  malla (``tools.mesh_quality``) de cada archivo escrito.
+
+Una variante ``voxel_size=0, solidify_thickness=0`` no tiene postproceso: su
+fila es la de la captura.
+"""
+
+from __future__ import annotations
+
+import csv
+import dataclasses
+import itertools
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import trimesh
+
+from pipeline.density_capture import DensityCaptureConfig, export_mesh, load_density_grid, mesh_from_grid
+from tools.blender_process import BlenderError, BlenderJob, run_blender
+from tools.chunked_volume import Region
+from tools.mesh_quality import analyze_mesh
+from tools.voxel_remesh import voxel_remesh
+
+RESULT_FIELDS = (
+    "capture",
+    "stage",
+    "iso_level",
+    "step_size",
+    "voxel_size",
+    "solidify_thickness",
+    "output",
+    "bytes",
+    "seconds",
+    "vertices",
+    "faces",
+    "watertight",
+    "boundary_edges",
+    "non_manifold_edges",
+    "volume",
+    "surface_area",
+    "error",
+)
+
+# Vista del grid compartido dentro de cada proceso del pool.
+_SHARED: Dict[str, Any] = {}
+
+
+def parse_values(value: str, cast: Callable[[str], Any] = float) -> List[Any]:
+    """``"0.4,0.5,0.6"`` → ``[0.4, 0.5, 0.6]`` (sin duplicados, en orden)."""
+    values = [cast(v) for v in value.split(",") if v.strip()]
+    if not values:
+        raise ValueError(f"Lista de valores vacía: {value!r}")
+    return list(dict.fromkeys(values))
+
+
+@dataclass
+class SweepPost:
+    """Parámetros de postproceso comunes a todas las variantes."""
+
+    export_format: str = "glb"
+    remesh_backend: str = "blender"
+    remesh_engine: str = "surface_nets"
+    remesh_mode: str = "VOXEL"
+    adaptivity: float = 0.0
+    solidify_offset: float = 0.0
+    smooth_shading: bool = False
+    blender: str | None = None
+    blender_timeout: float | None = None
+    blender_max_memory_mb: float | None = None
+    blender_log: Path | None = None
+
+
+@dataclass
+class SweepTask:
+    """Una captura ``(iso_level, step_size)`` y sus variantes de postproceso."""
+
+    index: int
+    config: DensityCaptureConfig
+    variants: List[Tuple[float, float]]
+    output_dir: Path
+    name: str
+    post: SweepPost
+
+
+@dataclass
+class SweepResult:
+    """Fila de la tabla de resultados (una por archivo escrito)."""
+
+    capture: int
+    stage: str
+    iso_level: float
+    step_size: int
+    voxel_size: float = 0.0
+    solidify_thickness: float = 0.0
+    output: str | None = None
+    bytes: int = 0
+    seconds: float = 0.0
+    vertices: int = 0
+    faces: int = 0
+    watertight: bool = False
+    boundary_edges: int = 0
+    non_manifold_edges: int = 0
+    volume: float = 0.0
+    surface_area: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class SharedGrid:
+    """Grid copiado una vez a un segmento de memoria compartida."""
+
+    shm: shared_memory.SharedMemory
+    shape: Tuple[int, ...]
+    dtype: str
+    array: np.ndarray = field(repr=False)
+
+    @classmethod
+    def from_array(cls, grid: np.ndarray) -> "SharedGrid":
+        shm = shared_memory.SharedMemory(create=True, size=max(1, grid.nbytes))
+        array = np.ndarray(grid.shape, dtype=grid.dtype, buffer=shm.buf)
+        array[...] = grid
+        return cls(shm=shm, shape=tuple(grid.shape), dtype=grid.dtype.str, array=array)
+
+    def close(self) -> None:
+        del self.array
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach_grid(name: str, shape: Tuple[int, ...], dtype: str) -> None:
+    """Inicializador del pool: abre el segmento y deja la vista en ``_SHARED``."""
+    shm = shared_memory.SharedMemory(name=name)
+    _SHARED["shm"] = shm  # mantener el segmento abierto mientras viva el proceso
+    _SHARED["grid"] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _value_tag(value: float) -> str:
+    return f"{value:g}".replace("-", "m")
+
+
+def _capture_name(name: str, config: DensityCaptureConfig) -> str:
+    return f"{name}_iso{_value_tag(config.iso_level)}_s{config.step_size}"
+
+
+def _describe(result: SweepResult, path: Path, seconds: float, mesh: trimesh.Trimesh | None = None) -> SweepResult:
+    """Completa la fila con tamaño, tiempo y calidad de la malla escrita."""
+    result.output = str(path)
+    result.seconds = seconds
+    result.bytes = path.stat().st_size
+    if mesh is None:
+        mesh = trimesh.load(path, force="mesh", process=False)
+    quality = analyze_mesh(mesh.vertices, mesh.faces)
+    result.vertices = quality.vertices
+    result.faces = quality.faces
+    result.watertight = quality.watertight
+    result.boundary_edges = quality.boundary_edges
+    result.non_manifold_edges = quality.non_manifold_edges
+    result.volume = quality.volume
+    result.surface_area = quality.surface_area
+    return result
+
+
+def _blender_session(
+    jobs: List[Dict[str, Any]], rows: List[SweepResult], task: SweepTask, jobs_path: Path
+) -> None:
+    """Lanza una sola sesión de Blender para ``jobs`` y completa sus filas."""
+    post = task.post
+    jobs_path.write_text(json.dumps({"jobs": jobs}, indent=2), encoding="utf-8")
+    script_path = Path(__file__).with_name("blender_runner.py")
+    cmd = [post.blender or "blender", "--background", "--python", str(script_path), "--", "--jobs", str(jobs_path)]
+    error = None
+    start = time.perf_counter()
+    try:
+        run_blender(
+            BlenderJob(
+                cmd=cmd,
+                name=jobs_path.stem,
+                # Un log por captura: las sesiones corren en paralelo.
+                log_path=post.blender_log.with_name(f"{post.blender_log.stem}_{jobs_path.stem}{post.blender_log.suffix}")
+                if post.blender_log
+                else None,
+                timeout=post.blender_timeout,
+                max_memory_mb=post.blender_max_memory_mb,
+            )
+        )
+    except (BlenderError, OSError) as exc:
+        error = str(exc).splitlines()[0]
+    seconds = time.perf_counter() - start
+    # Los tiempos de Blender son los de la sesión entera (compartida por sus trabajos).
+    for job, row in zip(jobs, rows):
+        path = Path(job["output"])
+        if path.exists():
+            _describe(row, path, seconds)
+        else:
+            row.seconds = seconds
+            row.error = error or "Blender no escribió la salida."
+
+
+def run_task(task: SweepTask, grid: np.ndarray | None = None) -> List[SweepResult]:
+    """Captura una combinación y la pasa por todas sus variantes de postproceso."""
+    grid = _SHARED["grid"] if grid is None else grid
+    config, post = task.config, task.post
+    capture_name = _capture_name(task.name, config)
+    row = SweepResult(capture=task.index, stage="capture", iso_level=config.iso_level, step_size=config.step_size)
+    start = time.perf_counter()
+    try:
+        mesh, _ = mesh_from_grid(grid, config)
+        path = export_mesh(mesh, task.output_dir / f"{capture_name}.{config.export_format}", config.export_format)
+    except (ValueError, RuntimeError) as exc:
+        row.error = str(exc)
+        print(f"[sweep] Captura {task.index} ({capture_name}) falló: {exc}")
+        return [row]
+    results = [_describe(row, path, time.perf_counter() - start, mesh)]
+    print(f"[sweep] Captura {task.index}: {row.faces} caras en {row.seconds:.2f}s -> {path.name}")
+
+    variants = [(v, t) for v, t in task.variants if v > 0 or t != 0]
+    blender_jobs: List[Dict[str, Any]] = []
+    blender_rows: List[SweepResult] = []
+    with tempfile.TemporaryDirectory(prefix="sweep_") as tmpdir:
+        remeshed: Dict[float, Tuple[Path | None, float, str | None]] = {}
+        for voxel_size, thickness in variants:
+            target = task.output_dir / (
+                f"{capture_name}_v{_value_tag(voxel_size)}_t{_value_tag(thickness)}.{post.export_format}"
+            )
+            variant = SweepResult(
+                capture=task.index,
+                stage="blender",
+                iso_level=config.iso_level,
+                step_size=config.step_size,
+                voxel_size=voxel_size,
+                solidify_thickness=thickness,
+            )
+            source, blender_voxel = path, voxel_size
+            if post.remesh_backend == "python" and voxel_size > 0:
+                if voxel_size not in remeshed:
+                    remeshed[voxel_size] = _native_remesh(mesh, voxel_size, post, Path(tmpdir))
+                native, remesh_seconds, remesh_error = remeshed[voxel_size]
+                if native is None:
+                    variant.stage, variant.error = "remesh", remesh_error
+                    results.append(variant)
+                    continue
+                source, blender_voxel = native, 0.0
+                if thickness == 0:
+                    variant.stage = "remesh"
+                    export_start = time.perf_counter()
+                    loaded = trimesh.load(native, force="mesh", process=False)
+                    written = export_mesh(loaded, target, post.export_format)
+                    seconds = remesh_seconds + time.perf_counter() - export_start
+                    results.append(_describe(variant, written, seconds, loaded))
+                    continue
+            blender_jobs.append(
+                {
+                    "input": str(source),
+                    "output": str(target),
+                    "format": post.export_format,
+                    "voxel_size": blender_voxel,
+                    "remesh_mode": post.remesh_mode,
+                    "adaptivity": post.adaptivity,
+                    "solidify_thickness": thickness,
+                    "solidify_offset": post.solidify_offset,
+                    "smooth_shading": post.smooth_shading,
+                }
+            )
+            blender_rows.append(variant)
+        if blender_jobs:
+            _blender_session(blender_jobs, blender_rows, task, Path(tmpdir) / f"{capture_name}_jobs.json")
+            results.extend(blender_rows)
+    for variant in results[1:]:
+        status = variant.error or f"{variant.faces} caras en {variant.seconds:.2f}s"
+        print(
+            f"[sweep] Captura {task.index} voxel={variant.voxel_size:g} solidify={variant.solidify_thickness:g} "
+            f"({variant.stage}): {status}"
+        )
+    return results
+
+
+def _native_remesh(
+    mesh: trimesh.Trimesh, voxel_size: float, post: SweepPost, tmpdir: Path
+) -> Tuple[Path | None, float, str | None]:
+    """Remesh nativo compartido por las variantes de un mismo ``voxel_size``: ``(ruta, segundos, error)``."""
+    start = time.perf_counter()
+    try:
+        result, _ = voxel_remesh(mesh.vertices, mesh.faces, voxel_size, engine=post.remesh_engine)
+    except (ValueError, MemoryError) as exc:
+        return None, time.perf_counter() - start, str(exc)
+    path = tmpdir / f"remesh_{_value_tag(voxel_size)}.obj"
+    trimesh.Trimesh(vertices=result.vertices, faces=result.faces, process=False).export(path, file_type="obj")
+    return path, time.perf_counter() - start, None
+
+
+def build_tasks(
+    config: DensityCaptureConfig,
+    iso_levels: Sequence[float],
+    step_sizes: Sequence[int],
+    voxel_sizes: Sequence[float],
+    thicknesses: Sequence[float],
+    output_dir: Path,
+    name: str,
+    post: SweepPost,
+) -> List[SweepTask]:
+    """Producto cartesiano: una tarea por captura, con todas las variantes de postproceso."""
+    variants = list(itertools.product(voxel_sizes, thicknesses))
+    return [
+        SweepTask(
+            index=i,
+            config=dataclasses.replace(config, iso_level=float(iso), step_size=int(step), target_triangles=None),
+            variants=variants,
+            output_dir=output_dir,
+            name=name,
+            post=post,
+        )
+        for i, (iso, step) in enumerate(itertools.product(iso_levels, step_sizes))
+    ]
+
+
+def write_results(results: Sequence[SweepResult], table_path: Path) -> Tuple[Path, Path]:
+    """Escribe la tabla como CSV y, junto a ella, como JSON."""
+    table_path.parent.mkdir(parents=True, exist_ok=True)
+    csv_path = table_path.with_suffix(".csv")
+    with csv_path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.DictWriter(handle, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        for result in results:
+            writer.writerow(dataclasses.asdict(result))
+    json_path = table_path.with_suffix(".json")
+    json_path.write_text(json.dumps([dataclasses.asdict(r) for r in results], indent=2), encoding="utf-8")
+    return csv_path, json_path
+
+
+def run_sweep(
+    density_path: Path,
+    output_dir: Path,
+    config: DensityCaptureConfig,
+    iso_levels: Sequence[float],
+    step_sizes: Sequence[int],
+    voxel_sizes: Sequence[float] = (0.0,),
+    thicknesses: Sequence[float] = (0.0,),
+    post: SweepPost | None = None,
+    region: Region | None = None,
+    workers: int | None = None,
+    table_path: Path | None = None,
+) -> List[SweepResult]:
+    """
+    Barrido completo: carga el grid una vez y reparte las capturas en procesos.
+
+    Returns:
+        Las filas de la tabla, ordenadas por captura (la captura primero y
+        después sus variantes).
+    """
+    post = post or SweepPost()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    grid = load_density_grid(density_path, region)
+    tasks = build_tasks(config, iso_levels, step_sizes, voxel_sizes, thicknesses, output_dir, density_path.stem, post)
+    workers = min(workers or min(4, os.cpu_count() or 1), len(tasks))
+    print(
+        f"[sweep] {len(tasks)} capturas × {len(tasks[0].variants)} variantes sobre un grid {grid.shape} "
+        f"({grid.nbytes / 2**20:.0f} MiB) con {workers} proceso(s)"
+    )
+    if workers <= 1:
+        grid = np.ascontiguousarray(grid)
+        batches = [run_task(task, grid) for task in tasks]
+    else:
+        shared = SharedGrid.from_array(grid)
+        del grid  # el mmap/copia original ya no hace falta
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_attach_grid,
+                initargs=(shared.shm.name, shared.shape, shared.dtype),
+            ) as pool:
+                batches = list(pool.map(run_task, tasks))
+        finally:
+            shared.close()
+    results = [row for batch in batches for row in batch]
+    csv_path, json_path = write_results(results, table_path or output_dir / "sweep.csv")
+    failed = sum(1 for row in results if row.error)
+    print(
+        f"[sweep] {len(results)} resultados ({failed} con error) en {time.perf_counter() - start:.2f}s; "
+        f"tabla: {csv_path} y {json_path}"
+    )
+    return results
@@ -0,0 +1,287 @@
+"""
+Exportación por teselas (ladrillos espaciales) para cargar esculturas grandes
+en el visor por partes.
+
+Un único GLB monolítico obliga a ``core/scene.ts`` a descargarlo y parsearlo
+entero antes de dibujar nada. Aquí el grid se parte en ladrillos de ``brick``
+celdas y cada ladrillo se malla por separado con Marching Cubes:
+
+- ``<salida>/tile_X_Y_Z.lodN.glb``: un GLB por tesela y nivel; ``lod0`` usa el
+  ``step_size`` de la configuración y cada nivel siguiente lo duplica.
+- ``<salida>/index.json``: caja de cada tesela (para *frustum culling*), y por
+  nivel su archivo, caras, bytes y error geométrico (distancia máxima y media
+  de los vértices a la iso-superficie del grid completo, en unidades de
+  ``spacing``) para elegir el nivel según el error en pantalla.
+
+Costuras: ladrillos vecinos comparten el plano de muestras del borde y el
+tamaño de ladrillo es múltiplo del paso más grueso, así que en el mismo nivel
+los vértices del borde salen idénticos en ambas teselas (mismo par de valores
+por arista; la traslación se suma en índices enteros antes de aplicar
+``spacing``). Las normales se calculan del gradiente del grid con un halo de
+una muestra, de modo que también coinciden en la costura.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import numpy as np
+from skimage import measure
+
+from pipeline.density_capture import DensityCaptureConfig, _region_bounds
+from tools.chunked_volume import SUFFIX as CHUNKED_SUFFIX
+from tools.chunked_volume import Region, array_shape, load_array
+from tools.metrics import inc, timer
+from tools.mesh_optimize import optimize_mesh
+from tools.mesh_writers import GltfBuilder
+
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+
+
+@dataclass
+class TileLevel:
+    """Un nivel de detalle de una tesela."""
+
+    level: int
+    step: int
+    uri: str
+    vertices: int
+    faces: int
+    bytes: int
+    geometric_error: float
+    mean_error: float
+
+
+@dataclass
+class Tile:
+    """Ladrillo con superficie: índice, caja en coordenadas de malla y niveles."""
+
+    id: str
+    index: Tuple[int, int, int]
+    bounds_min: Tuple[float, float, float]
+    bounds_max: Tuple[float, float, float]
+    levels: List[TileLevel] = field(default_factory=list)
+
+
+@dataclass
+class _LocalMesh:
+    """Malla mínima para ``optimize_mesh`` (vértices en índices del ladrillo)."""
+
+    vertices: np.ndarray
+    faces: np.ndarray
+
+
+def tiled_output_dir(output_path: Path) -> Path:
+    """``exports/escultura.glb`` → ``exports/escultura/`` (carpeta de teselas)."""
+    return output_path.with_suffix("")
+
+
+def _trilinear(block: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Muestrea ``block`` en ``points`` (índices fraccionarios, ``(N, 3)``)."""
+    upper = np.asarray(block.shape) - 2
+    base = np.clip(np.floor(points).astype(np.int64), 0, upper)
+    frac = points - base
+    i, j, k = base.T
+    fx, fy, fz = frac.T
+    result = np.zeros(len(points), dtype=np.float64)
+    for dx in (0, 1):
+        wx = fx if dx else 1.0 - fx
+        for dy in (0, 1):
+            wy = fy if dy else 1.0 - fy
+            for dz in (0, 1):
+                wz = fz if dz else 1.0 - fz
+                result += wx * wy * wz * block[i + dx, j + dy, k + dz]
+    return result
+
+
+def _gradient(block: np.ndarray, points: np.ndarray, spacing: np.ndarray) -> np.ndarray:
+    """Gradiente (diferencias centrales de media celda) en unidades de ``spacing``."""
+    grad = np.empty((len(points), 3), dtype=np.float64)
+    for axis in range(3):
+        offset = np.zeros(3)
+        offset[axis] = 0.5
+        grad[:, axis] = (_trilinear(block, points + offset) - _trilinear(block, points - offset)) / spacing[axis]
+    return grad
+
+
+def _surface_error(block: np.ndarray, points: np.ndarray, iso_level: float, grad: np.ndarray) -> Tuple[float, float]:
+    """Distancia de primer orden ``|f - iso| / |∇f|`` de los vértices a la iso-superficie."""
+    if not len(points):
+        return 0.0, 0.0
+    norm = np.maximum(np.linalg.norm(grad, axis=1), 1e-12)
+    distance = np.abs(_trilinear(block, points) - iso_level) / norm
+    return float(distance.max()), float(distance.mean())
+
+
+def _tile_mesh(
+    block: np.ndarray, halo: Tuple[int, int, int], cells: Tuple[int, int, int], iso_level: float, step: int
+) -> Tuple[np.ndarray, np.ndarray] | None:
+    """Marching Cubes sobre las ``cells`` del ladrillo (sin halo); vértices en índices de ``block``."""
+    core = block[tuple(slice(h, h + c + 1) for h, c in zip(halo, cells))]
+    if any(c < step for c in cells):
+        return None
+    try:
+        verts, faces, _, _ = measure.marching_cubes(
+            volume=core, level=iso_level, step_size=step, allow_degenerate=False
+        )
+    except (ValueError, RuntimeError):
+        return None
+    if not len(faces):
+        return None
+    return verts.astype(np.float64) + np.asarray(halo, dtype=np.float64), faces.astype(np.int64)
+
+
+def capture_tiled(
+    density_path: Path | np.ndarray,
+    output_path: Path,
+    config: DensityCaptureConfig | None = None,
+    brick: int = 64,
+    lods: int = 3,
+    region: Region | None = None,
+    workers: int | None = None,
+) -> Path:
+    """
+    Malla el grid por ladrillos y escribe los GLB por nivel y ``index.json``.
+
+    Returns:
+        La ruta del índice.
+    """
+    config = config or DensityCaptureConfig()
+    if config.engine != "marching_cubes":
+        raise ValueError("La exportación por teselas solo está disponible con el motor marching_cubes.")
+    if config.min_island_voxels or config.min_component_faces or config.min_component_volume or config.keep_largest:
+        raise ValueError("La limpieza de islas/componentes cambia los bordes de cada tesela; no aplica con --tiles.")
+    if config.target_triangles:
+        raise ValueError("--target-triangles no aplica con --tiles; usa --step-size para el nivel 0.")
+    if config.mirror_axis:
+        raise ValueError("--mirror-axis no aplica con --tiles.")
+    lods = max(1, lods)
+    step = max(1, config.step_size)
+    coarsest = step * 2 ** (lods - 1)
+    brick = max(coarsest, -(-brick // coarsest) * coarsest)
+    spacing = np.asarray(config.spacing, dtype=np.float64)
+
+    loader: Callable[[Tuple[slice, ...]], np.ndarray]
+    if isinstance(density_path, np.ndarray):
+        if density_path.ndim != 3:
+            raise ValueError(f"Se esperaba un grid 3D, pero se obtuvo una forma {density_path.shape}.")
+        source, shape = density_path, density_path.shape
+        loader = lambda sl: source[sl]  # noqa: E731
+    elif density_path.suffix in {".npy", CHUNKED_SUFFIX}:
+        # Cada tesela lee solo su ladrillo (mmap en .npy, bloques en .vbv).
+        path, shape = density_path, array_shape(density_path)
+        loader = lambda sl: load_array(path, sl)  # noqa: E731
+    else:
+        with timer("vibra_stage_seconds", stage="load"):
+            source = load_array(density_path)
+        shape = source.shape
+        loader = lambda sl: source[sl]  # noqa: E731
+    if len(shape) != 3:
+        raise ValueError(f"Se esperaba un grid 3D, pero se obtuvo una forma {tuple(shape)}.")
+    bounds = _region_bounds(region, tuple(shape))
+    extent = [hi - lo - 1 for lo, hi in bounds]
+    if min(extent) < 1:
+        raise ValueError("La región debe tener al menos 2 muestras por eje.")
+
+    out_dir = tiled_output_dir(output_path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = [-(-n // brick) for n in extent]
+    origins = [(i, j, k) for i in range(counts[0]) for j in range(counts[1]) for k in range(counts[2])]
+
+    def _run(index: Tuple[int, int, int]) -> Tile | None:
+        start = [i * brick for i in index]
+        cells = tuple(min(brick, n - s) for s, n in zip(start, extent))
+        # Halo de una muestra para gradientes (normales y error) iguales a ambos lados de la costura.
+        lo = [max(0, s - 1) for s in start]
+        hi = [min(n + 1, s + c + 2) for s, c, n in zip(start, cells, extent)]
+        halo = tuple(s - l for s, l in zip(start, lo))
+        with timer("vibra_stage_seconds", stage="load"):
+            block = loader(tuple(slice(b[0] + l, b[0] + h) for b, l, h in zip(bounds, lo, hi)))
+        block = np.ascontiguousarray(block, dtype=np.float32)
+        core = block[tuple(slice(h, h + c + 1) for h, c in zip(halo, cells))]
+        if not float(core.min()) <= config.iso_level <= float(core.max()):
+            return None
+        tile_id = "_".join(str(i) for i in index)
+        origin = np.asarray(start, dtype=np.float64) - np.asarray(halo, dtype=np.float64)
+        tile = Tile(
+            id=tile_id,
+            index=index,
+            bounds_min=tuple(float(v) for v in np.asarray(start) * spacing),
+            bounds_max=tuple(float(v) for v in (np.asarray(start) + np.asarray(cells)) * spacing),
+        )
+        for level in range(lods):
+            level_step = step * 2**level
+            with timer("vibra_stage_seconds", stage="extract"):
+                result = _tile_mesh(block, halo, cells, config.iso_level, level_step)
+            if result is None:
+                continue
+            local, faces = result
+            if config.optimize_cache:
+                with timer("vibra_stage_seconds", stage="optimize"):
+                    optimized, _ = optimize_mesh(_LocalMesh(local, faces), method=config.optimize_cache)
+                local, faces = optimized.vertices, optimized.faces
+            grad = _gradient(block, local, spacing)
+            max_error, mean_error = _surface_error(block, local, config.iso_level, grad)
+            normals = -grad / np.maximum(np.linalg.norm(grad, axis=1, keepdims=True), 1e-12)
+            # Traslación en índices enteros y luego spacing: costuras bit a bit iguales.
+            vertices = (local + origin) * spacing
+            uri = f"tile_{tile_id}.lod{level}.glb"
+            builder = GltfBuilder()
+            name = f"tile_{tile_id}_lod{level}"
+            builder.add_node(builder.add_mesh(vertices, faces, name=name, normals=normals), name=name)
+            path = builder.write(out_dir / uri)
+            inc("vibra_triangles_total", len(faces), engine=config.engine)
+            tile.levels.append(
+                TileLevel(
+                    level=level,
+                    step=level_step,
+                    uri=uri,
+                    vertices=int(len(vertices)),
+                    faces=int(len(faces)),
+                    bytes=path.stat().st_size,
+                    geometric_error=max_error,
+                    mean_error=mean_error,
+                )
+            )
+        return tile if tile.levels else None
+
+    begin = time.perf_counter()
+    workers = workers or min(4, os.cpu_count() or 1)
+    if workers <= 1:
+        tiles = [_run(index) for index in origins]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tile") as pool:
+            tiles = list(pool.map(_run, origins))
+    kept = [tile for tile in tiles if tile is not None]
+    if not kept:
+        raise ValueError(f"El iso-nivel {config.iso_level} no corta el volumen.")
+
+    index_path = out_dir / INDEX_NAME
+    payload = {
+        "version": INDEX_VERSION,
+        "iso_level": config.iso_level,
+        "spacing": list(spacing),
+        "brick": brick,
+        "shape": [n + 1 for n in extent],
+        "lods": [step * 2**level for level in range(lods)],
+        "bounds_min": [float(min(t.bounds_min[a] for t in kept)) for a in range(3)],
+        "bounds_max": [float(max(t.bounds_max[a] for t in kept)) for a in range(3)],
+        "tiles": [asdict(tile) for tile in kept],
+    }
+    tmp = index_path.with_name(f".{INDEX_NAME}.tmp")
+    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp, index_path)
+    faces = sum(t.levels[0].faces for t in kept)
+    print(
+        f"[tiled_export] {len(kept)} de {len(origins)} teselas de {brick}³ celdas, {lods} nivel(es), "
+        f"{faces} caras en lod0, en {time.perf_counter() - begin:.2f}s -> {index_path}"
+    )
+    return index_path
+
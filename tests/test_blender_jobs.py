@@ -0,0 +1,32 @@
+"""Lista de trabajos de Blender: valores por defecto, claves con guiones y errores."""
+
+import argparse
+import json
+
+import pytest
+
+from tools.blender_jobs import load_jobs
+
+
+def _defaults(**extra):
+    return argparse.Namespace(input=None, output=None, jobs="jobs.json", voxel_size=0.005, format=None, **extra)
+
+
+def test_jobs_inherit_defaults(tmp_path):
+    path = tmp_path / "jobs.json"
+    payload = {"defaults": {"voxel-size": 0.004}, "jobs": [{"input": "a.obj", "output": "a.glb"},
+                                                            {"input": "b.obj", "output": "b.stl", "voxel_size": 0}]}
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    a, b = load_jobs(path, _defaults())
+    assert (a.input.name, a.output.name, a.voxel_size) == ("a.obj", "a.glb", 0.004)
+    assert b.voxel_size == 0 and not hasattr(a, "jobs")
+
+
+def test_unknown_and_missing_keys(tmp_path):
+    path = tmp_path / "jobs.json"
+    path.write_text(json.dumps([{"input": "a.obj", "output": "a.glb", "colour": 1}]), encoding="utf-8")
+    with pytest.raises(ValueError, match="colour"):
+        load_jobs(path, _defaults())
+    path.write_text(json.dumps([{"input": "a.obj", "output": "a.glb"}]), encoding="utf-8")
+    with pytest.raises(ValueError, match="'format'"):
+        load_jobs(path, _defaults(), required=("input", "output", "format"))
@@ -0,0 +1,48 @@
+"""Procesos Blender: log por líneas, códigos de salida, timeout y log cerrado si el binario no existe."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from tools.blender_process import BlenderError, BlenderJob, run_blender, run_blender_job
+
+
+def _python(code):
+    return [sys.executable, "-c", code]
+
+
+def test_output_goes_to_log(tmp_path):
+    log = tmp_path / "job.log"
+    code = "import sys; print('hola'); print('aviso', file=sys.stderr)"
+    result = run_blender(BlenderJob(cmd=_python(code), log_path=log))
+    assert result.ok
+    text = log.read_text()
+    assert "[stdout] hola" in text and "[stderr] aviso" in text
+
+
+def test_failure_and_timeout_raise(tmp_path):
+    with pytest.raises(BlenderError) as failed:
+        run_blender(BlenderJob(cmd=_python("raise SystemExit(3)")))
+    assert failed.value.result.returncode == 3
+    with pytest.raises(BlenderError) as slow:
+        run_blender(BlenderJob(cmd=_python("import time; time.sleep(30)"), timeout=0.5))
+    assert slow.value.result.timed_out
+    assert slow.value.result.seconds < 10
+
+
+def test_log_is_closed_when_binary_is_missing(tmp_path, monkeypatch):
+    opened = []
+    original = Path.open
+
+    def _tracking_open(self, *args, **kwargs):
+        handle = original(self, *args, **kwargs)
+        opened.append(handle)
+        return handle
+
+    monkeypatch.setattr(Path, "open", _tracking_open)
+    job = BlenderJob(cmd=[str(tmp_path / "no-blender")], log_path=tmp_path / "job.log")
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(run_blender_job(job))
+    assert opened and all(handle.closed for handle in opened)
@@ -0,0 +1,34 @@
+"""Captura por losas: misma malla que en memoria, también cuando el iso-nivel toca el extremo de una losa."""
+
+import numpy as np
+import pytest
+import trimesh
+
+from pipeline.density_capture import DensityCaptureConfig, capture_density_to_mesh, capture_streaming
+
+
+def _sphere(n=40, radius=12.0):
+    x, y, z = np.indices((n, n, n), dtype=np.float32) - n // 2
+    return (radius - np.sqrt(x * x + y * y + z * z)).astype(np.float32)
+
+
+def _triangles(path):
+    mesh = trimesh.load(path, force="mesh", process=False)
+    corners = np.round(mesh.vertices[mesh.faces], 4).tolist()
+    return sorted(tuple(sorted(map(tuple, face))) for face in corners)
+
+
+@pytest.mark.parametrize("iso", [0.0, 0.35, 6.0])
+@pytest.mark.parametrize("slab", [8, 13])
+def test_streaming_matches_in_memory(tmp_path, iso, slab):
+    # Con iso 0 la losa [0, 8] tiene su máximo justo en el iso-nivel (tangente en x = 8).
+    grid = _sphere()
+    density = tmp_path / "sphere.npy"
+    np.save(density, grid)
+    config = DensityCaptureConfig(iso_level=iso)
+    expected, _ = capture_density_to_mesh(density, tmp_path / "full.obj", config)
+    streamed = capture_streaming(density, tmp_path / "slabs.obj", config, slab=slab)
+    a, b = _triangles(expected), _triangles(streamed)
+    assert a == b
+    mesh = trimesh.load(streamed, force="mesh", process=False)
+    assert mesh.is_watertight
@@ -0,0 +1,57 @@
+"""Volúmenes .vbv: ida y vuelta por códec, lectura de regiones y bloques dispersos."""
+
+import numpy as np
+import pytest
+
+from tools.chunked_volume import (
+    CODECS,
+    ChunkedVolume,
+    array_shape,
+    convert_volume,
+    load_array,
+    parse_region,
+    write_chunked_volume,
+)
+
+
+def _volume(shape=(37, 20, 45)):
+    rng = np.random.default_rng(0)
+    return rng.random(shape, dtype=np.float32)
+
+
+@pytest.mark.parametrize("codec", sorted(CODECS))
+def test_round_trip_every_codec(tmp_path, codec):
+    array = _volume()
+    path = write_chunked_volume(tmp_path / "grid.vbv", array, chunk_shape=(16, 16, 16), codec=codec, workers=2)
+    assert array_shape(path) == array.shape
+    np.testing.assert_array_equal(load_array(path), array)
+
+
+def test_region_reads_only_touched_chunks(tmp_path):
+    array = _volume()
+    path = write_chunked_volume(tmp_path / "grid.vbv", array, chunk_shape=(16, 16, 16))
+    region = parse_region("5:20,:,40:")
+    assert region == (slice(5, 20), slice(None), slice(40, None))
+    with ChunkedVolume(path) as volume:
+        assert volume.chunks_for(region) == [(i, j, 2) for i in (0, 1) for j in (0, 1)]
+        np.testing.assert_array_equal(volume.read(region), array[region])
+        np.testing.assert_array_equal(volume[3:4, 2:19, :], array[3:4, 2:19, :])
+
+
+def test_sparse_fill_skips_constant_chunks(tmp_path):
+    array = np.zeros((48, 48, 48), dtype=np.uint8)
+    array[20:30, 20:30, 20:30] = 1
+    src = tmp_path / "mask.npy"
+    np.save(src, array)
+    path = convert_volume(src, tmp_path / "mask.vbv", chunk_shape=(16, 16, 16), sparse_fill=0)
+    with ChunkedVolume(path) as volume:
+        assert volume.fill == 0
+        assert volume.active_chunks() == [(1, 1, 1)]
+        np.testing.assert_array_equal(volume.read(), array)
+
+
+def test_rejects_other_files(tmp_path):
+    bogus = tmp_path / "bogus.vbv"
+    bogus.write_bytes(b"not a volume" * 4)
+    with pytest.raises(ValueError):
+        ChunkedVolume(bogus)
@@ -0,0 +1,11 @@
+"""CLI: el parser se construye y acepta las opciones compartidas con tools."""
+
+from pipeline.cli import build_parser
+from tools.mesh_optimize import OPTIMIZE_METHODS
+
+
+def test_parser_accepts_optimize_methods():
+    parser = build_parser()
+    for method in OPTIMIZE_METHODS:
+        args = parser.parse_args(["capture", "--input", "a.npy", "--output", "a.stl", "--optimize-cache", method])
+        assert args.optimize_cache == method
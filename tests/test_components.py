@@ -0,0 +1,56 @@
+"""Componentes conexas: etiquetas iguales a scipy y filtrado de mallas por caras."""
+
+import numpy as np
+import pytest
+import trimesh
+
+from tools.components import filter_mesh, label_faces, label_voxels, remove_small_islands
+
+
+@pytest.mark.parametrize("density", [0.2, 0.35, 0.5])
+@pytest.mark.parametrize("shape", [(1, 1, 1), (7, 9, 11), (32, 32, 32)], ids=str)
+def test_voxel_labels_match_scipy(shape, density):
+    ndimage = pytest.importorskip("scipy.ndimage")
+    mask = np.random.default_rng(sum(shape)).random(shape) < density
+    labels, count = label_voxels(mask)
+    expected, expected_count = ndimage.label(mask)
+    assert count == expected_count
+    # Ambos numeran por el primer voxel de cada componente en orden C.
+    np.testing.assert_array_equal(labels, expected - 1)
+
+
+def test_small_islands_are_removed():
+    grid = np.zeros((24, 24, 24), dtype=np.float32)
+    grid[2:4, 2:4, 2:4] = 1.0
+    grid[8:20, 8:20, 8:20] = 1.0
+    cleaned, report = remove_small_islands(grid, 0.5, min_voxels=9)
+    assert (report.components_before, report.components_after) == (2, 1)
+    assert cleaned[2:4, 2:4, 2:4].max() < 0.5
+    np.testing.assert_array_equal(cleaned[8:20, 8:20, 8:20], 1.0)
+
+
+def _boxes(extents):
+    parts = [trimesh.creation.box(extents=(e, e, e)).subdivide() for e in extents]
+    for k, part in enumerate(parts):
+        part.apply_translation((3.0 * k, 0.0, 0.0))
+    return trimesh.util.concatenate(parts)
+
+
+def test_mesh_filter_by_faces_and_largest():
+    mesh = _boxes([1.0, 1.0, 1.0])
+    small = trimesh.creation.box(extents=(0.2, 0.2, 0.2))
+    small.apply_translation((0.0, 5.0, 0.0))
+    mesh = trimesh.util.concatenate([mesh, small])
+    labels, count = label_faces(mesh.faces)
+    assert count == 4
+    filtered, report = filter_mesh(mesh, min_faces=13)
+    assert (report.components_before, report.components_after) == (4, 3)
+    assert len(filtered.faces) == 3 * 48
+    filtered, report = filter_mesh(mesh, keep_largest=1)
+    assert report.components_after == 1 and len(filtered.faces) == 48
+
+
+def test_mesh_filter_can_remove_everything():
+    filtered, report = filter_mesh(_boxes([1.0]), min_faces=1000)
+    assert report.components_after == 0
+    assert len(filtered.faces) == 0 and len(filtered.vertices) == 0
@@ -0,0 +1,72 @@
+"""Series 4D: una malla por fotograma (array, .vbv o glob) y glTF animado con un nodo por fotograma."""
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+import pytest
+import trimesh
+
+from pipeline.density_capture import DensityCaptureConfig
+from pipeline.density_frames import capture_frames, frame_output_path, frame_sources, is_frame_input
+from tools.chunked_volume import write_chunked_volume
+
+RADII = (4.0, 6.0, 8.0)
+
+
+def _frames(n=24):
+    x, y, z = np.indices((n, n, n), dtype=np.float32) - (n - 1) / 2
+    distance = np.sqrt(x * x + y * y + z * z)
+    return np.stack([radius - distance for radius in RADII]).astype(np.float32)
+
+
+def _faces(paths):
+    return [len(trimesh.load(p, force="mesh", process=False).faces) for p in paths]
+
+
+def test_frame_output_path():
+    assert frame_output_path(Path("out/mesh.obj"), 3, "stl") == Path("out/mesh_0003.stl")
+    assert frame_output_path(Path("out/f{frame:02d}.obj"), 3, "obj") == Path("out/f03.obj")
+
+
+@pytest.mark.parametrize("layout", ["npy", "vbv", "glob"])
+def test_one_mesh_per_frame(tmp_path, layout):
+    frames = _frames()
+    if layout == "npy":
+        source = tmp_path / "frames.npy"
+        np.save(source, frames)
+    elif layout == "vbv":
+        source = write_chunked_volume(tmp_path / "frames.vbv", frames, chunk_shape=(16, 16, 16))
+    else:
+        for t, frame in enumerate(frames):
+            np.save(tmp_path / f"density_{t:03d}.npy", frame)
+        source = tmp_path / "density_*.npy"
+    assert is_frame_input(source) and len(frame_sources(source)) == len(RADII)
+    config = DensityCaptureConfig(iso_level=0.0, export_format="obj")
+    written, effective = capture_frames(source, tmp_path / "mesh.obj", config, workers=2, prefetch=2)
+    assert [p.name for p in written] == ["mesh_0000.obj", "mesh_0001.obj", "mesh_0002.obj"]
+    faces = _faces(written)
+    assert faces == sorted(faces) and faces[0] < faces[-1]
+    assert effective.step_size == config.step_size
+
+
+def _gltf_json(path):
+    data = Path(path).read_bytes()
+    length, kind = struct.unpack_from("<I4s", data, 12)
+    assert kind == b"JSON"
+    return json.loads(data[20 : 20 + length])
+
+
+def test_animation_has_one_node_per_frame(tmp_path):
+    source = tmp_path / "frames.npy"
+    np.save(source, _frames())
+    config = DensityCaptureConfig(iso_level=0.0, export_format="glb")
+    (path,), _ = capture_frames(source, tmp_path / "anim.glb", config, animation=True, fps=12.0)
+    gltf = _gltf_json(path)
+    assert len(gltf["meshes"]) == len(RADII)
+    (animation,) = gltf["animations"]
+    assert len(animation["channels"]) == len(RADII)
+    assert {s["interpolation"] for s in animation["samplers"]} == {"STEP"}
+    with pytest.raises(ValueError, match="glb o gltf"):
+        capture_frames(source, tmp_path / "anim.obj", DensityCaptureConfig(export_format="obj"), animation=True)
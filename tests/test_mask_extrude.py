@@ -0,0 +1,107 @@
+"""Extrusión 2D: marching squares en las dos rutas, tapas por barrido y prismas cerrados."""
+
+import numpy as np
+import pytest
+
+from tools import mask_extrude as me
+
+
+def _blobs(n, seed=0, radius=2):
+    # Ruido suavizado con caja: cientos de manchas y agujeros pequeños.
+    field = np.random.default_rng(seed).random((n, n))
+    for axis in (0, 1):
+        field = sum(np.roll(field, d, axis=axis) for d in range(-radius, radius + 1)) / (2 * radius + 1)
+    return field.astype(np.float32)
+
+
+def _mask(n, seed=0):
+    return (_blobs(n, seed) > 0.5).astype(np.float32)
+
+
+def _boundary_edges(faces):
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    _, counts = np.unique(edges, axis=0, return_counts=True)
+    return int((counts != 2).sum())
+
+
+def _areas(points, triangles):
+    a, b, c = (points[triangles[:, k], :2].astype(np.float64) for k in range(3))
+    return 0.5 * ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+
+
+def _py(kernel):
+    return getattr(kernel, "py_func", kernel)
+
+
+@pytest.mark.parametrize("shape", [(2, 2), (5, 7), (33, 17), (64, 64)], ids=str)
+@pytest.mark.parametrize("binary", [False, True])
+def test_square_kernels_match_numpy(shape, binary):
+    grid = np.random.default_rng(sum(shape)).random(shape).astype(np.float32)
+    if binary:
+        grid = (grid < 0.5).astype(np.float32)
+    iso = np.float32(0.5)
+    points, segments = me.marching_squares(grid, iso, backend="numpy")
+    counts = _py(me._count_squares)(grid, iso, me._SEGMENT_COUNT)
+    out_points = np.empty((int(counts[0] + counts[1]), 2))
+    out_segments = np.empty((int(counts[2]), 2), dtype=np.int64)
+    if len(out_points):
+        _py(me._fill_squares)(grid, iso, float(iso), counts, me._SEGMENTS, out_points, out_segments)
+    np.testing.assert_array_equal(out_points, points)
+    np.testing.assert_array_equal(out_segments, segments)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_numba_marching_squares_matches_numpy(seed):
+    pytest.importorskip("numba")
+    for grid in (_blobs(96, seed), _mask(96, seed)):
+        expected = me.marching_squares(grid, 0.5, backend="numpy")
+        for backend in ("numba", "auto"):
+            points, segments = me.marching_squares(grid, 0.5, backend=backend)
+            np.testing.assert_array_equal(points, expected[0])
+            np.testing.assert_array_equal(segments, expected[1])
+
+
+def test_square_with_hole():
+    points = np.array([[0, 0], [4, 0], [4, 4], [0, 4], [1, 1], [1, 3], [3, 3], [3, 1]], dtype=np.float64)
+    triangles = me.triangulate_polygon(points, [0, 1, 2, 3], [[4, 5, 6, 7]])
+    assert len(triangles) == 8
+    areas = _areas(points, triangles)
+    assert (areas > 0).all()
+    assert areas.sum() == pytest.approx(12.0)
+    # Con el cuadrado y el agujero tapados por fuera, cada arista queda en dos triángulos.
+    assert _boundary_edges(np.concatenate([triangles, [[0, 1, 2], [0, 2, 3], [4, 6, 5], [4, 7, 6]]])) == 0
+
+
+@pytest.mark.parametrize("hole", [[8, 10, 9], [4, 2, 6, 7]], ids=["fuera", "cruzado"])
+def test_tangled_rings_are_rejected(hole):
+    points = np.array(
+        [[0, 0], [4, 0], [4, 4], [0, 4], [1, 1], [1, 3], [3, 3], [3, 1], [10, 10], [11, 10], [11, 11]],
+        dtype=np.float64,
+    )
+    with pytest.raises(ValueError):
+        me.triangulate_polygon(points, [0, 1, 2, 3], [hole])
+
+
+@pytest.mark.parametrize("tolerance", [0.0, 0.5, 2.0])
+@pytest.mark.parametrize("seed", range(3))
+def test_many_holes_give_closed_prisms(seed, tolerance):
+    mask = _mask(96, seed)
+    mesh, report = me.extrude_mask(mask, tolerance=tolerance, height=2.0)
+    assert report.holes > 20
+    assert _boundary_edges(mesh.faces) == 0
+    count = len(mesh.vertices) // 2
+    top = mesh.faces[(mesh.faces >= count).all(axis=1)]
+    areas = _areas(mesh.vertices, top)
+    # Tapas sin solapes ni triángulos invertidos: área firmada == área absoluta.
+    assert areas.sum() == pytest.approx(np.abs(areas).sum())
+    a, b, c = (mesh.vertices[mesh.faces[:, k]].astype(np.float64) for k in range(3))
+    volume = np.einsum("ij,ij->i", a, np.cross(b, c)).sum() / 6.0
+    assert volume == pytest.approx(2.0 * areas.sum(), rel=1e-5)
+
+
+def test_simplification_falls_back_where_rings_cross():
+    mask = _mask(64, seed=1)
+    mesh, report = me.extrude_mask(mask, tolerance=2.0)
+    assert report.simplify_fallbacks > 0
+    assert report.simplified_points < report.contour_points
+    assert _boundary_edges(mesh.faces) == 0
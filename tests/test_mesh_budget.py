@@ -0,0 +1,35 @@
+"""Presupuesto de triángulos: paso mínimo que cabe y configuración efectiva sin mutar la del llamador."""
+
+import numpy as np
+import pytest
+
+from pipeline.density_capture import DensityCaptureConfig, mesh_from_grid
+from tools.mesh_budget import choose_step_size, estimate_triangles
+
+
+def _sphere(n=64, radius=26.0):
+    axis = np.arange(n, dtype=np.float32) - (n - 1) / 2.0
+    x, y, z = np.meshgrid(axis, axis, axis, indexing="ij")
+    return radius - np.sqrt(x * x + y * y + z * z)
+
+
+@pytest.mark.parametrize("target", [500, 3000, 20000])
+@pytest.mark.parametrize("min_step", [1, 3])
+def test_chosen_step_is_smallest_that_fits(target, min_step):
+    grid = _sphere()
+    estimate = choose_step_size(grid, 0.0, target, min_step=min_step)
+    assert estimate.step_size >= min_step
+    assert estimate.estimated_triangles == estimate_triangles(grid, 0.0, estimate.step_size)
+    assert estimate.estimated_triangles <= target
+    if estimate.step_size > min_step:
+        assert estimate_triangles(grid, 0.0, estimate.step_size - 1) > target
+
+
+def test_mesh_from_grid_returns_effective_step():
+    grid = _sphere()
+    config = DensityCaptureConfig(iso_level=0.0, target_triangles=3000)
+    mesh, effective = mesh_from_grid(grid, config)
+    assert config.step_size == 1
+    assert effective.step_size == choose_step_size(grid, 0.0, 3000).step_size > 1
+    assert effective.target_triangles == 3000
+    assert len(mesh.faces) <= 3000
@@ -0,0 +1,49 @@
+"""mesh_exporter: Blender se omite solo cuando no cambiaría la malla."""
+
+import json
+
+import numpy as np
+import pytest
+
+from tools import mesh_exporter
+from tools.mesh_quality import analyze_mesh
+
+
+def _args(*extra):
+    argv = ["export", "--form", "mask", "--mask", "m.npy", "--format", "stl", *extra]
+    return mesh_exporter.build_parser().parse_args(argv)
+
+
+def _quality(faces):
+    # Tetraedro cerrado repetido hasta ``faces`` caras.
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float64)
+    tetra = np.array([[0, 2, 1], [0, 1, 3], [0, 3, 2], [1, 2, 3]])
+    return analyze_mesh(vertices, np.tile(tetra, (faces // 4, 1)))
+
+
+@pytest.mark.parametrize(
+    "extra, faces, expected",
+    [
+        (["--smooth-iterations", "0", "--solidify-thickness", "0"], 400, True),
+        (["--smooth-iterations", "0", "--solidify-thickness", "0", "--quadriflow-target", "100"], 400, False),
+        (["--smooth-iterations", "0", "--solidify-thickness", "0", "--force-blender"], 400, False),
+        (["--solidify-thickness", "0"], 400, False),
+        (["--smooth-iterations", "0"], 400, False),
+        (["--smooth-iterations", "0", "--solidify-thickness", "0"], 0, False),
+    ],
+)
+def test_can_skip_blender(extra, faces, expected):
+    assert mesh_exporter.can_skip_blender(_quality(faces), _args(*extra)) is expected
+
+
+def test_export_without_blender(tmp_path, monkeypatch):
+    monkeypatch.setattr(mesh_exporter, "EXPORT_ROOT", tmp_path / "exports")
+    x, y, z = np.indices((24, 24, 24)) - 11.5
+    mask_path = tmp_path / "sphere.npy"
+    np.save(mask_path, (x * x + y * y + z * z < 64).astype(np.uint8))
+    # Un binario de Blender inexistente: si se lanzara, la exportación fallaría.
+    args = _args("--smooth-iterations", "0", "--solidify-thickness", "0", "--blender-path", str(tmp_path / "none"))
+    args.mask, args.session, args.name = str(mask_path), "s", "esfera"
+    metadata = json.loads(mesh_exporter.export_mask(args).read_text(encoding="utf-8"))
+    assert metadata["blender_skipped"] is True
+    assert (tmp_path / "exports" / "s" / "esfera.stl").stat().st_size > 0
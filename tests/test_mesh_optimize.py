@@ -0,0 +1,73 @@
+"""Orden de Forsyth: el núcleo por arrays (compilado o no) reproduce la versión Python."""
+
+import numpy as np
+import pytest
+
+from tools import mesh_optimize
+from tools.marching_cubes import marching_cubes
+
+
+def _wavy_mesh(n: int = 24, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    x, y, z = np.ogrid[:n, :n, :n]
+    volume = np.sin(x / 3.0) * np.cos(y / 2.5) + np.sin(z / 3.5) + rng.random((n, n, n)) * 0.3
+    return marching_cubes(volume.astype(np.float32), 0.2, backend="numpy")
+
+
+def _kernel_py(faces: np.ndarray, vertex_count: int, cache_size: int = mesh_optimize.FORSYTH_CACHE_SIZE):
+    kernel = getattr(mesh_optimize._forsyth_kernel, "py_func", mesh_optimize._forsyth_kernel)
+    offsets, adjacency = mesh_optimize._vertex_triangle_adjacency(faces, vertex_count)
+    valence = np.bincount(faces.ravel(), minlength=vertex_count).astype(np.int64)
+    return kernel(
+        faces.astype(np.int64),
+        offsets,
+        adjacency,
+        valence,
+        cache_size,
+        np.asarray(mesh_optimize._cache_position_scores(cache_size)),
+        np.asarray(mesh_optimize._valence_scores()),
+    )
+
+
+def test_array_kernel_matches_python_order():
+    mesh = _wavy_mesh(12)
+    faces, count = mesh.faces, len(mesh.vertices)
+    expected = mesh_optimize._forsyth_order_python(faces, count, mesh_optimize.FORSYTH_CACHE_SIZE)
+    np.testing.assert_array_equal(_kernel_py(faces, count), expected)
+
+
+def test_numba_kernel_matches_python_order():
+    pytest.importorskip("numba")
+    mesh = _wavy_mesh()
+    faces, count = mesh.faces, len(mesh.vertices)
+    expected = mesh_optimize._forsyth_order_python(faces, count, mesh_optimize.FORSYTH_CACHE_SIZE)
+    np.testing.assert_array_equal(mesh_optimize._forsyth_order(faces, count, mesh_optimize.FORSYTH_CACHE_SIZE), expected)
+
+
+def test_order_is_a_permutation_and_lowers_acmr():
+    mesh = _wavy_mesh()
+    faces, method = mesh_optimize.optimize_vertex_cache(mesh.faces, mesh.vertices, method="forsyth")
+    assert method == "forsyth"
+    assert sorted(map(tuple, faces)) == sorted(map(tuple, mesh.faces))
+    assert mesh_optimize.compute_acmr(faces) < mesh_optimize.compute_acmr(mesh.faces)
+
+
+def test_auto_switches_to_morton_above_limit(monkeypatch):
+    mesh = _wavy_mesh(12)
+    limit = len(mesh.faces) - 1
+    monkeypatch.setattr(mesh_optimize, "FORSYTH_MAX_FACES", limit)
+    monkeypatch.setattr(mesh_optimize, "FORSYTH_PYTHON_MAX_FACES", limit)
+    _, method = mesh_optimize.optimize_vertex_cache(mesh.faces, mesh.vertices, method="auto")
+    assert method == "morton"
+
+
+@pytest.mark.parametrize("cache_size", [4, mesh_optimize.ACMR_CACHE_SIZE, 32])
+def test_acmr_kernel_matches_python(monkeypatch, cache_size):
+    faces = _wavy_mesh().faces
+    kernel = getattr(mesh_optimize._acmr_kernel, "py_func", mesh_optimize._acmr_kernel)
+    monkeypatch.setattr(mesh_optimize, "HAS_NUMBA", False)
+    expected = mesh_optimize.compute_acmr(faces, cache_size)
+    flat = faces.ravel().astype(np.int64)
+    assert kernel(flat, int(flat.max()) + 1, cache_size) / len(faces) == expected
+    monkeypatch.undo()
+    assert mesh_optimize.compute_acmr(faces, cache_size) == expected
@@ -0,0 +1,141 @@
+"""Servicio de mallado: half-close, desconexión real, peticiones duplicadas y CORS."""
+
+import asyncio
+import socket
+import struct
+import threading
+
+import pytest
+
+from pipeline import mesh_server
+from pipeline.density_capture import DensityCaptureConfig
+from pipeline.mesh_server import MeshRequest, MeshService
+
+
+@pytest.fixture
+def slow_build(monkeypatch):
+    """Sustituye ``build_mesh`` por un trabajo que espera a ``release`` y cuenta llamadas."""
+    release = threading.Event()
+    calls = []
+
+    def build(request):
+        calls.append(request.key)
+        release.wait(5)
+        return b"solid mesh\n"
+
+    monkeypatch.setattr(mesh_server, "build_mesh", build)
+    yield release, calls
+    release.set()
+
+
+def _request(key="k"):
+    return MeshRequest(key=key, config=DensityCaptureConfig(export_format="stl"), grid_bytes=b"x")
+
+
+async def _serve(service):
+    server = await asyncio.start_server(lambda r, w: mesh_server.handle_connection(service, r, w), "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def _wait_for(condition, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def _mesh_post(port, origin=None):
+    extra = f"Origin: {origin}\r\n" if origin else ""
+    return (f"POST /mesh?format=stl HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n{extra}Content-Length: 1\r\n\r\nx").encode()
+
+
+def test_half_close_still_receives_mesh(slow_build):
+    release, _ = slow_build
+
+    async def scenario():
+        service = MeshService(workers=1)
+        server, port = await _serve(service)
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(_mesh_post(port, origin="http://localhost:5173"))
+            await writer.drain()
+            writer.write_eof()
+            await asyncio.sleep(0.2)
+            release.set()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+        service.shutdown()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.startswith(b"HTTP/1.1 200")
+    assert b"solid mesh" in response
+    assert b"Access-Control-Allow-Origin: http://localhost:5173" in response
+
+
+def test_reset_connection_cancels_job(slow_build):
+    async def scenario():
+        service = MeshService(workers=1)
+        server, port = await _serve(service)
+        async with server:
+            client = socket.create_connection(("127.0.0.1", port))
+            client.sendall(_mesh_post(port))
+            await _wait_for(lambda: service._jobs)
+            (job,) = service._jobs.values()
+            # SO_LINGER a 0: close() envía RST, una desconexión real.
+            client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            client.close()
+            await _wait_for(job.task.done)
+            await _wait_for(job.source.done)
+            cancelled = job.task.cancelled() and job.source.cancelled()
+        service.shutdown()
+        return cancelled
+
+    assert asyncio.run(scenario())
+
+
+def test_identical_requests_share_one_job(slow_build):
+    release, calls = slow_build
+
+    async def scenario():
+        service = MeshService(workers=2)
+        first, second = service.submit(_request()), service.submit(_request())
+        other = service.submit(_request("otro"))
+        assert first.source is second.source and second.shared and not first.shared
+        assert service.stats()["pending"] == 2
+        assert service.cancel(first.job_id)
+        await asyncio.sleep(0.05)
+        assert first.task.cancelled() and not second.source.cancelled()
+        release.set()
+        payload = await second.task
+        await other.task
+        service.shutdown()
+        return payload
+
+    assert asyncio.run(scenario()) == b"solid mesh\n"
+    assert sorted(calls) == ["k", "otro"]
+
+
+def test_cancelling_every_waiter_cancels_the_job(slow_build):
+    async def scenario():
+        service = MeshService(workers=1)
+        jobs = [service.submit(_request()) for _ in range(3)]
+        for job in jobs:
+            service.cancel(job.job_id)
+        await asyncio.sleep(0.05)
+        cancelled = jobs[0].source.cancelled() and not service._inflight
+        service.shutdown()
+        return cancelled
+
+    assert asyncio.run(scenario())
+
+
+def test_cors_only_for_configured_origins():
+    service = MeshService(cors_origins=("http://localhost:*", "https://vibra.example"))
+    assert service.cors_headers("http://localhost:8080")["Access-Control-Allow-Origin"] == "http://localhost:8080"
+    assert service.cors_headers("https://vibra.example")["Vary"] == "Origin"
+    assert service.cors_headers("https://evil.example") == {}
+    assert service.cors_headers(None) == {}
+    assert MeshService(cors_origins=("*",)).cors_headers("https://any.example") == {"Access-Control-Allow-Origin": "*"}
+    assert b"Access-Control" not in mesh_server._head(200, {})
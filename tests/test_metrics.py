@@ -0,0 +1,29 @@
+"""Métricas: un archivo por instancia y reenvío de --metrics-dir a los trabajos del spool."""
+
+from tools.metrics import MetricsRegistry, start_exporter
+from tools.spool import Spool, SpoolWorker
+
+
+def test_instances_do_not_overwrite_each_other(tmp_path):
+    for instance, value in (("a", 1), ("b", 2)):
+        registry = MetricsRegistry()
+        registry.inc("vibra_jobs_total", value, command="capture")
+        start_exporter(tmp_path, name="capture", interval=60, registry=registry, instance=instance).stop()
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["capture-a.json", "capture-a.prom", "capture-b.json", "capture-b.prom"]
+    text = (tmp_path / "capture-b.prom").read_text()
+    assert 'vibra_jobs_total{command="capture",process="b"} 2' in text
+
+
+def test_worker_forwards_metrics_dir(tmp_path):
+    spool = Spool(tmp_path / "spool")
+    worker = SpoolWorker(spool, worker_id="w1", metrics_dir=tmp_path / "metrics")
+    job = spool.submit(["capture", "--input", "a.npy"])
+    job.attempts = 2
+    argv = worker.job_argv(job)
+    assert argv[:4] == ["--metrics-dir", str(tmp_path / "metrics"), "--metrics-instance", f"w1-{job.job_id}.2"]
+    assert argv[4:] == job.argv
+    exporter = spool.submit(["export", "--mask", "m.npy"], module="tools.mesh_exporter")
+    assert worker.job_argv(exporter)[:3] == ["export", "--mask", "m.npy"]
+    own = spool.submit(["--metrics-dir", "elsewhere", "capture"])
+    assert worker.job_argv(own) == own.argv
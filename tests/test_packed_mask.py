@@ -0,0 +1,43 @@
+"""Máscaras empaquetadas: ida y vuelta por disco y misma malla que sobre la máscara densa."""
+
+import numpy as np
+import pytest
+
+from tools.marching_cubes import marching_cubes
+from tools.packed_mask import PackedMask, binary_levels, is_packed_file, packed_marching_cubes
+
+
+def _mask(shape=(23, 17, 29), seed=0):
+    # nz no múltiplo de 8: el último byte de cada fila va con relleno.
+    rng = np.random.default_rng(seed)
+    x, y, z = np.indices(shape, dtype=np.float32)
+    blob = (x - 11) ** 2 + (y - 8) ** 2 + (z - 14) ** 2 < 64
+    return (blob | (rng.random(shape) > 0.97)).astype(np.uint8)
+
+
+def test_round_trip_through_disk(tmp_path):
+    mask = _mask()
+    packed = PackedMask.from_array(mask)
+    path = packed.save(tmp_path / "mask.npz")
+    assert is_packed_file(path) and not is_packed_file(tmp_path / "missing.npz")
+    loaded = PackedMask.load(path)
+    assert loaded.shape == mask.shape and loaded.nbytes == 23 * 17 * 4
+    np.testing.assert_array_equal(loaded.unpack(), mask)
+    region = (slice(3, 9), slice(None), slice(5, 27))
+    np.testing.assert_array_equal(loaded.unpack(region), mask[region])
+    assert loaded.count() == int(mask.sum())
+
+
+def test_binary_levels():
+    assert binary_levels(np.array([[0, 255], [255, 0]], dtype=np.uint8)) == (0.0, 255.0)
+    assert binary_levels(np.array([[0, 1], [2, 0]], dtype=np.uint8)) is None
+    assert binary_levels(np.zeros((2, 2), dtype=np.float32)) is None
+
+
+@pytest.mark.parametrize("slab_bytes", [64, 2**20])
+def test_packed_marching_cubes_matches_dense(slab_bytes):
+    mask = _mask()
+    expected = marching_cubes(mask.astype(np.float32), 0.5, spacing=(1.0, 0.5, 2.0), backend="numpy")
+    result = packed_marching_cubes(PackedMask.from_array(mask), spacing=(1.0, 0.5, 2.0), slab_bytes=slab_bytes)
+    np.testing.assert_allclose(result.vertices, expected.vertices, atol=1e-6)
+    np.testing.assert_array_equal(result.faces, expected.faces)
@@ -0,0 +1,58 @@
+"""Lectura anticipada: orden de entrega, tope de bytes en cola y profundidad."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from tools.prefetch import PrefetchStats, ReadAhead
+
+MIB = 2**20
+
+
+def _loaders(count, delays=None, size=MIB):
+    delays = delays or [0.0] * count
+    state = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def make(i):
+        def load():
+            with lock:
+                state["now"] += 1
+                state["peak"] = max(state["peak"], state["now"])
+            time.sleep(delays[i])
+            with lock:
+                state["now"] -= 1
+            return np.full(size, i % 256, dtype=np.uint8)
+
+        return load
+
+    return [make(i) for i in range(count)], state
+
+
+def test_values_arrive_in_order_despite_uneven_loads():
+    delays = list(np.random.default_rng(0).uniform(0.0, 0.02, 12))
+    loaders, state = _loaders(12, delays, size=16)
+    stats = PrefetchStats()
+    with ReadAhead(loaders, depth=4, workers=3, stats=stats) as reader:
+        values = [int(value[0]) for value, _, _ in reader]
+    assert values == list(range(12))
+    assert stats.items == 12 and state["peak"] <= 3
+    assert stats.hidden_seconds <= stats.load_seconds
+
+
+def test_queued_bytes_stay_under_cap():
+    loaders, _ = _loaders(10)
+    stats = PrefetchStats()
+    with ReadAhead(loaders, depth=8, max_bytes=int(2.5 * MIB), stats=stats) as reader:
+        for _ in reader:
+            time.sleep(0.01)  # consumidor lento: sin tope la cola crecería hasta depth
+    assert stats.items == 10
+    assert MIB <= stats.peak_queued_bytes <= 2.5 * MIB
+    assert stats.throttled > 0
+
+
+def test_depth_must_be_positive():
+    with pytest.raises(ValueError):
+        ReadAhead([], depth=0)
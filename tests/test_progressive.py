@@ -0,0 +1,35 @@
+"""Captura progresiva: los niveles gruesos conservan las mismas componentes que la malla final."""
+
+import numpy as np
+import pytest
+
+from pipeline.density_capture import DensityCaptureConfig, iter_progressive_meshes
+
+SPHERES = (((32, 32, 32), 4.0), ((88, 40, 48), 9.0), ((64, 88, 80), 20.0))
+
+
+def _spheres(n=128):
+    x, y, z = np.indices((n, n, n), dtype=np.float32)
+    grid = np.full((n, n, n), -3.0, dtype=np.float32)
+    for (cx, cy, cz), radius in SPHERES:
+        distance = radius - np.sqrt((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2)
+        grid = np.maximum(grid, np.clip(distance, -3.0, 3.0))
+    return grid
+
+
+def _centers(mesh):
+    parts = mesh.split(only_watertight=False)
+    return sorted(tuple(np.round(part.vertices.mean(axis=0) / 4.0).astype(int)) for part in parts)
+
+
+@pytest.mark.parametrize("step", [1, 2])
+def test_coarse_levels_keep_final_components(step):
+    grid = _spheres()
+    # Entre la esfera pequeña y la mediana en todos los niveles si el umbral escala con la resolución.
+    config = DensityCaptureConfig(iso_level=0.0, step_size=step, min_component_faces=1000 // step**2)
+    levels = list(iter_progressive_meshes(grid, config, levels=3))
+    assert len(levels) == 3 and levels[-1].final
+    expected = _centers(levels[-1].mesh)
+    assert expected == sorted(tuple(np.round(np.asarray(c) / 4.0).astype(int)) for c, _ in SPHERES[1:])
+    for level in levels[:-1]:
+        assert _centers(level.mesh) == expected
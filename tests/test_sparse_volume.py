@@ -0,0 +1,66 @@
+"""Volúmenes dispersos: la malla por ladrillos activos coincide con la del grid denso."""
+
+import numpy as np
+import pytest
+
+from tools.chunked_volume import ChunkedVolume, write_chunked_volume
+from tools.marching_cubes import marching_cubes
+from tools.mesh_exporter import load_mask, sparse_mask_marching_cubes
+from tools.sparse_volume import SparseCOO, save_coo, value_range
+
+SPACING = (1.0, 2.0, 0.5)
+# Lejos de cualquier muestra (k / 200): sin vértices repetidos que la ruta densa no suelda.
+ISO = 0.3037
+
+
+def _blobs(n=72, seed=0, binary=False):
+    # Esferas sueltas sobre fondo 0: la mayoría de los bloques quedan vacíos.
+    rng = np.random.default_rng(seed)
+    x, y, z = np.indices((n, n, n), dtype=np.float32)
+    grid = np.zeros((n, n, n), dtype=np.float32)
+    for _ in range(5):
+        cx, cy, cz = rng.uniform(10, n - 10, 3)
+        radius = rng.uniform(3, 8)
+        grid = np.maximum(grid, radius - np.sqrt((x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2))
+    if binary:
+        return (grid > 0).astype(np.uint8) * 3
+    return np.round(np.clip(grid, 0, 2) * 100).astype(np.uint16)
+
+
+def _canonical(result):
+    # Vértices ordenados por posición y caras rotadas para empezar por el menor índice (conserva la orientación).
+    vertices = np.asarray(result.vertices, dtype=np.float64)
+    order = np.lexsort(vertices.T[::-1])
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    faces = rank[result.faces]
+    faces = np.stack([np.roll(face, -int(np.argmin(face))) for face in faces]) if len(faces) else faces
+    return vertices[order], faces[np.lexsort(faces.T[::-1])]
+
+
+@pytest.mark.parametrize("layout", ["coo", "vbv"])
+@pytest.mark.parametrize("binary", [False, True])
+def test_sparse_mask_matches_dense(tmp_path, layout, binary):
+    grid = _blobs(binary=binary)
+    if layout == "coo":
+        path = save_coo(tmp_path / "mask.npz", grid)
+    else:
+        path = write_chunked_volume(tmp_path / "mask.vbv", grid, chunk_shape=(16, 16, 16), fill=0)
+    volume, _ = load_mask(path, use_gpu=False, sparse=True)
+    assert isinstance(volume, (SparseCOO, ChunkedVolume))
+    try:
+        assert value_range(volume) == (float(grid.min()), float(grid.max()))
+        sparse, bricks = sparse_mask_marching_cubes(volume, ISO, SPACING)
+    finally:
+        if isinstance(volume, ChunkedVolume):
+            volume.close()
+    if layout == "vbv":
+        assert bricks["active"] < bricks["total"]
+    dense, _ = load_mask(path, use_gpu=False)
+    expected = marching_cubes(dense, iso_level=ISO, spacing=SPACING)
+    assert len(sparse.faces) == len(expected.faces)
+    assert len(sparse.vertices) == len(expected.vertices)
+    vertices, faces = _canonical(sparse)
+    expected_vertices, expected_faces = _canonical(expected)
+    np.testing.assert_allclose(vertices, expected_vertices, atol=1e-4)
+    np.testing.assert_array_equal(faces, expected_faces)
@@ -0,0 +1,43 @@
+"""Spool: los fallos se reintentan y, agotados los intentos, el trabajo acaba en failed/."""
+
+import json
+import time
+
+from tools.spool import Spool, SpoolWorker
+
+
+def test_failed_job_is_retried_then_moved_to_failed(tmp_path):
+    spool = Spool(tmp_path / "spool")
+    job = spool.submit(["no-such-command"], max_attempts=2)
+    worker = SpoolWorker(spool, worker_id="w1", poll_seconds=0.01)
+
+    first = worker.step()
+    assert first.status == "failed" and first.attempts == 1
+    assert spool.pending() == [job.job_id]
+    second = worker.step()
+    assert second.status == "failed" and second.attempts == 2
+    assert worker.step() is None
+    assert spool.status() == {"pending": 0, "running": 0, "done": 0, "failed": 1}
+
+    record = json.loads(spool.path("failed", f"{job.job_id}.json").read_text(encoding="utf-8"))
+    assert record["attempts"] == 2 and [h["attempts"] for h in record["history"]] == [1, 2]
+    assert record["result"]["returncode"] != 0
+    logs = sorted(p.name for p in (spool.root / "failed").glob("*.log"))
+    assert logs == [f"{job.job_id}.1.log", f"{job.job_id}.2.log"]
+    assert not list((spool.root / "running").iterdir())
+
+
+def test_expired_lease_on_last_attempt_goes_to_failed(tmp_path):
+    spool = Spool(tmp_path / "spool")
+    job = spool.submit(["capture"], max_attempts=1)
+    claimed = spool.claim()
+    assert claimed.job_id == job.job_id and claimed.attempts == 1
+    # Worker caído: su último latido es de hace una hora.
+    spool.write_lease(job.job_id, "w1")
+    lease_path = spool.path("running", f"{job.job_id}.lease")
+    lease = json.loads(lease_path.read_text(encoding="utf-8"))
+    lease_path.write_text(json.dumps({**lease, "heartbeat": time.time() - 3600}), encoding="utf-8")
+    assert spool.requeue_expired(lease_seconds=60) == [job.job_id]
+    assert spool.status()["failed"] == 1 and not spool.pending()
+    record = json.loads(spool.path("failed", f"{job.job_id}.json").read_text(encoding="utf-8"))
+    assert record["history"][-1]["status"] == "expired"
@@ -0,0 +1,51 @@
+"""Barridos: producto de parámetros y misma tabla con un proceso o con el grid compartido."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pipeline.density_capture import DensityCaptureConfig
+from pipeline.sweep import SweepPost, build_tasks, parse_values, run_sweep
+
+
+def test_parse_values():
+    assert parse_values("0.4, 0.5,0.4,") == [0.4, 0.5]
+    assert parse_values("1,2,2", int) == [1, 2]
+    with pytest.raises(ValueError):
+        parse_values(" , ")
+
+
+def test_build_tasks_is_cartesian_product():
+    config = DensityCaptureConfig(iso_level=0.1, step_size=3, target_triangles=1000)
+    tasks = build_tasks(config, [0.4, 0.6], [1, 2], [0.0, 0.05], [0.0, 0.002], Path("out"), "grid", SweepPost())
+    assert [(t.config.iso_level, t.config.step_size) for t in tasks] == [(0.4, 1), (0.4, 2), (0.6, 1), (0.6, 2)]
+    assert [t.index for t in tasks] == [0, 1, 2, 3]
+    assert tasks[0].variants == [(0.0, 0.0), (0.0, 0.002), (0.05, 0.0), (0.05, 0.002)]
+    assert all(t.config.target_triangles is None for t in tasks)
+    assert (config.iso_level, config.step_size, config.target_triangles) == (0.1, 3, 1000)
+
+
+def _rows(results):
+    return [(r.capture, r.stage, r.iso_level, r.step_size, r.voxel_size, r.faces, r.error) for r in results]
+
+
+def test_shared_grid_matches_single_process(tmp_path):
+    x, y, z = np.indices((32, 32, 32), dtype=np.float32) - 15.5
+    density = tmp_path / "sphere.npy"
+    np.save(density, (10.0 - np.sqrt(x * x + y * y + z * z)).astype(np.float32))
+    config = DensityCaptureConfig(iso_level=0.0, export_format="stl")
+    post = SweepPost(export_format="stl", remesh_backend="python")
+    runs = {}
+    for workers in (1, 2):
+        out = tmp_path / f"w{workers}"
+        runs[workers] = run_sweep(
+            density, out, config, [0.0, 2.0], [1, 2], voxel_sizes=[0.0, 1.5], post=post, workers=workers
+        )
+    assert _rows(runs[1]) == _rows(runs[2])
+    stages = [r.stage for r in runs[1]]
+    assert stages == ["capture", "remesh"] * 4
+    assert all(r.error is None and r.watertight for r in runs[1])
+    table = json.loads((tmp_path / "w2" / "sweep.json").read_text(encoding="utf-8"))
+    assert len(table) == 8 and (tmp_path / "w2" / "sweep.csv").exists()
@@ -0,0 +1,43 @@
+"""Exportación por teselas: al juntar las teselas de un nivel no quedan aristas abiertas."""
+
+import json
+
+import numpy as np
+import pytest
+import trimesh
+
+from pipeline.density_capture import DensityCaptureConfig, run_marching_cubes
+from pipeline.tiled_export import capture_tiled
+from tools.mesh_quality import analyze_mesh
+
+
+def _sphere(n=50, radius=18.0):
+    x, y, z = np.indices((n, n, n), dtype=np.float32) - (n - 1) / 2
+    return (radius - np.sqrt(x * x + y * y + z * z)).astype(np.float32)
+
+
+def _welded_level(directory, index, level):
+    vertices, faces, offset = [], [], 0
+    for tile in index["tiles"]:
+        entry = tile["levels"][level]
+        mesh = trimesh.load(directory / entry["uri"], force="mesh", process=False)
+        vertices.append(mesh.vertices)
+        faces.append(mesh.faces + offset)
+        offset += len(mesh.vertices)
+    vertices, faces = np.concatenate(vertices), np.concatenate(faces)
+    # Solo se sueldan posiciones idénticas: las costuras deben coincidir exactamente.
+    _, inverse = np.unique(vertices, axis=0, return_inverse=True)
+    return vertices, inverse.ravel()[faces]
+
+
+@pytest.mark.parametrize("brick", [16, 20])
+def test_welded_tiles_have_no_open_edges(tmp_path, brick):
+    grid = _sphere()
+    index_path = capture_tiled(grid, tmp_path / "sphere.glb", DensityCaptureConfig(iso_level=0.0), brick=brick, lods=2)
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    for level in range(2):
+        vertices, faces = _welded_level(index_path.parent, index, level)
+        quality = analyze_mesh(vertices, faces)
+        assert quality.boundary_edges == 0 and quality.non_manifold_edges == 0
+        if level == 0:
+            assert len(faces) == len(run_marching_cubes(grid, 0.0, (1.0, 1.0, 1.0), 1).faces)
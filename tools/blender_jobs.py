@@ -0,0 +1,50 @@
+"""
+Listas de trabajos para los scripts de Blender en modo por lotes.
+
+Lo comparten ``pipeline/blender_runner.py`` y ``tools/blender_postprocess.py``;
+solo usa la biblioteca estándar para poder importarse dentro de Blender.
+
+``jobs.json`` es una lista de trabajos o ``{"defaults": {...}, "jobs": [...]}``.
+Las claves admiten guiones o guiones bajos; lo que falte en un trabajo se toma
+de ``defaults`` y, después, de la línea de comandos.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import List, Sequence
+
+
+def load_jobs(
+    path: Path,
+    defaults: argparse.Namespace,
+    required: Sequence[str] = ("input", "output"),
+) -> List[argparse.Namespace]:
+    """Lee la lista de trabajos y completa cada uno con los valores por defecto.
+
+    ``required`` son las claves que cada trabajo debe tener (propias o
+    heredadas). ``input`` y ``output`` se devuelven como ``Path``.
+    """
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    base = {key: value for key, value in vars(defaults).items() if key != "jobs"}
+    if isinstance(payload, dict):
+        base.update({key.replace("-", "_"): value for key, value in payload.get("defaults", {}).items()})
+        entries = payload.get("jobs", [])
+    else:
+        entries = payload
+    jobs = []
+    for i, entry in enumerate(entries):
+        entry = {key.replace("-", "_"): value for key, value in entry.items()}
+        unknown = set(entry) - set(base)
+        if unknown:
+            raise ValueError(f"Trabajo {i}: claves desconocidas {sorted(unknown)}")
+        job = argparse.Namespace(**{**base, **entry})
+        missing = [key for key in required if not getattr(job, key, None)]
+        if missing:
+            raise ValueError(f"Trabajo {i}: faltan {', '.join(repr(key) for key in missing)}.")
+        job.input = Path(job.input)
+        job.output = Path(job.output)
+        jobs.append(job)
+    return jobs
@@ -5,16 +5,28 @@ Acciones:
 - Importa OBJ generado por Marching Cubes.
 - Quadriflow remesh, Smooth, Solidify.
 - Exporta a glTF/OBJ/STL.
+
+Con ``--jobs jobs.json`` procesa una lista de mallas en la misma sesión de
+Blender (``[{"input": ..., "output": ..., "format": "stl", ...}, ...]`` o
+``{"defaults": {...}, "jobs": [...]}``), liberando los datablocks entre
+trabajos.
 """
 
 from __future__ import annotations
 
 import argparse
 import sys
+import time
 from pathlib import Path
 
 import bpy
 
+if __package__:
+    from .blender_jobs import load_jobs
+else:
+    sys.path.append(str(Path(__file__).resolve().parent))
+    from blender_jobs import load_jobs  # type: ignore
+
 
 def parse_args() -> argparse.Namespace:
     argv = sys.argv
@@ -24,14 +36,28 @@ def parse_args() -> argparse.Namespace:
         argv = []
 
     parser = argparse.ArgumentParser()
-    parser.add_argument("--input", required=True)
-    parser.add_argument("--output", required=True)
-    parser.add_argument("--format", required=True, choices=["gltf", "obj", "stl"])
+    parser.add_argument("--input")
+    parser.add_argument("--output")
+    parser.add_argument("--jobs", help="JSON con una lista de trabajos (sustituye a --input/--output).")
+    parser.add_argument("--format", default=None, choices=["gltf", "obj", "stl"])
     parser.add_argument("--scale", type=float, default=1.0)
     parser.add_argument("--quadriflow-target", type=int, default=8000)
     parser.add_argument("--smooth-iterations", type=int, default=3)
     parser.add_argument("--solidify-thickness", type=float, default=0.002)
-    return parser.parse_args(argv)
+    args = parser.parse_args(argv)
+    if args.jobs is None and not (args.input and args.output and args.format):
+        parser.error("Se requiere --input, --output y --format, o bien --jobs.")
+    return args
+
+
+def free_scene_data() -> None:
+    """Elimina objetos y mallas/materiales huérfanos entre trabajos."""
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for collection in (bpy.data.meshes, bpy.data.materials, bpy.data.images):
+        for block in list(collection):
+            if block.users == 0:
+                collection.remove(block)
 
 
 def reset_scene() -> None:
@@ -103,9 +129,7 @@ def export(obj: bpy.types.Object, path: Path, fmt: str) -> None:
         raise ValueError(f"Formato no soportado: {fmt}")
 
 
-def main() -> None:
-    args = parse_args()
-    reset_scene()
+def process(args: argparse.Namespace) -> None:
     obj = import_obj(Path(args.input))
     apply_scale(obj, args.scale)
     apply_quadriflow(obj, args.quadriflow_target)
@@ -114,6 +138,29 @@ def main() -> None:
     export(obj, Path(args.output), args.format)
 
 
+def main() -> None:
+    args = parse_args()
+    reset_scene()
+    if args.jobs is None:
+        process(args)
+        return
+
+    jobs = load_jobs(Path(args.jobs), args, required=("input", "output", "format"))
+    failures = 0
+    for i, job in enumerate(jobs, start=1):
+        start = time.perf_counter()
+        try:
+            process(job)
+            print(f"[blender_postprocess] Trabajo {i}/{len(jobs)} listo en {time.perf_counter() - start:.1f}s")
+        except Exception as exc:
+            failures += 1
+            print(f"[blender_postprocess] Trabajo {i}/{len(jobs)} falló ({job.input}): {exc}", file=sys.stderr)
+        finally:
+            free_scene_data()
+    if failures:
+        sys.exit(f"[blender_postprocess] {failures} de {len(jobs)} trabajos fallaron.")
+
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,201 @@
+"""
+Orquestación asíncrona de procesos Blender headless.
+
+Sustituye a ``subprocess.run`` en ambas CLIs:
+- stdout/stderr se leen línea a línea y se escriben en un log (sin acumular
+  toda la salida en memoria; solo se guarda una cola para los errores).
+- Límite de tiempo por trabajo y límite de memoria (RSS vía ``/proc`` en Linux).
+- Los procesos colgados se terminan con SIGTERM y, tras un margen, SIGKILL
+  sobre todo el grupo de procesos.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Deque, List
+
+# Margen entre SIGTERM y SIGKILL al matar un proceso.
+KILL_GRACE_SECONDS = 5.0
+MEMORY_POLL_SECONDS = 0.5
+TAIL_LINES = 40
+
+
+class BlenderError(RuntimeError):
+    """Fallo, timeout o exceso de memoria en un proceso Blender."""
+
+    def __init__(self, result: "BlenderResult") -> None:
+        self.result = result
+        if result.timed_out:
+            reason = f"superó el límite de {result.timeout:.0f}s"
+        elif result.memory_exceeded:
+            reason = f"superó el límite de memoria ({result.peak_rss_mb:.0f} MiB)"
+        else:
+            reason = f"terminó con código {result.returncode}"
+        tail = "\n".join(result.tail)
+        log_hint = f" Log completo: {result.log_path}" if result.log_path else ""
+        super().__init__(f"Blender [{result.name}] {reason}.{log_hint}\nÚltimas líneas:\n{tail}")
+
+
+@dataclass
+class BlenderJob:
+    """Comando Blender con sus límites de ejecución."""
+
+    cmd: List[str]
+    name: str = "blender"
+    log_path: Path | None = None
+    timeout: float | None = None
+    max_memory_mb: float | None = None
+    echo: bool = False
+
+
+@dataclass
+class BlenderResult:
+    name: str
+    returncode: int | None
+    seconds: float
+    log_path: Path | None
+    timeout: float | None = None
+    timed_out: bool = False
+    memory_exceeded: bool = False
+    peak_rss_mb: float = 0.0
+    tail: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out and not self.memory_exceeded
+
+
+def _read_rss_mb(pid: int) -> float | None:
+    """RSS actual del proceso en MiB (solo Linux); ``None`` si no se puede leer."""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def _signal_process(process: asyncio.subprocess.Process, sig: int) -> None:
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, sig)
+        elif sig == getattr(signal, "SIGKILL", None):
+            process.kill()
+        else:
+            process.terminate()
+    except ProcessLookupError:
+        pass
+
+
+async def _terminate(process: asyncio.subprocess.Process) -> None:
+    """SIGTERM al grupo, espera ``KILL_GRACE_SECONDS`` y luego SIGKILL."""
+    if process.returncode is not None:
+        return
+    _signal_process(process, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(process.wait(), KILL_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        _signal_process(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+        await process.wait()
+
+
+async def _pump(
+    stream: asyncio.StreamReader, label: str, log: IO[str] | None, tail: Deque[str], job: BlenderJob
+) -> None:
+    while True:
+        raw = await stream.readline()
+        if not raw:
+            break
+        line = raw.decode("utf-8", errors="replace").rstrip()
+        tail.append(f"[{label}] {line}")
+        if log is not None:
+            log.write(f"[{label}] {line}\n")
+            log.flush()
+        if job.echo:
+            print(f"[{job.name}] {line}", file=sys.stderr if label == "stderr" else sys.stdout)
+
+
+async def _watch_memory(process: asyncio.subprocess.Process, job: BlenderJob, state: dict) -> None:
+    while process.returncode is None:
+        rss = _read_rss_mb(process.pid)
+        if rss is not None:
+            state["peak"] = max(state["peak"], rss)
+            if job.max_memory_mb is not None and rss > job.max_memory_mb:
+                state["exceeded"] = True
+                await _terminate(process)
+                return
+        await asyncio.sleep(MEMORY_POLL_SECONDS)
+
+
+async def run_blender_job(job: BlenderJob) -> BlenderResult:
+    """Ejecuta un trabajo Blender respetando timeout y límite de memoria."""
+    start = time.perf_counter()
+    tail: Deque[str] = deque(maxlen=TAIL_LINES)
+    log: IO[str] | None = None
+    if job.log_path is not None:
+        job.log_path.parent.mkdir(parents=True, exist_ok=True)
+        log = job.log_path.open("w", encoding="utf-8")
+    try:
+        if log is not None:
+            log.write(f"$ {' '.join(job.cmd)}\n")
+        process = await asyncio.create_subprocess_exec(
+            *job.cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=os.name == "posix",
+        )
+    except BaseException:
+        # Sin proceso no hay nadie que cierre el log más abajo.
+        if log is not None:
+            log.close()
+        raise
+    state = {"peak": 0.0, "exceeded": False}
+    pumps = asyncio.gather(
+        _pump(process.stdout, "stdout", log, tail, job),  # type: ignore[arg-type]
+        _pump(process.stderr, "stderr", log, tail, job),  # type: ignore[arg-type]
+        process.wait(),
+    )
+    watcher = asyncio.ensure_future(_watch_memory(process, job, state))
+    timed_out = False
+    try:
+        await asyncio.wait_for(asyncio.shield(pumps), job.timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+        await _terminate(process)
+        await pumps
+    except asyncio.CancelledError:
+        await _terminate(process)
+        raise
+    finally:
+        watcher.cancel()
+        if log is not None:
+            log.close()
+
+    return BlenderResult(
+        name=job.name,
+        returncode=process.returncode,
+        seconds=time.perf_counter() - start,
+        log_path=job.log_path,
+        timeout=job.timeout,
+        timed_out=timed_out,
+        memory_exceeded=bool(state["exceeded"]),
+        peak_rss_mb=float(state["peak"]),
+        tail=list(tail),
+    )
+
+
+def run_blender(job: BlenderJob) -> BlenderResult:
+    """Versión síncrona para las CLIs; lanza ``BlenderError`` si el trabajo falla."""
+    result = asyncio.run(run_blender_job(job))
+    if not result.ok:
+        raise BlenderError(result)
+    return result
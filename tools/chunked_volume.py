@@ -0,0 +1,352 @@
+"""
+Contenedor de volúmenes por bloques comprimidos (``.vbv``).
+
+A diferencia de ``.npz`` (un único stream zlib serie), cada bloque se comprime
+por separado con un códec de la stdlib, así que se puede:
+- leer solo una región (se decodifican únicamente los bloques que la cortan),
+- descomprimir en paralelo (zlib/lzma/bz2 liberan el GIL),
+- abrir el archivo con ``mmap`` sin cargarlo entero.
+
+Estructura del archivo::
+
+    MAGIC (8 bytes) | uint32 len(header) | header JSON (utf-8)
+    | índice uint64[n_bloques, 2] (offset, longitud) | bloques comprimidos
+
+Los bloques se guardan en orden C sobre la rejilla de bloques y cada uno es un
+array C-contiguo con su forma real (los del borde pueden ser más pequeños).
+
+Con ``fill`` en la cabecera el volumen es disperso: los bloques que solo
+contienen ese valor no se guardan (longitud 0 en el índice) y se leen como
+constantes (ver ``tools.sparse_volume``).
+"""
+
+from __future__ import annotations
+
+import bz2
+import itertools
+import json
+import lzma
+import mmap
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .metrics import inc
+
+MAGIC = b"VBVOL1\x00\x00"
+SUFFIX = ".vbv"
+DEFAULT_CHUNK_SHAPE = (64, 64, 64)
+
+CODECS: Dict[str, Tuple[Callable[[bytes, int], bytes], Callable[[bytes], bytes]]] = {
+    "none": (lambda data, level: bytes(data), bytes),
+    "zlib": (lambda data, level: zlib.compress(data, level), zlib.decompress),
+    "bz2": (lambda data, level: bz2.compress(data, max(1, min(level, 9))), bz2.decompress),
+    "lzma": (lambda data, level: lzma.compress(data, preset=max(0, min(level, 9))), lzma.decompress),
+}
+
+Region = Tuple[slice, ...]
+
+
+def _default_workers() -> int:
+    return min(8, os.cpu_count() or 1)
+
+
+def _normalize_region(region: Sequence[slice] | None, shape: Tuple[int, ...]) -> Tuple[Tuple[int, int], ...]:
+    if region is None:
+        return tuple((0, n) for n in shape)
+    if len(region) != len(shape):
+        raise ValueError(f"La región debe tener {len(shape)} ejes, se recibieron {len(region)}.")
+    bounds = []
+    for sl, n in zip(region, shape):
+        start, stop, step = sl.indices(n)
+        if step != 1:
+            raise ValueError("Las regiones solo admiten paso 1.")
+        bounds.append((start, max(start, stop)))
+    return tuple(bounds)
+
+
+class ChunkedVolume:
+    """Lector perezoso de ``.vbv`` sobre ``mmap``."""
+
+    def __init__(self, path: Path, workers: int | None = None) -> None:
+        self.path = Path(path)
+        self.workers = workers or _default_workers()
+        self._file = self.path.open("rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} no es un volumen .vbv válido.")
+        (header_len,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(self._mmap[header_start : header_start + header_len].decode("utf-8"))
+
+        self.shape: Tuple[int, ...] = tuple(int(n) for n in header["shape"])
+        self.dtype = np.dtype(header["dtype"])
+        self.chunk_shape: Tuple[int, ...] = tuple(int(n) for n in header["chunk_shape"])
+        self.codec: str = header["codec"]
+        self.fill = header.get("fill")
+        if self.codec not in CODECS:
+            self.close()
+            raise ValueError(f"Códec '{self.codec}' desconocido en {path}.")
+        self.grid_shape = tuple(-(-n // c) for n, c in zip(self.shape, self.chunk_shape))
+        n_chunks = int(np.prod(self.grid_shape))
+        self._index = np.frombuffer(
+            self._mmap, dtype="<u8", count=n_chunks * 2, offset=header_start + header_len
+        ).reshape(n_chunks, 2)
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    def close(self) -> None:
+        self._index = None  # type: ignore[assignment]
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "ChunkedVolume":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _chunk_bounds(self, coords: Tuple[int, ...]) -> Tuple[Tuple[int, int], ...]:
+        return tuple(
+            (c * size, min((c + 1) * size, n)) for c, size, n in zip(coords, self.chunk_shape, self.shape)
+        )
+
+    def read_chunk(self, coords: Tuple[int, ...]) -> np.ndarray:
+        """Decodifica un bloque por sus coordenadas en la rejilla de bloques."""
+        linear = int(np.ravel_multi_index(coords, self.grid_shape))
+        offset, length = (int(v) for v in self._index[linear])
+        shape = tuple(hi - lo for lo, hi in self._chunk_bounds(coords))
+        if length == 0 and self.fill is not None:
+            return np.full(shape, self.fill, dtype=self.dtype)
+        raw = CODECS[self.codec][1](self._mmap[offset : offset + length])
+        inc("vibra_bytes_read_total", length, kind="vbv")
+        return np.frombuffer(raw, dtype=self.dtype).reshape(shape)
+
+    def active_chunks(self) -> List[Tuple[int, ...]]:
+        """Bloques guardados (en un volumen disperso, los que no son solo ``fill``)."""
+        stored = np.flatnonzero(self._index[:, 1] > 0) if self.fill is not None else range(len(self._index))
+        return [tuple(int(c) for c in np.unravel_index(i, self.grid_shape)) for i in stored]
+
+    def chunks_for(self, region: Sequence[slice] | None = None) -> List[Tuple[int, ...]]:
+        """Coordenadas de los bloques que intersecan la región."""
+        bounds = _normalize_region(region, self.shape)
+        ranges = [
+            range(lo // size, -(-hi // size)) if hi > lo else range(0)
+            for (lo, hi), size in zip(bounds, self.chunk_shape)
+        ]
+        return list(itertools.product(*ranges))
+
+    def read(self, region: Sequence[slice] | None = None) -> np.ndarray:
+        """Lee la región pedida decodificando solo sus bloques, en paralelo."""
+        bounds = _normalize_region(region, self.shape)
+        shape = tuple(hi - lo for lo, hi in bounds)
+        chunks = self.chunks_for(region)
+        if self.fill is None:
+            out = np.empty(shape, dtype=self.dtype)
+        else:
+            # Los bloques vacíos ya quedan con el valor de fondo.
+            out = np.full(shape, self.fill, dtype=self.dtype)
+            stored = self._index[:, 1] > 0
+            chunks = [c for c in chunks if stored[np.ravel_multi_index(c, self.grid_shape)]]
+
+        def _fill(coords: Tuple[int, ...]) -> None:
+            data = self.read_chunk(coords)
+            src, dst = [], []
+            for (c_lo, c_hi), (r_lo, r_hi) in zip(self._chunk_bounds(coords), bounds):
+                lo, hi = max(c_lo, r_lo), min(c_hi, r_hi)
+                src.append(slice(lo - c_lo, hi - c_lo))
+                dst.append(slice(lo - r_lo, hi - r_lo))
+            out[tuple(dst)] = data[tuple(src)]
+
+        if len(chunks) <= 1 or self.workers <= 1:
+            for coords in chunks:
+                _fill(coords)
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(_fill, chunks))
+        return out
+
+    def __getitem__(self, key: slice | Tuple[slice, ...]) -> np.ndarray:
+        if not isinstance(key, tuple):
+            key = (key,)
+        key = tuple(key) + (slice(None),) * (self.ndim - len(key))
+        return self.read(key)
+
+
+def write_chunked_volume(
+    path: Path,
+    array: np.ndarray,
+    chunk_shape: Sequence[int] = DEFAULT_CHUNK_SHAPE,
+    codec: str = "zlib",
+    level: int = 6,
+    workers: int | None = None,
+    fill: float | None = None,
+) -> Path:
+    """
+    Escribe ``array`` como ``.vbv`` comprimiendo los bloques en paralelo.
+
+    Con ``fill`` los bloques que solo contienen ese valor no se guardan.
+    ``array`` puede ser cualquier volumen con ``shape``, ``dtype`` y lectura
+    por ``slice`` (p. ej. ``SparseCOO``): se lee bloque a bloque.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Códec '{codec}' no soportado. Usa uno de: {', '.join(sorted(CODECS))}")
+    if not (hasattr(array, "shape") and hasattr(array, "dtype") and hasattr(array, "__getitem__")):
+        array = np.asarray(array)
+    if len(chunk_shape) > array.ndim:
+        raise ValueError(f"chunk_shape {tuple(chunk_shape)} tiene más ejes que el volumen {array.shape}.")
+    # Ejes iniciales sin tamaño de bloque (p. ej. tiempo en grids 4D) van de uno en uno.
+    chunk_shape = (1,) * (array.ndim - len(chunk_shape)) + tuple(chunk_shape)
+    chunk_shape = tuple(max(1, int(c)) for c in chunk_shape)
+    grid_shape = tuple(-(-n // c) for n, c in zip(array.shape, chunk_shape))
+    compress = CODECS[codec][0]
+    dtype = array.dtype.newbyteorder("<") if array.dtype.byteorder == ">" else array.dtype
+
+    def _encode(coords: Tuple[int, ...]) -> bytes:
+        region = tuple(slice(c * size, (c + 1) * size) for c, size in zip(coords, chunk_shape))
+        block = np.ascontiguousarray(array[region], dtype=dtype)
+        if fill is not None and (block == fill).all():
+            return b""
+        return compress(block.tobytes(), level)
+
+    meta = {"shape": list(array.shape), "dtype": dtype.str, "chunk_shape": list(chunk_shape), "codec": codec}
+    if fill is not None:
+        meta["fill"] = np.asarray(fill, dtype=dtype).item()
+    header = json.dumps(meta).encode("utf-8")
+    all_coords = list(itertools.product(*(range(n) for n in grid_shape)))
+    with ThreadPoolExecutor(max_workers=workers or _default_workers()) as pool:
+        blobs = list(pool.map(_encode, all_coords))
+
+    data_start = len(MAGIC) + 4 + len(header) + 16 * len(blobs)
+    index = np.empty((len(blobs), 2), dtype="<u8")
+    offset = data_start
+    for i, blob in enumerate(blobs):
+        index[i] = (offset, len(blob))
+        offset += len(blob)
+
+    path = Path(path)
+    with path.open("wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        f.write(index.tobytes())
+        for blob in blobs:
+            f.write(blob)
+    return path
+
+
+def load_array(path: Path, region: Sequence[slice] | None = None) -> np.ndarray:
+    """
+    Carga ``.npy``, ``.npz`` (primera clave) o ``.vbv``, opcionalmente solo una región.
+
+    ``.npy`` se abre con ``mmap_mode`` para no leer más de lo necesario.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == SUFFIX:
+        with ChunkedVolume(path) as volume:
+            return volume.read(region)
+    if suffix == ".npy":
+        data = np.load(path, mmap_mode="r" if region is not None else None)
+        data = np.array(data[tuple(region)]) if region is not None else data
+        inc("vibra_bytes_read_total", data.nbytes, kind="npy")
+        return data
+    if suffix == ".npz":
+        from .packed_mask import PackedMask, is_packed_file
+        from .sparse_volume import SparseCOO, is_coo_file
+
+        if is_coo_file(path):
+            return SparseCOO.load(path).read(region)
+        if is_packed_file(path):
+            return PackedMask.load(path).unpack(region)
+        with np.load(path) as loaded:
+            if not loaded.files:
+                raise ValueError(f"El archivo NPZ {path} no contiene arrays.")
+            data = loaded[loaded.files[0]]
+        inc("vibra_bytes_read_total", path.stat().st_size, kind="npz")
+        return data[tuple(region)] if region is not None else data
+    raise ValueError(f"Formato de volumen no soportado: {path.suffix}")
+
+
+def array_shape(path: Path) -> Tuple[int, ...]:
+    """Forma del array sin decodificarlo (``.npy`` por mmap, ``.vbv`` por cabecera)."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == SUFFIX:
+        with ChunkedVolume(path) as volume:
+            return volume.shape
+    if suffix == ".npy":
+        return tuple(np.load(path, mmap_mode="r").shape)
+    if suffix == ".npz":
+        with np.load(path) as loaded:
+            if "shape" in loaded.files and ("coords" in loaded.files or "packed" in loaded.files):
+                return tuple(int(n) for n in loaded["shape"])
+    return tuple(load_array(path).shape)
+
+
+def convert_volume(
+    src: Path,
+    dst: Path,
+    chunk_shape: Sequence[int] = DEFAULT_CHUNK_SHAPE,
+    codec: str = "zlib",
+    level: int = 6,
+    sparse_fill: float | None = None,
+    pack_threshold: float | None = None,
+) -> Path:
+    """
+    Convierte entre ``.npy``/``.npz`` y ``.vbv`` según las extensiones.
+
+    Con ``sparse_fill`` la salida es dispersa: ``.vbv`` sin los bloques que solo
+    contienen ese valor, o ``.npz`` COO. Una entrada COO hacia ``.vbv`` se
+    escribe bloque a bloque sin densificar el volumen entero. Con
+    ``pack_threshold`` la salida es una máscara ``.npz`` a un bit por voxel
+    (``valor >= pack_threshold``).
+    """
+    from .packed_mask import PackedMask
+    from .sparse_volume import SparseCOO, is_coo_file, save_coo
+
+    src, dst = Path(src), Path(dst)
+    suffix = dst.suffix.lower()
+    if pack_threshold is not None:
+        if suffix != ".npz" or sparse_fill is not None:
+            raise ValueError("La máscara empaquetada se escribe en .npz y no admite --sparse-fill.")
+        return PackedMask.from_array(load_array(src), threshold=pack_threshold).save(dst)
+    if suffix == SUFFIX and is_coo_file(src):
+        volume = SparseCOO.load(src, brick_shape=chunk_shape)
+        fill = volume.fill if sparse_fill is None else sparse_fill
+        return write_chunked_volume(dst, volume, chunk_shape=chunk_shape, codec=codec, level=level, fill=fill)
+    array = load_array(src)
+    if suffix == SUFFIX:
+        return write_chunked_volume(dst, array, chunk_shape=chunk_shape, codec=codec, level=level, fill=sparse_fill)
+    if suffix == ".npz" and sparse_fill is not None:
+        return save_coo(dst, array, fill=sparse_fill)
+    if suffix == ".npy":
+        np.save(dst, array)
+    elif suffix == ".npz":
+        np.savez_compressed(dst, volume=array)
+    else:
+        raise ValueError(f"Destino no soportado: {dst.suffix} (usa .vbv, .npy o .npz)")
+    return dst
+
+
+def parse_region(raw: str) -> Region:
+    """Convierte ``"x0:x1,y0:y1,z0:z1"`` en una tupla de ``slice`` (extremos opcionales)."""
+    slices: List[slice] = []
+    for part in raw.split(","):
+        lo, _, hi = part.strip().partition(":")
+        slices.append(slice(int(lo) if lo else None, int(hi) if hi else None))
+    return tuple(slices)
+
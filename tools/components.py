@@ -0,0 +1,221 @@
+"""
+Etiquetado y filtrado de componentes conexas antes de exportar.
+
+Las máscaras ruidosas generan cientos de islas diminutas que luego pasan por
+``write_obj``, Quadriflow y Solidify. Aquí se eliminan antes, con un
+union-find vectorizado (enganche al mínimo + saltos de puntero) que sirve
+tanto para voxeles (conectividad 6) como para caras de malla (vértices
+compartidos).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, Tuple
+
+import numpy as np
+
+
+@dataclass
+class ComponentReport:
+    """Resumen del filtrado: componentes y elementos antes/después."""
+
+    level: str
+    components_before: int
+    components_after: int
+    elements_before: int
+    elements_after: int
+
+
+def union_find(count: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """
+    Devuelve la raíz (mínimo índice) de cada nodo dado un conjunto de aristas.
+
+    Cada ronda engancha la raíz mayor de cada arista a la menor con
+    ``np.minimum.at`` y comprime caminos por saltos de puntero; converge en
+    pocas rondas incluso para componentes largas.
+    """
+    parent = np.arange(count, dtype=np.int64)
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    while True:
+        pu = parent[u]
+        pv = parent[v]
+        differ = pu != pv
+        if not differ.any():
+            break
+        lo = np.minimum(pu[differ], pv[differ])
+        hi = np.maximum(pu[differ], pv[differ])
+        np.minimum.at(parent, hi, lo)
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+        # Las aristas ya unidas no vuelven a separarse.
+        u, v = u[differ], v[differ]
+    return parent
+
+
+def label_voxels(mask: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Etiqueta componentes 6-conexas de una máscara booleana 3D.
+
+    Returns:
+        ``(labels, n)`` con ``labels`` int32 (-1 fuera de la máscara) y etiquetas 0..n-1.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    index = np.full(mask.shape, -1, dtype=np.int64)
+    count = int(mask.sum())
+    index[mask] = np.arange(count)
+    us, vs = [], []
+    for axis in range(mask.ndim):
+        lo = [slice(None)] * mask.ndim
+        hi = [slice(None)] * mask.ndim
+        lo[axis] = slice(0, -1)
+        hi[axis] = slice(1, None)
+        both = mask[tuple(lo)] & mask[tuple(hi)]
+        us.append(index[tuple(lo)][both])
+        vs.append(index[tuple(hi)][both])
+    roots = union_find(count, np.concatenate(us), np.concatenate(vs))
+    _, compact = np.unique(roots, return_inverse=True)
+    labels = np.full(mask.shape, -1, dtype=np.int32)
+    labels[mask] = compact
+    return labels, int(compact.max()) + 1 if count else 0
+
+
+def label_faces(faces: np.ndarray, vertex_count: int | None = None) -> Tuple[np.ndarray, int]:
+    """Etiqueta componentes de caras conectadas por vértices compartidos."""
+    faces = np.asarray(faces)
+    if not len(faces):
+        return np.empty(0, dtype=np.int32), 0
+    vertex_count = vertex_count or int(faces.max()) + 1
+    cols = faces.shape[1]
+    u = faces[:, :-1].ravel()
+    v = faces[:, 1:].ravel() if cols > 1 else u
+    roots = union_find(vertex_count, u, v)
+    _, compact = np.unique(roots[faces[:, 0]], return_inverse=True)
+    return compact.astype(np.int32), int(compact.max()) + 1
+
+
+def _keep_labels(sizes: np.ndarray, min_size: float, keep_largest: int | None) -> np.ndarray:
+    keep = sizes >= min_size
+    if keep_largest is not None and keep_largest < keep.sum():
+        ranked = np.argsort(-np.where(keep, sizes, -np.inf), kind="stable")
+        keep = np.zeros_like(keep)
+        keep[ranked[:keep_largest]] = True
+    return keep
+
+
+def filter_voxel_components(
+    mask: np.ndarray, min_voxels: int = 0, keep_largest: int | None = None
+) -> Tuple[np.ndarray, ComponentReport]:
+    """Elimina islas de voxeles por debajo de ``min_voxels`` (o fuera de las N mayores)."""
+    labels, count = label_voxels(mask)
+    sizes = np.bincount(labels[labels >= 0], minlength=count)
+    keep = _keep_labels(sizes, min_voxels, keep_largest)
+    filtered = np.zeros(labels.shape, dtype=bool)
+    inside = labels >= 0
+    filtered[inside] = keep[labels[inside]]
+    report = ComponentReport(
+        level="voxels",
+        components_before=count,
+        components_after=int(keep.sum()),
+        elements_before=int(sizes.sum()),
+        elements_after=int(sizes[keep].sum()),
+    )
+    return filtered, report
+
+
+def remove_small_islands(
+    grid: np.ndarray, iso_level: float, min_voxels: int, keep_largest: int | None = None
+) -> Tuple[np.ndarray, ComponentReport]:
+    """
+    Borra del grid las islas (``grid >= iso_level``) con menos de ``min_voxels`` voxeles.
+
+    Los voxeles eliminados se rellenan con un valor por debajo del iso; como no
+    son 6-vecinos de ninguna isla conservada, no alteran su superficie.
+    """
+    inside = np.asarray(grid) >= iso_level
+    kept, report = filter_voxel_components(inside, min_voxels=min_voxels, keep_largest=keep_largest)
+    removed = inside & ~kept
+    if not removed.any():
+        return grid, report
+    minimum = float(np.min(grid))
+    fill = minimum if minimum < iso_level else iso_level - 1.0
+    cleaned = np.array(grid, copy=True)
+    cleaned[removed] = fill
+    return cleaned, report
+
+
+def component_volumes(vertices: np.ndarray, faces: np.ndarray, labels: np.ndarray, count: int) -> np.ndarray:
+    """Volumen (valor absoluto de la suma de tetraedros con signo) por componente."""
+    tri = np.asarray(vertices, dtype=np.float64)[faces[:, :3]]
+    signed = np.einsum("ij,ij->i", tri[:, 0], np.cross(tri[:, 1], tri[:, 2])) / 6.0
+    return np.abs(np.bincount(labels, weights=signed, minlength=count))
+
+
+def filter_mesh_components(
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    min_faces: int = 0,
+    min_volume: float = 0.0,
+    keep_largest: int | None = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, ComponentReport]:
+    """
+    Filtra componentes de malla por número de caras, volumen o las N mayores.
+
+    Los vértices no referenciados se eliminan y los índices se remapean.
+
+    Returns:
+        ``(vertices, faces, vertex_order, report)``; ``vertex_order`` son los
+        índices originales de los vértices conservados.
+    """
+    faces = np.asarray(faces)
+    # Se etiqueta sobre posiciones soldadas: algunos extractores duplican vértices por celda.
+    _, welded = np.unique(np.asarray(vertices), axis=0, return_inverse=True)
+    labels, count = label_faces(welded.reshape(-1)[faces], len(vertices))
+    face_counts = np.bincount(labels, minlength=count)
+    keep = face_counts >= min_faces
+    if min_volume > 0:
+        keep &= component_volumes(vertices, faces, labels, count) >= min_volume
+    # "Mayores" se mide por número de caras.
+    keep &= _keep_labels(np.where(keep, face_counts, -1), 0, keep_largest)
+
+    kept_faces = faces[keep[labels]]
+    used = np.zeros(len(vertices), dtype=bool)
+    used[kept_faces.ravel()] = True
+    order = np.flatnonzero(used)
+    remap = np.full(len(vertices), -1, dtype=np.int64)
+    remap[order] = np.arange(len(order))
+    report = ComponentReport(
+        level="faces",
+        components_before=count,
+        components_after=int(keep.sum()),
+        elements_before=int(len(faces)),
+        elements_after=int(len(kept_faces)),
+    )
+    return vertices[order], remap[kept_faces].astype(faces.dtype), order, report
+
+
+def filter_mesh(
+    mesh: Any, min_faces: int = 0, min_volume: float = 0.0, keep_largest: int | None = None
+) -> Tuple[Any, ComponentReport]:
+    """
+    Aplica ``filter_mesh_components`` a ``MarchingCubesResult`` o ``trimesh.Trimesh``
+    y devuelve una malla nueva del mismo tipo.
+    """
+    vertices, faces, order, report = filter_mesh_components(
+        np.asarray(mesh.vertices), np.asarray(mesh.faces), min_faces, min_volume, keep_largest
+    )
+    if dataclasses.is_dataclass(mesh):
+        return dataclasses.replace(mesh, vertices=vertices, faces=faces), report
+    filtered = type(mesh)(
+        vertices=vertices,
+        faces=faces,
+        # Si no queda ninguna componente, trimesh no acepta normales vacías.
+        vertex_normals=np.asarray(mesh.vertex_normals)[order] if len(order) else None,
+        process=False,
+    )
+    return filtered, report
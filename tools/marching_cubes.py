@@ -1,19 +1,37 @@
 """
 Implementación ligera de Marching Cubes sin dependencias externas.
 
-Se apoya en las tablas clásicas definidas en `marching_cubes_tables.py` y usa
-únicamente NumPy para interpolar los vértices de la superficie isovolumen.
+Se apoya en las tablas clásicas definidas en `marching_cubes_tables.py`. Hay dos
+rutas que producen exactamente la misma malla:
+
+- ``numpy``: vectorizada por casos (un ``uint8`` por celda) y por aristas
+  cruzadas; siempre disponible.
+- ``numba``: núcleo compilado opcional (``pip install .[jit]``) que recorre el
+  grid por losas en X sin temporales del tamaño del volumen: una pasada cuenta
+  vértices y triángulos y otra los escribe directamente en la salida.
+
+Los vértices se sueldan: hay uno por arista del grid que cruza el iso, ordenados
+por eje y luego en orden C de su esquina menor; las caras siguen el orden C de
+las celdas y, dentro de cada celda, el de ``TRI_TABLE``.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Sequence, Tuple
 
 import numpy as np
 
 from .marching_cubes_tables import EDGE_TABLE, TRI_TABLE
 
+try:  # Acelerador opcional: sin Numba se usa la ruta NumPy.
+    import numba
+except ImportError:  # pragma: no cover - depende del entorno
+    numba = None
+
+HAS_NUMBA = numba is not None
+BACKENDS = ("auto", "numpy", "numba")
+
 # Coordenadas relativas de los 8 vértices de un cubo unidad.
 CUBE_CORNERS = np.array(
     [
@@ -45,6 +63,15 @@ EDGE_CONNECTIONS: Tuple[Tuple[int, int], ...] = (
     (3, 7),
 )
 
+# Tablas en forma de array para ambas rutas.
+_CORNERS = CUBE_CORNERS.astype(np.int64)
+_EDGE_TABLE = np.asarray(EDGE_TABLE, dtype=np.int64)
+_TRI = np.asarray(TRI_TABLE, dtype=np.int64)
+_TRI_COUNT = (_TRI >= 0).sum(axis=1) // 3
+# Por arista del cubo: esquina menor (desplazamiento en la celda) y eje que recorre.
+_EDGE_ORIGIN = np.array([np.minimum(_CORNERS[a], _CORNERS[b]) for a, b in EDGE_CONNECTIONS], dtype=np.int64)
+_EDGE_AXIS = np.array([int(np.argmax(_CORNERS[a] != _CORNERS[b])) for a, b in EDGE_CONNECTIONS], dtype=np.int64)
+
 
 @dataclass
 class MarchingCubesResult:
@@ -52,32 +79,193 @@ class MarchingCubesResult:
     faces: np.ndarray
 
 
-def _vertex_interp(
-    p1: np.ndarray, p2: np.ndarray, v1: float, v2: float, iso_level: float
-) -> np.ndarray:
-    """Interpola la posición exacta del vértice en una arista."""
-    if abs(iso_level - v1) < 1e-5:
-        return p1
-    if abs(iso_level - v2) < 1e-5:
-        return p2
+def _empty_result() -> MarchingCubesResult:
+    return MarchingCubesResult(np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.int32))
+
+
+def _edge_fractions(v1: np.ndarray, v2: np.ndarray, iso_level: float) -> np.ndarray:
+    """Posición relativa del cruce en cada arista (``0`` → ``v1``, ``1`` → ``v2``)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mu = (iso_level - v1) / (v2 - v1)
+    mu = np.where(np.abs(v1 - v2) < 1e-5, 0.0, mu)
+    mu = np.where(np.abs(iso_level - v2) < 1e-5, 1.0, mu)
+    return np.where(np.abs(iso_level - v1) < 1e-5, 0.0, mu)
+
+
+def _marching_cubes_numpy(vol: np.ndarray, iso: np.float32, spacing: np.ndarray) -> MarchingCubesResult:
+    nx, ny, nz = vol.shape
+    below = vol < iso
+    cases = np.zeros((nx - 1, ny - 1, nz - 1), dtype=np.uint8)
+    for bit, (dx, dy, dz) in enumerate(_CORNERS):
+        cases |= below[dx : dx + nx - 1, dy : dy + ny - 1, dz : dz + nz - 1].astype(np.uint8) << np.uint8(bit)
+
+    # Un vértice por arista cruzada del grid; el id global (eje, índice lineal) fija el orden.
+    total = vol.size
+    ids, positions = [], []
+    for axis in range(3):
+        lo = [slice(None)] * 3
+        hi = [slice(None)] * 3
+        lo[axis], hi[axis] = slice(0, -1), slice(1, None)
+        points = np.nonzero(below[tuple(lo)] != below[tuple(hi)])
+        upper = list(points)
+        upper[axis] = upper[axis] + 1
+        mu = _edge_fractions(
+            vol[points].astype(np.float64), vol[tuple(upper)].astype(np.float64), float(iso)
+        )
+        coords = np.stack(points, axis=1).astype(np.float64)
+        coords[:, axis] += mu
+        positions.append(coords * spacing)
+        ids.append(axis * total + np.ravel_multi_index(points, vol.shape))
+    edge_ids = np.concatenate(ids)
+    if not len(edge_ids):
+        return _empty_result()
+
+    flat_cases = cases.ravel()
+    active = np.flatnonzero(_TRI_COUNT[flat_cases] > 0)
+    rows = _TRI[flat_cases[active], :15]
+    valid = rows >= 0
+    cell, _ = np.nonzero(valid)
+    edges = rows[valid]
+    ci, cj, ck = np.unravel_index(active[cell], cases.shape)
+    origin = _EDGE_ORIGIN[edges]
+    linear = ((ci + origin[:, 0]) * ny + (cj + origin[:, 1])) * nz + (ck + origin[:, 2])
+    faces = np.searchsorted(edge_ids, _EDGE_AXIS[edges] * total + linear)
+
+    return MarchingCubesResult(
+        vertices=np.concatenate(positions).astype(np.float32),
+        faces=faces.reshape(-1, 3).astype(np.int32),
+    )
+
+
+# --- Núcleo compilado ---------------------------------------------------------
+# Funciones escalares en Python plano; si Numba está instalado se compilan con
+# ``njit`` más abajo. Usan la misma aritmética (float64) que la ruta NumPy.
+
+
+def _edge_fraction(v1: float, v2: float, iso: float) -> float:
+    if abs(iso - v1) < 1e-5:
+        return 0.0
+    if abs(iso - v2) < 1e-5:
+        return 1.0
     if abs(v1 - v2) < 1e-5:
-        return p1
+        return 0.0
+    return (iso - v1) / (v2 - v1)
+
 
-    mu = (iso_level - v1) / (v2 - v1)
-    return p1 + mu * (p2 - p1)
+def _cell_case(vol, i, j, k, iso, corners):
+    case = 0
+    for c in range(8):
+        if vol[i + corners[c, 0], j + corners[c, 1], k + corners[c, 2]] < iso:
+            case |= 1 << c
+    return case
 
 
-def _compute_cube_index(values: Sequence[float], iso_level: float) -> int:
-    """Calcula el índice de caso en base a los 8 valores del cubo."""
-    cube_index = 0
-    for i, v in enumerate(values):
-        if v < iso_level:
-            cube_index |= 1 << i
-    return cube_index
+def _count_kernel(vol, iso, tri_count, corners):
+    """Primera pasada: aristas cruzadas por eje y número de triángulos."""
+    nx, ny, nz = vol.shape
+    edges = np.zeros(3, dtype=np.int64)
+    triangles = 0
+    for i in range(nx):
+        for j in range(ny):
+            for k in range(nz):
+                b = vol[i, j, k] < iso
+                if i + 1 < nx and (vol[i + 1, j, k] < iso) != b:
+                    edges[0] += 1
+                if j + 1 < ny and (vol[i, j + 1, k] < iso) != b:
+                    edges[1] += 1
+                if k + 1 < nz and (vol[i, j, k + 1] < iso) != b:
+                    edges[2] += 1
+                if i + 1 < nx and j + 1 < ny and k + 1 < nz:
+                    triangles += tri_count[_cell_case(vol, i, j, k, iso, corners)]
+    return edges, triangles
+
+
+def _slab_vertices(vol, iso, iso64, i, slab, cursor, vertices, sx, sy, sz):
+    """Escribe los vértices cuya esquina menor está en la losa ``i`` y guarda su índice."""
+    nx, ny, nz = vol.shape
+    for j in range(ny):
+        for k in range(nz):
+            v = vol[i, j, k]
+            b = v < iso
+            for axis in range(3):
+                ii = i + 1 if axis == 0 else i
+                jj = j + 1 if axis == 1 else j
+                kk = k + 1 if axis == 2 else k
+                if ii >= nx or jj >= ny or kk >= nz:
+                    continue
+                w = vol[ii, jj, kk]
+                if (w < iso) == b:
+                    continue
+                mu = _edge_fraction(np.float64(v), np.float64(w), iso64)
+                index = cursor[axis]
+                cursor[axis] += 1
+                slab[j, k, axis] = index
+                vertices[index, 0] = (i + (mu if axis == 0 else 0.0)) * sx
+                vertices[index, 1] = (j + (mu if axis == 1 else 0.0)) * sy
+                vertices[index, 2] = (k + (mu if axis == 2 else 0.0)) * sz
+
+
+def _fill_kernel(vol, iso, iso64, sx, sy, sz, edges, tri, tri_count, corners, edge_origin, edge_axis, vertices, faces):
+    """Segunda pasada: vértices y caras en una sola recorrida, con dos losas de índices."""
+    nx, ny, nz = vol.shape
+    slabs = np.full((2, ny, nz, 3), -1, dtype=np.int32)
+    cursor = np.zeros(3, dtype=np.int64)
+    cursor[1] = edges[0]
+    cursor[2] = edges[0] + edges[1]
+    _slab_vertices(vol, iso, iso64, 0, slabs[0], cursor, vertices, sx, sy, sz)
+    face = 0
+    for i in range(nx - 1):
+        _slab_vertices(vol, iso, iso64, i + 1, slabs[(i + 1) % 2], cursor, vertices, sx, sy, sz)
+        for j in range(ny - 1):
+            for k in range(nz - 1):
+                case = _cell_case(vol, i, j, k, iso, corners)
+                count = tri_count[case]
+                for t in range(3 * count):
+                    e = tri[case, t]
+                    faces[face + t // 3, t % 3] = slabs[
+                        (i + edge_origin[e, 0]) % 2, j + edge_origin[e, 1], k + edge_origin[e, 2], edge_axis[e]
+                    ]
+                face += count
+
+
+if HAS_NUMBA:  # pragma: no cover - depende del entorno
+    _jit = numba.njit(cache=True, nogil=True)
+    _edge_fraction = _jit(_edge_fraction)
+    _cell_case = _jit(_cell_case)
+    _count_kernel = _jit(_count_kernel)
+    _slab_vertices = _jit(_slab_vertices)
+    _fill_kernel = _jit(_fill_kernel)
+
+
+def _marching_cubes_kernel(vol: np.ndarray, iso: np.float32, spacing: np.ndarray) -> MarchingCubesResult:
+    edges, triangles = _count_kernel(vol, iso, _TRI_COUNT, _CORNERS)
+    if triangles == 0:
+        return _empty_result()
+    vertices = np.empty((int(edges.sum()), 3), dtype=np.float32)
+    faces = np.empty((int(triangles), 3), dtype=np.int32)
+    sx, sy, sz = (float(s) for s in spacing)
+    _fill_kernel(
+        vol, iso, float(iso), sx, sy, sz, edges, _TRI, _TRI_COUNT, _CORNERS, _EDGE_ORIGIN, _EDGE_AXIS, vertices, faces
+    )
+    return MarchingCubesResult(vertices=vertices, faces=faces)
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    """``auto`` → ``numba`` si está instalado, si no ``numpy``."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido: {backend}. Opciones: {', '.join(BACKENDS)}")
+    if backend == "auto":
+        return "numba" if HAS_NUMBA else "numpy"
+    if backend == "numba" and not HAS_NUMBA:
+        raise ImportError("El backend numba requiere 'pip install numba' (o 'pip install .[jit]').")
+    return backend
 
 
 def marching_cubes(
-    volume: np.ndarray, iso_level: float = 0.5, spacing: Sequence[float] = (1.0, 1.0, 1.0)
+    volume: np.ndarray,
+    iso_level: float = 0.5,
+    spacing: Sequence[float] = (1.0, 1.0, 1.0),
+    backend: str = "auto",
 ) -> MarchingCubesResult:
     """
     Genera vértices y caras triangulares a partir de un volumen binario/escala de grises.
@@ -86,65 +274,19 @@ def marching_cubes(
         volume: Arreglo 3D con los voxeles.
         iso_level: Umbral para la superficie.
         spacing: Escala de voxel en cada eje (x, y, z).
+        backend: ``auto``, ``numpy`` o ``numba``; todos devuelven la misma malla.
 
     Returns:
         MarchingCubesResult con arrays de vértices (N, 3) y caras (M, 3).
     """
-    vol = np.asarray(volume, dtype=np.float32)
+    vol = np.ascontiguousarray(volume, dtype=np.float32)
     if vol.ndim != 3:
         raise ValueError(f"El volumen debe ser 3D, se recibió {vol.ndim}D.")
+    if min(vol.shape) < 2:
+        return _empty_result()
 
-    sx, sy, sz = spacing
-    dims = vol.shape
-
-    vertices: List[np.ndarray] = []
-    faces: List[List[int]] = []
-    vertex_cache: Dict[Tuple[int, int, int, int], int] = {}
-
-    for x in range(dims[0] - 1):
-        for y in range(dims[1] - 1):
-            for z in range(dims[2] - 1):
-                # 8 valores del cubo actual
-                cube_values = [
-                    vol[x + dx, y + dy, z + dz]
-                    for dx, dy, dz in CUBE_CORNERS.astype(int)
-                ]
-
-                cube_index = _compute_cube_index(cube_values, iso_level)
-                edges = EDGE_TABLE[cube_index]
-                if edges == 0:
-                    continue
-
-                vert_list: List[np.ndarray] = [np.zeros(3, dtype=np.float32)] * 12
-                base = np.array([x, y, z], dtype=np.float32)
-
-                for edge in range(12):
-                    if edges & (1 << edge):
-                        a0, b0 = EDGE_CONNECTIONS[edge]
-                        p1 = (base + CUBE_CORNERS[a0]) * (sx, sy, sz)
-                        p2 = (base + CUBE_CORNERS[b0]) * (sx, sy, sz)
-                        v1, v2 = cube_values[a0], cube_values[b0]
-                        vert_list[edge] = _vertex_interp(p1, p2, v1, v2, iso_level)
-
-                tri = TRI_TABLE[cube_index]
-                for idx in range(0, len(tri), 3):
-                    if tri[idx] == -1:
-                        break
-                    face_vertices: List[int] = []
-                    for offset in range(3):
-                        edge_idx = tri[idx + offset]
-                        key = (x, y, z, edge_idx)
-                        if key not in vertex_cache:
-                            vertex_cache[key] = len(vertices)
-                            vertices.append(vert_list[edge_idx])
-                        face_vertices.append(vertex_cache[key])
-                    faces.append(face_vertices)
-
-    if not vertices or not faces:
-        return MarchingCubesResult(np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.int32))
-
-    return MarchingCubesResult(
-        vertices=np.vstack(vertices).astype(np.float32),
-        faces=np.vstack(faces).astype(np.int32),
-    )
-
+    iso = np.float32(iso_level)
+    scale = np.asarray(spacing, dtype=np.float64)
+    if resolve_backend(backend) == "numba":
+        return _marching_cubes_kernel(vol, iso, scale)
+    return _marching_cubes_numpy(vol, iso, scale)
@@ -1,43 +1,49 @@
 """
 Tablas de soporte para el algoritmo Marching Cubes.
 
-Los valores de `EDGE_TABLE` y `TRI_TABLE` son los clásicos del paper original
-y se utilizan para interpolar los vértices dentro de cada cubo.
+Convención de Bourke: esquinas y aristas de ``marching_cubes.CUBE_CORNERS`` y
+``EDGE_CONNECTIONS``; el bit ``i`` del caso vale 1 si la esquina ``i`` está por
+debajo del iso. ``EDGE_TABLE[c]`` marca las aristas cuyos extremos difieren y
+``TRI_TABLE[c]`` lista hasta 5 triángulos (aristas) terminados en ``-1``.
+
+En las caras ambiguas se separan siempre las esquinas por debajo del iso; como
+la regla solo depende de los 4 valores de la cara, dos celdas vecinas la
+resuelven igual y la malla queda cerrada.
 """
 
 EDGE_TABLE = [
     0x0000, 0x0109, 0x0203, 0x030a, 0x0406, 0x050f, 0x0605, 0x070c,
-    0x081c, 0x0915, 0x0a1f, 0x0b16, 0x0c1a, 0x0d13, 0x0e19, 0x0f10,
-    0x1080, 0x1189, 0x1283, 0x138a, 0x1486, 0x158f, 0x1685, 0x178c,
-    0x189c, 0x1995, 0x1a9f, 0x1b96, 0x1c9a, 0x1d93, 0x1e99, 0x1f90,
-    0x2300, 0x2209, 0x2103, 0x200a, 0x2706, 0x260f, 0x2505, 0x240c,
-    0x2b1c, 0x2a15, 0x291f, 0x2816, 0x2f1a, 0x2e13, 0x2d19, 0x2c10,
-    0x3480, 0x3589, 0x3683, 0x378a, 0x3086, 0x318f, 0x3285, 0x338c,
-    0x3c9c, 0x3d95, 0x3e9f, 0x3f96, 0x389a, 0x3993, 0x3a99, 0x3b90,
-    0x4600, 0x4709, 0x4403, 0x450a, 0x4206, 0x430f, 0x4005, 0x410c,
-    0x4e1c, 0x4f15, 0x4c1f, 0x4d16, 0x4a1a, 0x4b13, 0x4819, 0x4910,
-    0x5780, 0x5689, 0x5583, 0x548a, 0x5386, 0x528f, 0x5185, 0x508c,
-    0x5f9c, 0x5e95, 0x5d9f, 0x5c96, 0x5b9a, 0x5a93, 0x5999, 0x5890,
-    0x6c00, 0x6d09, 0x6e03, 0x6f0a, 0x6806, 0x690f, 0x6a05, 0x6b0c,
-    0x641c, 0x6515, 0x661f, 0x6716, 0x601a, 0x6113, 0x6219, 0x6310,
-    0x7b80, 0x7a89, 0x7983, 0x788a, 0x7f86, 0x7e8f, 0x7d85, 0x7c8c,
-    0x739c, 0x7295, 0x719f, 0x7096, 0x779a, 0x7693, 0x7599, 0x7490,
-    0x8c00, 0x8d09, 0x8e03, 0x8f0a, 0x8806, 0x890f, 0x8a05, 0x8b0c,
-    0x841c, 0x8515, 0x861f, 0x8716, 0x801a, 0x8113, 0x8219, 0x8310,
-    0x9b80, 0x9a89, 0x9983, 0x988a, 0x9f86, 0x9e8f, 0x9d85, 0x9c8c,
-    0x939c, 0x9295, 0x919f, 0x9096, 0x979a, 0x9693, 0x9599, 0x9490,
-    0xa500, 0xa409, 0xa303, 0xa20a, 0xa506, 0xa40f, 0xa705, 0xa60c,
-    0xa91c, 0xa815, 0xab1f, 0xaa16, 0xad1a, 0xac13, 0xaf19, 0xae10,
-    0xb080, 0xb189, 0xb283, 0xb38a, 0xb486, 0xb58f, 0xb685, 0xb78c,
-    0xb89c, 0xb995, 0xba9f, 0xbb96, 0xbc9a, 0xbd93, 0xbe99, 0xbf90,
-    0xca00, 0xcb09, 0xc803, 0xc90a, 0xce06, 0xcf0f, 0xcc05, 0xcd0c,
-    0xc21c, 0xc315, 0xc01f, 0xc116, 0xc61a, 0xc713, 0xc419, 0xc510,
-    0xd380, 0xd289, 0xd183, 0xd08a, 0xd786, 0xd68f, 0xd585, 0xd48c,
-    0xdb9c, 0xda95, 0xd99f, 0xd896, 0xdf9a, 0xde93, 0xdd99, 0xdc90,
-    0xe600, 0xe709, 0xe403, 0xe50a, 0xe206, 0xe30f, 0xe005, 0xe10c,
-    0xee1c, 0xef15, 0xec1f, 0xed16, 0xea1a, 0xeb13, 0xe819, 0xe910,
-    0xf780, 0xf689, 0xf583, 0xf48a, 0xf386, 0xf28f, 0xf185, 0xf08c,
-    0xff9c, 0xfe95, 0xfd9f, 0xfc96, 0xfb9a, 0xfa93, 0xf999, 0xf890,
+    0x080c, 0x0905, 0x0a0f, 0x0b06, 0x0c0a, 0x0d03, 0x0e09, 0x0f00,
+    0x0190, 0x0099, 0x0393, 0x029a, 0x0596, 0x049f, 0x0795, 0x069c,
+    0x099c, 0x0895, 0x0b9f, 0x0a96, 0x0d9a, 0x0c93, 0x0f99, 0x0e90,
+    0x0230, 0x0339, 0x0033, 0x013a, 0x0636, 0x073f, 0x0435, 0x053c,
+    0x0a3c, 0x0b35, 0x083f, 0x0936, 0x0e3a, 0x0f33, 0x0c39, 0x0d30,
+    0x03a0, 0x02a9, 0x01a3, 0x00aa, 0x07a6, 0x06af, 0x05a5, 0x04ac,
+    0x0bac, 0x0aa5, 0x09af, 0x08a6, 0x0faa, 0x0ea3, 0x0da9, 0x0ca0,
+    0x0460, 0x0569, 0x0663, 0x076a, 0x0066, 0x016f, 0x0265, 0x036c,
+    0x0c6c, 0x0d65, 0x0e6f, 0x0f66, 0x086a, 0x0963, 0x0a69, 0x0b60,
+    0x05f0, 0x04f9, 0x07f3, 0x06fa, 0x01f6, 0x00ff, 0x03f5, 0x02fc,
+    0x0dfc, 0x0cf5, 0x0fff, 0x0ef6, 0x09fa, 0x08f3, 0x0bf9, 0x0af0,
+    0x0650, 0x0759, 0x0453, 0x055a, 0x0256, 0x035f, 0x0055, 0x015c,
+    0x0e5c, 0x0f55, 0x0c5f, 0x0d56, 0x0a5a, 0x0b53, 0x0859, 0x0950,
+    0x07c0, 0x06c9, 0x05c3, 0x04ca, 0x03c6, 0x02cf, 0x01c5, 0x00cc,
+    0x0fcc, 0x0ec5, 0x0dcf, 0x0cc6, 0x0bca, 0x0ac3, 0x09c9, 0x08c0,
+    0x08c0, 0x09c9, 0x0ac3, 0x0bca, 0x0cc6, 0x0dcf, 0x0ec5, 0x0fcc,
+    0x00cc, 0x01c5, 0x02cf, 0x03c6, 0x04ca, 0x05c3, 0x06c9, 0x07c0,
+    0x0950, 0x0859, 0x0b53, 0x0a5a, 0x0d56, 0x0c5f, 0x0f55, 0x0e5c,
+    0x015c, 0x0055, 0x035f, 0x0256, 0x055a, 0x0453, 0x0759, 0x0650,
+    0x0af0, 0x0bf9, 0x08f3, 0x09fa, 0x0ef6, 0x0fff, 0x0cf5, 0x0dfc,
+    0x02fc, 0x03f5, 0x00ff, 0x01f6, 0x06fa, 0x07f3, 0x04f9, 0x05f0,
+    0x0b60, 0x0a69, 0x0963, 0x086a, 0x0f66, 0x0e6f, 0x0d65, 0x0c6c,
+    0x036c, 0x0265, 0x016f, 0x0066, 0x076a, 0x0663, 0x0569, 0x0460,
+    0x0ca0, 0x0da9, 0x0ea3, 0x0faa, 0x08a6, 0x09af, 0x0aa5, 0x0bac,
+    0x04ac, 0x05a5, 0x06af, 0x07a6, 0x00aa, 0x01a3, 0x02a9, 0x03a0,
+    0x0d30, 0x0c39, 0x0f33, 0x0e3a, 0x0936, 0x083f, 0x0b35, 0x0a3c,
+    0x053c, 0x0435, 0x073f, 0x0636, 0x013a, 0x0033, 0x0339, 0x0230,
+    0x0e90, 0x0f99, 0x0c93, 0x0d9a, 0x0a96, 0x0b9f, 0x0895, 0x099c,
+    0x069c, 0x0795, 0x049f, 0x0596, 0x029a, 0x0393, 0x0099, 0x0190,
+    0x0f00, 0x0e09, 0x0d03, 0x0c0a, 0x0b06, 0x0a0f, 0x0905, 0x080c,
+    0x070c, 0x0605, 0x050f, 0x0406, 0x030a, 0x0203, 0x0109, 0x0000,
 ]
 
 TRI_TABLE = [
@@ -225,221 +231,76 @@ TRI_TABLE = [
     [0, 11, 3, 0, 6, 11, 0, 9, 6, 5, 6, 9, 1, 2, 10, -1],
     [11, 8, 5, 11, 5, 6, 8, 0, 5, 10, 5, 2, 0, 2, 5, -1],
     [6, 11, 3, 6, 3, 5, 2, 10, 3, 10, 5, 3, -1, -1, -1, -1],
-    [5, 8, 9, 5, 6, 8, 6, 11, 8, 1, 2, 10, -1, -1, -1, -1],
-    [0, 9, 3, 9, 5, 3, 5, 6, 3, 6, 11, 3, 1, 2, 10, -1],
-    [6, 11, 8, 6, 8, 5, 2, 10, 8, 10, 5, 8, 0, 1, 9, -1],
-    [6, 11, 3, 6, 3, 5, 2, 10, 3, 10, 5, 3, -1, -1, -1, -1],
-    [5, 6, 11, 5, 11, 9, 9, 11, 8, -1, -1, -1, -1, -1, -1, -1],
-    [0, 9, 5, 0, 5, 3, 3, 5, 6, 3, 6, 11, -1, -1, -1, -1],
-    [0, 1, 5, 0, 5, 8, 8, 5, 6, 8, 6, 11, -1, -1, -1, -1],
-    [6, 11, 3, 6, 3, 5, 5, 3, 1, -1, -1, -1, -1, -1, -1, -1],
-    [1, 2, 6, 1, 6, 8, 1, 8, 9, 8, 6, 11, -1, -1, -1, -1],
-    [2, 6, 9, 2, 9, 1, 6, 11, 9, 8, 9, 3, 11, 3, 9, -1],
-    [11, 8, 0, 11, 0, 6, 6, 0, 2, -1, -1, -1, -1, -1, -1, -1],
-    [6, 11, 3, 6, 3, 2, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-    [2, 3, 8, 2, 8, 6, 6, 8, 11, -1, -1, -1, -1, -1, -1, -1],
-    [11, 6, 2, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-    [7, 2, 3, 7, 6, 2, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-    [7, 0, 8, 7, 6, 0, 6, 2, 0, -1, -1, -1, -1, -1, -1, -1],
-    [2, 7, 6, 2, 3, 7, 0, 1, 9, -1, -1, -1, -1, -1, -1, -1],
-    [1, 9, 6, 1, 6, 2, 9, 8, 6, 7, 6, 3, 8, 3, 6, -1],
-    [10, 1, 2, 6, 7, 8, 6, 8, 11, -1, -1, -1, -1, -1, -1, -1],
-    [1, 2, 10, 3, 0, 11, 0, 6, 11, 0, 8, 6, 6, 8, 7, -1],
-    [2, 10, 9, 2, 9, 1, 11, 6, 8, 6, 7, 8, -1, -1, -1, -1],
-    [11, 6, 8, 8, 6, 7, 10, 9, 2, 9, 1, 2, -1, -1, -1, -1],
-    [7, 2, 3, 7, 6, 2, 5, 10, 1, -1, -1, -1, -1, -1, -1, -1],
-    [8, 6, 7, 8, 0, 6, 0, 2, 6, 5, 10, 1, -1, -1, -1, -1],
-    [9, 0, 1, 5, 10, 6, 7, 6, 8, 8, 6, 2, 8, 2, 3, -1],
-    [9, 1, 2, 9, 2, 5, 5, 2, 6, 7, 6, 8, -1, -1, -1, -1],
-    [6, 3, 11, 6, 5, 3, 5, 1, 3, 7, 8, 4, -1, -1, -1, -1],
-    [6, 5, 1, 6, 1, 11, 4, 7, 1, 7, 3, 1, 4, 1, 0, -1],
-    [3, 11, 6, 3, 6, 0, 0, 6, 5, 0, 5, 9, 4, 7, 8, -1],
-    [11, 6, 5, 7, 11, 5, 4, 7, 5, 4, 5, 9, -1, -1, -1, -1],
-    [10, 4, 9, 10, 6, 4, 1, 2, 5, 2, 4, 5, 2, 3, 4, -1],
-    [8, 6, 4, 8, 2, 6, 8, 0, 2, 10, 6, 2, 9, 5, 1, -1],
-    [4, 0, 2, 4, 2, 6, 5, 10, 2, 5, 2, 3, 5, 3, 9, 3, 9, 0, -1],
-    [2, 3, 10, 10, 3, 5, 5, 3, 4, 4, 3, 8, 6, 4, 10, -1],
-    [9, 5, 4, 2, 3, 11, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-    [0, 11, 2, 0, 8, 11, 4, 9, 5, -1, -1, -1, -1, -1, -1, -1],
-    [0, 5, 4, 0, 1, 5, 2, 3, 11, -1, -1, -1, -1, -1, -1, -1],
-    [2, 1, 5, 2, 5, 8, 2, 8, 11, 4, 8, 5, -1, -1, -1, -1],
-    [3, 11, 10, 3, 10, 1, 11, 6, 10, 4, 9, 5, -1, -1, -1, -1],
-    [1, 0, 10, 10, 0, 8, 10, 8, 11, 11, 6, 10, 4, 9, 5, -1],
-    [4, 0, 10, 4, 10, 5, 0, 3, 10, 11, 10, 6, 3, 11, 10, -1],
-    [7, 6, 11, 4, 9, 5, 10, 5, 6, 6, 5, 11, 11, 5, 8, 8, 5, 4, -1],
-    [9, 6, 5, 9, 0, 6, 0, 7, 6, 0, 3, 7, -1, -1, -1, -1],
-    [1, 6, 5, 1, 3, 6, 3, 7, 6, 1, 0, 3, 8, 7, 4, -1],
-    [6, 5, 1, 6, 1, 7, 4, 7, 1, -1, -1, -1, -1, -1, -1, -1],
-    [9, 5, 4, 10, 1, 2, 7, 6, 11, 8, 3, 0, -1, -1, -1, -1],
-    [11, 7, 6, 10, 1, 2, 9, 5, 4, 0, 8, 3, -1, -1, -1, -1],
-    [6, 11, 7, 2, 10, 5, 2, 5, 3, 3, 5, 4, 3, 4, 8, -1],
-    [11, 7, 6, 10, 5, 2, 5, 4, 2, 4, 0, 2, -1, -1, -1, -1],
-    [5, 9, 4, 6, 11, 7, 1, 2, 10, -1, -1, -1, -1, -1, -1, -1],
-    [4, 5, 9, 7, 6, 11, 1, 2, 10, 0, 8, 3, -1, -1, -1, -1],
-    [7, 6, 11, 5, 9, 4, 2, 10, 3, 10, 8, 3, 10, 0, 8, -1],
-    [7, 6, 11, 4, 5, 9, 2, 10, 8, 2, 8, 0, -1, -1, -1, -1],
-    [6, 9, 5, 6, 11, 9, 11, 8, 9, 7, 6, 11, -1, -1, -1, -1],
-    [3, 6, 11, 0, 6, 3, 0, 5, 6, 0, 9, 5, 7, 6, 11, -1],
-    [0, 11, 8, 0, 5, 11, 0, 1, 5, 5, 6, 11, 7, 6, 11, -1],
-    [6, 11, 5, 6, 5, 7, 7, 5, 3, 3, 5, 1, -1, -1, -1, -1],
-    [1, 2, 10, 9, 5, 11, 9, 11, 8, 11, 5, 6, 7, 6, 11, -1],
-    [0, 9, 3, 9, 5, 3, 5, 6, 3, 11, 3, 6, 7, 6, 11, 1, 2, 10, -1],
-    [11, 8, 0, 11, 0, 6, 6, 0, 2, 5, 6, 10, 7, 6, 11, -1],
-    [6, 11, 3, 6, 3, 5, 2, 10, 3, 7, 6, 11, 10, 5, 3, 5, 3, 1, -1],
-    [1, 2, 6, 1, 6, 8, 1, 8, 9, 8, 6, 7, 11, 7, 6, -1],
-    [2, 6, 9, 2, 9, 1, 6, 7, 9, 0, 9, 3, 7, 3, 9, 11, 7, 6, -1],
-    [7, 6, 2, 7, 2, 3, 6, 7, 2, 8, 0, 2, 11, 7, 6, -1],
-    [7, 6, 2, 7, 2, 3, 11, 7, 6, -1, -1, -1, -1, -1, -1, -1],
-    [2, 3, 11, 10, 6, 7, 10, 7, 1, 1, 7, 8, 1, 8, 9, -1],
-    [1, 0, 10, 0, 8, 10, 8, 7, 10, 11, 7, 6, -1, -1, -1, -1],
-    [7, 6, 10, 7, 10, 8, 3, 11, 0, 11, 6, 0, 6, 10, 0, -1],
-    [7, 6, 10, 7, 10, 8, 11, 7, 6, 8, 10, 9, -1, -1, -1, -1],
-    [6, 8, 4, 11, 8, 6, 3, 1, 2, 1, 3, 7, 1, 7, 6, 7, 3, 8, -1],
-    [1, 2, 0, 2, 6, 0, 6, 4, 0, 7, 6, 11, -1, -1, -1, -1],
-    [8, 4, 6, 8, 6, 11, 9, 0, 6, 9, 6, 5, 0, 2, 6, 7, 6, 11, -1],
-    [7, 6, 11, 4, 5, 9, 2, 3, 6, 3, 7, 6, -1, -1, -1, -1],
-    [6, 9, 5, 6, 11, 9, 11, 8, 9, 7, 6, 11, -1, -1, -1, -1],
-    [3, 6, 11, 0, 6, 3, 0, 5, 6, 0, 9, 5, 7, 6, 11, -1],
-    [0, 11, 8, 0, 5, 11, 0, 1, 5, 5, 6, 11, 7, 6, 11, -1],
-    [6, 11, 3, 6, 3, 5, 5, 3, 1, 7, 6, 11, -1, -1, -1, -1],
-    [1, 2, 10, 9, 5, 11, 9, 11, 8, 11, 5, 6, 7, 6, 11, -1],
-    [0, 9, 3, 9, 5, 3, 5, 6, 3, 11, 3, 6, 7, 6, 11, 1, 2, 10, -1],
-    [6, 11, 8, 6, 8, 5, 5, 8, 0, 5, 0, 2, 5, 2, 10, 7, 6, 11, -1],
-    [7, 6, 11, 5, 6, 10, 3, 2, 5, 3, 5, 1, 2, 5, 10, -1],
-    [1, 2, 5, 5, 2, 6, 9, 1, 5, 8, 3, 7, -1, -1, -1, -1],
-    [1, 2, 5, 5, 2, 6, 3, 0, 8, -1, -1, -1, -1, -1, -1, -1],
-    [2, 5, 6, 2, 1, 5, 8, 0, 7, 0, 4, 7, -1, -1, -1, -1],
-    [6, 2, 5, 2, 1, 5, 7, 8, 3, 4, 7, 0, 0, 7, 2, -1],
-    [9, 5, 4, 10, 1, 6, 1, 7, 6, 1, 3, 7, -1, -1, -1, -1],
-    [1, 6, 10, 1, 7, 6, 1, 0, 7, 8, 7, 0, 9, 5, 4, -1],
-    [4, 0, 10, 4, 10, 5, 0, 3, 10, 6, 10, 7, 3, 7, 10, -1],
-    [7, 6, 10, 7, 10, 8, 5, 4, 10, 4, 8, 10, -1, -1, -1, -1],
-    [6, 9, 5, 6, 11, 9, 11, 8, 9, 7, 6, 11, -1, -1, -1, -1],
-    [3, 6, 11, 0, 6, 3, 0, 5, 6, 0, 9, 5, 7, 6, 11, -1],
-    [0, 11, 8, 0, 5, 11, 0, 1, 5, 5, 6, 11, 7, 6, 11, -1],
-    [6, 11, 3, 6, 3, 5, 5, 3, 1, 7, 6, 11, -1, -1, -1, -1],
-    [1, 2, 10, 9, 5, 11, 9, 11, 8, 11, 5, 6, 7, 6, 11, -1],
-    [0, 9, 3, 9, 5, 3, 5, 6, 3, 11, 3, 6, 7, 6, 11, 1, 2, 10, -1],
-    [11, 8, 0, 11, 0, 6, 6, 0, 2, 5, 6, 10, 7, 6, 11, -1],
-    [7, 6, 11, 5, 6, 10, 3, 2, 5, 3, 5, 1, 2, 5, 10, -1],
-    [6, 11, 7, 5, 6, 7, 5, 7, 4, 4, 7, 8, -1, -1, -1, -1],
-    [4, 3, 0, 4, 7, 3, 5, 6, 7, 5, 7, 4, -1, -1, -1, -1],
-    [6, 7, 8, 6, 8, 5, 5, 8, 0, 5, 0, 1, 4, 7, 6, -1],
-    [4, 7, 3, 4, 3, 5, 5, 3, 1, 6, 7, 5, -1, -1, -1, -1],
-    [6, 7, 8, 6, 8, 5, 2, 10, 1, 5, 8, 4, -1, -1, -1, -1],
-    [1, 2, 10, 3, 0, 8, 6, 7, 5, 7, 4, 5, -1, -1, -1, -1],
-    [5, 0, 2, 5, 2, 10, 4, 5, 0, 7, 8, 6, 8, 2, 6, -1],
-    [2, 10, 5, 2, 5, 3, 3, 5, 4, 3, 4, 7, 6, 7, 5, -1],
-    [7, 6, 11, 5, 4, 9, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-    [3, 0, 8, 5, 4, 9, 11, 7, 6, -1, -1, -1, -1, -1, -1, -1],
-    [0, 5, 4, 0, 1, 5, 11, 7, 6, -1, -1, -1, -1, -1, -1, -1],
-    [4, 9, 5, 3, 1, 8, 1, 6, 8, 1, 2, 6, 6, 7, 8, -1],
-    [2, 10, 1, 11, 7, 6, 9, 5, 4, -1, -1, -1, -1, -1, -1, -1],
-    [0, 8, 3, 1, 2, 10, 4, 9, 5, 11, 7, 6, -1, -1, -1, -1],
-    [7, 6, 11, 5, 4, 10, 4, 2, 10, 4, 0, 2, -1, -1, -1, -1],
-    [3, 4, 8, 3, 5, 4, 3, 2, 5, 10, 5, 2, 11, 7, 6, -1],
-    [7, 2, 3, 7, 6, 2, 5, 4, 9, -1, -1, -1, -1, -1, -1, -1],
-    [9, 5, 4, 0, 8, 6, 0, 6, 2, 6, 8, 7, -1, -1, -1, -1],
-    [3, 6, 2, 3, 7, 6, 1, 5, 0, 5, 4, 0, -1, -1, -1, -1],
-    [6, 2, 8, 6, 8, 7, 2, 1, 8, 4, 8, 5, 1, 5, 8, -1],
-    [9, 5, 4, 10, 1, 6, 1, 7, 6, 1, 3, 7, -1, -1, -1, -1],
-    [1, 6, 10, 1, 7, 6, 1, 0, 7, 8, 7, 0, 9, 5, 4, -1],
-    [4, 0, 10, 4, 10, 5, 0, 3, 10, 6, 10, 7, 3, 7, 10, -1],
-    [7, 6, 10, 7, 10, 8, 5, 4, 10, 4, 8, 10, -1, -1, -1, -1],
-    [6, 9, 5, 6, 11, 9, 11, 8, 9, 7, 6, 11, -1, -1, -1, -1],
-    [3, 6, 11, 0, 6, 3, 0, 5, 6, 0, 9, 5, 7, 6, 11, -1],
-    [0, 11, 8, 0, 5, 11, 0, 1, 5, 5, 6, 11, 7, 6, 11, -1],
-    [6, 11, 3, 6, 3, 5, 5, 3, 1, 7, 6, 11, -1, -1, -1, -1],
-    [1, 2, 10, 9, 5, 11, 9, 11, 8, 11, 5, 6, 7, 6, 11, -1],
-    [0, 9, 3, 9, 5, 3, 5, 6, 3, 11, 3, 6, 7, 6, 11, 1, 2, 10, -1],
-    [6, 11, 8, 6, 8, 5, 5, 8, 0, 5, 0, 2, 5, 2, 10, 7, 6, 11, -1],
-    [7, 6, 11, 5, 6, 10, 3, 2, 5, 3, 5, 1, 2, 5, 10, -1],
-    [7, 6, 11, 5, 4, 9, 4, 8, 9, 3, 0, 1, 1, 2, 10, -1],
-    [7, 6, 11, 5, 4, 9, 1, 2, 10, 3, 0, 8, -1, -1, -1, -1],
-    [0, 2, 4, 4, 2, 6, 4, 6, 5, 6, 2, 10, 7, 6, 11, -1],
-    [6, 5, 4, 6, 4, 2, 11, 7, 6, 3, 2, 8, 2, 4, 8, -1],
-    [9, 5, 4, 7, 6, 11, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-    [9, 5, 4, 7, 6, 11, 0, 8, 3, -1, -1, -1, -1, -1, -1, -1],
-    [0, 5, 4, 0, 1, 5, 6, 11, 7, -1, -1, -1, -1, -1, -1, -1],
-    [11, 7, 6, 8, 3, 1, 8, 1, 4, 4, 1, 5, -1, -1, -1, -1],
-    [4, 9, 5, 10, 1, 2, 7, 6, 11, -1, -1, -1, -1, -1, -1, -1],
-    [0, 8, 3, 1, 2, 10, 4, 9, 5, 11, 7, 6, -1, -1, -1, -1],
-    [6, 11, 7, 5, 4, 10, 4, 2, 10, 4, 0, 2, -1, -1, -1, -1],
-    [3, 4, 8, 3, 5, 4, 3, 2, 5, 10, 5, 2, 11, 7, 6, -1],
-    [7, 2, 3, 7, 6, 2, 5, 4, 9, -1, -1, -1, -1, -1, -1, -1],
-    [9, 5, 4, 0, 8, 6, 0, 6, 2, 6, 8, 7, -1, -1, -1, -1],
-    [3, 6, 2, 3, 7, 6, 1, 5, 0, 5, 4, 0, -1, -1, -1, -1],
-    [6, 2, 8, 6, 8, 7, 2, 1, 8, 4, 8, 5, 1, 5, 8, -1],
-    [9, 5, 4, 10, 1, 6, 1, 7, 6, 1, 3, 7, -1, -1, -1, -1],
-    [1, 6, 10, 1, 7, 6, 1, 0, 7, 8, 7, 0, 9, 5, 4, -1],
-    [4, 0, 10, 4, 10, 5, 0, 3, 10, 6, 10, 7, 3, 7, 10, -1],
-    [7, 6, 10, 7, 10, 8, 5, 4, 10, 4, 8, 10, -1, -1, -1, -1],
-    [6, 9, 5, 6, 11, 9, 11, 8, 9, 7, 6, 11, -1, -1, -1, -1],
-    [3, 6, 11, 0, 6, 3, 0, 5, 6, 0, 9, 5, 7, 6, 11, -1],
-    [0, 11, 8, 0, 5, 11, 0, 1, 5, 5, 6, 11, 7, 6, 11, -1],
-    [6, 11, 3, 6, 3, 5, 5, 3, 1, 7, 6, 11, -1, -1, -1, -1],
-    [1, 2, 10, 9, 5, 11, 9, 11, 8, 11, 5, 6, 7, 6, 11, -1],
-    [0, 9, 3, 9, 5, 3, 5, 6, 3, 11, 3, 6, 7, 6, 11, 1, 2, 10, -1],
-    [6, 11, 8, 6, 8, 5, 5, 8, 0, 5, 0, 2, 5, 2, 10, 7, 6, 11, -1],
-    [6, 11, 3, 6, 3, 5, 2, 10, 3, 7, 6, 11, 10, 5, 3, 5, 3, 1, -1],
-    [2, 3, 8, 2, 8, 6, 6, 8, 7, 6, 7, 11, -1, -1, -1, -1],
-    [2, 0, 6, 6, 0, 7, 0, 8, 7, 6, 7, 11, -1, -1, -1, -1],
-    [1, 9, 0, 2, 3, 6, 3, 7, 6, 3, 8, 7, 6, 7, 11, -1],
-    [1, 9, 8, 1, 8, 2, 2, 8, 7, 2, 7, 6, 6, 7, 11, -1],
-    [10, 1, 2, 6, 7, 11, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-    [10, 1, 2, 11, 6, 7, 8, 3, 0, -1, -1, -1, -1, -1, -1, -1],
-    [0, 2, 9, 2, 10, 9, 6, 7, 11, -1, -1, -1, -1, -1, -1, -1],
-    [11, 6, 7, 2, 10, 3, 10, 8, 3, 10, 9, 8, -1, -1, -1, -1],
-    [7, 6, 3, 3, 6, 2, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
-    [7, 6, 3, 3, 6, 2, 8, 3, 0, -1, -1, -1, -1, -1, -1, -1],
-    [0, 2, 9, 2, 6, 9, 6, 7, 9, 7, 8, 9, -1, -1, -1, -1],
-    [2, 6, 7, 2, 7, 3, 4, 9, 5, -1, -1, -1, -1, -1, -1, -1],
-    [4, 9, 5, 8, 3, 0, 6, 7, 2, 7, 3, 2, -1, -1, -1, -1],
-    [7, 2, 6, 7, 3, 2, 5, 4, 9, 8, 3, 0, -1, -1, -1, -1],
-    [7, 2, 6, 7, 3, 2, 5, 4, 9, -1, -1, -1, -1, -1, -1, -1],
-    [3, 11, 2, 7, 6, 8, 6, 4, 8, 6, 5, 4, 10, 1, 2, -1],
-    [1, 2, 10, 3, 0, 8, 6, 5, 7, 5, 4, 7, 6, 7, 11, -1],
-    [4, 8, 5, 5, 8, 6, 8, 11, 6, 2, 10, 9, 2, 9, 0, -1],
-    [11, 6, 7, 10, 5, 2, 5, 4, 2, 4, 0, 2, -1, -1, -1, -1],
-    [6, 7, 11, 5, 4, 9, 2, 10, 1, -1, -1, -1, -1, -1, -1, -1],
-    [4, 9, 5, 11, 6, 7, 10, 1, 2, 3, 0, 8, -1, -1, -1, -1],
-    [2, 10, 5, 2, 5, 0, 0, 5, 4, 6, 7, 11, -1, -1, -1, -1],
-    [11, 6, 7, 2, 10, 3, 10, 8, 3, 10, 5, 8, 5, 4, 8, -1],
-    [7, 11, 6, 8, 4, 7, 9, 5, 4, 10, 1, 2, -1, -1, -1, -1],
-    [9, 5, 4, 10, 1, 2, 0, 8, 3, 7, 11, 6, -1, -1, -1, -1],
-    [0, 2, 5, 0, 5, 9, 2, 10, 5, 8, 4, 7, 11, 6, 7, -1],
-    [6, 7, 11, 2, 10, 5, 2, 5, 3, 3, 5, 4, 3, 4, 8, -1],
-    [9, 5, 4, 7, 11, 6, 10, 1, 2, -1, -1, -1, -1, -1, -1, -1],
-    [6, 7, 11, 5, 4, 9, 3, 0, 8, 1, 2, 10, -1, -1, -1, -1],
-    [7, 11, 6, 8, 4, 7, 0, 2, 10, 0, 10, 5, 0, 5, 9, -1],
-    [6, 7, 11, 8, 4, 7, 2, 10, 5, 2, 5, 3, 3, 5, 4, -1],
-    [6, 7, 11, 10, 1, 2, 5, 4, 9, 8, 3, 0, -1, -1, -1, -1],
-    [6, 7, 11, 5, 4, 9, 10, 1, 2, 0, 8, 3, -1, -1, -1, -1],
-    [5, 4, 9, 6, 7, 11, 0, 2, 10, 0, 10, 5, 0, 5, 9, 8, 4, 7, -1],
-    [11, 6, 7, 10, 5, 2, 5, 4, 2, 4, 0, 2, -1, -1, -1, -1],
-    [6, 7, 11, 5, 4, 9, 2, 10, 1, -1, -1, -1, -1, -1, -1, -1],
-    [6, 7, 11, 5, 4, 9, 1, 2, 10, 0, 8, 3, -1, -1, -1, -1],
-    [6, 7, 11, 4, 0, 2, 4, 2, 5, 5, 2, 10, -1, -1, -1, -1],
-    [6, 7, 11, 4, 8, 3, 4, 3, 5, 5, 3, 2, 5, 2, 10, -1],
-    [9, 5, 4, 10, 1, 2, 7, 11, 6, -1, -1, -1, -1, -1, -1, -1],
-    [6, 7, 11, 5, 4, 9, 1, 2, 10, 3, 0, 8, -1, -1, -1, -1],
-    [6, 7, 11, 5, 4, 0, 5, 0, 10, 10, 0, 2, -1, -1, -1, -1],
-    [6, 7, 11, 5, 4, 8, 5, 8, 10, 10, 8, 2, 2, 8, 3, -1],
-    [6, 7, 11, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [2, 3, 8, 2, 8, 9, 2, 9, 5, 2, 5, 6, -1, -1, -1, -1],
+    [9, 5, 6, 9, 6, 2, 9, 2, 0, -1, -1, -1, -1, -1, -1, -1],
+    [5, 6, 2, 5, 2, 3, 5, 3, 8, 5, 8, 0, 5, 0, 1, -1],
+    [5, 6, 2, 5, 2, 1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [3, 8, 9, 3, 9, 5, 3, 5, 6, 3, 6, 10, 3, 10, 1, -1],
+    [6, 10, 1, 6, 1, 0, 6, 0, 9, 6, 9, 5, -1, -1, -1, -1],
+    [0, 3, 8, 5, 6, 10, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [5, 6, 10, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [10, 11, 7, 10, 7, 5, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [8, 3, 0, 10, 11, 7, 10, 7, 5, -1, -1, -1, -1, -1, -1, -1],
+    [0, 1, 9, 10, 11, 7, 10, 7, 5, -1, -1, -1, -1, -1, -1, -1],
+    [9, 8, 3, 9, 3, 1, 10, 11, 7, 10, 7, 5, -1, -1, -1, -1],
+    [1, 2, 11, 1, 11, 7, 1, 7, 5, -1, -1, -1, -1, -1, -1, -1],
+    [8, 3, 0, 1, 2, 11, 1, 11, 7, 1, 7, 5, -1, -1, -1, -1],
+    [0, 2, 11, 0, 11, 7, 0, 7, 5, 0, 5, 9, -1, -1, -1, -1],
+    [5, 9, 8, 5, 8, 3, 5, 3, 2, 5, 2, 11, 5, 11, 7, -1],
+    [2, 3, 7, 2, 7, 5, 2, 5, 10, -1, -1, -1, -1, -1, -1, -1],
+    [8, 7, 5, 8, 5, 10, 8, 10, 2, 8, 2, 0, -1, -1, -1, -1],
+    [0, 1, 9, 2, 3, 7, 2, 7, 5, 2, 5, 10, -1, -1, -1, -1],
+    [8, 7, 5, 8, 5, 10, 8, 10, 2, 8, 2, 1, 8, 1, 9, -1],
+    [1, 3, 7, 1, 7, 5, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [8, 7, 5, 8, 5, 1, 8, 1, 0, -1, -1, -1, -1, -1, -1, -1],
+    [0, 3, 7, 0, 7, 5, 0, 5, 9, -1, -1, -1, -1, -1, -1, -1],
+    [9, 8, 7, 9, 7, 5, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [4, 5, 10, 4, 10, 11, 4, 11, 8, -1, -1, -1, -1, -1, -1, -1],
+    [4, 5, 10, 4, 10, 11, 4, 11, 3, 4, 3, 0, -1, -1, -1, -1],
+    [0, 1, 9, 4, 5, 10, 4, 10, 11, 4, 11, 8, -1, -1, -1, -1],
+    [4, 5, 10, 4, 10, 11, 4, 11, 3, 4, 3, 1, 4, 1, 9, -1],
+    [1, 2, 11, 1, 11, 8, 1, 8, 4, 1, 4, 5, -1, -1, -1, -1],
+    [4, 5, 1, 4, 1, 2, 4, 2, 11, 4, 11, 3, 4, 3, 0, -1],
+    [2, 11, 8, 2, 8, 4, 2, 4, 5, 2, 5, 9, 2, 9, 0, -1],
+    [11, 3, 2, 4, 5, 9, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [2, 3, 8, 2, 8, 4, 2, 4, 5, 2, 5, 10, -1, -1, -1, -1],
+    [4, 5, 10, 4, 10, 2, 4, 2, 0, -1, -1, -1, -1, -1, -1, -1],
+    [0, 1, 9, 2, 3, 8, 2, 8, 4, 2, 4, 5, 2, 5, 10, -1],
+    [4, 5, 10, 4, 10, 2, 4, 2, 1, 4, 1, 9, -1, -1, -1, -1],
+    [1, 3, 8, 1, 8, 4, 1, 4, 5, -1, -1, -1, -1, -1, -1, -1],
+    [4, 5, 1, 4, 1, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [3, 8, 4, 3, 4, 5, 3, 5, 9, 3, 9, 0, -1, -1, -1, -1],
+    [4, 5, 9, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [9, 10, 11, 9, 11, 7, 9, 7, 4, -1, -1, -1, -1, -1, -1, -1],
+    [8, 3, 0, 9, 10, 11, 9, 11, 7, 9, 7, 4, -1, -1, -1, -1],
+    [0, 1, 10, 0, 10, 11, 0, 11, 7, 0, 7, 4, -1, -1, -1, -1],
+    [10, 11, 7, 10, 7, 4, 10, 4, 8, 10, 8, 3, 10, 3, 1, -1],
+    [1, 2, 11, 1, 11, 7, 1, 7, 4, 1, 4, 9, -1, -1, -1, -1],
+    [8, 3, 0, 1, 2, 11, 1, 11, 7, 1, 7, 4, 1, 4, 9, -1],
+    [0, 2, 11, 0, 11, 7, 0, 7, 4, -1, -1, -1, -1, -1, -1, -1],
+    [4, 8, 3, 4, 3, 2, 4, 2, 11, 4, 11, 7, -1, -1, -1, -1],
+    [2, 3, 7, 2, 7, 4, 2, 4, 9, 2, 9, 10, -1, -1, -1, -1],
+    [7, 4, 9, 7, 9, 10, 7, 10, 2, 7, 2, 0, 7, 0, 8, -1],
+    [10, 2, 3, 10, 3, 7, 10, 7, 4, 10, 4, 0, 10, 0, 1, -1],
+    [10, 2, 1, 8, 7, 4, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [1, 3, 7, 1, 7, 4, 1, 4, 9, -1, -1, -1, -1, -1, -1, -1],
+    [7, 4, 9, 7, 9, 1, 7, 1, 0, 7, 0, 8, -1, -1, -1, -1],
+    [0, 3, 7, 0, 7, 4, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [8, 7, 4, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [8, 9, 10, 8, 10, 11, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [9, 10, 11, 9, 11, 3, 9, 3, 0, -1, -1, -1, -1, -1, -1, -1],
+    [0, 1, 10, 0, 10, 11, 0, 11, 8, -1, -1, -1, -1, -1, -1, -1],
+    [10, 11, 3, 10, 3, 1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [1, 2, 11, 1, 11, 8, 1, 8, 9, -1, -1, -1, -1, -1, -1, -1],
+    [9, 1, 2, 9, 2, 11, 9, 11, 3, 9, 3, 0, -1, -1, -1, -1],
+    [0, 2, 11, 0, 11, 8, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [11, 3, 2, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [2, 3, 8, 2, 8, 9, 2, 9, 10, -1, -1, -1, -1, -1, -1, -1],
+    [9, 10, 2, 9, 2, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [10, 2, 3, 10, 3, 8, 10, 8, 0, 10, 0, 1, -1, -1, -1, -1],
+    [10, 2, 1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [1, 3, 8, 1, 8, 9, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [9, 1, 0, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [0, 3, 8, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
+    [-1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1, -1],
 ]
-
-# Normaliza y recorta la tabla a 256 filas con 16 columnas (relleno con -1).
-_RAW_TRI_TABLE = TRI_TABLE
-
-
-def _normalize_row(row):
-    trimmed = []
-    for value in row:
-        if value == -1:
-            break
-        trimmed.append(value)
-    trimmed = trimmed[:15]  # Máx. 5 triángulos -> 15 índices
-    return trimmed + [-1] * (16 - len(trimmed))
-
-
-TRI_TABLE = [_normalize_row(row) for row in _RAW_TRI_TABLE[:256]]
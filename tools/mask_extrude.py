@@ -0,0 +1,909 @@
+"""
+Extrusión directa de máscaras 2D a prismas cerrados.
+
+Mallar una máscara 2D apilándola en un volumen de dos cortes y pasando Marching
+Cubes 3D genera muchos triángulos y paredes pobres. Aquí se trabaja en 2D:
+
+1. ``marching_squares``: contornos con un vértice por arista cruzada del grid
+   (misma regla de ambigüedad que ``marching_cubes``: se separan las esquinas
+   por debajo del iso), con rutas NumPy y Numba como allí.
+2. ``simplify_ring``: Douglas-Peucker sobre cada anillo cerrado. Los anillos
+   que al simplificarse cambian de sentido, cortan a otro o rompen el anidado
+   se quedan sin simplificar.
+3. ``triangulate_polygon``: tapas por barrido en Y (búsqueda binaria en la
+   lista de aristas activas): diagonales que parten la región en trozos
+   monótonos (de Berg et al., cap. 3) y triangulación lineal de cada trozo. Los agujeros entran en el mismo barrido,
+   sin puentes, así que todos los anillos de la máscara se triangulan juntos; el
+   mismo barrido detecta los cruces entre aristas vecinas (Shamos-Hoey).
+4. ``extrude_mask``: paredes con un quad por segmento y tapas arriba/abajo que
+   comparten vértices con las paredes, así que el prisma es estanco.
+
+Los contornos dejan el interior (``valor >= iso``) a la izquierda: los
+exteriores quedan en sentido antihorario y los agujeros en horario.
+
+Los recorridos por celda o por vértice (marching squares, encadenado,
+Douglas-Peucker, barrido y triangulación) son núcleos sobre arrays que se
+compilan con Numba si está instalado (``pip install .[jit]``); sin Numba corren
+en Python puro y ``marching_squares`` usa su ruta NumPy.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .marching_cubes import MarchingCubesResult, resolve_backend
+
+try:  # Acelerador opcional: sin Numba los núcleos corren en Python.
+    import numba
+except ImportError:  # pragma: no cover - depende del entorno
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+# Cuadrado unidad: esquinas en sentido antihorario y aristas (esquina a, esquina b).
+_SQUARE_CORNERS = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.int64)
+_SQUARE_EDGES = ((0, 1), (1, 2), (3, 2), (0, 3))
+# Por arista: esquina menor y eje que recorre (0 = x, 1 = y).
+_EDGE_ORIGIN = np.array([_SQUARE_CORNERS[a] for a, _ in _SQUARE_EDGES], dtype=np.int64)
+_EDGE_AXIS = np.array([0, 1, 0, 1], dtype=np.int64)
+# Tolerancia mínima de Douglas-Peucker: con 0 solo se quitan los puntos colineales.
+_MIN_TOLERANCE = 1e-9
+
+
+def _segment_table() -> np.ndarray:
+    """Segmentos orientados por caso (16, 4): pares de aristas, ``-1`` de relleno."""
+    table = np.full((16, 4), -1, dtype=np.int64)
+    mids = (_SQUARE_CORNERS[[a for a, _ in _SQUARE_EDGES]] + _SQUARE_CORNERS[[b for _, b in _SQUARE_EDGES]]) / 2.0
+    for case in range(16):
+        below = [(case >> c) & 1 for c in range(4)]
+        crossed = [e for e, (a, b) in enumerate(_SQUARE_EDGES) if below[a] != below[b]]
+        if len(crossed) == 2:
+            pairs = [tuple(crossed)]
+        elif len(crossed) == 4:
+            # Silla: cada esquina por debajo del iso queda aislada por su propio segmento.
+            pairs = [(e, f) for c in range(4) if below[c] for e in range(4) for f in range(e + 1, 4)
+                     if c in _SQUARE_EDGES[e] and c in _SQUARE_EDGES[f]]
+        else:
+            pairs = []
+        for slot, (e, f) in enumerate(pairs):
+            # El interior (esquinas no marcadas) debe quedar a la izquierda de e → f.
+            inward = np.zeros(2)
+            for edge in (e, f):
+                a, b = _SQUARE_EDGES[edge]
+                inside = b if below[a] else a
+                inward += _SQUARE_CORNERS[inside] - mids[edge]
+            d = mids[f] - mids[e]
+            if d[0] * inward[1] - d[1] * inward[0] < 0:
+                e, f = f, e
+            table[case, 2 * slot : 2 * slot + 2] = (e, f)
+    return table
+
+
+_SEGMENTS = _segment_table()
+_SEGMENT_COUNT = (_SEGMENTS >= 0).sum(axis=1) // 2
+
+
+@dataclass
+class ExtrudeReport:
+    """Resumen de la extrusión."""
+
+    rings: int
+    holes: int
+    contour_points: int
+    simplified_points: int
+    vertices: int
+    faces: int
+    simplify_fallbacks: int = 0
+
+
+class _TangledRings(ValueError):
+    """Anillos que se cruzan o quedan mal anidados; ``vertices`` señala dónde."""
+
+    def __init__(self, vertices: Sequence[int]) -> None:
+        super().__init__("Los anillos del contorno se cruzan o están mal anidados.")
+        self.vertices = [int(v) for v in vertices if v >= 0]
+
+
+def _orient(ax, ay, bx, by, cx, cy):
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _marching_squares_numpy(grid: np.ndarray, iso: np.float32) -> Tuple[np.ndarray, np.ndarray]:
+    h, w = grid.shape
+    below = grid < iso
+    cases = np.zeros((h - 1, w - 1), dtype=np.uint8)
+    for bit, (dx, dy) in enumerate(_SQUARE_CORNERS):
+        cases |= below[dx : dx + h - 1, dy : dy + w - 1].astype(np.uint8) << np.uint8(bit)
+
+    ids, points = [], []
+    for axis in range(2):
+        lo = [slice(None)] * 2
+        hi = [slice(None)] * 2
+        lo[axis], hi[axis] = slice(0, -1), slice(1, None)
+        crossing = np.nonzero(below[tuple(lo)] != below[tuple(hi)])
+        upper = list(crossing)
+        upper[axis] = upper[axis] + 1
+        v1 = grid[crossing].astype(np.float64)
+        v2 = grid[tuple(upper)].astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mu = np.clip(np.where(np.abs(v2 - v1) < 1e-12, 0.5, (float(iso) - v1) / (v2 - v1)), 0.0, 1.0)
+        coords = np.stack(crossing, axis=1).astype(np.float64)
+        coords[:, axis] += mu
+        points.append(coords)
+        ids.append(axis * grid.size + np.ravel_multi_index(crossing, grid.shape))
+    edge_ids = np.concatenate(ids)
+    if not len(edge_ids):
+        return np.empty((0, 2)), np.empty((0, 2), dtype=np.int64)
+
+    flat = cases.ravel()
+    rows = _SEGMENTS[flat]
+    cell, slot = np.nonzero(rows >= 0)
+    edges = rows[cell, slot]
+    ci, cj = np.unravel_index(cell, cases.shape)
+    origin = _EDGE_ORIGIN[edges]
+    linear = (ci + origin[:, 0]) * w + (cj + origin[:, 1])
+    segments = np.searchsorted(edge_ids, _EDGE_AXIS[edges] * grid.size + linear).reshape(-1, 2)
+    return np.concatenate(points), segments
+
+
+def _square_fraction(v1, v2, iso64):
+    """Cruce relativo en una arista, igual que la ruta NumPy."""
+    mu = 0.5 if abs(v2 - v1) < 1e-12 else (iso64 - v1) / (v2 - v1)
+    return min(max(mu, 0.0), 1.0)
+
+
+def _count_squares(grid, iso, segment_count):
+    """Primera pasada: aristas cruzadas en X, en Y y número de segmentos."""
+    h, w = grid.shape
+    across = along = found = 0
+    for i in range(h - 1):
+        # Esquinas izquierdas de la celda (i, j), arrastradas desde la anterior.
+        top, bottom = grid[i, 0] < iso, grid[i + 1, 0] < iso
+        for j in range(w - 1):
+            right_top, right_bottom = grid[i, j + 1] < iso, grid[i + 1, j + 1] < iso
+            across += top != bottom
+            along += top != right_top
+            found += segment_count[top | bottom << 1 | right_bottom << 2 | right_top << 3]
+            top, bottom = right_top, right_bottom
+        across += top != bottom
+    for j in range(w - 1):
+        along += (grid[h - 1, j] < iso) != (grid[h - 1, j + 1] < iso)
+    return np.array([across, along, found], dtype=np.int64)
+
+
+def _fill_squares(grid, iso, iso64, counts, table, points, segments):
+    """
+    Segunda pasada: puntos y segmentos por filas.
+
+    Los puntos salen en el orden de la ruta NumPy (aristas en X y luego en Y,
+    por fila y columna); ``across`` guarda los índices de las aristas en X de la
+    fila y ``along`` los de las aristas en Y de las dos filas de la celda.
+    """
+    h, w = grid.shape
+    across = np.empty(w, dtype=np.int64)
+    along = np.empty((2, w), dtype=np.int64)
+    cursor_x, cursor_y = 0, counts[0]
+    for j in range(w - 1):
+        if (grid[0, j] < iso) != (grid[0, j + 1] < iso):
+            points[cursor_y, 0] = 0.0
+            points[cursor_y, 1] = j + _square_fraction(np.float64(grid[0, j]), np.float64(grid[0, j + 1]), iso64)
+            along[0, j] = cursor_y
+            cursor_y += 1
+    slot = 0
+    for i in range(h - 1):
+        upper, lower = along[i % 2], along[(i + 1) % 2]
+        v_top, v_bottom = grid[i, 0], grid[i + 1, 0]
+        top, bottom = v_top < iso, v_bottom < iso
+        if top != bottom:
+            points[cursor_x, 0] = i + _square_fraction(np.float64(v_top), np.float64(v_bottom), iso64)
+            points[cursor_x, 1] = 0.0
+            across[0] = cursor_x
+            cursor_x += 1
+        for j in range(w - 1):
+            v_right_top, v_right_bottom = grid[i, j + 1], grid[i + 1, j + 1]
+            right_top, right_bottom = v_right_top < iso, v_right_bottom < iso
+            case = top | bottom << 1 | right_bottom << 2 | right_top << 3
+            if bottom != right_bottom:
+                points[cursor_y, 0] = i + 1
+                points[cursor_y, 1] = j + _square_fraction(np.float64(v_bottom), np.float64(v_right_bottom), iso64)
+                lower[j] = cursor_y
+                cursor_y += 1
+            if right_top != right_bottom:
+                points[cursor_x, 0] = i + _square_fraction(np.float64(v_right_top), np.float64(v_right_bottom), iso64)
+                points[cursor_x, 1] = j + 1
+                across[j + 1] = cursor_x
+                cursor_x += 1
+            for t in range(4):
+                e = table[case, t]
+                if e < 0:
+                    break
+                if e == 0:
+                    index = across[j]
+                elif e == 1:
+                    index = lower[j]
+                elif e == 2:
+                    index = across[j + 1]
+                else:
+                    index = upper[j]
+                segments[slot // 2, slot % 2] = index
+                slot += 1
+            v_top, v_bottom, top, bottom = v_right_top, v_right_bottom, right_top, right_bottom
+
+
+def _marching_squares_kernel(grid: np.ndarray, iso: np.float32) -> Tuple[np.ndarray, np.ndarray]:
+    counts = _count_squares(grid, iso, _SEGMENT_COUNT)
+    points = np.empty((int(counts[0] + counts[1]), 2), dtype=np.float64)
+    segments = np.empty((int(counts[2]), 2), dtype=np.int64)
+    if len(points):
+        _fill_squares(grid, iso, float(iso), counts, _SEGMENTS, points, segments)
+    return points, segments
+
+
+def marching_squares(grid: np.ndarray, iso_level: float = 0.5, backend: str = "auto") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Contornos de ``grid`` (2D) como segmentos orientados.
+
+    ``backend`` (``auto``, ``numpy`` o ``numba``) elige la ruta como en
+    ``marching_cubes``; las dos devuelven los mismos arrays.
+
+    Returns:
+        ``(points, segments)``: puntos (V, 2) en coordenadas de píxel y
+        segmentos (S, 2) de índices, con el interior a la izquierda.
+    """
+    grid = np.ascontiguousarray(grid, dtype=np.float32)
+    if grid.ndim != 2:
+        raise ValueError(f"Se esperaba una máscara 2D, se recibió {grid.ndim}D.")
+    h, w = grid.shape
+    if h < 2 or w < 2:
+        return np.empty((0, 2)), np.empty((0, 2), dtype=np.int64)
+    iso = np.float32(iso_level)
+    if resolve_backend(backend) == "numba":
+        return _marching_squares_kernel(grid, iso)
+    return _marching_squares_numpy(grid, iso)
+
+
+def _chain_kernel(following):
+    """Recorre los ciclos de ``following``: índices encadenados y comienzo de cada anillo."""
+    n = following.shape[0]
+    visited = np.zeros(n, dtype=np.bool_)
+    order = np.empty(n, dtype=np.int64)
+    starts = np.empty(n + 1, dtype=np.int64)
+    count = 0
+    rings = 0
+    for start in range(n):
+        if following[start] < 0 or visited[start]:
+            continue
+        starts[rings] = count
+        rings += 1
+        current = start
+        while True:
+            visited[current] = True
+            order[count] = current
+            count += 1
+            current = following[current]
+            if current == start:
+                break
+            if current < 0 or visited[current]:
+                raise ValueError("Contorno abierto: la máscara debe estar rodeada de fondo.")
+    starts[rings] = count
+    return order[:count], starts[: rings + 1]
+
+
+def _douglas_peucker_span(x, y, start, n, first, last, tolerance, keep, stack):
+    """Douglas-Peucker entre las posiciones ``first`` y ``last`` (módulo ``n``) del anillo en ``start``."""
+    keep[start + first % n] = True
+    keep[start + last % n] = True
+    stack[0, 0], stack[0, 1] = first, last
+    depth = 1
+    while depth:
+        depth -= 1
+        lo, hi = stack[depth, 0], stack[depth, 1]
+        if hi - lo < 2:
+            continue
+        a, b = start + lo % n, start + hi % n
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        # Distancias al cuadrado (la de la recta, escalada por su longitud al cuadrado).
+        length = dx * dx + dy * dy
+        if length < 1e-24:
+            length = 0.0
+        worst, dist = -1, -1.0
+        for p in range(lo + 1, hi):
+            i = start + p  # ``p < hi <= n``: solo los extremos dan la vuelta
+            if length == 0.0:
+                d = (x[i] - x[a]) ** 2 + (y[i] - y[a]) ** 2
+            else:
+                d = (dx * (y[i] - y[a]) - dy * (x[i] - x[a])) ** 2
+            if d > dist:
+                worst, dist = p, d
+        if dist > tolerance * tolerance * (length if length > 0.0 else 1.0):
+            keep[start + worst] = True
+            stack[depth, 0], stack[depth, 1] = lo, worst
+            stack[depth + 1, 0], stack[depth + 1, 1] = worst, hi
+            depth += 2
+
+
+def _simplify_kernel(x, y, starts, tolerance):
+    """
+    Máscara de puntos conservados por anillo (coordenadas ya en orden de anillo).
+
+    Cada anillo se parte en el punto más lejano al primero y cada mitad se
+    simplifica por separado; si quedan menos de 3 puntos se conservan todos.
+    """
+    total = x.shape[0]
+    keep = np.zeros(total, dtype=np.bool_)
+    stack = np.empty((total + 2, 2), dtype=np.int64)
+    for r in range(starts.shape[0] - 1):
+        start, n = starts[r], starts[r + 1] - starts[r]
+        if n <= 3:
+            keep[start : start + n] = True
+            continue
+        far, best = 0, -1.0
+        for i in range(n):
+            d = (x[start + i] - x[start]) ** 2 + (y[start + i] - y[start]) ** 2
+            if d > best:
+                far, best = i, d
+        _douglas_peucker_span(x, y, start, n, 0, far, tolerance, keep, stack)
+        _douglas_peucker_span(x, y, start, n, far, n, tolerance, keep, stack)
+        if keep[start : start + n].sum() < 3:
+            keep[start : start + n] = True
+    return keep
+
+
+def _break_ties(x, y, order):
+    """Ordena por X cada tramo de ``order`` (ya por Y descendente) con la misma Y."""
+    n = order.shape[0]
+    i = 0
+    while i < n:
+        j = i + 1
+        while j < n and y[order[j]] == y[order[i]]:
+            j += 1
+        if j - i > 32:
+            run = order[i:j].copy()
+            order[i:j] = run[np.argsort(x[run], kind="mergesort")]
+        else:
+            for k in range(i + 1, j):
+                v = order[k]
+                m = k
+                while m > i and x[order[m - 1]] > x[v]:
+                    order[m] = order[m - 1]
+                    m -= 1
+                order[m] = v
+        i = j
+
+
+def _segments_cross(ax, ay, bx, by, cx, cy, dx, dy):
+    """Si los segmentos ``ab`` y ``cd`` se cortan o se tocan."""
+    o1 = _orient(ax, ay, bx, by, cx, cy)
+    o2 = _orient(ax, ay, bx, by, dx, dy)
+    o3 = _orient(cx, cy, dx, dy, ax, ay)
+    o4 = _orient(cx, cy, dx, dy, bx, by)
+    if o1 == 0 and o2 == 0:
+        # Colineales: solo si sus cajas se solapan.
+        return (
+            min(ax, bx) <= max(cx, dx) and min(cx, dx) <= max(ax, bx)
+            and min(ay, by) <= max(cy, dy) and min(cy, dy) <= max(ay, by)
+        )
+    return o1 * o2 <= 0 and o3 * o4 <= 0
+
+
+def _sweep_kernel(x, y, nxt, prv, rank, events):
+    """
+    Diagonales que parten los anillos en trozos monótonos en Y.
+
+    Barrido de arriba abajo (``rank``: Y descendente y X ascendente). ``status``
+    guarda, de izquierda a derecha, las aristas que cortan la línea de barrido
+    (la arista ``e`` va de ``e`` a ``nxt[e]``) y ``span`` sus extremos de arriba
+    abajo; las que bajan tienen el interior a su derecha y llevan un ayudante.
+    Como en Shamos-Hoey, cada par de aristas que pasa a ser vecino en ``status``
+    se prueba por si se cortan.
+
+    Cada caso solo anota qué desplazar, qué aristas poner y qué pares probar, y
+    eso se aplica al final del evento en línea: pasar arrays a funciones
+    compiladas cuesta más que el trabajo de cada evento.
+
+    Devuelve ``(diagonales, fallos)``: ``fallos`` son vértices de anillos que se
+    cruzan (el barrido sigue para encontrar más) o, si no hay cruces, del primer
+    punto donde el anidado no cuadra y de sus vecinos en ``status`` (ahí se para).
+    """
+    n = x.shape[0]
+    status = np.empty(n + 2, dtype=np.int64)
+    span = np.empty((n + 2, 4), dtype=np.float64)
+    helper = np.arange(n)
+    merge = np.zeros(n, dtype=np.bool_)
+    diagonals = np.empty((2 * n, 2), dtype=np.int64)
+    faults = np.empty(4 * n + 3, dtype=np.int64)
+    count = 0
+    found = 0
+    bad = 0
+    for v in events:
+        u, w = prv[v], nxt[v]
+        px, py = x[v], y[v]
+        # Primera posición cuya arista deja a ``v`` estrictamente a su izquierda.
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _orient(span[mid, 0], span[mid, 1], span[mid, 2], span[mid, 3], px, py) < 0:
+                hi = mid
+            else:
+                lo = mid + 1
+        turn = _orient(x[u], y[u], px, py, x[w], y[w])
+        below_u, below_w = rank[u] > rank[v], rank[w] > rank[v]
+        broken = -2
+        move = 0
+        puts, put_at, put_edge, put_at2, put_edge2 = 0, 0, 0, 0, 0
+        check, check2 = -1, -1
+        if below_u and below_w:
+            # Empiezan las dos aristas: inicio (fuera a la izquierda) o división (dentro).
+            left = status[lo - 1] if lo > 0 else -1
+            inside = left >= 0 and rank[nxt[left]] > rank[left]
+            if turn == 0 or inside != (turn < 0):
+                broken = left
+            else:
+                if inside:
+                    diagonals[found, 0], diagonals[found, 1] = v, helper[left]
+                    found += 1
+                    helper[left] = v
+                move = 2
+                puts, put_at, put_edge, put_at2, put_edge2 = 2, lo, u if inside else v, lo + 1, v if inside else u
+                check, check2 = lo - 1, lo + 1
+                helper[v] = v
+        elif not below_u and not below_w:
+            # Acaban las dos: final o unión (la arista que baja es ``u``).
+            first = v if turn < 0 else u
+            second = u if turn < 0 else v
+            if turn == 0 or lo < 2 or status[lo - 2] != first or status[lo - 1] != second:
+                broken = status[lo - 1] if lo > 0 else -1
+            else:
+                if merge[helper[u]]:
+                    diagonals[found, 0], diagonals[found, 1] = v, helper[u]
+                    found += 1
+                move = -2
+                check = lo - 3
+                if turn < 0:
+                    left = status[lo - 3] if lo > 2 else -1
+                    if left < 0 or rank[nxt[left]] < rank[left]:
+                        broken = left
+                    else:
+                        if merge[helper[left]]:
+                            diagonals[found, 0], diagonals[found, 1] = v, helper[left]
+                            found += 1
+                        helper[left] = v
+                        merge[v] = True
+        elif below_w:
+            # Borde que baja: la arista ``u`` sigue como ``v``, con el interior a la derecha.
+            if lo < 1 or status[lo - 1] != u:
+                broken = status[lo - 1] if lo > 0 else -1
+            else:
+                if merge[helper[u]]:
+                    diagonals[found, 0], diagonals[found, 1] = v, helper[u]
+                    found += 1
+                puts, put_at, put_edge = 1, lo - 1, v
+                check, check2 = lo - 2, lo - 1
+                helper[v] = v
+        else:
+            # Borde que sube: el interior queda a la izquierda, bajo la arista vecina.
+            if lo < 2 or status[lo - 1] != v:
+                broken = status[lo - 1] if lo > 0 else -1
+            else:
+                puts, put_at, put_edge = 1, lo - 1, u
+                check, check2 = lo - 2, lo - 1
+                left = status[lo - 2]
+                if rank[nxt[left]] < rank[left]:
+                    broken = left
+                else:
+                    if merge[helper[left]]:
+                        diagonals[found, 0], diagonals[found, 1] = v, helper[left]
+                        found += 1
+                    helper[left] = v
+
+        if move > 0:
+            for k in range(count - 1, lo - 1, -1):
+                status[k + 2] = status[k]
+                for c in range(4):
+                    span[k + 2, c] = span[k, c]
+        elif move < 0:
+            for k in range(lo, count):
+                status[k - 2] = status[k]
+                for c in range(4):
+                    span[k - 2, c] = span[k, c]
+        count += move
+        for k in range(puts):
+            at = put_at if k == 0 else put_at2
+            e = put_edge if k == 0 else put_edge2
+            a, b = e, nxt[e]
+            if rank[a] > rank[b]:
+                a, b = b, a
+            status[at] = e
+            span[at, 0], span[at, 1], span[at, 2], span[at, 3] = x[a], y[a], x[b], y[b]
+        for k in range(2):
+            p = check if k == 0 else check2
+            if p < 0 or p + 1 >= count or bad + 2 > faults.shape[0]:
+                continue
+            e, f = status[p], status[p + 1]
+            if nxt[e] == f or nxt[f] == e:
+                continue  # aristas contiguas
+            q = p + 1
+            if _segments_cross(span[p, 0], span[p, 1], span[p, 2], span[p, 3], span[q, 0], span[q, 1], span[q, 2], span[q, 3]):
+                faults[bad], faults[bad + 1] = e, f
+                bad += 2
+
+        if broken != -2:
+            # Tras un cruce el orden de ``status`` ya no es fiable: basta con el cruce.
+            # Si no lo hay, el anillo culpable suele ser vecino de ``v`` en ``status``.
+            if bad == 0:
+                faults[0], faults[1] = v, broken
+                faults[2] = status[lo] if lo < count else -1
+                bad = 3
+            break
+    return diagonals[:found], faults[:bad]
+
+
+def _link_kernel(x, y, nxt, diagonals):
+    """
+    Siguiente semiarista de cada una dentro de su cara interior.
+
+    Semiaristas: ``v`` es la arista de anillo ``v → nxt[v]`` y la diagonal ``d``
+    da ``n + 2d`` (``a → b``) y ``n + 2d + 1`` (``b → a``). Alrededor de cada
+    vértice las diagonales se ordenan por ángulo antihorario desde la arista de
+    anillo que sale de él; la siguiente de ``a → b`` es la que precede a
+    ``b → a`` en ese orden (o la arista de anillo si no hay ninguna antes).
+    """
+    n = x.shape[0]
+    m = diagonals.shape[0]
+    total = n + 2 * m
+    origin = np.empty(total, dtype=np.int64)
+    target = np.empty(total, dtype=np.int64)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    for v in range(n):
+        origin[v], target[v] = v, nxt[v]
+    for d in range(m):
+        a, b = diagonals[d, 0], diagonals[d, 1]
+        origin[n + 2 * d], target[n + 2 * d] = a, b
+        origin[n + 2 * d + 1], target[n + 2 * d + 1] = b, a
+        offsets[a + 1] += 1
+        offsets[b + 1] += 1
+    for v in range(n):
+        offsets[v + 1] += offsets[v]
+
+    around = np.empty(2 * m, dtype=np.int64)
+    angle = np.empty(2 * m, dtype=np.float64)
+    position = np.empty(total, dtype=np.int64)
+    fill = offsets[:n].copy()
+    for h in range(n, total):
+        v, t = origin[h], target[h]
+        base = np.arctan2(y[nxt[v]] - y[v], x[nxt[v]] - x[v])
+        turn = np.arctan2(y[t] - y[v], x[t] - x[v]) - base
+        if turn < 0:
+            turn += 2 * np.pi
+        # Inserción ordenada: cada vértice tiene pocas diagonales.
+        k = fill[v]
+        while k > offsets[v] and angle[k - 1] > turn:
+            around[k], angle[k] = around[k - 1], angle[k - 1]
+            k -= 1
+        around[k], angle[k] = h, turn
+        fill[v] += 1
+    for v in range(n):
+        for k in range(offsets[v], offsets[v + 1]):
+            position[around[k]] = k
+
+    following = np.empty(total, dtype=np.int64)
+    for h in range(total):
+        v = target[h]
+        if h < n:
+            # Arista de anillo entrante: su gemela exterior va la última alrededor de ``v``.
+            k = offsets[v + 1]
+        else:
+            k = position[n + ((h - n) ^ 1)]
+        following[h] = around[k - 1] if k > offsets[v] else v
+    return origin, following
+
+
+def _triangulate_monotone(x, y, rank, face, k, chain, side, stack, triangles, found):
+    """Triangula el ciclo antihorario ``face[:k]``, monótono en Y, con la pila clásica."""
+    top, bottom = 0, 0
+    for i in range(1, k):
+        if rank[face[i]] < rank[face[top]]:
+            top = i
+        if rank[face[i]] > rank[face[bottom]]:
+            bottom = i
+    # La cadena izquierda sigue el ciclo desde arriba; la derecha lo recorre al revés.
+    chain[0], side[0] = face[top], 0
+    i, j = (top + 1) % k, (top - 1 + k) % k
+    last_left = last_right = rank[face[top]]
+    m = 1
+    while i != bottom or j != bottom:
+        if j == bottom or (i != bottom and rank[face[i]] < rank[face[j]]):
+            if rank[face[i]] < last_left:
+                raise ValueError("Trozo no monótono en la triangulación por barrido.")
+            last_left = rank[face[i]]
+            chain[m], side[m] = face[i], 0
+            i = (i + 1) % k
+        else:
+            if rank[face[j]] < last_right:
+                raise ValueError("Trozo no monótono en la triangulación por barrido.")
+            last_right = rank[face[j]]
+            chain[m], side[m] = face[j], 1
+            j = (j - 1 + k) % k
+        m += 1
+    chain[m] = face[bottom]
+
+    stack[0], stack[1] = 0, 1
+    depth = 2
+    for t in range(2, m):
+        c = chain[t]
+        if side[t] != side[stack[depth - 1]]:
+            # Cadena opuesta: abanico con toda la pila.
+            for s in range(depth - 1):
+                a, b = chain[stack[s]], chain[stack[s + 1]]
+                if side[t] == 0:
+                    a, b = b, a
+                triangles[found, 0], triangles[found, 1], triangles[found, 2] = c, a, b
+                found += 1
+            stack[0], stack[1] = t - 1, t
+            depth = 2
+        else:
+            # Misma cadena: se cortan orejas mientras el ángulo en la cima sea convexo.
+            last = stack[depth - 1]
+            depth -= 1
+            while depth > 0:
+                a, b = chain[stack[depth - 1]], chain[last]
+                if side[t] == 0:
+                    if _orient(x[a], y[a], x[b], y[b], x[c], y[c]) <= 0:
+                        break
+                    triangles[found, 0], triangles[found, 1], triangles[found, 2] = a, b, c
+                elif _orient(x[c], y[c], x[b], y[b], x[a], y[a]) <= 0:
+                    break
+                else:
+                    triangles[found, 0], triangles[found, 1], triangles[found, 2] = c, b, a
+                found += 1
+                last = stack[depth - 1]
+                depth -= 1
+            stack[depth], stack[depth + 1] = last, t
+            depth += 2
+    # El vértice más bajo cierra con lo que queda en la pila, como si fuera de la otra cadena.
+    c = chain[m]
+    for s in range(depth - 1):
+        a, b = chain[stack[s]], chain[stack[s + 1]]
+        if side[stack[depth - 1]] == 1:
+            a, b = b, a
+        triangles[found, 0], triangles[found, 1], triangles[found, 2] = c, a, b
+        found += 1
+    return found
+
+
+def _monotone_kernel(x, y, rank, origin, following):
+    """Triangula cada cara (ciclos de ``following`` sobre semiaristas interiores)."""
+    count = origin.shape[0]
+    seen = np.zeros(count, dtype=np.bool_)
+    face = np.empty(count, dtype=np.int64)
+    chain = np.empty(count, dtype=np.int64)
+    side = np.empty(count, dtype=np.int64)
+    stack = np.empty(count, dtype=np.int64)
+    triangles = np.empty((count, 3), dtype=np.int64)
+    found = 0
+    for start in range(count):
+        if seen[start]:
+            continue
+        k = 0
+        h = start
+        while not seen[h]:
+            seen[h] = True
+            face[k] = origin[h]
+            k += 1
+            h = following[h]
+        if h != start or k < 3:
+            raise ValueError("Cara abierta en la triangulación por barrido.")
+        found = _triangulate_monotone(x, y, rank, face, k, chain, side, stack, triangles, found)
+    return triangles[:found]
+
+
+if HAS_NUMBA:  # pragma: no cover - depende del entorno
+    _jit = numba.njit(cache=True, nogil=True)
+    _orient = _jit(_orient)
+    _square_fraction = _jit(_square_fraction)
+    _count_squares = _jit(_count_squares)
+    _fill_squares = _jit(_fill_squares)
+    _chain_kernel = _jit(_chain_kernel)
+    _douglas_peucker_span = _jit(_douglas_peucker_span)
+    _simplify_kernel = _jit(_simplify_kernel)
+    _break_ties = _jit(_break_ties)
+    _segments_cross = _jit(_segments_cross)
+    _sweep_kernel = _jit(_sweep_kernel)
+    _link_kernel = _jit(_link_kernel)
+    _triangulate_monotone = _jit(_triangulate_monotone)
+    _monotone_kernel = _jit(_monotone_kernel)
+
+
+def _contour_order(count: int, segments: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Anillos como ``(índices encadenados, comienzos)``; el anillo ``r`` es ``order[starts[r]:starts[r + 1]]``."""
+    following = np.full(count, -1, dtype=np.int64)
+    following[segments[:, 0]] = segments[:, 1]
+    return _chain_kernel(following)
+
+
+def contour_rings(points: np.ndarray, segments: np.ndarray) -> List[np.ndarray]:
+    """Encadena segmentos orientados en anillos cerrados (índices en ``points``)."""
+    order, starts = _contour_order(len(points), segments)
+    return np.split(order, starts[1:-1]) if len(order) else []
+
+
+def _ring_links(starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Siguiente y anterior de cada posición dentro de su anillo."""
+    index = np.arange(int(starts[-1]), dtype=np.int64)
+    nxt, prv = index + 1, index - 1
+    nxt[starts[1:] - 1] = starts[:-1]
+    prv[starts[:-1]] = starts[1:] - 1
+    return nxt, prv
+
+
+def _ring_areas(x: np.ndarray, y: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    nxt, _ = _ring_links(starts)
+    return 0.5 * np.add.reduceat(x * y[nxt] - x[nxt] * y, starts[:-1])
+
+
+def signed_area(ring_points: np.ndarray) -> float:
+    x, y = ring_points[:, 0], ring_points[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def simplify_ring(ring_points: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Douglas-Peucker sobre un anillo cerrado; devuelve los índices conservados.
+
+    El anillo se parte en el punto más lejano al primero y cada mitad se
+    simplifica por separado. Siempre se eliminan los puntos colineales.
+    """
+    ring_points = np.asarray(ring_points, dtype=np.float64)
+    starts = np.array([0, len(ring_points)], dtype=np.int64)
+    x, y = np.ascontiguousarray(ring_points[:, 0]), np.ascontiguousarray(ring_points[:, 1])
+    return np.flatnonzero(_simplify_kernel(x, y, starts, max(float(tolerance), _MIN_TOLERANCE)))
+
+
+def _triangulate_rings(xy: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Triangula la región que dejan los anillos de ``xy`` (consecutivos, según ``starts``).
+
+    Returns:
+        Triángulos (T, 3) antihorarios con índices de fila de ``xy``.
+
+    Raises:
+        _TangledRings: si el barrido detecta anillos cruzados o mal anidados.
+    """
+    nxt, prv = _ring_links(starts)
+    x, y = np.ascontiguousarray(xy[:, 0], dtype=np.float64), np.ascontiguousarray(xy[:, 1], dtype=np.float64)
+    # Y descendente y, a igual Y, X ascendente (como ``np.lexsort((x, -y))``, más rápido).
+    events = np.argsort(-y)
+    _break_ties(x, y, events)
+    rank = np.empty_like(events)
+    rank[events] = np.arange(len(events))
+    diagonals, faults = _sweep_kernel(x, y, nxt, prv, rank, events)
+    if len(faults):
+        raise _TangledRings(faults)
+    origin, following = _link_kernel(x, y, nxt, diagonals)
+    return _monotone_kernel(x, y, rank, origin, following)
+
+
+def triangulate_polygon(points: np.ndarray, outer: np.ndarray, holes: Sequence[np.ndarray] = ()) -> np.ndarray:
+    """
+    Triangula un contorno antihorario con agujeros horarios.
+
+    Returns:
+        Triángulos (T, 3) antihorarios con índices de ``points``.
+
+    Raises:
+        ValueError: si los anillos se cruzan o un agujero queda fuera del contorno.
+    """
+    rings = [np.asarray(ring, dtype=np.int64) for ring in (outer, *holes)]
+    order = np.concatenate(rings)
+    starts = np.cumsum([0] + [len(ring) for ring in rings])
+    return order[_triangulate_rings(np.asarray(points, dtype=np.float64)[order], starts)]
+
+
+def extrude_mask(
+    mask: np.ndarray,
+    iso_level: float = 0.5,
+    spacing: Sequence[float] = (1.0, 1.0, 1.0),
+    height: float | None = None,
+    tolerance: float = 0.5,
+    backend: str = "auto",
+) -> Tuple[MarchingCubesResult, ExtrudeReport]:
+    """
+    Extruye una máscara 2D a lo largo de Z.
+
+    Args:
+        mask: Máscara 2D; el eje 0 es X y el eje 1 es Y.
+        iso_level: Umbral del contorno.
+        spacing: Escala (x, y, z); ``height`` por defecto es ``spacing[2]``.
+        height: Altura del prisma en unidades de salida.
+        tolerance: Tolerancia de Douglas-Peucker en píxeles (0 = solo colineales).
+        backend: Ruta de ``marching_squares`` (``auto``, ``numpy`` o ``numba``).
+
+    Returns:
+        ``(malla, informe)``; la malla es cerrada y con normales hacia fuera.
+    """
+    grid = np.asarray(mask, dtype=np.float32)
+    if grid.ndim == 3 and 1 in grid.shape:
+        grid = grid.reshape([n for n in grid.shape if n != 1] or [1])
+    if grid.ndim != 2:
+        raise ValueError(f"Se esperaba una máscara 2D, se recibió {grid.ndim}D.")
+    # Borde de fondo: todos los contornos quedan cerrados.
+    grid = np.pad(grid, 1, constant_values=min(float(grid.min()), iso_level) - 1.0)
+    # Un valor justo en el iso pondría el cruce en la esquina, compartido por
+    # varias aristas; subirlo un ulp lo deja dentro y separa los puntos.
+    iso = np.float32(iso_level)
+    grid[grid == iso] = np.nextafter(iso, np.float32(np.inf))
+    points, segments = marching_squares(grid, iso_level, backend)
+    points = points - 1.0
+
+    order, starts = _contour_order(len(points), segments)
+    x, y = points[order, 0], points[order, 1]
+    area = _ring_areas(x, y, starts) if len(order) else np.empty(0)
+    valid = np.abs(area) > 1e-12
+    if not valid.all():
+        sizes = np.diff(starts)
+        inside = np.repeat(valid, sizes)
+        x, y, area = x[inside], y[inside], area[valid]
+        starts = np.r_[0, np.cumsum(sizes[valid])]
+
+    report = ExtrudeReport(
+        rings=int((area > 0).sum()),
+        holes=int((area < 0).sum()),
+        contour_points=int(len(points)),
+        simplified_points=0,
+        vertices=0,
+        faces=0,
+    )
+    if not len(area):
+        return MarchingCubesResult(np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.int32)), report
+
+    # Todos los anillos se triangulan en un solo barrido. Los que al simplificarse
+    # cambian de sentido, cortan a otro o rompen el anidado se rehacen sin simplificar.
+    simplified = _simplify_kernel(x, y, starts, max(float(tolerance), _MIN_TOLERANCE))
+    exact = None
+    reverted = np.zeros(len(area), dtype=bool)
+    while True:
+        keep = np.where(np.repeat(reverted, np.diff(starts)), exact, simplified) if reverted.any() else simplified
+        kept = np.flatnonzero(keep)
+        kept_starts = np.r_[0, np.cumsum(np.add.reduceat(keep.astype(np.int64), starts[:-1]))]
+        kx, ky = x[kept], y[kept]
+        bad = np.sign(_ring_areas(kx, ky, kept_starts)) != np.sign(area)
+        if not bad.any():
+            try:
+                cap = _triangulate_rings(np.column_stack([kx, ky]), kept_starts)
+                break
+            except _TangledRings as tangle:
+                bad[np.searchsorted(kept_starts, tangle.vertices, side="right") - 1] = True
+        if not (bad & ~reverted).any():
+            # El anidado falla lejos del anillo culpable: se rehacen todos.
+            if reverted.all():
+                raise ValueError("Los contornos se cruzan incluso sin simplificar.")
+            bad[:] = True
+        reverted |= bad
+        if exact is None:
+            exact = _simplify_kernel(x, y, starts, _MIN_TOLERANCE)
+    report.simplify_fallbacks = int(reverted.sum())
+    report.simplified_points = int(len(kept))
+
+    sx, sy, sz = (float(s) for s in spacing)
+    top = sz if height is None else float(height)
+    count = len(kept)
+    xy = np.column_stack([kx * sx, ky * sy])
+    vertices = np.concatenate(
+        [np.column_stack([xy, np.zeros(count)]), np.column_stack([xy, np.full(count, top)])]
+    )
+
+    # Paredes: segmento a → b con el interior a la izquierda, normal hacia la derecha.
+    a = np.arange(count)
+    b, _ = _ring_links(kept_starts)
+    walls = np.concatenate([np.stack([a, b, b + count], axis=1), np.stack([a, b + count, a + count], axis=1)])
+    faces = np.concatenate([cap[:, ::-1], cap + count, walls])
+
+    report.vertices = int(len(vertices))
+    report.faces = int(len(faces))
+    return (
+        MarchingCubesResult(vertices=vertices.astype(np.float32), faces=faces.astype(np.int32)),
+        report,
+    )
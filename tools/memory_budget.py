@@ -0,0 +1,179 @@
+"""
+Presupuesto de memoria para la captura densidad → malla.
+
+Un ``.npy`` grande, la copia float32 que hace Marching Cubes y las estructuras
+de trimesh pueden tumbar por OOM un host que corre varios trabajos. Aquí se
+estima el pico antes de empezar y se elige cómo capturar:
+
+- ``memory``: grid completo en RAM (camino habitual).
+- ``streaming``: el grid se lee por losas en X (mmap en ``.npy``, bloques en
+  ``.vbv``) y solo una losa vive en memoria (dos copias mientras se lee); el
+  grosor de la losa se ajusta al presupuesto.
+
+Modelo (bytes):
+- grid: ``celdas · itemsize`` más ``celdas · 4`` si no es float32 (Marching
+  Cubes trabaja sobre una copia float32 contigua).
+- superficie: ``triángulos · BYTES_PER_TRIANGLE[formato]``, medido con trimesh
+  sobre mallas de ~10⁶ triángulos (el exportador OBJ/STL formatea en memoria y
+  cuesta varias veces más que GLB/PLY).
+- base: RSS del proceso en el momento de planificar.
+
+Los triángulos esperados se cuentan sobre un submuestreo del grid (como
+``--target-triangles``) cuando se puede leer barato, o con una cota por área de
+las caras del volumen cuando no.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import resource
+import sys
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from .mesh_budget import COARSE_TARGET_CELLS, count_active_cells
+
+# Pico por triángulo (malla trimesh + exportación), con ~10 % de margen.
+BYTES_PER_TRIANGLE = {"obj": 540, "stl": 360, "glb": 105, "gltf": 105, "ply": 105}
+# Partes por losa en streaming: vértices float32 + caras int32 (~V = F/2).
+STREAM_BYTES_PER_TRIANGLE = 18
+# Sin muestreo: celdas activas ≈ factor · suma de las áreas de las caras del volumen.
+ASSUMED_SURFACE_FACTOR = 4.0
+TRIANGLES_PER_CELL = 2.0
+MIN_SLAB = 2
+
+_UNITS = {"": 2**20, "k": 2**10, "m": 2**20, "g": 2**30, "t": 2**40}
+
+
+def parse_memory_size(value: str) -> int:
+    """``"2G"``, ``"1500M"``, ``"512MiB"`` → bytes; sin unidad se interpreta en MiB."""
+    match = re.fullmatch(r"\s*([0-9]*\.?[0-9]+)\s*([kmgt]?)(i?b)?\s*", value.lower())
+    if not match:
+        raise ValueError(f"Tamaño de memoria no válido: {value!r} (usa p. ej. 2G, 1500M).")
+    size = float(match.group(1)) * _UNITS[match.group(2)]
+    if size <= 0:
+        raise ValueError("El presupuesto de memoria debe ser > 0.")
+    return int(size)
+
+
+def current_rss_bytes() -> int:
+    """RSS actual (``/proc`` en Linux); si no se puede leer, el pico hasta ahora."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Pico de RSS del proceso (``ru_maxrss``: KiB en Linux, bytes en macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def format_mib(size: float) -> str:
+    return f"{size / 2**20:.0f} MiB"
+
+
+def estimate_surface_triangles(
+    shape: Sequence[int], iso_level: float, step_size: int = 1, sample: np.ndarray | None = None
+) -> Tuple[int, str]:
+    """
+    Triángulos esperados y cómo se estimaron (``"muestreo"`` o ``"cota"``).
+
+    ``sample`` es el volumen (o un mmap) del que se toma un submuestreo de ~64³
+    celdas; las celdas activas escalan con el área, ``A(s) ≈ A(c)·(c/s)²``.
+    """
+    step = max(1, step_size)
+    if sample is not None:
+        cells = int(np.prod([max(n - 1, 1) for n in shape]))
+        coarse = max(step, math.ceil((cells / COARSE_TARGET_CELLS) ** (1.0 / 3.0)))
+        active = count_active_cells(sample, iso_level, coarse)
+        return int(active * TRIANGLES_PER_CELL * (coarse / step) ** 2), "muestreo"
+    nx, ny, nz = (max(1, n // step) for n in shape)
+    area = nx * ny + ny * nz + nx * nz
+    return int(ASSUMED_SURFACE_FACTOR * area * TRIANGLES_PER_CELL), "cota"
+
+
+@dataclass
+class CapturePlan:
+    """Modo de captura elegido y el pico estimado que lo justifica."""
+
+    mode: str
+    slab: int
+    budget_bytes: int
+    estimated_bytes: int
+    baseline_bytes: int
+    grid_bytes: int
+    surface_bytes: int
+    triangles: int
+    triangles_source: str
+    fits: bool
+
+    def describe(self) -> str:
+        where = "grid completo en memoria" if self.mode == "memory" else f"streaming en losas de {self.slab} planos"
+        return (
+            f"{where}; pico estimado {format_mib(self.estimated_bytes)} de {format_mib(self.budget_bytes)} "
+            f"(base {format_mib(self.baseline_bytes)}, grid {format_mib(self.grid_bytes)}, "
+            f"~{self.triangles} triángulos por {self.triangles_source} → {format_mib(self.surface_bytes)})"
+        )
+
+
+def plan_capture(
+    shape: Sequence[int],
+    dtype: np.dtype,
+    budget_bytes: int,
+    triangles: int,
+    export_format: str = "obj",
+    step_size: int = 1,
+    streamable: bool = True,
+    chunk_x: int | None = None,
+    triangles_source: str = "cota",
+) -> CapturePlan:
+    """
+    Elige ``memory`` si cabe; si no, la losa más gruesa que cabe en streaming.
+
+    ``chunk_x`` (bloques de ``.vbv``) alinea las losas a bloques para no
+    decodificar dos veces los del borde. Si ni la losa mínima cabe, el plan
+    vuelve con ``fits=False`` y la losa mínima.
+    """
+    itemsize = np.dtype(dtype).itemsize
+    per_cell = itemsize + (0 if np.dtype(dtype) == np.float32 else 4)
+    plane = int(shape[1]) * int(shape[2]) * per_cell
+    surface = triangles * BYTES_PER_TRIANGLE.get(export_format.lower(), max(BYTES_PER_TRIANGLE.values()))
+    baseline = current_rss_bytes()
+    full = baseline + int(shape[0]) * plane + surface
+
+    def _plan(mode: str, slab: int, grid: int, total: int) -> CapturePlan:
+        return CapturePlan(
+            mode=mode,
+            slab=slab,
+            budget_bytes=budget_bytes,
+            estimated_bytes=total,
+            baseline_bytes=baseline,
+            grid_bytes=grid,
+            surface_bytes=surface,
+            triangles=triangles,
+            triangles_source=triangles_source,
+            fits=total <= budget_bytes,
+        )
+
+    if full <= budget_bytes or not streamable:
+        return _plan("memory", int(shape[0]), int(shape[0]) * plane, full)
+
+    # Streaming: losa + partes compactas acumuladas + malla final. Cada losa
+    # existe dos veces mientras se copia (páginas del mmap o bloques decodificados).
+    plane += int(shape[1]) * int(shape[2]) * itemsize
+    fixed = baseline + surface + triangles * STREAM_BYTES_PER_TRIANGLE
+    step = max(1, step_size)
+    slab = (budget_bytes - fixed) // plane - 1 if budget_bytes > fixed else 0
+    slab = int(slab) // step * step
+    if chunk_x and slab >= chunk_x:
+        slab = slab // chunk_x * chunk_x
+    slab = max(slab, MIN_SLAB * step)
+    slab = min(slab, int(shape[0]))
+    grid = (slab + 1) * plane
+    return _plan("streaming", slab, grid, fixed + grid)
@@ -0,0 +1,122 @@
+"""
+Elección automática del ``step_size`` a partir de un presupuesto de triángulos.
+
+Marching Cubes y Surface Nets generan ~2 triángulos por celda activa (celda
+cuyo signo cambia en alguna esquina), y el número de celdas activas escala con
+el área de la superficie, es decir, con ``1 / step²``. Se cuentan las celdas
+activas en una pasada gruesa (grid submuestreado, sin extraer la malla), se
+extrapola al paso buscado y se confirma con un conteo exacto en el paso
+elegido, que sigue siendo mucho más barato que la extracción completa.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+# Triángulos por celda activa medidos sobre superficies suaves.
+TRIANGLES_PER_CELL = {
+    "marching_cubes": 2.0,
+    "surface_nets": 2.0,
+    "dual_contouring": 2.0,
+}
+
+# La pasada gruesa apunta a ~64³ celdas.
+COARSE_TARGET_CELLS = 64**3
+
+
+@dataclass
+class BudgetEstimate:
+    """Paso elegido y estimaciones que lo justifican."""
+
+    target_triangles: int
+    step_size: int
+    estimated_triangles: int
+    coarse_step: int
+    coarse_active_cells: int
+    seconds: float
+
+
+def count_active_cells(volume: np.ndarray, iso_level: float, step_size: int = 1) -> int:
+    """Cuenta celdas activas del grid submuestreado sin generar geometría."""
+    below = np.asarray(volume)[::step_size, ::step_size, ::step_size] < iso_level
+    if min(below.shape) < 2:
+        return 0
+    cells = below[:-1, :-1, :-1]
+    any_below = cells.copy()
+    all_below = cells.copy()
+    nx, ny, nz = cells.shape
+    for dx in (0, 1):
+        for dy in (0, 1):
+            for dz in (0, 1):
+                if dx == dy == dz == 0:
+                    continue
+                corner = below[dx : dx + nx, dy : dy + ny, dz : dz + nz]
+                any_below |= corner
+                all_below &= corner
+    return int(np.count_nonzero(any_below & ~all_below))
+
+
+def estimate_triangles(
+    volume: np.ndarray, iso_level: float, step_size: int = 1, engine: str = "marching_cubes"
+) -> int:
+    """Triángulos esperados para ``step_size`` (conteo exacto de celdas activas)."""
+    return int(count_active_cells(volume, iso_level, step_size) * TRIANGLES_PER_CELL.get(engine, 2.0))
+
+
+def choose_step_size(
+    volume: np.ndarray,
+    iso_level: float,
+    target_triangles: int,
+    engine: str = "marching_cubes",
+    min_step: int = 1,
+) -> BudgetEstimate:
+    """
+    Devuelve el menor ``step_size >= min_step`` cuya malla cabe en ``target_triangles``.
+
+    Si ni el paso máximo útil (grid de 2 celdas por eje) cumple, se devuelve ese.
+    """
+    if target_triangles <= 0:
+        raise ValueError("target_triangles debe ser > 0.")
+    start = time.perf_counter()
+    volume = np.asarray(volume)
+    per_cell = TRIANGLES_PER_CELL.get(engine, 2.0)
+    max_step = max(1, (min(volume.shape) - 1) // 2)
+    min_step = max(1, min(min_step, max_step))
+
+    cells = int(np.prod([max(n - 1, 1) for n in volume.shape]))
+    coarse_step = max(min_step, math.ceil((cells / COARSE_TARGET_CELLS) ** (1.0 / 3.0)))
+    coarse_step = min(coarse_step, max_step)
+    coarse_active = count_active_cells(volume, iso_level, coarse_step)
+
+    # Las celdas activas escalan con el área: A(s) ≈ A(c)·(c/s)².
+    coarse_triangles = coarse_active * per_cell
+    if coarse_triangles <= 0:
+        step = min_step
+    else:
+        step = math.ceil(coarse_step * math.sqrt(coarse_triangles / target_triangles))
+        step = min(max(step, min_step), max_step)
+
+    # Confirmación exacta: se corrige la extrapolación en ambos sentidos.
+    estimated = estimate_triangles(volume, iso_level, step, engine)
+    while estimated > target_triangles and step < max_step:
+        step += 1
+        estimated = estimate_triangles(volume, iso_level, step, engine)
+    while step > min_step:
+        finer = estimate_triangles(volume, iso_level, step - 1, engine)
+        if finer > target_triangles:
+            break
+        step -= 1
+        estimated = finer
+
+    return BudgetEstimate(
+        target_triangles=int(target_triangles),
+        step_size=int(step),
+        estimated_triangles=int(estimated),
+        coarse_step=int(coarse_step),
+        coarse_active_cells=int(coarse_active),
+        seconds=time.perf_counter() - start,
+    )
@@ -12,24 +12,52 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import subprocess
 import sys
 import tempfile
+import time
 from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, Sequence, Tuple
+from typing import Any, Dict, Iterable, Sequence, Tuple, Union
 
 import numpy as np
 
 if __package__ is None:
     sys.path.append(str(Path(__file__).resolve().parent))
+    from blender_process import BlenderJob, run_blender  # type: ignore
+    from chunked_volume import SUFFIX as CHUNKED_SUFFIX, ChunkedVolume  # type: ignore
+    from components import filter_mesh, remove_small_islands  # type: ignore
     from marching_cubes import MarchingCubesResult, marching_cubes  # type: ignore
+    from mask_extrude import extrude_mask  # type: ignore
+    from mesh_optimize import OPTIMIZE_METHODS, optimize_mesh  # type: ignore
+    from mesh_quality import MeshQuality, analyze_mesh  # type: ignore
+    from mesh_writers import write_mesh  # type: ignore
+    from metrics import inc, observe, start_exporter, timer  # type: ignore
+    from packed_mask import PackedMask, binary_levels, is_packed_file, packed_marching_cubes  # type: ignore
+    from sparse_volume import SparseCOO, is_coo_file, open_sparse, sparse_marching_cubes, value_range  # type: ignore
+    from surface_nets import ENGINES, dual_contouring, surface_nets  # type: ignore
 else:
+    from .blender_process import BlenderJob, run_blender
+    from .chunked_volume import SUFFIX as CHUNKED_SUFFIX, ChunkedVolume
+    from .components import filter_mesh, remove_small_islands
     from .marching_cubes import MarchingCubesResult, marching_cubes
+    from .mask_extrude import extrude_mask
+    from .mesh_optimize import OPTIMIZE_METHODS, optimize_mesh
+    from .mesh_quality import MeshQuality, analyze_mesh
+    from .mesh_writers import write_mesh
+    from .metrics import inc, observe, start_exporter, timer
+    from .packed_mask import PackedMask, binary_levels, is_packed_file, packed_marching_cubes
+    from .sparse_volume import SparseCOO, is_coo_file, open_sparse, sparse_marching_cubes, value_range
+    from .surface_nets import ENGINES, dual_contouring, surface_nets
 
 EXPORT_ROOT = Path(__file__).resolve().parent.parent / "exports"
 
+EXTRACTORS = {
+    "marching_cubes": marching_cubes,
+    "surface_nets": surface_nets,
+    "dual_contouring": dual_contouring,
+}
+
 
 @dataclass
 class ExportMetadata:
@@ -45,6 +73,11 @@ class ExportMetadata:
     params: Dict[str, Any]
     source: str
     used_gpu: bool
+    vertex_cache: Dict[str, Any] | None = None
+    components: Dict[str, Any] | None = None
+    quality: Dict[str, Any] | None = None
+    blender_skipped: bool = False
+    extrusion: Dict[str, Any] | None = None
 
 
 def _parse_spacing(raw: str) -> Tuple[float, float, float]:
@@ -54,18 +87,57 @@ def _parse_spacing(raw: str) -> Tuple[float, float, float]:
     return parts[0], parts[1], parts[2]
 
 
-def load_mask(mask_path: Path, use_gpu: bool) -> Tuple[np.ndarray, bool]:
-    """Carga máscara (Numpy) y opcionalmente la fuerza a GPU antes de volver a CPU."""
+SparseMask = Union[SparseCOO, ChunkedVolume]
+
+
+def load_mask(
+    mask_path: Path, use_gpu: bool, keep_2d: bool = False, packed: bool = False, sparse: bool = False
+) -> Tuple[np.ndarray | PackedMask | SparseMask, bool]:
+    """
+    Carga máscara (Numpy) y opcionalmente la fuerza a GPU antes de volver a CPU.
+
+    Las máscaras 2D se apilan en un volumen de dos cortes salvo con ``keep_2d``
+    (``--form mask2d``, que las extruye directamente). Con ``packed`` una máscara
+    3D binaria (``.npz`` empaquetado, ``bool`` o entero de dos valores) vuelve
+    como ``PackedMask`` en lugar de pasar a float32. Con ``sparse`` una máscara
+    dispersa 3D (COO ``.npz`` o ``.vbv`` con ``fill``) vuelve abierta, sin
+    densificar, para ``sparse_mask_marching_cubes``; el llamador la cierra.
+    """
     if not mask_path.exists():
         raise FileNotFoundError(f"No se encontró la máscara en {mask_path}")
 
-    loaded = np.load(mask_path)
+    volume = open_sparse(mask_path)
+    if volume is not None:
+        if sparse and volume.ndim == 3:
+            return volume, False
+        print("[WARN] Máscara dispersa densificada: la extracción pedida necesita el grid completo.", file=sys.stderr)
+        if hasattr(volume, "close"):
+            volume.close()
+
+    if mask_path.suffix.lower() == CHUNKED_SUFFIX:
+        with ChunkedVolume(mask_path) as volume:
+            loaded = volume.read()
+    elif is_coo_file(mask_path):
+        loaded = SparseCOO.load(mask_path).read()
+    elif is_packed_file(mask_path):
+        bits = PackedMask.load(mask_path)
+        if packed and bits.ndim == 3:
+            return bits, False
+        loaded = bits.unpack()
+    else:
+        # Con ``packed`` el .npy se empaqueta por bloques desde el mmap, sin copia densa.
+        loaded = np.load(mask_path, mmap_mode="r" if packed and mask_path.suffix.lower() == ".npy" else None)
+        inc("vibra_bytes_read_total", mask_path.stat().st_size, kind=mask_path.suffix.lower().lstrip("."))
     if isinstance(loaded, np.lib.npyio.NpzFile):
         if not loaded.files:
             raise ValueError(f"El archivo NPZ {mask_path} no contiene arrays.")
         mask = loaded[loaded.files[0]]
     else:
         mask = loaded
+    if packed and mask.ndim == 3:
+        levels = binary_levels(mask)
+        if levels is not None and levels[0] != levels[1]:
+            return PackedMask.from_array(mask, threshold=levels[1]), False
     mask_on_gpu = False
 
     if use_gpu:
@@ -78,17 +150,51 @@ def load_mask(mask_path: Path, use_gpu: bool) -> Tuple[np.ndarray, bool]:
         except Exception as exc:  # noqa: BLE001
             print(f"[WARN] No se pudo usar GPU (cupy): {exc}", file=sys.stderr)
 
-    if mask.ndim == 2:
+    if mask.ndim == 2 and not keep_2d:
         # Extruir un plano plano para obtener un volumen mínimo.
         mask = np.stack([mask, mask], axis=-1)
-    if mask.ndim != 3:
+    if mask.ndim != 3 and not (keep_2d and mask.ndim == 2):
         raise ValueError(f"La máscara debe ser 3D o 2D, se recibió {mask.ndim}D.")
 
     # Normalización a [0,1] para el umbral.
-    mask = (mask.astype(np.float32) - mask.min()) / (mask.ptp() + 1e-6)
+    mask = (mask.astype(np.float32) - mask.min()) / (np.ptp(mask) + 1e-6)
     return mask, mask_on_gpu
 
 
+def sparse_mask_marching_cubes(
+    volume: SparseMask, iso_level: float, spacing: Sequence[float]
+) -> Tuple[MarchingCubesResult, Dict[str, int]]:
+    """
+    Marching Cubes sobre los ladrillos activos de una máscara dispersa.
+
+    Cada ladrillo se normaliza con el mínimo y el rango globales igual que en
+    ``load_mask``, así que la malla coincide con la del grid denso sin llegar a
+    construirlo.
+    """
+    # Mismo tipo que ``mask.min()`` y ``np.ptp(mask)`` en la ruta densa (bool se resta como uint8).
+    dtype = np.uint8 if np.dtype(volume.dtype) == np.bool_ else volume.dtype
+    low, high = np.asarray(value_range(volume), dtype=dtype)
+    span = high - low
+
+    def _extract(block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        result = marching_cubes((block.astype(np.float32) - low) / (span + 1e-6), iso_level=iso_level)
+        return result.vertices, result.faces
+
+    # El corte en unidades originales solo sirve para descartar ladrillos sin superficie.
+    raw_iso = float(low) + iso_level * (float(span) + 1e-6)
+    extraction = sparse_marching_cubes(volume, raw_iso, extract=_extract)
+    result = MarchingCubesResult(
+        vertices=(extraction.vertices * np.asarray(spacing, dtype=np.float64)).astype(np.float32),
+        faces=extraction.faces.astype(np.int32),
+    )
+    bricks = {
+        "total": extraction.bricks_total,
+        "active": extraction.bricks_active,
+        "meshed": extraction.bricks_meshed,
+    }
+    return result, bricks
+
+
 def write_obj(path: Path, vertices: np.ndarray, faces: np.ndarray) -> None:
     with path.open("w", encoding="utf-8") as f:
         for v in vertices:
@@ -107,6 +213,9 @@ def invoke_blender(
     quadriflow_target: int,
     smooth_iterations: int,
     solidify_thickness: float,
+    timeout: float | None = None,
+    max_memory_mb: float | None = None,
+    log_path: Path | None = None,
 ) -> None:
     cmd = [
         blender_path,
@@ -129,11 +238,15 @@ def invoke_blender(
         "--solidify-thickness",
         str(solidify_thickness),
     ]
-    result = subprocess.run(cmd, check=False, capture_output=True, text=True)
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"Blender falló ({result.returncode}). stdout:\n{result.stdout}\nstderr:\n{result.stderr}"
+    run_blender(
+        BlenderJob(
+            cmd=cmd,
+            name=output_path.stem,
+            log_path=log_path,
+            timeout=timeout,
+            max_memory_mb=max_memory_mb,
         )
+    )
 
 
 def build_metadata(
@@ -142,8 +255,23 @@ def build_metadata(
     mask_path: Path,
     used_gpu: bool,
     scaled_vertices: np.ndarray,
+    vertex_cache: Dict[str, Any] | None = None,
+    components: Dict[str, Any] | None = None,
+    quality: Dict[str, Any] | None = None,
+    blender_skipped: bool = False,
+    extrusion: Dict[str, Any] | None = None,
 ) -> ExportMetadata:
     verts = scaled_vertices if scaled_vertices.size else np.zeros((0, 3), dtype=np.float32)
+    params: Dict[str, Any] = {
+        "quadriflow_target": args.quadriflow_target,
+        "smooth_iterations": args.smooth_iterations,
+        "solidify_thickness": args.solidify_thickness,
+        "form": args.form,
+        "engine": args.engine,
+    }
+    if args.form == "mask2d":
+        params["extrude_height"] = args.extrude_height
+        params["simplify"] = args.simplify
     bounds_min = verts.min(axis=0).tolist() if len(verts) else [0.0, 0.0, 0.0]
     bounds_max = verts.max(axis=0).tolist() if len(verts) else [0.0, 0.0, 0.0]
     return ExportMetadata(
@@ -156,44 +284,140 @@ def build_metadata(
         faces=int(mesh.faces.shape[0]),
         bounds_min=tuple(float(x) for x in bounds_min),
         bounds_max=tuple(float(x) for x in bounds_max),
-        params={
-            "quadriflow_target": args.quadriflow_target,
-            "smooth_iterations": args.smooth_iterations,
-            "solidify_thickness": args.solidify_thickness,
-            "form": args.form,
-        },
+        params=params,
         source=str(mask_path),
         used_gpu=used_gpu,
+        vertex_cache=vertex_cache,
+        components=components,
+        quality=quality,
+        blender_skipped=blender_skipped,
+        extrusion=extrusion,
+    )
+
+
+def can_skip_blender(quality: MeshQuality, args: argparse.Namespace) -> bool:
+    """
+    Blender no cambiaría el resultado si la malla ya cumple el objetivo de
+    Quadriflow y no hay suavizado ni Solidify que aplicar.
+    """
+    if args.force_blender or quality.faces == 0:
+        return False
+    return (
+        quality.faces <= args.quadriflow_target
+        and args.smooth_iterations <= 0
+        and args.solidify_thickness <= 0
     )
 
 
 def export_mask(args: argparse.Namespace) -> Path:
-    mask, used_gpu = load_mask(Path(args.mask), args.use_gpu)
-    mc_result = marching_cubes(mask, iso_level=args.iso, spacing=args.spacing)
+    planar = args.form == "mask2d"
+    # Con iso 0.5 el punto medio de la arista es el cruce exacto en datos binarios.
+    packed = (
+        not planar
+        and args.engine == "marching_cubes"
+        and args.iso == 0.5
+        and args.min_island_voxels <= 0
+        and not args.use_gpu
+    )
+    # Las islas de voxeles, la GPU y los otros motores necesitan el grid denso.
+    sparse = not planar and args.engine == "marching_cubes" and args.min_island_voxels <= 0 and not args.use_gpu
+    with timer("vibra_stage_seconds", stage="load"):
+        mask, used_gpu = load_mask(Path(args.mask), args.use_gpu, keep_2d=planar, packed=packed, sparse=sparse)
+    components: Dict[str, Any] = {}
+    extrusion = None
+    if args.min_island_voxels > 0:
+        mask, report = remove_small_islands(mask, args.iso, args.min_island_voxels)
+        components["voxels"] = asdict(report)
+    if planar:
+        with timer("vibra_stage_seconds", stage="extract"):
+            mc_result, extrude_report = extrude_mask(
+                mask, iso_level=args.iso, spacing=args.spacing, height=args.extrude_height, tolerance=args.simplify
+            )
+        extrusion = asdict(extrude_report)
+        print(
+            f"[INFO] Extrusión 2D: {extrude_report.rings} contornos, {extrude_report.holes} agujeros, "
+            f"{extrude_report.contour_points} -> {extrude_report.simplified_points} puntos, {extrude_report.faces} caras"
+        )
+    elif isinstance(mask, (SparseCOO, ChunkedVolume)):
+        try:
+            with timer("vibra_stage_seconds", stage="extract"):
+                mc_result, bricks = sparse_mask_marching_cubes(mask, args.iso, args.spacing)
+        finally:
+            if isinstance(mask, ChunkedVolume):
+                mask.close()
+        print(
+            f"[INFO] Máscara dispersa: {bricks['active']} de {bricks['total']} bloques activos, "
+            f"{bricks['meshed']} mallados."
+        )
+    elif isinstance(mask, PackedMask):
+        print(f"[INFO] Máscara empaquetada: {mask.shape}, {mask.nbytes} bytes a un bit por voxel.")
+        with timer("vibra_stage_seconds", stage="extract"):
+            mc_result = packed_marching_cubes(mask, spacing=args.spacing)
+    else:
+        with timer("vibra_stage_seconds", stage="extract"):
+            mc_result = EXTRACTORS[args.engine](mask, iso_level=args.iso, spacing=args.spacing)
+    inc("vibra_triangles_total", len(mc_result.faces), engine="mask2d" if planar else args.engine)
+    if args.min_component_faces > 0 or args.min_component_volume > 0 or args.keep_largest is not None:
+        mc_result, report = filter_mesh(
+            mc_result,
+            min_faces=args.min_component_faces,
+            min_volume=args.min_component_volume,
+            keep_largest=args.keep_largest,
+        )
+        components["faces"] = asdict(report)
+        print(f"[INFO] Componentes {report.components_before} -> {report.components_after}")
+    vertex_cache = None
+    if args.optimize_cache:
+        with timer("vibra_stage_seconds", stage="optimize"):
+            mc_result, report = optimize_mesh(mc_result, method=args.optimize_cache)
+        vertex_cache = asdict(report)
+        print(f"[INFO] ACMR {report.acmr_before:.3f} -> {report.acmr_after:.3f} ({report.method})")
     scaled_vertices = mc_result.vertices * args.scale
+    quality = analyze_mesh(scaled_vertices, mc_result.faces)
 
     session_dir = EXPORT_ROOT / args.session
     session_dir.mkdir(parents=True, exist_ok=True)
+    output_path = session_dir / f"{args.name}.{args.format}"
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir) / f"{args.name}_raw.obj"
-        write_obj(tmp_path, scaled_vertices, mc_result.faces)
-
-        output_path = session_dir / f"{args.name}.{args.format}"
-        blender_script = Path(__file__).with_name("blender_postprocess.py")
-        invoke_blender(
-            args.blender_path,
-            blender_script,
-            tmp_path,
-            output_path,
-            args.format,
-            args.scale,
-            args.quadriflow_target,
-            args.smooth_iterations,
-            args.solidify_thickness,
-        )
-
-    metadata = build_metadata(mc_result, args, Path(args.mask), used_gpu, scaled_vertices)
+    skip_blender = can_skip_blender(quality, args)
+    if skip_blender:
+        print(f"[INFO] Blender omitido: {quality.faces} caras <= {args.quadriflow_target}, sin smooth ni solidify.")
+        with timer("vibra_stage_seconds", stage="export"):
+            write_mesh(output_path, scaled_vertices, mc_result.faces, args.format)
+    else:
+        with tempfile.TemporaryDirectory() as tmpdir, timer("vibra_stage_seconds", stage="blender"):
+            tmp_path = Path(tmpdir) / f"{args.name}_raw.obj"
+            write_obj(tmp_path, scaled_vertices, mc_result.faces)
+
+            blender_script = Path(__file__).with_name("blender_postprocess.py")
+            # Los vértices ya van escalados; Blender no debe volver a escalar.
+            invoke_blender(
+                args.blender_path,
+                blender_script,
+                tmp_path,
+                output_path,
+                args.format,
+                1.0,
+                args.quadriflow_target,
+                args.smooth_iterations,
+                args.solidify_thickness,
+                timeout=args.blender_timeout,
+                max_memory_mb=args.blender_max_memory_mb,
+                log_path=session_dir / f"{args.name}_blender.log",
+            )
+
+    metadata = build_metadata(
+        mc_result,
+        args,
+        Path(args.mask),
+        used_gpu,
+        scaled_vertices,
+        vertex_cache,
+        components or None,
+        quality=asdict(quality),
+        blender_skipped=skip_blender,
+        extrusion=extrusion,
+    )
     metadata_path = session_dir / f"{args.name}.json"
     metadata_path.write_text(json.dumps(asdict(metadata), indent=2), encoding="utf-8")
     return metadata_path
@@ -202,22 +426,83 @@ def export_mask(args: argparse.Namespace) -> Path:
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Exportar malla desde máscara binaria.")
     parser.add_argument("command", choices=["export"], help="Comando principal.")
-    parser.add_argument("--form", required=True, choices=["mask"], help="Origen de la geometría.")
-    parser.add_argument("--mask", required=True, help="Ruta a la máscara .npy/.npz")
+    parser.add_argument(
+        "--form",
+        required=True,
+        choices=["mask", "mask2d"],
+        help="Origen de la geometría (mask2d: contorno 2D extruido en Z, sin Marching Cubes).",
+    )
+    parser.add_argument("--mask", required=True, help="Ruta a la máscara .npy/.npz/.vbv")
     parser.add_argument("--format", required=True, choices=["gltf", "obj", "stl"], help="Formato final.")
     parser.add_argument("--session", default=datetime.utcnow().strftime("%Y%m%d-%H%M%S"), help="ID de sesión.")
     parser.add_argument("--name", default=None, help="Nombre base del archivo exportado.")
     parser.add_argument("--scale", type=float, default=1.0, help="Factor de escala aplicado a la malla.")
     parser.add_argument("--iso", type=float, default=0.5, help="Iso-nivel para Marching Cubes.")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="marching_cubes",
+        help="Motor de extracción (surface_nets/dual_contouring: un vértice por celda, menos astillas).",
+    )
     parser.add_argument("--spacing", type=_parse_spacing, default=(1.0, 1.0, 1.0), help="Espaciado voxel x,y,z.")
+    parser.add_argument(
+        "--extrude-height",
+        type=float,
+        default=None,
+        help="Altura del prisma con --form mask2d (por defecto, el espaciado en z).",
+    )
+    parser.add_argument(
+        "--simplify",
+        type=float,
+        default=0.5,
+        help="Tolerancia Douglas-Peucker en píxeles para --form mask2d (0 = solo colineales).",
+    )
     parser.add_argument("--use-gpu", action="store_true", help="Subir máscara a GPU antes del marching cubes.")
     parser.add_argument("--blender-path", default="blender", help="Binario de Blender para ejecución headless.")
     parser.add_argument("--quadriflow-target", type=int, default=8000, help="Número objetivo de caras tras Quadriflow.")
     parser.add_argument("--smooth-iterations", type=int, default=3, help="Iteraciones del modificador Smooth.")
     parser.add_argument("--solidify-thickness", type=float, default=0.002, help="Espesor para Solidify.")
+    parser.add_argument("--min-island-voxels", type=int, default=0, help="Borra islas de voxeles más pequeñas.")
+    parser.add_argument("--min-component-faces", type=int, default=0, help="Borra componentes con menos caras.")
+    parser.add_argument(
+        "--min-component-volume", type=float, default=0.0, help="Borra componentes de menor volumen (unidades del grid)."
+    )
+    parser.add_argument("--keep-largest", type=int, default=None, help="Conserva solo las N componentes mayores.")
+    parser.add_argument(
+        "--force-blender",
+        action="store_true",
+        help="Ejecuta Blender aunque la malla ya cumpla los objetivos (sin atajo).",
+    )
+    parser.add_argument("--blender-timeout", type=float, default=None, help="Límite de tiempo de Blender en segundos.")
+    parser.add_argument(
+        "--blender-max-memory-mb", type=float, default=None, help="Límite de memoria (RSS) de Blender en MiB."
+    )
+    parser.add_argument(
+        "--optimize-cache",
+        choices=OPTIMIZE_METHODS,
+        default=None,
+        help="Reordena triángulos/vértices para la caché de GPU antes de escribir (auto, forsyth, morton).",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        default=None,
+        help="Vuelca métricas del lote (mesh_exporter-<instancia>.prom y .json) en este directorio.",
+    )
+    parser.add_argument(
+        "--metrics-instance",
+        default=None,
+        help="Instancia en el nombre de los archivos de métricas (por defecto host-pid).",
+    )
     return parser
 
 
+def _record_job(status: str, start: float, exporter: Any) -> None:
+    inc("vibra_jobs_total", runner="mesh_exporter", command="export", status=status)
+    observe("vibra_job_seconds", time.perf_counter() - start, runner="mesh_exporter", command="export")
+    if exporter is not None:
+        exporter.stop()
+
+
 def main(raw_args: Iterable[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(raw_args)
@@ -227,11 +512,19 @@ def main(raw_args: Iterable[str] | None = None) -> int:
     if args.name is None:
         args.name = Path(args.mask).stem
 
+    exporter = (
+        start_exporter(Path(args.metrics_dir), name="mesh_exporter", instance=args.metrics_instance)
+        if args.metrics_dir
+        else None
+    )
+    start = time.perf_counter()
     try:
         metadata_path = export_mask(args)
     except Exception as exc:  # noqa: BLE001
         print(f"[ERROR] {exc}", file=sys.stderr)
+        _record_job("error", start, exporter)
         return 1
+    _record_job("ok", start, exporter)
 
     print(f"Malla exportada. Metadatos: {metadata_path}")
     return 0
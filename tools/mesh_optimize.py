@@ -0,0 +1,406 @@
+"""
+Optimización del orden de mallas para cachés de vértices de GPU.
+
+Marching Cubes emite triángulos en orden de barrido de voxeles, lo que produce
+muchos fallos de caché al dibujar y comprime mal. Este módulo aplica:
+
+1. Reordenamiento de triángulos estilo Forsyth ("Linear-Speed Vertex Cache
+   Optimisation"). El bucle greedy es secuencial: con Numba (``pip install
+   .[jit]``) se compila y ``auto`` lo usa hasta ``FORSYTH_MAX_FACES``; sin
+   Numba corre en Python puro (~40 µs por triángulo) y ``auto`` pasa al orden
+   espacial Morton, totalmente vectorizado, por encima de
+   ``FORSYTH_PYTHON_MAX_FACES``.
+2. Reordenamiento de vértices por primer uso (vertex fetch) y remapeo de índices.
+3. Métrica ACMR (average cache miss ratio) antes y después: también es un
+   recorrido secuencial de una caché FIFO y se compila igual que Forsyth.
+
+Funciona sobre ``MarchingCubesResult`` y sobre ``trimesh.Trimesh`` sin importar
+trimesh directamente.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import time
+from dataclasses import dataclass
+from typing import Any, List, Tuple
+
+import numpy as np
+
+try:  # Acelerador opcional: sin Numba el bucle de Forsyth corre en Python.
+    import numba
+except ImportError:  # pragma: no cover - depende del entorno
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+# Parámetros clásicos del algoritmo de Forsyth.
+FORSYTH_CACHE_SIZE = 32
+_CACHE_DECAY_POWER = 1.5
+_LAST_TRI_SCORE = 0.75
+_VALENCE_BOOST_SCALE = 2.0
+_VALENCE_BOOST_POWER = 0.5
+_MAX_VALENCE = 64
+
+# Tamaño de caché FIFO usado para medir ACMR (típico de GPUs post-transform).
+ACMR_CACHE_SIZE = 16
+
+# Por encima de estas caras el modo "auto" usa el orden Morton, para que Forsyth
+# no pase de ~1 s: el núcleo compilado hace ~6·10⁵ triángulos por segundo y el
+# de Python ~2,5·10⁴.
+FORSYTH_MAX_FACES = 500_000
+FORSYTH_PYTHON_MAX_FACES = 20_000
+
+OPTIMIZE_METHODS = ("auto", "forsyth", "morton")
+
+
+@dataclass
+class VertexCacheReport:
+    """Resumen de la optimización: ACMR antes/después y método usado."""
+
+    method: str
+    faces: int
+    vertices: int
+    acmr_before: float
+    acmr_after: float
+    cache_size: int
+    seconds: float
+
+
+def _cache_position_scores(cache_size: int) -> List[float]:
+    scores: List[float] = []
+    for pos in range(cache_size):
+        if pos < 3:
+            scores.append(_LAST_TRI_SCORE)
+        else:
+            scale = 1.0 / (cache_size - 3)
+            scores.append((1.0 - (pos - 3) * scale) ** _CACHE_DECAY_POWER)
+    return scores
+
+
+def _valence_scores() -> List[float]:
+    scores = [0.0]
+    for valence in range(1, _MAX_VALENCE + 1):
+        scores.append(_VALENCE_BOOST_SCALE * valence ** (-_VALENCE_BOOST_POWER))
+    return scores
+
+
+def _vertex_triangle_adjacency(faces: np.ndarray, vertex_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Devuelve (offsets, triángulos) en formato CSR vértice → triángulos."""
+    flat = faces.ravel()
+    order = np.argsort(flat, kind="stable")
+    triangles = (order // 3).astype(np.int64)
+    counts = np.bincount(flat, minlength=vertex_count)
+    offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, triangles
+
+
+def compute_acmr(faces: np.ndarray, cache_size: int = ACMR_CACHE_SIZE) -> float:
+    """
+    Calcula el ACMR (fallos de caché por triángulo) con una caché FIFO.
+
+    Un vértice es acierto si fue insertado hace menos de ``cache_size`` fallos.
+    """
+    faces = np.asarray(faces)
+    if faces.size == 0:
+        return 0.0
+    if HAS_NUMBA:
+        flat_array = np.ascontiguousarray(faces.ravel(), dtype=np.int64)
+        return _acmr_kernel(flat_array, int(flat_array.max()) + 1, cache_size) / faces.shape[0]
+    flat = faces.ravel().tolist()
+    inserted_at = [-cache_size - 1] * (max(flat) + 1)
+    misses = 0
+    for v in flat:
+        if misses - inserted_at[v] > cache_size:
+            inserted_at[v] = misses
+            misses += 1
+    return misses / faces.shape[0]
+
+
+def _morton_order(vertices: np.ndarray, faces: np.ndarray, bits: int = 10) -> np.ndarray:
+    """Ordena triángulos por código Morton del centroide (vectorizado)."""
+    centroids = vertices[faces].mean(axis=1)
+    lo = centroids.min(axis=0)
+    extent = np.maximum(centroids.max(axis=0) - lo, 1e-12)
+    cells = ((centroids - lo) / extent * ((1 << bits) - 1)).astype(np.uint64)
+
+    code = np.zeros(len(faces), dtype=np.uint64)
+    for bit in range(bits):
+        for axis in range(3):
+            code |= ((cells[:, axis] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(3 * bit + axis)
+    return np.argsort(code, kind="stable")
+
+
+def _forsyth_order_python(faces: np.ndarray, vertex_count: int, cache_size: int) -> np.ndarray:
+    """Orden greedy de Forsyth en Python puro (listas). Devuelve la permutación de triángulos."""
+    face_count = faces.shape[0]
+    offsets_arr, adjacency_arr = _vertex_triangle_adjacency(faces, vertex_count)
+    offsets = offsets_arr.tolist()
+    adjacency = adjacency_arr.tolist()
+    face_list = faces.tolist()
+
+    position_scores = _cache_position_scores(cache_size)
+    valence_table = _valence_scores()
+
+    def score(valence: int, position: int) -> float:
+        if valence == 0:
+            return -1.0
+        value = position_scores[position] if position >= 0 else 0.0
+        if valence <= _MAX_VALENCE:
+            return value + valence_table[valence]
+        return value + _VALENCE_BOOST_SCALE * valence ** (-_VALENCE_BOOST_POWER)
+
+    valence = np.bincount(faces.ravel(), minlength=vertex_count).tolist()
+    vertex_score = [score(n, -1) for n in valence]
+    tri_score = np.asarray(vertex_score)[faces].sum(axis=1).tolist()
+    emitted = [False] * face_count
+
+    order: List[int] = []
+    cache: List[int] = []
+    cursor = 0
+    best = int(np.argmax(tri_score)) if face_count else -1
+
+    while len(order) < face_count:
+        if best < 0:
+            # Callejón sin salida: siguiente triángulo pendiente en orden de entrada.
+            while emitted[cursor]:
+                cursor += 1
+            best = cursor
+
+        tri = face_list[best]
+        emitted[best] = True
+        order.append(best)
+        for v in tri:
+            valence[v] -= 1
+
+        new_cache = list(tri)
+        for v in cache:
+            if v not in tri:
+                new_cache.append(v)
+
+        candidates: List[int] = []
+        for position, v in enumerate(new_cache):
+            in_cache = position < cache_size
+            new_score = score(valence[v], position if in_cache else -1)
+            delta = new_score - vertex_score[v]
+            vertex_score[v] = new_score
+            for t in adjacency[offsets[v] : offsets[v + 1]]:
+                if emitted[t]:
+                    continue
+                tri_score[t] += delta
+                if in_cache:
+                    candidates.append(t)
+        cache = new_cache[:cache_size]
+        best = max(candidates, key=tri_score.__getitem__) if candidates else -1
+
+    return np.asarray(order, dtype=np.int64)
+
+
+def _vertex_score(valence, position, position_scores, valence_table):
+    if valence == 0:
+        return -1.0
+    value = position_scores[position] if position >= 0 else 0.0
+    if valence <= _MAX_VALENCE:
+        return value + valence_table[valence]
+    return value + _VALENCE_BOOST_SCALE * valence ** (-_VALENCE_BOOST_POWER)
+
+
+def _forsyth_kernel(faces, offsets, adjacency, valence, cache_size, position_scores, valence_table):
+    """Mismo recorrido que ``_forsyth_order_python`` sobre arrays (se compila con Numba)."""
+    face_count = faces.shape[0]
+    vertex_count = valence.shape[0]
+    vertex_score = np.empty(vertex_count, dtype=np.float64)
+    for v in range(vertex_count):
+        vertex_score[v] = _vertex_score(valence[v], -1, position_scores, valence_table)
+    tri_score = np.empty(face_count, dtype=np.float64)
+    for t in range(face_count):
+        tri_score[t] = vertex_score[faces[t, 0]] + vertex_score[faces[t, 1]] + vertex_score[faces[t, 2]]
+    emitted = np.zeros(face_count, dtype=np.bool_)
+    order = np.empty(face_count, dtype=np.int64)
+    cache = np.empty(cache_size + 3, dtype=np.int64)
+    new_cache = np.empty(cache_size + 3, dtype=np.int64)
+    max_degree = 0
+    for v in range(vertex_count):
+        max_degree = max(max_degree, offsets[v + 1] - offsets[v])
+    candidates = np.empty((cache_size + 3) * max_degree, dtype=np.int64)
+    cache_len = 0
+    cursor = 0
+    best = int(np.argmax(tri_score)) if face_count else -1
+
+    for n in range(face_count):
+        if best < 0:
+            # Callejón sin salida: siguiente triángulo pendiente en orden de entrada.
+            while emitted[cursor]:
+                cursor += 1
+            best = cursor
+        a, b, c = faces[best, 0], faces[best, 1], faces[best, 2]
+        emitted[best] = True
+        order[n] = best
+        valence[a] -= 1
+        valence[b] -= 1
+        valence[c] -= 1
+
+        new_cache[0], new_cache[1], new_cache[2] = a, b, c
+        new_len = 3
+        for i in range(cache_len):
+            v = cache[i]
+            if v != a and v != b and v != c:
+                new_cache[new_len] = v
+                new_len += 1
+
+        count = 0
+        for position in range(new_len):
+            v = new_cache[position]
+            in_cache = position < cache_size
+            new_score = _vertex_score(valence[v], position if in_cache else -1, position_scores, valence_table)
+            delta = new_score - vertex_score[v]
+            vertex_score[v] = new_score
+            for i in range(offsets[v], offsets[v + 1]):
+                t = adjacency[i]
+                if emitted[t]:
+                    continue
+                tri_score[t] += delta
+                if in_cache:
+                    candidates[count] = t
+                    count += 1
+        cache_len = min(new_len, cache_size)
+        cache[:cache_len] = new_cache[:cache_len]
+        # El primer máximo entre los candidatos, como ``max`` en la versión Python.
+        best = -1
+        for i in range(count):
+            t = candidates[i]
+            if best < 0 or tri_score[t] > tri_score[best]:
+                best = t
+    return order
+
+
+def _acmr_kernel(flat, vertex_count, cache_size):
+    """Fallos de la caché FIFO de ``compute_acmr`` sobre el array de índices (se compila con Numba)."""
+    inserted_at = np.full(vertex_count, -cache_size - 1, dtype=np.int64)
+    misses = 0
+    for i in range(flat.shape[0]):
+        v = flat[i]
+        if misses - inserted_at[v] > cache_size:
+            inserted_at[v] = misses
+            misses += 1
+    return misses
+
+
+if HAS_NUMBA:  # pragma: no cover - depende del entorno
+    _jit = numba.njit(cache=True, nogil=True)
+    _vertex_score = _jit(_vertex_score)
+    _forsyth_kernel = _jit(_forsyth_kernel)
+    _acmr_kernel = _jit(_acmr_kernel)
+
+
+def _forsyth_order(faces: np.ndarray, vertex_count: int, cache_size: int) -> np.ndarray:
+    """Orden greedy de Forsyth (núcleo compilado si hay Numba). Devuelve la permutación de triángulos."""
+    if not HAS_NUMBA:
+        return _forsyth_order_python(faces, vertex_count, cache_size)
+    offsets, adjacency = _vertex_triangle_adjacency(faces, vertex_count)
+    valence = np.bincount(faces.ravel(), minlength=vertex_count).astype(np.int64)
+    return _forsyth_kernel(
+        np.ascontiguousarray(faces, dtype=np.int64),
+        offsets,
+        adjacency,
+        valence,
+        cache_size,
+        np.asarray(_cache_position_scores(cache_size), dtype=np.float64),
+        np.asarray(_valence_scores(), dtype=np.float64),
+    )
+
+
+def optimize_vertex_cache(
+    faces: np.ndarray,
+    vertices: np.ndarray | None = None,
+    method: str = "auto",
+    cache_size: int = FORSYTH_CACHE_SIZE,
+) -> Tuple[np.ndarray, str]:
+    """
+    Reordena los triángulos para mejorar la reutilización de la caché de vértices.
+
+    Args:
+        faces: Índices de triángulos (M, 3).
+        vertices: Posiciones (N, 3); necesarias para el método ``morton``.
+        method: ``auto``, ``forsyth`` o ``morton``.
+        cache_size: Tamaño de caché simulado por Forsyth.
+
+    Returns:
+        Tupla ``(faces_reordenadas, método_usado)``.
+    """
+    if method not in OPTIMIZE_METHODS:
+        raise ValueError(f"Método '{method}' no soportado. Usa uno de: {', '.join(OPTIMIZE_METHODS)}")
+    faces = np.asarray(faces)
+    if faces.size == 0:
+        return faces, method
+    if method == "auto":
+        limit = FORSYTH_MAX_FACES if HAS_NUMBA else FORSYTH_PYTHON_MAX_FACES
+        method = "forsyth" if faces.shape[0] <= limit or vertices is None else "morton"
+    if method == "morton":
+        if vertices is None:
+            raise ValueError("El método 'morton' necesita las posiciones de los vértices.")
+        order = _morton_order(np.asarray(vertices, dtype=np.float64), faces)
+    else:
+        vertex_count = int(faces.max()) + 1
+        order = _forsyth_order(faces, vertex_count, cache_size)
+    return faces[order], method
+
+
+def optimize_vertex_fetch(vertices: np.ndarray, faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Reordena los vértices según su primer uso en el buffer de índices.
+
+    Los vértices no referenciados se conservan al final en su orden original.
+
+    Returns:
+        Tupla ``(vertices, faces, order)`` donde ``order[i]`` es el índice
+        original del vértice que ocupa la posición ``i``.
+    """
+    vertex_count = len(vertices)
+    flat = np.asarray(faces).ravel()
+    first_use = np.full(vertex_count, flat.size, dtype=np.int64)
+    used, first_index = np.unique(flat, return_index=True)
+    first_use[used] = first_index
+    order = np.argsort(first_use, kind="stable")
+    remap = np.empty(vertex_count, dtype=np.int64)
+    remap[order] = np.arange(vertex_count)
+    new_faces = remap[faces].astype(faces.dtype, copy=False)
+    return vertices[order], new_faces, order
+
+
+def optimize_mesh(mesh: Any, method: str = "auto", cache_size: int = FORSYTH_CACHE_SIZE) -> Tuple[Any, VertexCacheReport]:
+    """
+    Aplica reordenamiento de triángulos y de vértices a una malla.
+
+    Acepta ``MarchingCubesResult`` (o cualquier dataclass con ``vertices``/``faces``)
+    y ``trimesh.Trimesh``; devuelve una malla nueva del mismo tipo y el reporte ACMR.
+    """
+    start = time.perf_counter()
+    vertices = np.asarray(mesh.vertices)
+    faces = np.asarray(mesh.faces)
+    acmr_before = compute_acmr(faces)
+
+    faces, used_method = optimize_vertex_cache(faces, vertices, method=method, cache_size=cache_size)
+    vertices, faces, order = optimize_vertex_fetch(vertices, faces)
+
+    if dataclasses.is_dataclass(mesh):
+        result = dataclasses.replace(mesh, vertices=vertices, faces=faces)
+    else:
+        result = type(mesh)(
+            vertices=vertices,
+            faces=faces,
+            vertex_normals=np.asarray(mesh.vertex_normals)[order],
+            process=False,
+        )
+
+    report = VertexCacheReport(
+        method=used_method,
+        faces=int(faces.shape[0]),
+        vertices=int(vertices.shape[0]),
+        acmr_before=acmr_before,
+        acmr_after=compute_acmr(faces),
+        cache_size=ACMR_CACHE_SIZE,
+        seconds=time.perf_counter() - start,
+    )
+    return result, report
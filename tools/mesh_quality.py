@@ -0,0 +1,89 @@
+"""
+Análisis vectorizado de calidad de malla.
+
+Calcula variedad (manifold), aristas de borde, caras, volumen, área y caja
+envolvente. ``mesh_exporter`` usa el resultado para decidir si Blender puede
+omitirse cuando no cambiaría nada.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+
+@dataclass
+class MeshQuality:
+    vertices: int
+    faces: int
+    edges: int
+    boundary_edges: int
+    non_manifold_edges: int
+    degenerate_faces: int
+    manifold: bool
+    watertight: bool
+    volume: float
+    surface_area: float
+    bounds_min: Tuple[float, float, float]
+    bounds_max: Tuple[float, float, float]
+
+
+def edge_counts(faces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Aristas no dirigidas únicas (E, 2) y cuántas caras comparten cada una."""
+    faces = np.asarray(faces, dtype=np.int64)
+    edges = np.stack([faces, np.roll(faces, -1, axis=1)], axis=-1).reshape(-1, 2)
+    edges.sort(axis=1)
+    if not len(edges):
+        return edges, np.empty(0, dtype=np.int64)
+    # Clave escalar por arista: np.unique 1D es mucho más rápido que axis=0.
+    stride = int(edges.max()) + 1
+    keys, counts = np.unique(edges[:, 0] * stride + edges[:, 1], return_counts=True)
+    return np.stack([keys // stride, keys % stride], axis=1), counts
+
+
+def analyze_mesh(vertices: np.ndarray, faces: np.ndarray) -> MeshQuality:
+    """
+    Analiza una malla triangular (o de polígonos de tamaño fijo).
+
+    El volumen es la suma de tetraedros con signo respecto al origen; solo es
+    significativo si la malla es estanca.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    _, counts = edge_counts(faces)
+    boundary = int((counts == 1).sum())
+    non_manifold = int((counts > 2).sum())
+
+    if len(faces):
+        tri = vertices[faces[:, :3]]
+        cross = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+        doubled_area = np.linalg.norm(cross, axis=1)
+        area = float(doubled_area.sum() / 2.0)
+        degenerate = int((doubled_area <= 1e-12).sum())
+        volume = float(np.einsum("ij,ij->i", tri[:, 0], np.cross(tri[:, 1], tri[:, 2])).sum() / 6.0)
+    else:
+        area = volume = 0.0
+        degenerate = 0
+
+    if len(vertices):
+        bounds_min = tuple(float(x) for x in vertices.min(axis=0))
+        bounds_max = tuple(float(x) for x in vertices.max(axis=0))
+    else:
+        bounds_min = bounds_max = (0.0, 0.0, 0.0)
+
+    return MeshQuality(
+        vertices=int(len(vertices)),
+        faces=int(len(faces)),
+        edges=int(len(counts)),
+        boundary_edges=boundary,
+        non_manifold_edges=non_manifold,
+        degenerate_faces=degenerate,
+        manifold=non_manifold == 0,
+        watertight=non_manifold == 0 and boundary == 0 and len(faces) > 0,
+        volume=volume,
+        surface_area=area,
+        bounds_min=bounds_min,  # type: ignore[arg-type]
+        bounds_max=bounds_max,  # type: ignore[arg-type]
+    )
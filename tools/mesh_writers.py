@@ -0,0 +1,232 @@
+"""
+Escritores de malla en Python puro (NumPy), sin Blender ni trimesh.
+
+- ``write_stl``: STL binario vectorizado.
+- ``write_obj_fast``: OBJ con formateo por bloques (``np.savetxt``).
+- ``GltfBuilder``: glTF 2.0 (``.gltf`` + ``.bin`` o ``.glb``) con varias mallas,
+  nodos y animaciones.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from pathlib import Path
+from typing import Any, Dict, Sequence, Tuple
+
+import numpy as np
+
+from .metrics import inc
+
+_GLB_MAGIC = 0x46546C67
+_CHUNK_JSON = 0x4E4F534A
+_CHUNK_BIN = 0x004E4942
+
+_ARRAY_BUFFER = 34962
+_ELEMENT_ARRAY_BUFFER = 34963
+_FLOAT = 5126
+_UNSIGNED_INT = 5125
+
+
+def face_normals(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    tri = np.asarray(vertices, dtype=np.float64)[faces]
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return normals / np.maximum(lengths, 1e-20)
+
+
+def vertex_normals(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """Normales por vértice ponderadas por área (acumulación con bincount)."""
+    tri = np.asarray(vertices, dtype=np.float64)[faces]
+    weighted = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    normals = np.zeros((len(vertices), 3), dtype=np.float64)
+    flat = np.asarray(faces).ravel()
+    for axis in range(3):
+        normals[:, axis] = np.bincount(flat, weights=np.repeat(weighted[:, axis], 3), minlength=len(vertices))
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return (normals / np.maximum(lengths, 1e-20)).astype(np.float32)
+
+
+def _count_written(path: Path, fmt: str) -> Path:
+    inc("vibra_bytes_written_total", path.stat().st_size, format=fmt)
+    return path
+
+
+def write_stl(path: Path, vertices: np.ndarray, faces: np.ndarray) -> Path:
+    """STL binario: cabecera de 80 bytes, contador y registros de 50 bytes."""
+    faces = np.asarray(faces)
+    record = np.dtype([("normal", "<f4", 3), ("v", "<f4", (3, 3)), ("attr", "<u2")])
+    data = np.zeros(len(faces), dtype=record)
+    data["normal"] = face_normals(vertices, faces)
+    data["v"] = np.asarray(vertices, dtype=np.float32)[faces]
+    with Path(path).open("wb") as f:
+        f.write(b"vibraalto-core binary STL".ljust(80, b"\0"))
+        f.write(struct.pack("<I", len(faces)))
+        f.write(data.tobytes())
+    return _count_written(Path(path), "stl")
+
+
+def write_obj_fast(path: Path, vertices: np.ndarray, faces: np.ndarray) -> Path:
+    """OBJ con índices 1-based; formatea por bloques en lugar de línea a línea."""
+    with Path(path).open("w", encoding="utf-8") as f:
+        np.savetxt(f, np.asarray(vertices, dtype=np.float64), fmt="v %.6f %.6f %.6f")
+        np.savetxt(f, np.asarray(faces, dtype=np.int64) + 1, fmt="f %d %d %d")
+    return _count_written(Path(path), "obj")
+
+
+class GltfBuilder:
+    """Construye un documento glTF 2.0 con un único buffer binario."""
+
+    def __init__(self) -> None:
+        self.doc: Dict[str, Any] = {
+            "asset": {"version": "2.0", "generator": "vibraalto-core"},
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+        self._blob = bytearray()
+
+    def _add_view(self, data: bytes, target: int | None = None) -> int:
+        while len(self._blob) % 4:
+            self._blob.append(0)
+        view: Dict[str, Any] = {"buffer": 0, "byteOffset": len(self._blob), "byteLength": len(data)}
+        if target is not None:
+            view["target"] = target
+        self._blob.extend(data)
+        self.doc["bufferViews"].append(view)
+        return len(self.doc["bufferViews"]) - 1
+
+    def add_accessor(self, array: np.ndarray, kind: str, target: int | None = None, bounds: bool = False) -> int:
+        """Añade un accessor (``SCALAR``/``VEC3``/``VEC4``) sobre datos float32 o uint32."""
+        is_float = np.issubdtype(array.dtype, np.floating)
+        data = np.ascontiguousarray(array, dtype="<f4" if is_float else "<u4")
+        accessor: Dict[str, Any] = {
+            "bufferView": self._add_view(data.tobytes(), target),
+            "componentType": _FLOAT if is_float else _UNSIGNED_INT,
+            "count": int(data.shape[0]),
+            "type": kind,
+        }
+        if bounds and len(data):
+            flat = data.reshape(len(data), -1)
+            accessor["min"] = [float(x) for x in flat.min(axis=0)]
+            accessor["max"] = [float(x) for x in flat.max(axis=0)]
+        self.doc["accessors"].append(accessor)
+        return len(self.doc["accessors"]) - 1
+
+    def add_mesh(
+        self, vertices: np.ndarray, faces: np.ndarray, name: str = "mesh", normals: bool | np.ndarray = True
+    ) -> int:
+        """``normals`` puede ser un array ``(V, 3)`` ya calculado (p. ej. del gradiente del grid)."""
+        vertices = np.asarray(vertices, dtype=np.float32)
+        faces = np.asarray(faces)
+        attributes = {"POSITION": self.add_accessor(vertices, "VEC3", _ARRAY_BUFFER, bounds=True)}
+        if isinstance(normals, np.ndarray):
+            attributes["NORMAL"] = self.add_accessor(normals.astype(np.float32, copy=False), "VEC3", _ARRAY_BUFFER)
+        elif normals and len(faces):
+            attributes["NORMAL"] = self.add_accessor(vertex_normals(vertices, faces), "VEC3", _ARRAY_BUFFER)
+        primitive = {
+            "attributes": attributes,
+            "indices": self.add_accessor(faces.reshape(-1), "SCALAR", _ELEMENT_ARRAY_BUFFER),
+            "mode": 4,
+        }
+        self.doc["meshes"].append({"name": name, "primitives": [primitive]})
+        return len(self.doc["meshes"]) - 1
+
+    def add_node(self, mesh: int | None = None, name: str = "node", root: bool = True, **props: Any) -> int:
+        node: Dict[str, Any] = {"name": name, **props}
+        if mesh is not None:
+            node["mesh"] = mesh
+        self.doc["nodes"].append(node)
+        index = len(self.doc["nodes"]) - 1
+        if root:
+            self.doc["scenes"][0]["nodes"].append(index)
+        return index
+
+    def add_animation(
+        self,
+        channels: Sequence[Tuple[int, str, np.ndarray, np.ndarray]],
+        name: str = "animation",
+        interpolation: str = "LINEAR",
+    ) -> int:
+        """
+        Añade una animación con canales ``(nodo, propiedad, tiempos, valores)``.
+
+        ``propiedad`` es ``translation``, ``rotation`` o ``scale``; los tiempos
+        (segundos, estrictamente crecientes) y valores son float32.
+        """
+        kinds = {"translation": "VEC3", "rotation": "VEC4", "scale": "VEC3"}
+        samplers, targets = [], []
+        for node, path, times, values in channels:
+            samplers.append(
+                {
+                    "input": self.add_accessor(np.asarray(times, dtype=np.float32), "SCALAR", bounds=True),
+                    "output": self.add_accessor(np.asarray(values, dtype=np.float32), kinds[path]),
+                    "interpolation": interpolation,
+                }
+            )
+            targets.append({"sampler": len(samplers) - 1, "target": {"node": node, "path": path}})
+        self.doc.setdefault("animations", []).append({"name": name, "samplers": samplers, "channels": targets})
+        return len(self.doc["animations"]) - 1
+
+    def _finalize(self, uri: str | None) -> Dict[str, Any]:
+        while len(self._blob) % 4:
+            self._blob.append(0)
+        doc = dict(self.doc)
+        buffer: Dict[str, Any] = {"byteLength": len(self._blob)}
+        if uri is not None:
+            buffer["uri"] = uri
+        doc["buffers"] = [buffer]
+        return {key: value for key, value in doc.items() if value != []}
+
+    def to_glb(self) -> bytes:
+        payload = json.dumps(self._finalize(None), separators=(",", ":")).encode("utf-8")
+        payload += b" " * (-len(payload) % 4)
+        binary = bytes(self._blob)
+        total = 12 + 8 + len(payload) + 8 + len(binary)
+        return b"".join(
+            [
+                struct.pack("<III", _GLB_MAGIC, 2, total),
+                struct.pack("<II", len(payload), _CHUNK_JSON),
+                payload,
+                struct.pack("<II", len(binary), _CHUNK_BIN),
+                binary,
+            ]
+        )
+
+    def write(self, path: Path) -> Path:
+        """``.glb`` → binario único; ``.gltf`` → JSON + ``.bin`` al lado."""
+        path = Path(path)
+        if path.suffix.lower() == ".glb":
+            path.write_bytes(self.to_glb())
+            return _count_written(path, "glb")
+        bin_path = path.with_suffix(".bin")
+        doc = self._finalize(bin_path.name)
+        bin_path.write_bytes(bytes(self._blob))
+        path.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        _count_written(bin_path, "gltf")
+        return _count_written(path, "gltf")
+
+
+def write_gltf(path: Path, vertices: np.ndarray, faces: np.ndarray, name: str = "mesh") -> Path:
+    """Escribe una malla como ``.gltf`` (+ ``.bin``) o ``.glb`` según la extensión."""
+    builder = GltfBuilder()
+    builder.add_node(builder.add_mesh(vertices, faces, name=name), name=name)
+    return builder.write(path)
+
+
+def write_mesh(path: Path, vertices: np.ndarray, faces: np.ndarray, fmt: str | None = None) -> Path:
+    """Despacha por formato: obj, stl, gltf, glb."""
+    fmt = (fmt or Path(path).suffix.lstrip(".")).lower()
+    path = Path(path).with_suffix(f".{fmt}")
+    if fmt == "obj":
+        return write_obj_fast(path, vertices, faces)
+    if fmt == "stl":
+        return write_stl(path, vertices, faces)
+    if fmt in {"gltf", "glb"}:
+        return write_gltf(path, vertices, faces, name=path.stem)
+    raise ValueError(f"Formato no soportado por los escritores nativos: {fmt}")
+
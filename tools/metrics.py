@@ -0,0 +1,288 @@
+"""
+Métricas de lote: contadores e histogramas de latencia sin servicios externos.
+
+Los procesos largos (lotes nocturnos, ``pipeline.cli worker``, ``serve``) solo
+dejaban líneas ``print``. Este módulo mantiene un registro en memoria
+(thread-safe) y un hilo lo vuelca periódicamente a disco:
+
+- ``<nombre>-<instancia>.prom``: formato texto de Prometheus, para el
+  *textfile collector* de ``node_exporter`` o para leerlo a mano.
+- ``<nombre>-<instancia>.json``: instantánea con contadores, conteo/suma y
+  percentiles aproximados (p50/p95/p99) de cada histograma.
+
+La instancia (``host-pid`` por defecto) separa los archivos de procesos
+concurrentes o sucesivos, que si no se pisarían entre sí; cada serie lleva
+además la etiqueta ``process`` con ese valor para que el collector no vea
+series duplicadas entre archivos. Los contadores son por proceso: el total del
+lote es la suma de los archivos. Ambos archivos se escriben a un temporal y se
+publican con ``os.replace``, así que un lector nunca ve un archivo a medias.
+
+Uso::
+
+    from tools.metrics import inc, observe, timer, start_exporter
+
+    exporter = start_exporter(Path("exports/metrics"), name="capture")
+    with timer("vibra_stage_seconds", stage="extract"):
+        ...
+    inc("vibra_triangles_total", len(faces), engine="marching_cubes")
+    exporter.stop()  # último volcado
+
+Métricas que emite el pipeline (``METRICS``): trabajos y su latencia, etapas,
+aciertos de caché, bytes leídos/escritos, triángulos generados y la E/S de la
+lectura anticipada.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import os
+import re
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+# Cubos de latencia en segundos: de etapas rápidas a trabajos de Blender largos.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0,
+)
+DEFAULT_INTERVAL = 15.0
+
+METRICS: Dict[str, Tuple[str, str]] = {
+    "vibra_jobs_total": ("counter", "Trabajos terminados por ejecutor, comando y estado."),
+    "vibra_job_seconds": ("histogram", "Duración de los trabajos por ejecutor y comando."),
+    "vibra_spool_requeued_total": ("counter", "Trabajos del spool devueltos a la cola por arrendamiento vencido."),
+    "vibra_stage_seconds": ("histogram", "Duración de cada etapa del pipeline."),
+    "vibra_cache_requests_total": ("counter", "Consultas a cachés por resultado (hit/miss)."),
+    "vibra_bytes_read_total": ("counter", "Bytes leídos por tipo de entrada."),
+    "vibra_bytes_written_total": ("counter", "Bytes escritos por formato de salida."),
+    "vibra_triangles_total": ("counter", "Triángulos generados por motor de extracción."),
+    "vibra_prefetch_seconds_total": ("counter", "Lectura anticipada: segundos de carga y de espera del consumidor."),
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Histogram:
+    """Histograma de cubos fijos (acumulados al exportar, como en Prometheus)."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        total, out = 0, []
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+    def quantile(self, q: float) -> float:
+        """Percentil aproximado por interpolación lineal dentro del cubo."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        lower, seen = 0.0, 0
+        for bound, count in zip(self.bounds + (math.inf,), self.counts):
+            if seen + count >= rank and count:
+                upper = self.max if math.isinf(bound) else min(bound, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.max
+
+
+class MetricsRegistry:
+    """Contadores e histogramas etiquetados, seguros entre hilos."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+    def prometheus_text(self, labels: Sequence[Tuple[str, str]] = ()) -> str:
+        """Texto de Prometheus; ``labels`` se añaden a todas las series."""
+        extra = tuple(labels)
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(set(self._counters) | set(self._histograms)):
+                kind, help_text = METRICS.get(name, ("histogram" if name in self._histograms else "counter", name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self._counters.get(name, {}).items()):
+                    lines.append(f"{name}{_format_labels(key, extra)} {_format_value(value)}")
+                for key, histogram in sorted(self._histograms.get(name, {}).items()):
+                    for bound, total in histogram.cumulative():
+                        le = extra + (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(key, le)} {total}")
+                    lines.append(f"{name}_sum{_format_labels(key, extra)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(key, extra)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, series in sorted(self._counters.items())
+                for key, value in sorted(series.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(key),
+                    "count": h.count,
+                    "sum": h.sum,
+                    "max": h.max,
+                    "p50": h.quantile(0.50),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                }
+                for name, series in sorted(self._histograms.items())
+                for key, h in sorted(series.items())
+            ]
+        now = time.time()
+        return {
+            "timestamp": now,
+            "uptime_seconds": now - self.started,
+            "pid": os.getpid(),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def write(
+        self, textfile: Path | None = None, json_path: Path | None = None, labels: Sequence[Tuple[str, str]] = ()
+    ) -> None:
+        """Publica el registro de forma atómica (temporal + ``os.replace``)."""
+        for path, payload in (
+            (textfile, self.prometheus_text(labels) if textfile else None),
+            (json_path, json.dumps({**self.snapshot(), "labels": dict(labels)}, indent=2) if json_path else None),
+        ):
+            if path is None or payload is None:
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, path)
+
+
+REGISTRY = MetricsRegistry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+
+
+def default_instance() -> str:
+    """Identificador del proceso para los archivos de métricas: ``host-pid``."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class MetricsExporter(threading.Thread):
+    """Hilo que vuelca el registro cada ``interval`` segundos y al parar."""
+
+    def __init__(
+        self,
+        directory: Path,
+        name: str = "pipeline",
+        interval: float = DEFAULT_INTERVAL,
+        registry: MetricsRegistry = REGISTRY,
+        instance: str | None = None,
+    ) -> None:
+        super().__init__(name="metrics-exporter", daemon=True)
+        self.registry = registry
+        self.instance = instance or default_instance()
+        stem = f"{name}-{re.sub(r'[^A-Za-z0-9_.-]', '_', self.instance)}"
+        self.textfile = Path(directory) / f"{stem}.prom"
+        self.json_path = Path(directory) / f"{stem}.json"
+        self.interval = max(0.1, interval)
+        self._stop_event = threading.Event()
+
+    def flush(self) -> None:
+        self.registry.write(self.textfile, self.json_path, labels=(("process", self.instance),))
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.flush()
+            except OSError as exc:
+                print(f"[metrics] No se pudo escribir {self.textfile}: {exc}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=self.interval)
+        self.flush()
+
+
+def start_exporter(
+    directory: Path,
+    name: str = "pipeline",
+    interval: float = DEFAULT_INTERVAL,
+    registry: MetricsRegistry = REGISTRY,
+    instance: str | None = None,
+) -> MetricsExporter:
+    """Arranca el volcado periódico de ``registry`` en ``directory`` (``<name>-<instance>.prom``/``.json``)."""
+    exporter = MetricsExporter(directory, name=name, interval=interval, registry=registry, instance=instance)
+    exporter.flush()
+    exporter.start()
+    return exporter
@@ -0,0 +1,219 @@
+"""
+Máscaras binarias empaquetadas a un bit por voxel (``np.packbits``).
+
+Una máscara ``uint8``/``bool`` pasaba a float32 al cargarse: 32 veces lo que
+ocupa a un bit por voxel. Aquí se guarda y se malla empaquetada:
+
+- En disco: ``.npz`` con ``packed`` (``uint8``, ``np.packbits`` sobre el último
+  eje, orden ``big``) y ``shape``. Se escribe con ``PackedMask.save`` o
+  ``convert --pack-threshold``.
+- En memoria: ``PackedMask`` mantiene esos bytes; ``(nx, ny, ⌈nz/8⌉)``.
+
+``packed_marching_cubes`` clasifica las celdas sobre los bytes empaquetados: las
+esquinas ``k`` y ``k + 1`` de cada fila son la palabra y la palabra desplazada un
+bit, las celdas activas salen de un OR de XOR entre esquinas y solo esas se
+desempaquetan para leer su caso. Con datos 0/1 el cruce de cada arista está en
+el punto medio, así que no hace falta interpolar; con iso 0.5 la malla es la
+misma que ``marching_cubes`` sobre la máscara desempaquetada. El grid se recorre
+en losas de planos en X, de modo que el pico de memoria es la máscara
+empaquetada más una losa y la superficie.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .marching_cubes import _EDGE_AXIS, _EDGE_ORIGIN, _TRI, MarchingCubesResult, _empty_result
+from .metrics import inc
+
+PACKED_KEYS = ("packed", "shape")
+# Bytes empaquetados por losa al mallar (cada losa crea ~10 temporales de ese tamaño).
+DEFAULT_SLAB_BYTES = 2**20
+# Planos por bloque al empaquetar un array denso (evita un temporal bool completo).
+_PACK_PLANES = 64
+
+
+def _packed_length(n: int) -> int:
+    return -(-int(n) // 8)
+
+
+@dataclass
+class PackedMask:
+    """Máscara 2D/3D con un bit por voxel, empaquetada sobre el último eje."""
+
+    bits: np.ndarray
+    shape: Tuple[int, ...]
+
+    def __post_init__(self) -> None:
+        self.shape = tuple(int(n) for n in self.shape)
+        expected = self.shape[:-1] + (_packed_length(self.shape[-1]),)
+        if self.bits.dtype != np.uint8 or self.bits.shape != expected:
+            raise ValueError(
+                f"'packed' debe ser uint8 con forma {expected}, se recibió {self.bits.dtype} {self.bits.shape}."
+            )
+
+    @classmethod
+    def from_array(cls, array: np.ndarray, threshold: float = 0.5) -> "PackedMask":
+        """Empaqueta ``array >= threshold`` por bloques de planos."""
+        array = np.asarray(array)
+        if array.ndim < 2:
+            raise ValueError(f"La máscara debe ser 2D o 3D, se recibió {array.ndim}D.")
+        bits = np.empty(array.shape[:-1] + (_packed_length(array.shape[-1]),), dtype=np.uint8)
+        for start in range(0, array.shape[0], _PACK_PLANES):
+            block = slice(start, start + _PACK_PLANES)
+            bits[block] = np.packbits(array[block] >= threshold, axis=-1)
+        return cls(bits, array.shape)
+
+    @classmethod
+    def load(cls, path: Path) -> "PackedMask":
+        with np.load(path) as payload:
+            if not all(key in payload.files for key in PACKED_KEYS):
+                raise ValueError(f"{path} no es una máscara empaquetada (faltan {', '.join(PACKED_KEYS)}).")
+            mask = cls(payload["packed"], tuple(payload["shape"]))
+        inc("vibra_bytes_read_total", Path(path).stat().st_size, kind="packed")
+        return mask
+
+    def save(self, path: Path) -> Path:
+        np.savez_compressed(path, packed=self.bits, shape=np.asarray(self.shape, dtype=np.int64))
+        return Path(path)
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes)
+
+    def count(self) -> int:
+        """Voxeles a 1 (popcount por tabla sobre los bytes empaquetados)."""
+        return int(_POPCOUNT[self.bits].sum(dtype=np.int64))
+
+    def unpack(self, region: Sequence[slice] | None = None) -> np.ndarray:
+        """Desempaqueta ``region`` (o todo) a ``uint8`` 0/1."""
+        region = tuple(region or ()) + (slice(None),) * (self.ndim - len(region or ()))
+        outer = self.bits[region[:-1]]
+        return np.unpackbits(outer, axis=-1, count=self.shape[-1])[..., region[-1]]
+
+
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def is_packed_file(path: Path) -> bool:
+    """``True`` si ``path`` es un ``.npz`` con las claves de máscara empaquetada."""
+    path = Path(path)
+    if path.suffix.lower() != ".npz" or not path.exists():
+        return False
+    with np.load(path) as payload:
+        return all(key in payload.files for key in PACKED_KEYS)
+
+
+def binary_levels(array: np.ndarray) -> Tuple[float, float] | None:
+    """``(bajo, alto)`` si ``array`` es ``bool`` o entero con dos valores como mucho; si no ``None``."""
+    if array.dtype != bool and not np.issubdtype(array.dtype, np.integer):
+        return None
+    if not array.size:
+        return None
+    lo, hi = array.min(), array.max()
+    for start in range(0, array.shape[0], _PACK_PLANES):
+        block = array[start : start + _PACK_PLANES]
+        if ((block != lo) & (block != hi)).any():
+            return None
+    return float(lo), float(hi)
+
+
+def _shift_next(words: np.ndarray) -> np.ndarray:
+    """Desplaza las filas un bit hacia ``k + 1``: el bit ``k`` pasa a ser el vecino ``k + 1``."""
+    out = words << np.uint8(1)
+    out[..., :-1] |= words[..., 1:] >> np.uint8(7)
+    return out
+
+
+def _set_bits(words: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Fila plana y posición de cada bit a 1, en orden C; solo se desempaquetan los bytes no nulos."""
+    flat = words.reshape(-1, words.shape[-1])
+    rows, cols = np.nonzero(flat)
+    hit, offset = np.nonzero(np.unpackbits(flat[rows, cols][:, None], axis=1))
+    return rows[hit], cols[hit].astype(np.int64) * 8 + offset
+
+
+def _bit_at(words: np.ndarray, rows: np.ndarray, pos: np.ndarray) -> np.ndarray:
+    flat = words.reshape(-1, words.shape[-1])
+    return (flat[rows, pos >> 3] >> (7 - (pos & 7)).astype(np.uint8)) & np.uint8(1)
+
+
+def packed_marching_cubes(
+    mask: PackedMask,
+    spacing: Sequence[float] = (1.0, 1.0, 1.0),
+    slab_bytes: int = DEFAULT_SLAB_BYTES,
+) -> MarchingCubesResult:
+    """
+    Marching Cubes sobre una máscara empaquetada, con vértices en el punto medio de cada arista.
+
+    Misma convención que ``marching_cubes`` (tablas, soldado por arista del grid
+    y orden de vértices y caras) con los voxeles a 1 dentro de la superficie.
+    """
+    if mask.ndim != 3:
+        raise ValueError(f"La máscara empaquetada debe ser 3D, se recibió {mask.ndim}D.")
+    nx, ny, nz = mask.shape
+    if min(mask.shape) < 2:
+        return _empty_result()
+    bits = mask.bits
+    total = nx * ny * nz
+    # Bits válidos de una fila para celdas y aristas en Z (k < nz - 1).
+    valid = np.packbits(np.arange(bits.shape[-1] * 8) < nz - 1)
+    slab = max(1, int(slab_bytes) // max(1, ny * bits.shape[-1]))
+
+    ids: List[List[np.ndarray]] = [[], [], []]
+    face_ids: List[np.ndarray] = []
+    for i0 in range(0, nx - 1, slab):
+        i1 = min(i0 + slab, nx - 1)
+        planes = np.asarray(bits[i0 : i1 + 1])
+        # Las aristas en Y/Z del último plano solo las aporta la última losa.
+        own = planes if i1 == nx - 1 else planes[:-1]
+
+        rows, k = _set_bits(planes[:-1] ^ planes[1:])
+        ids[0].append(((i0 + rows // ny) * ny + rows % ny) * nz + k)
+        rows, k = _set_bits(own[:, :-1] ^ own[:, 1:])
+        ids[1].append(total + ((i0 + rows // (ny - 1)) * ny + rows % (ny - 1)) * nz + k)
+        rows, k = _set_bits((own ^ _shift_next(own)) & valid)
+        ids[2].append(2 * total + (i0 * ny + rows) * nz + k)
+
+        # Esquinas en el orden de CUBE_CORNERS: (0,0,0) (1,0,0) (1,1,0) (0,1,0) y sus vecinas en Z.
+        base = [planes[:-1, :-1], planes[1:, :-1], planes[1:, 1:], planes[:-1, 1:]]
+        corners = base + [_shift_next(words) for words in base]
+        active = np.zeros_like(corners[0])
+        for words in corners[1:]:
+            active |= words ^ corners[0]
+        rows, k = _set_bits(active & valid)
+        if not len(rows):
+            continue
+        inside = np.zeros(len(rows), dtype=np.uint8)
+        for bit, words in enumerate(corners):
+            inside |= _bit_at(words, rows, k) << np.uint8(bit)
+        # El caso marca las esquinas por debajo del iso: las que están a 0.
+        table = _TRI[inside ^ np.uint8(0xFF), :15]
+        present = table >= 0
+        cell, _ = np.nonzero(present)
+        edges = table[present]
+        origin = _EDGE_ORIGIN[edges]
+        ci = i0 + rows[cell] // (ny - 1) + origin[:, 0]
+        cj = rows[cell] % (ny - 1) + origin[:, 1]
+        ck = k[cell] + origin[:, 2]
+        face_ids.append(_EDGE_AXIS[edges] * total + (ci * ny + cj) * nz + ck)
+
+    edge_ids = np.concatenate([part for axis in ids for part in axis])
+    if not len(edge_ids) or not face_ids:
+        return _empty_result()
+    i, j, k = np.unravel_index(edge_ids % total, mask.shape)
+    coords = np.stack([i, j, k], axis=1).astype(np.float64)
+    coords[np.arange(len(edge_ids)), edge_ids // total] += 0.5
+    faces = np.searchsorted(edge_ids, np.concatenate(face_ids))
+    return MarchingCubesResult(
+        vertices=(coords * np.asarray(spacing, dtype=np.float64)).astype(np.float32),
+        faces=faces.reshape(-1, 3).astype(np.int32),
+    )
@@ -0,0 +1,174 @@
+"""
+Lectura anticipada de entradas en corridas de varios archivos.
+
+Al mallar una secuencia (fotogramas 4D, patrones glob) cada grid se leía y
+descomprimía justo antes de mallarlo, con la CPU esperando al disco. ``ReadAhead``
+recorre una lista de cargadores en orden y mantiene hasta ``depth`` cargas en
+vuelo en un pool de hilos acotado mientras el consumidor trabaja con el
+elemento actual (la lectura y la descompresión ``zlib`` de ``.npz`` liberan el
+GIL). Los datos ya cargados y aún no consumidos no pasan de ``max_bytes``: no se
+lanza otra carga si la cola más una estimación de lo que está en vuelo (el
+tamaño del último elemento) lo superaría, salvo la del siguiente elemento, que
+siempre se lanza para no bloquear (y mientras no ha terminado la primera carga,
+que da la estimación, solo hay una en vuelo).
+
+``PrefetchStats`` resume cuánto tiempo de E/S quedó oculto: la suma de las
+cargas en segundo plano menos lo que el consumidor tuvo que esperar por ellas.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Iterator, Sequence, Tuple
+
+from .memory_budget import format_mib
+from .metrics import inc
+
+DEFAULT_DEPTH = 2
+DEFAULT_MAX_BYTES = 2**30
+
+
+@dataclass
+class PrefetchStats:
+    """Tiempos de carga y de espera acumulados por un ``ReadAhead``."""
+
+    items: int = 0
+    depth: int = DEFAULT_DEPTH
+    workers: int = 1
+    max_bytes: int = DEFAULT_MAX_BYTES
+    load_seconds: float = 0.0
+    wait_seconds: float = 0.0
+    peak_queued_bytes: int = 0
+    throttled: int = 0
+
+    @property
+    def hidden_seconds(self) -> float:
+        return max(0.0, self.load_seconds - self.wait_seconds)
+
+    def describe(self) -> str:
+        share = 100.0 * self.hidden_seconds / self.load_seconds if self.load_seconds else 0.0
+        return (
+            f"{self.items} entradas leídas por adelantado (profundidad {self.depth}, {self.workers} hilo(s)): "
+            f"E/S {self.load_seconds:.2f}s, espera {self.wait_seconds:.2f}s, oculta {self.hidden_seconds:.2f}s "
+            f"({share:.0f} %); cola máxima {format_mib(self.peak_queued_bytes)} de {format_mib(self.max_bytes)}"
+            + (f", {self.throttled} carga(s) frenadas por memoria" if self.throttled else "")
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "items": self.items,
+            "depth": self.depth,
+            "workers": self.workers,
+            "max_bytes": self.max_bytes,
+            "load_seconds": self.load_seconds,
+            "wait_seconds": self.wait_seconds,
+            "hidden_seconds": self.hidden_seconds,
+            "peak_queued_bytes": self.peak_queued_bytes,
+            "throttled": self.throttled,
+        }
+
+
+def _nbytes(value: Any) -> int:
+    return int(getattr(value, "nbytes", 0) or 0)
+
+
+class ReadAhead:
+    """
+    Itera ``loaders`` en orden devolviendo ``(valor, segundos de carga, segundos de espera)``.
+
+    Uso::
+
+        with ReadAhead([source.load for source in sources], depth=2) as reader:
+            for grid, load_seconds, wait_seconds in reader:
+                ...
+        print(reader.stats.describe())
+    """
+
+    def __init__(
+        self,
+        loaders: Sequence[Callable[[], Any]],
+        depth: int = DEFAULT_DEPTH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        workers: int | None = None,
+        stats: PrefetchStats | None = None,
+    ) -> None:
+        if depth < 1:
+            raise ValueError("La profundidad de lectura anticipada debe ser >= 1.")
+        self.loaders = list(loaders)
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.workers = max(1, min(workers or depth, depth))
+        # ``stats`` permite que quien llama lea el resumen sin conservar el lector.
+        self.stats = stats if stats is not None else PrefetchStats()
+        self.stats.depth, self.stats.workers, self.stats.max_bytes = depth, self.workers, max_bytes
+        self._lock = threading.Lock()
+        self._queued_bytes = 0
+        self._last_bytes: int | None = None
+        self._pending: Deque[Future] = deque()
+        self._next = 0
+        self._pool: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> "ReadAhead":
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch")
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _load(self, loader: Callable[[], Any]) -> Tuple[Any, float]:
+        start = time.perf_counter()
+        value = loader()
+        seconds = time.perf_counter() - start
+        size = _nbytes(value)
+        with self._lock:
+            self._queued_bytes += size
+            self._last_bytes = size
+            self.stats.peak_queued_bytes = max(self.stats.peak_queued_bytes, self._queued_bytes)
+        return value, seconds
+
+    def _fill(self) -> None:
+        """Lanza cargas hasta ``depth`` en vuelo mientras quepan en ``max_bytes``."""
+        assert self._pool is not None, "ReadAhead debe usarse como gestor de contexto."
+        while self._next < len(self.loaders) and len(self._pending) < self.depth:
+            if self._pending:
+                with self._lock:
+                    last = self._last_bytes
+                    in_flight = sum(1 for future in self._pending if not future.done())
+                    projected = self._queued_bytes + (in_flight + 1) * (last or 0)
+                if last is None:
+                    return  # hasta la primera carga no se sabe cuánto ocupa una entrada
+                if projected > self.max_bytes:
+                    self.stats.throttled += 1
+                    return
+            self._pending.append(self._pool.submit(self._load, self.loaders[self._next]))
+            self._next += 1
+
+    def __iter__(self) -> Iterator[Tuple[Any, float, float]]:
+        self._fill()
+        while self._pending:
+            future = self._pending.popleft()
+            start = time.perf_counter()
+            value, load_seconds = future.result()
+            wait = time.perf_counter() - start
+            with self._lock:
+                self._queued_bytes -= _nbytes(value)
+            self.stats.items += 1
+            self.stats.load_seconds += load_seconds
+            self.stats.wait_seconds += wait
+            inc("vibra_prefetch_seconds_total", load_seconds, kind="load")
+            inc("vibra_prefetch_seconds_total", wait, kind="wait")
+            # Se relanza antes de ceder el valor: la siguiente carga corre mientras se usa este.
+            self._fill()
+            yield value, load_seconds, wait
@@ -0,0 +1,349 @@
+"""
+Cola de trabajos sobre un directorio compartido (NFS) para varios hosts.
+
+Estructura del spool::
+
+    spool/
+      pending/   trabajos en espera (<id>.json)
+      running/   trabajos reclamados (<id>.json) + arrendamiento (<id>.lease)
+      done/      resultado de los terminados (<id>.json)
+      failed/    resultado de los fallidos tras agotar reintentos
+      tmp/       escrituras a medias (se publican con rename)
+
+Coordinación sin servidor:
+- Reclamar = ``os.rename(pending/<id>.json, running/<id>.json)``. El rename es
+  atómico en el servidor NFS: si dos workers compiten, uno recibe
+  ``FileNotFoundError`` y pasa al siguiente.
+- Cada trabajo en curso tiene un arrendamiento con el worker dueño y un latido
+  que se renueva cada ``heartbeat`` segundos desde un hilo.
+- Cualquier worker devuelve a ``pending/`` los trabajos cuyo latido superó
+  ``lease`` segundos (host caído o proceso muerto). El dueño original, si
+  sigue vivo, detecta que perdió el arrendamiento y descarta su resultado.
+
+Cada trabajo ejecuta ``python -m <módulo> <argv...>`` en un subproceso, con la
+salida en ``done/<id>.<intento>.log`` o ``failed/<id>.<intento>.log``. Con
+``metrics_dir`` el worker añade ``--metrics-dir`` y una instancia propia de cada
+intento, así las métricas del subproceso no se pierden ni pisan las de otro. Los
+relojes de los hosts deben estar sincronizados (NTP); el margen de ``lease``
+absorbe desfases pequeños.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from .metrics import inc, observe
+
+# Solo se ejecutan estas CLIs del proyecto.
+ALLOWED_MODULES = ("pipeline.cli", "tools.mesh_exporter")
+DEFAULT_LEASE_SECONDS = 60.0
+DEFAULT_HEARTBEAT_SECONDS = 10.0
+DEFAULT_POLL_SECONDS = 2.0
+DEFAULT_MAX_ATTEMPTS = 3
+# Candidatos entre los que cada worker elige al azar para no competir por el primero.
+CLAIM_WINDOW = 16
+
+STATES = ("pending", "running", "done", "failed", "tmp")
+
+
+@dataclass
+class SpoolJob:
+    """Trabajo serializado en el spool."""
+
+    job_id: str
+    argv: List[str]
+    module: str = "pipeline.cli"
+    timeout: float | None = None
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    submitted: float = field(default_factory=time.time)
+    history: List[Dict[str, Any]] = field(default_factory=list)
+
+    @classmethod
+    def from_mapping(cls, payload: Dict[str, Any]) -> "SpoolJob":
+        return cls(**{key: payload[key] for key in cls.__dataclass_fields__ if key in payload})
+
+
+@dataclass
+class SpoolResult:
+    job_id: str
+    worker: str
+    status: str
+    returncode: int | None
+    seconds: float
+    attempts: int
+    log_path: str | None = None
+    error: str | None = None
+
+
+class Spool:
+    """Operaciones atómicas sobre el directorio del spool."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        for state in STATES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def path(self, state: str, name: str) -> Path:
+        return self.root / state / name
+
+    def _publish(self, payload: Dict[str, Any], target: Path) -> None:
+        """Escribe en ``tmp/`` y publica con rename para no exponer archivos a medias."""
+        tmp = self.path("tmp", f"{target.name}.{uuid.uuid4().hex}")
+        tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        os.replace(tmp, target)
+
+    def submit(
+        self,
+        argv: Sequence[str],
+        module: str = "pipeline.cli",
+        timeout: float | None = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> SpoolJob:
+        if module not in ALLOWED_MODULES:
+            raise ValueError(f"Módulo '{module}' no permitido. Usa uno de: {', '.join(ALLOWED_MODULES)}")
+        # Prefijo temporal para que los workers atiendan en orden de llegada.
+        job = SpoolJob(
+            job_id=f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}",
+            argv=list(argv),
+            module=module,
+            timeout=timeout,
+            max_attempts=max_attempts,
+        )
+        self._publish(asdict(job), self.path("pending", f"{job.job_id}.json"))
+        return job
+
+    def pending(self) -> List[str]:
+        return sorted(p.stem for p in (self.root / "pending").glob("*.json"))
+
+    def claim(self) -> SpoolJob | None:
+        """Reclama un trabajo pendiente por rename atómico; ``None`` si no hay."""
+        candidates = self.pending()[:CLAIM_WINDOW]
+        random.shuffle(candidates)
+        for job_id in candidates:
+            running = self.path("running", f"{job_id}.json")
+            try:
+                os.rename(self.path("pending", f"{job_id}.json"), running)
+            except FileNotFoundError:
+                continue  # otro worker lo reclamó antes
+            # rename conserva el mtime de la cola; se renueva para que no parezca vencido.
+            os.utime(running)
+            job = SpoolJob.from_mapping(json.loads(running.read_text(encoding="utf-8")))
+            # El intento se cuenta al reclamar: un trabajo que tumba hosts acaba en failed/.
+            job.attempts += 1
+            self._publish(asdict(job), running)
+            return job
+        return None
+
+    def write_lease(self, job_id: str, worker: str) -> None:
+        lease = {"worker": worker, "host": socket.gethostname(), "pid": os.getpid(), "heartbeat": time.time()}
+        self._publish(lease, self.path("running", f"{job_id}.lease"))
+
+    def read_lease(self, job_id: str) -> Dict[str, Any] | None:
+        try:
+            return json.loads(self.path("running", f"{job_id}.lease").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def owns(self, job_id: str, worker: str) -> bool:
+        lease = self.read_lease(job_id)
+        return lease is not None and lease.get("worker") == worker
+
+    def finish(self, job: SpoolJob, result: SpoolResult, worker: str) -> bool:
+        """
+        Publica el resultado si el worker sigue siendo dueño del arrendamiento.
+
+        Los fallos con reintentos disponibles vuelven a ``pending/``.
+        """
+        if not self.owns(job.job_id, worker):
+            return False
+        state = "done" if result.status == "done" else "failed"
+        if result.log_path:
+            log_path = self.path(state, f"{job.job_id}.{job.attempts}.log")
+            os.replace(result.log_path, log_path)
+            result.log_path = str(log_path)
+        job.history.append(asdict(result))
+        running = self.path("running", f"{job.job_id}.json")
+        if result.status == "failed" and job.attempts < job.max_attempts:
+            self._publish(asdict(job), running)
+            os.replace(running, self.path("pending", running.name))
+        else:
+            self._publish({**asdict(job), "result": asdict(result)}, self.path(state, running.name))
+            running.unlink(missing_ok=True)
+        self.path("running", f"{job.job_id}.lease").unlink(missing_ok=True)
+        return True
+
+    def requeue_expired(self, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> List[str]:
+        """Devuelve a ``pending/`` los trabajos con latido vencido o sin arrendamiento."""
+        requeued = []
+        now = time.time()
+        for running in (self.root / "running").glob("*.json"):
+            job_id = running.stem
+            lease = self.read_lease(job_id)
+            if lease is not None:
+                heartbeat = float(lease.get("heartbeat", 0.0))
+            else:
+                # Recién reclamado y aún sin arrendamiento: se usa la fecha del archivo.
+                try:
+                    stat = running.stat()
+                except FileNotFoundError:
+                    continue
+                heartbeat = max(stat.st_mtime, stat.st_ctime)
+            if now - heartbeat < lease_seconds:
+                continue
+            # Se reclama para sí con un rename antes de tocarlo: solo un worker lo requeue.
+            reaping = self.path("tmp", f"{job_id}.reap.{uuid.uuid4().hex}")
+            try:
+                os.rename(running, reaping)
+            except FileNotFoundError:
+                continue
+            self.path("running", f"{job_id}.lease").unlink(missing_ok=True)
+            job = SpoolJob.from_mapping(json.loads(reaping.read_text(encoding="utf-8")))
+            job.history.append({"status": "expired", "lease": lease, "at": now})
+            target = "pending" if job.attempts < job.max_attempts else "failed"
+            self._publish(asdict(job), self.path(target, f"{job_id}.json"))
+            reaping.unlink(missing_ok=True)
+            requeued.append(job_id)
+        return requeued
+
+    def status(self) -> Dict[str, int]:
+        return {
+            state: len(list((self.root / state).glob("*.json"))) for state in ("pending", "running", "done", "failed")
+        }
+
+
+class _Heartbeat(threading.Thread):
+    """Renueva el arrendamiento mientras dura el trabajo."""
+
+    def __init__(self, spool: Spool, job_id: str, worker: str, interval: float) -> None:
+        super().__init__(name=f"heartbeat-{job_id}", daemon=True)
+        self.spool = spool
+        self.job_id = job_id
+        self.worker = worker
+        self.interval = interval
+        self.lost = False
+        self._finished = threading.Event()
+
+    def run(self) -> None:
+        while not self._finished.wait(self.interval):
+            if not self.spool.owns(self.job_id, self.worker):
+                self.lost = True
+                return
+            self.spool.write_lease(self.job_id, self.worker)
+
+    def stop(self) -> None:
+        self._finished.set()
+        self.join()
+
+
+class SpoolWorker:
+    """Bucle de un worker: requeue de vencidos → reclamar → ejecutar → publicar."""
+
+    def __init__(
+        self,
+        spool: Spool,
+        worker_id: str | None = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        heartbeat_seconds: float = DEFAULT_HEARTBEAT_SECONDS,
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+        cwd: Path | None = None,
+        metrics_dir: Path | None = None,
+    ) -> None:
+        if heartbeat_seconds >= lease_seconds:
+            raise ValueError("El latido debe ser más frecuente que la duración del arrendamiento.")
+        self.spool = spool
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.cwd = cwd or Path(__file__).resolve().parent.parent
+        self.metrics_dir = metrics_dir
+
+    def job_argv(self, job: SpoolJob) -> List[str]:
+        """Argumentos del subproceso, con las opciones de métricas del worker si el trabajo no trae las suyas."""
+        argv = list(job.argv)
+        if self.metrics_dir is None or "--metrics-dir" in argv:
+            return argv
+        options = [
+            "--metrics-dir",
+            str(self.metrics_dir),
+            "--metrics-instance",
+            f"{self.worker_id}-{job.job_id}.{job.attempts}",
+        ]
+        # pipeline.cli las lee antes del subcomando; mesh_exporter tiene un único parser.
+        return options + argv if job.module == "pipeline.cli" else argv + options
+
+    def run_job(self, job: SpoolJob) -> SpoolResult:
+        log_path = self.spool.path("tmp", f"{job.job_id}.{self.worker_id}.log")
+        cmd = [sys.executable, "-m", job.module, *self.job_argv(job)]
+        start = time.perf_counter()
+        returncode: int | None = None
+        error = None
+        with log_path.open("w", encoding="utf-8") as log:
+            log.write(f"$ {' '.join(cmd)}\n")
+            log.flush()
+            try:
+                returncode = subprocess.run(
+                    cmd, cwd=self.cwd, stdout=log, stderr=subprocess.STDOUT, timeout=job.timeout, check=False
+                ).returncode
+            except subprocess.TimeoutExpired:
+                error = f"superó el límite de {job.timeout:.0f}s"
+        return SpoolResult(
+            job_id=job.job_id,
+            worker=self.worker_id,
+            status="done" if returncode == 0 else "failed",
+            returncode=returncode,
+            seconds=time.perf_counter() - start,
+            attempts=job.attempts,
+            log_path=str(log_path),
+            error=error or (None if returncode == 0 else f"código {returncode}"),
+        )
+
+    def step(self) -> SpoolResult | None:
+        """Procesa como máximo un trabajo; ``None`` si la cola está vacía."""
+        for job_id in self.spool.requeue_expired(self.lease_seconds):
+            print(f"[spool] Arrendamiento vencido, trabajo devuelto a la cola: {job_id}")
+            inc("vibra_spool_requeued_total")
+        job = self.spool.claim()
+        if job is None:
+            return None
+        self.spool.write_lease(job.job_id, self.worker_id)
+        heartbeat = _Heartbeat(self.spool, job.job_id, self.worker_id, self.heartbeat_seconds)
+        heartbeat.start()
+        try:
+            result = self.run_job(job)
+        finally:
+            heartbeat.stop()
+        command = job.argv[0] if job.argv else job.module
+        observe("vibra_job_seconds", result.seconds, runner="spool", command=command)
+        if heartbeat.lost or not self.spool.finish(job, result, self.worker_id):
+            print(f"[spool] {self.worker_id} perdió el arrendamiento de {job.job_id}; resultado descartado.")
+            inc("vibra_jobs_total", runner="spool", command=command, status="lost")
+            return result
+        inc("vibra_jobs_total", runner="spool", command=command, status=result.status)
+        print(f"[spool] {job.job_id}: {result.status} en {result.seconds:.1f}s ({self.worker_id})")
+        return result
+
+    def run(self, max_jobs: int | None = None, exit_when_empty: bool = False) -> int:
+        """Bucle principal; devuelve el número de trabajos procesados."""
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            result = self.step()
+            if result is None:
+                if exit_when_empty:
+                    break
+                time.sleep(self.poll_seconds * random.uniform(0.5, 1.5))
+                continue
+            processed += 1
+        return processed
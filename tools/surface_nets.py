@@ -0,0 +1,240 @@
+"""
+Extracción de superficies duales: Naive Surface Nets y Dual Contouring.
+
+A diferencia de Marching Cubes, se genera un único vértice por celda activa
+(celda cuyo signo cambia en alguna esquina) y un quad por cada arista del grid
+que cruza la iso-superficie.
+
+Compromisos frente a Marching Cubes:
+
+- En superficies cerradas y suaves el número de vértices y de triángulos es
+  prácticamente el mismo (dos triángulos por quad). Solo ``quads=True``
+  reduce a la mitad el número de caras.
+- Los triángulos están mucho mejor formados (casi sin astillas de ángulo
+  pequeño), lo que acorta el remesh posterior.
+- En celdas ambiguas (p. ej. máscaras binarias con ruido a escala de voxel)
+  el vértice único une hojas distintas de la superficie y aparecen aristas no
+  variedad (compartidas por más de dos caras). Marching Cubes sigue siendo la
+  opción si la malla debe ser variedad en esos casos.
+
+- ``surface_nets``: vértice = media de los cruces en las aristas de la celda.
+- ``dual_contouring``: vértice = minimizador de la QEF (planos tangentes por
+  gradiente), regularizado hacia la media y acotado a la celda.
+
+Todo está vectorizado con NumPy; la memoria temporal escala con el número de
+celdas activas salvo por las máscaras booleanas del volumen.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from .marching_cubes import CUBE_CORNERS, EDGE_CONNECTIONS, MarchingCubesResult
+
+ENGINES = ("marching_cubes", "surface_nets", "dual_contouring")
+
+_CORNERS = CUBE_CORNERS.astype(np.int64)
+_EDGE_A = np.array([a for a, _ in EDGE_CONNECTIONS], dtype=np.int64)
+_EDGE_B = np.array([b for _, b in EDGE_CONNECTIONS], dtype=np.int64)
+
+# Peso de regularización de la QEF hacia el centro de masa de los cruces.
+QEF_REGULARIZATION = 0.05
+
+
+def _prepare(volume: np.ndarray, step_size: int) -> np.ndarray:
+    vol = np.asarray(volume, dtype=np.float32)
+    if vol.ndim != 3:
+        raise ValueError(f"El volumen debe ser 3D, se recibió {vol.ndim}D.")
+    if step_size < 1:
+        raise ValueError("step_size debe ser >= 1.")
+    if step_size > 1:
+        vol = vol[::step_size, ::step_size, ::step_size]
+    return vol
+
+
+def _active_cells(below: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Devuelve coordenadas (N, 3) e índices lineales (N,) de las celdas activas."""
+    cells = below[:-1, :-1, :-1]
+    any_below = cells.copy()
+    all_below = cells.copy()
+    for dx, dy, dz in _CORNERS[1:]:
+        corner = below[dx : dx + cells.shape[0], dy : dy + cells.shape[1], dz : dz + cells.shape[2]]
+        any_below |= corner
+        all_below &= corner
+    active = any_below & ~all_below
+    coords = np.stack(np.nonzero(active), axis=1)
+    linear = np.ravel_multi_index(coords.T, cells.shape) if len(coords) else np.empty(0, dtype=np.int64)
+    return coords, linear
+
+
+def _edge_crossings(
+    vol: np.ndarray, coords: np.ndarray, iso_level: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Para cada celda activa y cada una de sus 12 aristas devuelve el punto de
+    cruce local (N, 12, 3), la máscara de cruce (N, 12) y los valores de esquina (N, 8).
+    """
+    corner_idx = coords[:, None, :] + _CORNERS[None, :, :]
+    values = vol[corner_idx[..., 0], corner_idx[..., 1], corner_idx[..., 2]]
+    va = values[:, _EDGE_A]
+    vb = values[:, _EDGE_B]
+    crossing = (va < iso_level) != (vb < iso_level)
+    denom = np.where(crossing, vb - va, 1.0)
+    t = np.clip(np.where(crossing, (iso_level - va) / denom, 0.5), 0.0, 1.0)
+    pa = CUBE_CORNERS[_EDGE_A]
+    pb = CUBE_CORNERS[_EDGE_B]
+    points = pa[None, :, :] + t[..., None] * (pb - pa)[None, :, :]
+    return points, crossing, values
+
+
+def _corner_gradients(vol: np.ndarray, coords: np.ndarray) -> np.ndarray:
+    """Gradiente por diferencias centrales en las 8 esquinas de cada celda (N, 8, 3)."""
+    corner_idx = coords[:, None, :] + _CORNERS[None, :, :]
+    grads = np.empty(corner_idx.shape, dtype=np.float32)
+    for axis in range(3):
+        hi = corner_idx.copy()
+        lo = corner_idx.copy()
+        hi[..., axis] = np.minimum(hi[..., axis] + 1, vol.shape[axis] - 1)
+        lo[..., axis] = np.maximum(lo[..., axis] - 1, 0)
+        span = (hi[..., axis] - lo[..., axis]).clip(min=1)
+        grads[..., axis] = (
+            vol[hi[..., 0], hi[..., 1], hi[..., 2]] - vol[lo[..., 0], lo[..., 1], lo[..., 2]]
+        ) / span
+    return grads
+
+
+def _solve_qef(
+    points: np.ndarray, crossing: np.ndarray, normals: np.ndarray, mass_point: np.ndarray
+) -> np.ndarray:
+    """Resuelve (AᵀA + λI) x = Aᵀb + λ·c por lotes y acota el resultado a la celda."""
+    weights = crossing.astype(np.float64)[..., None]
+    n = normals * weights
+    ata = np.einsum("nei,nej->nij", n, normals)
+    atb = np.einsum("nei,ne->ni", n, np.einsum("nei,nei->ne", normals, points))
+    reg = QEF_REGULARIZATION * np.eye(3)
+    solution = np.linalg.solve(ata + reg, (atb + QEF_REGULARIZATION * mass_point)[..., None])[..., 0]
+    return np.clip(solution, 0.0, 1.0)
+
+
+def _quads(below: np.ndarray, linear: np.ndarray, cell_shape: Tuple[int, int, int]) -> np.ndarray:
+    """Un quad por arista interior con cambio de signo, orientado hacia fuera."""
+    quads = []
+    for axis in range(3):
+        u, v = (axis + 1) % 3, (axis + 2) % 3
+        lo = [slice(None)] * 3
+        hi = [slice(None)] * 3
+        lo[axis] = slice(0, -1)
+        hi[axis] = slice(1, None)
+        for other in (u, v):
+            lo[other] = slice(1, below.shape[other] - 1)
+            hi[other] = slice(1, below.shape[other] - 1)
+        start_below = below[tuple(lo)]
+        changes = start_below != below[tuple(hi)]
+        idx = np.stack(np.nonzero(changes), axis=1)
+        if not len(idx):
+            continue
+        flip = start_below[tuple(idx.T)]
+        idx[:, u] += 1
+        idx[:, v] += 1
+
+        eu = np.zeros(3, dtype=np.int64)
+        ev = np.zeros(3, dtype=np.int64)
+        eu[u] = 1
+        ev[v] = 1
+        ring = [idx - eu - ev, idx - ev, idx, idx - eu]
+        cells = np.stack([np.ravel_multi_index(c.T, cell_shape) for c in ring], axis=1)
+        # El normal saliente apunta hacia la esquina "por debajo" del iso.
+        cells[flip] = cells[flip][:, ::-1]
+        quads.append(cells)
+
+    if not quads:
+        return np.empty((0, 4), dtype=np.int64)
+    cells = np.concatenate(quads)
+    return np.searchsorted(linear, cells)
+
+
+def _triangulate(quads: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """Divide cada quad por su diagonal más corta."""
+    p = vertices[quads]
+    d02 = np.einsum("ij,ij->i", p[:, 0] - p[:, 2], p[:, 0] - p[:, 2])
+    d13 = np.einsum("ij,ij->i", p[:, 1] - p[:, 3], p[:, 1] - p[:, 3])
+    use02 = d02 <= d13
+    tris = np.empty((len(quads) * 2, 3), dtype=quads.dtype)
+    tris[0::2] = np.where(use02[:, None], quads[:, [0, 1, 2]], quads[:, [0, 1, 3]])
+    tris[1::2] = np.where(use02[:, None], quads[:, [0, 2, 3]], quads[:, [1, 2, 3]])
+    return tris
+
+
+def _extract(
+    volume: np.ndarray,
+    iso_level: float,
+    spacing: Sequence[float],
+    step_size: int,
+    quads: bool,
+    dual_contouring: bool,
+) -> MarchingCubesResult:
+    vol = _prepare(volume, step_size)
+    below = vol < iso_level
+    cell_shape = tuple(n - 1 for n in vol.shape)
+    coords, linear = _active_cells(below)
+    if not len(coords):
+        width = 4 if quads else 3
+        return MarchingCubesResult(np.empty((0, 3), dtype=np.float32), np.empty((0, width), dtype=np.int32))
+
+    points, crossing, _ = _edge_crossings(vol, coords, iso_level)
+    counts = crossing.sum(axis=1, keepdims=True)
+    mass_point = (points * crossing[..., None]).sum(axis=1) / np.maximum(counts, 1)
+    local = mass_point
+    if dual_contouring:
+        grads = _corner_gradients(vol, coords)
+        t = np.linalg.norm(points - CUBE_CORNERS[_EDGE_A][None], axis=-1)[..., None]
+        normals = grads[:, _EDGE_A] * (1.0 - t) + grads[:, _EDGE_B] * t
+        normals /= np.maximum(np.linalg.norm(normals, axis=-1, keepdims=True), 1e-12)
+        local = _solve_qef(points.astype(np.float64), crossing, normals.astype(np.float64), mass_point)
+
+    scale = np.asarray(spacing, dtype=np.float64) * step_size
+    vertices = ((coords + local) * scale).astype(np.float32)
+    faces = _quads(below, linear, cell_shape)
+    if not quads:
+        faces = _triangulate(faces, vertices)
+    return MarchingCubesResult(vertices=vertices, faces=faces.astype(np.int32))
+
+
+def surface_nets(
+    volume: np.ndarray,
+    iso_level: float = 0.5,
+    spacing: Sequence[float] = (1.0, 1.0, 1.0),
+    step_size: int = 1,
+    quads: bool = False,
+) -> MarchingCubesResult:
+    """
+    Naive Surface Nets vectorizado.
+
+    Args:
+        volume: Arreglo 3D con los voxeles (valores altos = dentro).
+        iso_level: Umbral para la superficie.
+        spacing: Escala de voxel en cada eje (x, y, z).
+        step_size: Submuestreo del grid antes de extraer.
+        quads: Si es ``True`` devuelve caras (M, 4) en lugar de triángulos.
+
+    Returns:
+        MarchingCubesResult con vértices (N, 3) y caras (M, 3) o (M, 4).
+    """
+    return _extract(volume, iso_level, spacing, step_size, quads, dual_contouring=False)
+
+
+def dual_contouring(
+    volume: np.ndarray,
+    iso_level: float = 0.5,
+    spacing: Sequence[float] = (1.0, 1.0, 1.0),
+    step_size: int = 1,
+    quads: bool = False,
+) -> MarchingCubesResult:
+    """
+    Dual Contouring vectorizado (QEF con gradientes por diferencias centrales).
+
+    Misma interfaz que ``surface_nets``; conserva mejor aristas vivas.
+    """
+    return _extract(volume, iso_level, spacing, step_size, quads, dual_contouring=True)